@@ -51,7 +51,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.middleware.StaticFilesMiddleware",  # WhiteNoise, async-capable
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -155,6 +155,15 @@ else:
     MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_URL = '/media/'
 
+# Protected file serving (core.file_serving): '' streams from Django,
+# 'x-accel-redirect' hands off to nginx (internal location at FILE_SERVE_ACCEL_PREFIX
+# aliased to MEDIA_ROOT), 'x-sendfile' to Apache/lighttpd
+FILE_SERVE_OFFLOAD = config('FILE_SERVE_OFFLOAD', default='')
+FILE_SERVE_ACCEL_PREFIX = config('FILE_SERVE_ACCEL_PREFIX', default='/protected-media/')
+
+# Image thumbnails/previews (core.thumbnails) render in a background thread after commit
+THUMBNAILS_ASYNC = config('THUMBNAILS_ASYNC', default=True, cast=bool)
+
 # Whitenoise config
 WHITENOISE_USE_FINDERS = True
 WHITENOISE_AUTOREFRESH = True
@@ -211,6 +220,37 @@ STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='')
 STRIPE_WEBHOOK_SECRET = config('STRIPE_WEBHOOK_SECRET', default='')
 FRONTEND_URL = config('FRONTEND_URL', default='https://theminddepartmentwebsite.vercel.app')
 
+# Cache — shared Redis when configured, per-process memory otherwise
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Comms push delivery (comms.pubsub): new-message notifications are shared
+# across workers through Redis pub/sub when configured, in-process otherwise.
+# Waiting streams also re-check the database every COMMS_STREAM_POLL_SECONDS.
+COMMS_PUBSUB_URL = config('COMMS_PUBSUB_URL', default=REDIS_URL)
+COMMS_STREAM_POLL_SECONDS = config('COMMS_STREAM_POLL_SECONDS', default=10, cast=int)
+
+# Reports/dashboard response cache lifetime in seconds (0 disables it)
+REPORT_CACHE_TTL = config('REPORT_CACHE_TTL', default=300, cast=int)
+
+# Compliance dashboard analytics cache lifetime in seconds (0 disables it)
+COMPLIANCE_ANALYTICS_TTL = config('COMPLIANCE_ANALYTICS_TTL', default=60, cast=int)
+
+# Wall-clock zone that analytics bucket bookings by (hour, weekday, date)
+REPORT_TIME_ZONE = config('REPORT_TIME_ZONE', default='Europe/London')
+
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
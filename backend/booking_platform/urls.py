@@ -18,7 +18,7 @@ Including another URLconf
 from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from django.http import FileResponse, Http404
+from django.http import Http404
 import os
 from rest_framework.routers import DefaultRouter
 from bookings.api_views import ServiceViewSet, StaffViewSet, BookingViewSet, ClientViewSet, StaffBlockViewSet
@@ -26,10 +26,12 @@ from bookings.views_schedule import BusinessHoursViewSet, StaffScheduleViewSet,
 from bookings.views_intake import IntakeProfileViewSet, IntakeWellbeingDisclaimerViewSet
 from bookings.views_payment import ClassPackageViewSet, ClientCreditViewSet, PaymentIntegrationViewSet
 from bookings.views_stripe import create_checkout_session, stripe_webhook
-from bookings.views_dashboard import dashboard_summary, backfill_sbe
+from bookings.views_dashboard import dashboard_summary, dashboard_client_quadrant, dashboard_revenue_bookings, backfill_sbe
 from bookings.views_working_hours import working_hours_list, working_hours_bulk_set, working_hours_delete
 from bookings.views_timesheets import timesheets_list, timesheets_update, timesheets_generate, timesheets_summary
-from bookings.views_reports import reports_overview, reports_daily, reports_monthly, reports_staff, reports_insights, reports_staff_hours, reports_staff_hours_csv, reports_leave
+from bookings.views_reports import reports_overview, reports_daily, reports_monthly, reports_staff, reports_insights, reports_staff_hours, reports_staff_hours_csv, reports_leave, reports_cache
+from core.file_serving import is_protected_media, serve_protected_file
+from core.streaming import StreamingFileResponse
 from bookings.views_demo import demo_seed_view, demo_status_view
 from bookings.views_demo_availability import demo_availability_seed_view
 from bookings.views_availability import (
@@ -96,6 +98,8 @@ urlpatterns = [
     path('api/comms/', include('comms.urls')),
     path('api/documents/', include('documents.urls')),
     path('api/dashboard-summary/', dashboard_summary, name='dashboard-summary'),
+    path('api/dashboard-summary/client-quadrant/', dashboard_client_quadrant, name='dashboard-client-quadrant'),
+    path('api/dashboard-summary/revenue-bookings/', dashboard_revenue_bookings, name='dashboard-revenue-bookings'),
     path('api/backfill-sbe/', backfill_sbe, name='backfill-sbe'),
     path('api/reports/overview/', reports_overview, name='reports-overview'),
     path('api/reports/daily/', reports_daily, name='reports-daily'),
@@ -105,10 +109,13 @@ urlpatterns = [
     path('api/reports/staff-hours/', reports_staff_hours, name='reports-staff-hours'),
     path('api/reports/staff-hours/csv/', reports_staff_hours_csv, name='reports-staff-hours-csv'),
     path('api/reports/leave/', reports_leave, name='reports-leave'),
+    path('api/reports/cache/', reports_cache, name='reports-cache'),
     # Demo data
     path('api/demo/seed/', demo_seed_view, name='demo-seed'),
     path('api/demo/status/', demo_status_view, name='demo-status'),
     path('api/demo/availability/seed/', demo_availability_seed_view, name='demo-availability-seed'),
+    # Protected uploads (vault, compliance evidence, incident photos, chat attachments)
+    path('api/files/<slug:kind>/<int:pk>/', serve_protected_file, name='protected-file'),
     # Availability engine
     path('api/availability/', staff_availability_view, name='staff-availability'),
     path('api/availability/slots/', staff_free_slots_view, name='staff-free-slots'),
@@ -117,9 +124,11 @@ urlpatterns = [
 
 def serve_media(request, path):
     """Serve uploaded media files in all environments (static() only works with DEBUG=True)."""
+    if is_protected_media(path):
+        raise Http404('File not found')
     file_path = os.path.join(settings.MEDIA_ROOT, path)
     if os.path.isfile(file_path):
-        return FileResponse(open(file_path, 'rb'))
+        return StreamingFileResponse(open(file_path, 'rb'))
     raise Http404('File not found')
 
 urlpatterns += [
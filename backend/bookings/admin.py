@@ -1,14 +1,13 @@
 from django.contrib import admin
-from django.http import HttpResponse
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from django.db.models import Count, Q, Sum
-import csv
+from django.db.models import Count, Max, Q, Sum
 from datetime import datetime, timedelta
 from .models import Service, Staff, Client, Booking, BusinessHours, StaffSchedule, Closure, StaffLeave, Session, OptimisationLog
 from .models_intake import IntakeProfile, IntakeWellbeingDisclaimer
 from .models_payment import ClassPackage, ClientCredit, PaymentTransaction
+from core.exports import iter_values, stream_csv
 
 # Customize admin site branding
 admin.site.site_header = "The Mind Department Admin"
@@ -63,32 +62,44 @@ class ClientAdmin(admin.ModelAdmin):
     last_booking.short_description = 'Last Booking'
     
     def export_clients_csv(self, request, queryset):
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="clients_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Name', 'Email', 'Phone', 'Total Bookings', 'Total Spent', 'Services Used', 'Last Booking', 'Created'])
-        
-        for client in queryset:
-            bookings = client.bookings.filter(status__in=['confirmed', 'completed'])
-            total_bookings = bookings.count()
-            total_spent = sum(b.service.price for b in bookings)
-            services = ', '.join(set(b.service.name for b in bookings))
-            last_booking = bookings.order_by('-start_time').first()
-            last_booking_date = last_booking.start_time.strftime('%Y-%m-%d') if last_booking else 'Never'
-            
-            writer.writerow([
-                client.name,
-                client.email,
-                client.phone,
-                total_bookings,
-                f"£{total_spent:.2f}",
-                services,
-                last_booking_date,
-                client.created_at.strftime('%Y-%m-%d')
-            ])
-        
-        return response
+        # Totals come from the changelist's grouped query and service names
+        # from a second stream in the same client order, merged row by row.
+        clients = iter_values(
+            queryset.annotate(
+                _last_booking=Max('bookings__start_time', filter=Q(bookings__status__in=['confirmed', 'completed'])),
+            ).order_by('id'),
+            ('id', 'name', 'email', 'phone', '_booking_count', '_total_spent', '_last_booking', 'created_at'),
+        )
+        services_used = iter_values(
+            Booking.objects.filter(client__in=queryset, status__in=['confirmed', 'completed'])
+            .order_by('client_id', 'service__name').distinct(),
+            ('client_id', 'service__name'),
+        )
+
+        def rows():
+            pending = next(services_used, None)
+            for client_id, name, email, phone, n_bookings, spent, last_start, created_at in clients:
+                names = []
+                while pending is not None and pending[0] <= client_id:
+                    if pending[0] == client_id:
+                        names.append(pending[1])
+                    pending = next(services_used, None)
+                yield [
+                    name,
+                    email,
+                    phone,
+                    n_bookings,
+                    f"£{spent or 0:.2f}",
+                    ', '.join(names),
+                    last_start.strftime('%Y-%m-%d') if last_start else 'Never',
+                    created_at.strftime('%Y-%m-%d'),
+                ]
+
+        return stream_csv(
+            f'clients_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+            ['Name', 'Email', 'Phone', 'Total Bookings', 'Total Spent', 'Services Used', 'Last Booking', 'Created'],
+            rows(),
+        )
     export_clients_csv.short_description = 'Export selected clients to CSV'
 
 
@@ -106,35 +117,39 @@ class BookingAdmin(admin.ModelAdmin):
     price.short_description = 'Price'
     
     def export_bookings_csv(self, request, queryset):
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="bookings_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Booking ID', 'Client Name', 'Client Email', 'Client Phone', 'Service', 'Staff', 'Date', 'Start Time', 'End Time', 'Duration', 'Price', 'Status', 'Notes', 'Created'])
-        
-        for booking in queryset:
-            writer.writerow([
-                booking.id,
-                booking.client.name,
-                booking.client.email,
-                booking.client.phone,
-                booking.service.name,
-                booking.staff.name,
-                booking.start_time.strftime('%Y-%m-%d'),
-                booking.start_time.strftime('%H:%M'),
-                booking.end_time.strftime('%H:%M'),
-                f"{booking.service.duration_minutes} min",
-                f"£{booking.service.price}",
-                booking.status,
-                booking.notes,
-                booking.created_at.strftime('%Y-%m-%d %H:%M')
-            ])
-        
-        return response
+        fields = (
+            'id', 'client__name', 'client__email', 'client__phone', 'service__name', 'staff__name',
+            'start_time', 'end_time', 'service__duration_minutes', 'service__price', 'status', 'notes', 'created_at',
+        )
+        rows = (
+            [
+                booking_id, client_name, client_email, client_phone, service_name, staff_name,
+                start_time.strftime('%Y-%m-%d'),
+                start_time.strftime('%H:%M'),
+                end_time.strftime('%H:%M') if end_time else '',
+                f"{duration} min",
+                f"£{price}",
+                booking_status,
+                notes,
+                created_at.strftime('%Y-%m-%d %H:%M'),
+            ]
+            for (booking_id, client_name, client_email, client_phone, service_name, staff_name,
+                 start_time, end_time, duration, price, booking_status, notes, created_at)
+            in iter_values(queryset, fields)
+        )
+        return stream_csv(
+            f'bookings_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+            ['Booking ID', 'Client Name', 'Client Email', 'Client Phone', 'Service', 'Staff', 'Date', 'Start Time', 'End Time', 'Duration', 'Price', 'Status', 'Notes', 'Created'],
+            rows,
+        )
     export_bookings_csv.short_description = 'Export selected bookings to CSV'
     
     def mark_as_completed(self, request, queryset):
+        service_ids = list(queryset.values_list('service_id', flat=True).distinct())
         updated = queryset.update(status='completed')
+        # queryset.update() bypasses the Booking signals — resync the rollups
+        from .rollups import rebuild_rollups
+        rebuild_rollups(service_ids=service_ids)
         self.message_user(request, f'{updated} booking(s) marked as completed.')
     mark_as_completed.short_description = 'Mark selected as completed'
     
@@ -272,25 +287,19 @@ class OptimisationLogAdmin(admin.ModelAdmin):
     actions = ['export_logs_csv']
 
     def export_logs_csv(self, request, queryset):
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="optimisation_logs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'Booking ID', 'Client', 'Reliability Score', 'Risk Score', 'Override', 'Override Reason', 'Recommendation', 'Timestamp'])
-        for log in queryset.select_related('booking__client'):
-            client_name = log.booking.client.name if log.booking and log.booking.client else ''
-            rec = log.output_recommendation or {}
-            writer.writerow([
-                log.id,
-                log.booking_id,
-                client_name,
-                log.reliability_score,
-                log.risk_score,
-                log.override_applied,
-                log.override_reason,
-                str(rec),
-                log.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            ])
-        return response
+        fields = (
+            'id', 'booking_id', 'booking__client__name', 'reliability_score', 'risk_score',
+            'override_applied', 'override_reason', 'output_recommendation', 'timestamp',
+        )
+        rows = (
+            [*row[:2], row[2] or '', *row[3:7], str(row[7] or {}), row[8].strftime('%Y-%m-%d %H:%M:%S')]
+            for row in iter_values(queryset, fields)
+        )
+        return stream_csv(
+            f'optimisation_logs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+            ['ID', 'Booking ID', 'Client', 'Reliability Score', 'Risk Score', 'Override', 'Override Reason', 'Recommendation', 'Timestamp'],
+            rows,
+        )
     export_logs_csv.short_description = 'Export selected logs to CSV'
 
 
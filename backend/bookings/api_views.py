@@ -125,28 +125,26 @@ class ServiceViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'], url_path='recalculate-intelligence')
     def recalculate_intelligence(self, request):
         """POST /api/services/recalculate-intelligence/ — Trigger intelligence recalc"""
-        from django.core.management import call_command
-        import io
-        out = io.StringIO()
-        call_command('update_service_intelligence', stdout=out)
-        return Response({'status': 'ok', 'message': out.getvalue().strip()})
+        from .service_intelligence import recalculate_service_intelligence
+        updated = recalculate_service_intelligence()
+        return Response({'status': 'ok', 'message': f'Updated intelligence for {updated} services'})
 
     @action(detail=False, methods=['get'], url_path='optimisation-csv')
     def optimisation_csv(self, request):
         """GET /api/services/optimisation-csv/ — Export R&D audit trail as CSV"""
-        import csv
-        from django.http import HttpResponse
-        logs = ServiceOptimisationLog.objects.select_related('service').all()[:500]
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="service_optimisation_log.csv"'
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'Service', 'Previous Price', 'New Price', 'Previous Deposit',
-                        'New Deposit', 'Reason', 'AI Recommended', 'Owner Override', 'Timestamp'])
-        for l in logs:
-            writer.writerow([l.id, l.service.name, l.previous_price, l.new_price,
-                           l.previous_deposit, l.new_deposit, l.reason,
-                           l.ai_recommended, l.owner_override, l.timestamp.isoformat()])
-        return response
+        from core.exports import iter_values, stream_csv
+        fields = ('id', 'service__name', 'previous_price', 'new_price', 'previous_deposit',
+                  'new_deposit', 'reason', 'ai_recommended', 'owner_override', 'timestamp')
+        rows = (
+            [*row[:-1], row[-1].isoformat()]
+            for row in iter_values(ServiceOptimisationLog.objects.all(), fields)
+        )
+        return stream_csv(
+            'service_optimisation_log.csv',
+            ['ID', 'Service', 'Previous Price', 'New Price', 'Previous Deposit',
+             'New Deposit', 'Reason', 'AI Recommended', 'Owner Override', 'Timestamp'],
+            rows,
+        )
 
 
 class StaffViewSet(viewsets.ModelViewSet):
@@ -282,18 +280,13 @@ class BookingViewSet(viewsets.ModelViewSet):
 
                 # Auto-create CRM lead if not exists
                 try:
-                    from crm.models import Lead
-                    if not Lead.objects.filter(client_id=client.id).exists():
-                        Lead.objects.create(
-                            name=client.name,
-                            email=client.email,
-                            phone=client.phone,
-                            source='booking',
-                            status='QUALIFIED',
-                            value_pence=service.price_pence,
-                            notes=f'Auto-created from booking #{booking.id}',
-                            client_id=client.id,
-                        )
+                    from crm.sync import ensure_client_lead
+                    ensure_client_lead(
+                        client,
+                        status='QUALIFIED',
+                        value_pence=service.price_pence,
+                        notes=f'Auto-created from booking #{booking.id}',
+                    )
                 except Exception:
                     pass  # CRM is optional, don't break bookings
 
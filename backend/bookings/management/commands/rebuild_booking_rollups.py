@@ -0,0 +1,25 @@
+"""
+Management command: rebuild_booking_rollups
+Rebuilds the daily booking rollups (ServiceDailyStat, BookingDailyRollup) from raw
+Booking rows. Booking writes keep them current; run this after bulk imports or
+direct SQL changes, or to realign revenue after service price changes.
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily booking rollups used by service intelligence and reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--service', type=int, action='append', dest='service_ids',
+            help='Limit the rebuild to a service id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        from bookings.rollups import rebuild_rollups
+
+        counts = rebuild_rollups(service_ids=options['service_ids'])
+        for name, rows in counts.items():
+            self.stdout.write(f'  {name}: {rows} rows')
+        self.stdout.write(self.style.SUCCESS('Booking rollups rebuilt.'))
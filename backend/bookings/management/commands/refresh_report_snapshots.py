@@ -0,0 +1,61 @@
+"""
+Management command: refresh_report_snapshots
+Rebuilds precomputed report snapshots (reports insights, dashboard sections)
+that are missing, stale after changes to their source models, or from an
+earlier day.
+
+Usage:
+    python manage.py refresh_report_snapshots           # Refresh stale snapshots once
+    python manage.py refresh_report_snapshots --all     # Rebuild every snapshot
+    python manage.py refresh_report_snapshots --loop    # Run continuously (for Railway)
+"""
+import time
+import logging
+from django.core.management.base import BaseCommand
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild stale precomputed report snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Rebuild every snapshot, stale or not')
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Run continuously in a loop (for Railway background worker)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=15,
+            help='Interval in minutes between checks (default: 15)',
+        )
+
+    def handle(self, *args, **options):
+        from bookings.snapshots import SNAPSHOTS, refresh_snapshot, refresh_stale_snapshots
+
+        if options['all']:
+            for name in SNAPSHOTS:
+                refresh_snapshot(name)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(SNAPSHOTS)} report snapshots'))
+            return
+
+        if options['loop']:
+            interval = options['interval']
+            self.stdout.write(self.style.SUCCESS(
+                f'[SNAPSHOT] Starting snapshot refresh loop (every {interval} minutes)'
+            ))
+            while True:
+                try:
+                    refresh_stale_snapshots()
+                except Exception as e:
+                    self.stderr.write(self.style.ERROR(f'[SNAPSHOT] Error: {e}'))
+                    logger.exception('[SNAPSHOT] Unhandled error in snapshot loop')
+                time.sleep(interval * 60)
+        else:
+            rebuilt = refresh_stale_snapshots()
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt {len(rebuilt)} report snapshots{': ' + ', '.join(rebuilt) if rebuilt else ''}"
+            ))
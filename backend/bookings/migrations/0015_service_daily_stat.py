@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0014_add_reminder_tracking_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('no_shows', models.IntegerField(default=0)),
+                ('cancelled', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Service price of completed bookings', max_digits=12)),
+                ('peak_count', models.IntegerField(default=0, help_text='Bookings starting 10:00-14:00')),
+                ('off_peak_count', models.IntegerField(default=0)),
+                ('risk_sum', models.FloatField(default=0)),
+                ('risk_count', models.IntegerField(default=0, help_text='Bookings with a risk score')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='bookings.service')),
+            ],
+            options={
+                'verbose_name': 'Service Daily Stat',
+                'ordering': ['service', 'date'],
+                'indexes': [models.Index(fields=['date', 'service'], name='bookings_se_date_e8c010_idx')],
+                'constraints': [models.UniqueConstraint(fields=('service', 'date'), name='uniq_service_daily_stat')],
+            },
+        ),
+    ]
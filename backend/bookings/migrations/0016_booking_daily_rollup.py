@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0015_service_daily_stat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('risk_level', models.CharField(blank=True, default='', max_length=10)),
+                ('data_origin', models.CharField(default='REAL', max_length=4)),
+                ('bookings', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Sum of service price', max_digits=12)),
+                ('deposits', models.DecimalField(decimal_places=2, default=0, help_text='Sum of payment_amount where paid', max_digits=12)),
+                ('revenue_at_risk', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('risk_sum', models.FloatField(default=0)),
+                ('risk_count', models.IntegerField(default=0, help_text='Bookings with a risk score')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='bookings.service')),
+                ('staff', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='bookings.staff')),
+            ],
+            options={
+                'verbose_name': 'Booking Daily Rollup',
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['data_origin', 'date'], name='bookings_bo_data_or_0aedff_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'staff', 'service', 'status', 'risk_level', 'data_origin'), name='uniq_booking_daily_rollup')],
+            },
+        ),
+    ]
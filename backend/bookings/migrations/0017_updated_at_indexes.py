@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0016_booking_daily_rollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['updated_at'], name='bookings_bo_updated_e5c31b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['updated_at'], name='bookings_le_updated_9da4de_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timesheetentry',
+            index=models.Index(fields=['updated_at'], name='bookings_ti_updated_8d32c3_idx'),
+        ),
+    ]
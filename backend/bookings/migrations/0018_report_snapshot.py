@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0017_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('payload', models.JSONField(default=dict)),
+                ('computed_at', models.DateTimeField(help_text='When the build that produced the payload started')),
+                ('changed_at', models.DateTimeField(blank=True, help_text='First source change seen since computed_at', null=True)),
+            ],
+            options={
+                'verbose_name': 'Report Snapshot',
+                'ordering': ['name'],
+            },
+        ),
+    ]
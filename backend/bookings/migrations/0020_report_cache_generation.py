@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0019_booking_start_status_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportCacheGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Report Cache Generation',
+            },
+        ),
+    ]
@@ -22,6 +22,9 @@ from .models_availability import (
     LeaveRequest, BlockedTime, Shift, TimesheetEntry,
 )
 
+# Import rollup models
+from .models_rollups import ServiceDailyStat, BookingDailyRollup, ReportSnapshot, ReportCacheGeneration
+
 class Service(models.Model):
     PAYMENT_TYPE_CHOICES = [
         ('full', 'Full Payment'),
@@ -261,6 +264,9 @@ class Booking(models.Model):
         indexes = [
             models.Index(fields=['start_time', 'staff']),
             models.Index(fields=['status']),
+            models.Index(fields=['updated_at']),
+            # Demand heatmap / demand index scans: date window + status filter
+            models.Index(fields=['start_time', 'status'], name='booking_start_status_idx'),
         ]
 
     def __str__(self):
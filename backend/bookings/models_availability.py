@@ -177,6 +177,7 @@ class LeaveRequest(models.Model):
 
     class Meta:
         ordering = ['-start_datetime']
+        indexes = [models.Index(fields=['updated_at'])]
 
     def __str__(self):
         return f"{self.staff_member.name} {self.leave_type} {self.start_datetime:%Y-%m-%d} [{self.status}]"
@@ -263,6 +264,14 @@ TIMESHEET_SOURCE_CHOICES = [
 ]
 
 
+def net_hours(start, end, break_minutes):
+    """Hours between start and end less the break, to 2dp; None without both ends."""
+    if start and end:
+        delta = (end - start).total_seconds() / 3600
+        return round(max(0, delta - break_minutes / 60), 2)
+    return None
+
+
 class TimesheetEntry(models.Model):
     staff_member = models.ForeignKey(
         'Staff', on_delete=models.CASCADE, related_name='timesheet_entries'
@@ -282,23 +291,18 @@ class TimesheetEntry(models.Model):
     class Meta:
         ordering = ['-date']
         unique_together = ['staff_member', 'date']
+        indexes = [models.Index(fields=['updated_at'])]
 
     def __str__(self):
         return f"{self.staff_member.name} {self.date} [{self.status}]"
 
     @property
     def scheduled_hours(self):
-        if self.scheduled_start and self.scheduled_end:
-            delta = (self.scheduled_end - self.scheduled_start).total_seconds() / 3600
-            return round(max(0, delta - self.break_minutes / 60), 2)
-        return None
+        return net_hours(self.scheduled_start, self.scheduled_end, self.break_minutes)
 
     @property
     def actual_hours(self):
-        if self.actual_start and self.actual_end:
-            delta = (self.actual_end - self.actual_start).total_seconds() / 3600
-            return round(max(0, delta - self.break_minutes / 60), 2)
-        return None
+        return net_hours(self.actual_start, self.actual_end, self.break_minutes)
 
     @property
     def variance(self):
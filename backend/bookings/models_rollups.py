@@ -0,0 +1,115 @@
+"""
+Booking Rollups — Models
+Pre-aggregated per-day booking facts, maintained incrementally from Booking writes
+so intelligence and reporting jobs read small daily rows instead of raw history,
+plus precomputed report payloads (ReportSnapshot) and the report cache's
+invalidation counter (ReportCacheGeneration).
+"""
+from django.db import models
+
+
+# ─────────────────────────────────────────────────────────────────────
+# ServiceDailyStat — per-service, per-day counters for Service Intelligence
+# ─────────────────────────────────────────────────────────────────────
+class ServiceDailyStat(models.Model):
+    service = models.ForeignKey(
+        'Service', on_delete=models.CASCADE, related_name='daily_stats'
+    )
+    date = models.DateField()
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    no_shows = models.IntegerField(default=0)
+    cancelled = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text='Service price of completed bookings')
+    peak_count = models.IntegerField(default=0, help_text='Bookings starting 10:00-14:00')
+    off_peak_count = models.IntegerField(default=0)
+    risk_sum = models.FloatField(default=0)
+    risk_count = models.IntegerField(default=0, help_text='Bookings with a risk score')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['service', 'date']
+        verbose_name = 'Service Daily Stat'
+        constraints = [
+            models.UniqueConstraint(fields=['service', 'date'], name='uniq_service_daily_stat'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'service']),
+        ]
+
+    def __str__(self):
+        return f"{self.service_id} @ {self.date}: {self.total} bookings"
+
+
+# ─────────────────────────────────────────────────────────────────────
+# BookingDailyRollup — daily booking fact table for Reports
+# ─────────────────────────────────────────────────────────────────────
+class BookingDailyRollup(models.Model):
+    date = models.DateField()
+    staff = models.ForeignKey(
+        'Staff', on_delete=models.CASCADE, related_name='daily_rollups'
+    )
+    service = models.ForeignKey(
+        'Service', on_delete=models.CASCADE, related_name='daily_rollups'
+    )
+    status = models.CharField(max_length=20)
+    risk_level = models.CharField(max_length=10, blank=True, default='')
+    data_origin = models.CharField(max_length=4, default='REAL')
+    bookings = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text='Sum of service price')
+    deposits = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text='Sum of payment_amount where paid')
+    revenue_at_risk = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    risk_sum = models.FloatField(default=0)
+    risk_count = models.IntegerField(default=0, help_text='Bookings with a risk score')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['date']
+        verbose_name = 'Booking Daily Rollup'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'staff', 'service', 'status', 'risk_level', 'data_origin'],
+                name='uniq_booking_daily_rollup',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['data_origin', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} staff={self.staff_id} service={self.service_id} {self.status}: {self.bookings}"
+
+
+# ─────────────────────────────────────────────────────────────────────
+# ReportSnapshot — precomputed report payloads served as-is until stale
+# ─────────────────────────────────────────────────────────────────────
+class ReportSnapshot(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    payload = models.JSONField(default=dict)
+    computed_at = models.DateTimeField(help_text='When the build that produced the payload started')
+    changed_at = models.DateTimeField(null=True, blank=True, help_text='First source change seen since computed_at')
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Report Snapshot'
+
+    def __str__(self):
+        return f"{self.name} @ {self.computed_at:%Y-%m-%d %H:%M}{' (stale)' if self.is_stale else ''}"
+
+    @property
+    def is_stale(self):
+        return self.changed_at is not None and self.changed_at >= self.computed_at
+
+
+# ─────────────────────────────────────────────────────────────────────
+# ReportCacheGeneration — shared invalidation counter for cached reports
+# ─────────────────────────────────────────────────────────────────────
+class ReportCacheGeneration(models.Model):
+    """Single row (pk=1); lives in the database so every worker sees a bump."""
+    generation = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Report Cache Generation'
+
+    def __str__(self):
+        return f"report cache generation {self.generation}"
@@ -0,0 +1,199 @@
+"""
+Report Cache — conditional GET + response caching for Reports/Dashboard
+Responses are cached under the normalised query params plus a data version:
+the latest Booking/TimesheetEntry/LeaveRequest modification and an invalidation
+generation bumped by write signals and rebuilds, read together in one query.
+The generation lives in the database (ReportCacheGeneration) rather than the
+cache, so a bump reaches every worker even when CACHES is per-process.
+Every cached response carries ETag/Last-Modified, so a repeat load with
+If-None-Match is answered 304 after the version query alone.
+
+REPORT_CACHE_TTL (seconds, 0 disables) bounds how long a response is reused
+for data the watermark does not track (service prices, client reliability).
+"""
+import hashlib
+from datetime import timezone as dt_timezone
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework.response import Response
+
+from .time_buckets import local_today
+
+KEY_PREFIX = 'reports'
+STAT_KEYS = ('hits', 'misses', 'not_modified')
+
+# Query params that control the cache rather than the report
+CONTROL_PARAMS = ('refresh',)
+
+
+def _ttl():
+    return getattr(settings, 'REPORT_CACHE_TTL', 300)
+
+
+def _watermark_models():
+    from .models import Booking
+    from .models_availability import TimesheetEntry, LeaveRequest
+    return (Booking, TimesheetEntry, LeaveRequest)
+
+
+def _as_datetime(value):
+    # Raw SQL skips the ORM converters, so SQLite hands back text
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if value is not None and timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+    return value
+
+
+def data_version():
+    """
+    (latest modification across the report source tables, invalidation
+    generation), in one query.
+    """
+    from .models_rollups import ReportCacheGeneration
+    qn = connection.ops.quote_name
+    columns = [
+        f'(SELECT MAX({qn("updated_at")}) FROM {qn(model._meta.db_table)})'
+        for model in _watermark_models()
+    ]
+    columns.append(
+        f'(SELECT {qn("generation")} FROM {qn(ReportCacheGeneration._meta.db_table)} '
+        f'WHERE {qn("id")} = 1)'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {", ".join(columns)}')
+        *row, generation = cursor.fetchone()
+    stamps = [_as_datetime(v) for v in row if v is not None]
+    return (max(stamps) if stamps else None), (generation or 0)
+
+
+def report_generation():
+    from .models_rollups import ReportCacheGeneration
+    return ReportCacheGeneration.objects.filter(pk=1).values_list('generation', flat=True).first() or 0
+
+
+def invalidate_reports():
+    """Drop every cached report response by moving to a new generation."""
+    from .models_rollups import ReportCacheGeneration
+    counter = ReportCacheGeneration.objects.filter(pk=1)
+    if not counter.update(generation=F('generation') + 1):
+        try:
+            with transaction.atomic():
+                ReportCacheGeneration.objects.create(pk=1, generation=1)
+        except IntegrityError:
+            # Another worker created the row first
+            counter.update(generation=F('generation') + 1)
+
+
+def _record(stat):
+    key = f'{KEY_PREFIX}:stats:{stat}'
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def cache_stats():
+    """Hit/miss counters for the report cache, plus the combined hit ratio."""
+    counts = {stat: cache.get(f'{KEY_PREFIX}:stats:{stat}', 0) for stat in STAT_KEYS}
+    served = counts['hits'] + counts['not_modified']
+    total = served + counts['misses']
+    return {
+        **counts,
+        'requests': total,
+        'hit_ratio': round(served / total, 3) if total else 0,
+        'generation': report_generation(),
+        'ttl': _ttl(),
+    }
+
+
+def reset_cache_stats():
+    cache.delete_many([f'{KEY_PREFIX}:stats:{stat}' for stat in STAT_KEYS])
+
+
+def normalise_params(query_params):
+    """Sorted, blank-free, order-independent representation of the query string."""
+    parts = []
+    for name in sorted(query_params.keys()):
+        if name in CONTROL_PARAMS:
+            continue
+        values = sorted(v for v in query_params.getlist(name) if v != '')
+        if values:
+            parts.append(f'{name}={",".join(values)}')
+    return '&'.join(parts)
+
+
+def _cache_key(view_name, request, watermark, generation, ttl):
+    # Reports default to windows relative to today, and the TTL bucket keeps
+    # time-dependent sections from outliving the configured lifetime.
+    raw = '|'.join([
+        view_name,
+        normalise_params(request.query_params),
+        watermark.isoformat() if watermark else '-',
+        str(generation),
+        local_today().isoformat(),
+        str(int(timezone.now().timestamp()) // ttl),
+    ])
+    return f'{KEY_PREFIX}:{view_name}:{hashlib.sha1(raw.encode()).hexdigest()}'
+
+
+def _etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    if '*' in etags:
+        return True
+    return any(e.removeprefix('W/') == etag for e in etags)
+
+
+def _with_validators(response, etag, watermark, status):
+    response['ETag'] = etag
+    if watermark:
+        response['Last-Modified'] = http_date(watermark.timestamp())
+    # Clients must revalidate so the watermark decides freshness
+    response['Cache-Control'] = 'private, no-cache'
+    response['X-Report-Cache'] = status
+    return response
+
+
+def cached_report(view):
+    """
+    Cache a GET report view's response data and answer conditional requests.
+    Apply beneath @api_view; ?refresh=1 recomputes and replaces the entry.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        ttl = _ttl()
+        if ttl <= 0 or request.method != 'GET':
+            return view(request, *args, **kwargs)
+
+        refresh = request.query_params.get('refresh', '').lower() in ('1', 'true')
+        watermark, generation = data_version()
+        key = _cache_key(view.__name__, request, watermark, generation, ttl)
+        etag = quote_etag(key.rsplit(':', 1)[1])
+
+        if not refresh and _etag_matches(request, etag):
+            _record('not_modified')
+            return _with_validators(Response(status=304), etag, watermark, 'NOT_MODIFIED')
+
+        data = None if refresh else cache.get(key)
+        if data is not None:
+            _record('hits')
+            return _with_validators(Response(data), etag, watermark, 'HIT')
+
+        response = view(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        cache.set(key, response.data, ttl)
+        _record('misses')
+        return _with_validators(response, etag, watermark, 'MISS')
+
+    return wrapper
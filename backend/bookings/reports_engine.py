@@ -0,0 +1,304 @@
+"""
+Reports Engine — set-based analytics behind the Reports API
+Overview: one conditional-aggregate query for the KPIs, one per-client query
+for reliability/repeat stats, and one grouped result set from which the
+timelines, risk distribution, service breakdown and heatmap are all derived
+in memory.
+Insights: the same grouped result set over the last 30 days, one repeat-client
+count, one pass over active services and one risky-client lookup.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.utils import timezone
+
+from .time_buckets import local_date, local_hour, local_weekday
+
+REVENUE_STATUSES = ('completed', 'confirmed')
+HIGH_RISK_LEVELS = ('HIGH', 'CRITICAL')
+OPEN_STATUSES = ('confirmed', 'pending')
+
+
+def _overview_kpis(qs):
+    """All headline counts and sums in a single conditional-aggregate query."""
+    revenue_filter = Q(status__in=REVENUE_STATUSES)
+    return qs.aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=revenue_filter),
+        no_shows=Count('id', filter=Q(status='no_show')),
+        cancelled=Count('id', filter=Q(status='cancelled')),
+        revenue=Sum('service__price', filter=revenue_filter),
+        revenue_at_risk=Sum('revenue_at_risk', filter=Q(risk_level__in=HIGH_RISK_LEVELS, status__in=OPEN_STATUSES)),
+        deposits=Sum('payment_amount', filter=Q(payment_status='paid')),
+        avg_risk=Avg('risk_score'),
+    )
+
+
+def _overview_clients(qs):
+    """Per-client booking counts + reliability in one pass: (unique, repeat, avg reliability)."""
+    rows = list(
+        qs.values('client_id')
+        .annotate(cnt=Count('id'), reliability=Max('client__reliability_score'))
+        .order_by()
+    )
+    unique = len(rows)
+    repeat = sum(1 for r in rows if r['cnt'] >= 2)
+    avg_reliability = sum(r['reliability'] or 0 for r in rows) / unique if unique else 0
+    return unique, repeat, avg_reliability
+
+
+def _overview_groups(qs):
+    """The single grouped result set the chart series are derived from."""
+    return list(
+        qs.annotate(
+            day=local_date(),
+            hour=local_hour(),
+            dow=local_weekday(),
+        )
+        .values('day', 'hour', 'dow', 'service_id', 'service__name', 'risk_level', 'status')
+        .annotate(
+            count=Count('id'),
+            revenue=Sum('service__price'),
+            at_risk=Sum('revenue_at_risk'),
+        )
+        .order_by()
+    )
+
+
+def build_overview(qs):
+    """Build the /api/reports/overview/ payload for a filtered Booking queryset."""
+    kpi = _overview_kpis(qs)
+    unique_clients, repeat_clients, avg_reliability = _overview_clients(qs)
+    groups = _overview_groups(qs)
+
+    total = kpi['total']
+    ns_rate = round(kpi['no_shows'] / total * 100, 1) if total > 0 else 0
+    repeat_pct = round(repeat_clients / unique_clients * 100, 1) if unique_clients > 0 else 0
+
+    zero = Decimal('0')
+    revenue_by_day = defaultdict(lambda: [zero, 0])
+    risk_by_day = defaultdict(lambda: zero)
+    risk_levels = defaultdict(lambda: [0, zero])
+    services = {}
+    heatmap = defaultdict(int)
+
+    for g in groups:
+        revenue = g['revenue'] or zero
+        at_risk = g['at_risk'] or zero
+        is_revenue = g['status'] in REVENUE_STATUSES
+
+        if is_revenue:
+            day = revenue_by_day[g['day']]
+            day[0] += revenue
+            day[1] += g['count']
+
+            svc = services.setdefault(g['service_id'], {
+                'id': g['service_id'], 'name': g['service__name'],
+                'revenue': zero, 'volume': 0, 'no_shows': 0, 'risk_exposure': zero,
+            })
+            svc['revenue'] += revenue
+            svc['volume'] += g['count']
+            svc['risk_exposure'] += at_risk
+
+        if g['risk_level'] in HIGH_RISK_LEVELS and g['status'] in OPEN_STATUSES:
+            risk_by_day[g['day']] += at_risk
+
+        if g['risk_level']:
+            level = risk_levels[g['risk_level']]
+            level[0] += g['count']
+            level[1] += revenue
+
+        heatmap[(g['dow'], g['hour'])] += g['count']
+
+    service_breakdown = sorted(services.values(), key=lambda s: s['revenue'], reverse=True)
+
+    return {
+        'kpi': {
+            'revenue': float(kpi['revenue'] or 0),
+            'revenue_at_risk': float(kpi['revenue_at_risk'] or 0),
+            'deposits': float(kpi['deposits'] or 0),
+            'total_bookings': total,
+            'completed': kpi['completed'],
+            'no_shows': kpi['no_shows'],
+            'cancelled': kpi['cancelled'],
+            'no_show_rate': ns_rate,
+            'avg_reliability': round(float(avg_reliability), 1),
+            'avg_risk_score': round(float(kpi['avg_risk'] or 0), 1),
+            'repeat_client_pct': repeat_pct,
+            'unique_clients': unique_clients,
+        },
+        'revenue_timeline': [
+            {'date': day.isoformat(), 'revenue': float(rev), 'count': cnt}
+            for day, (rev, cnt) in sorted(revenue_by_day.items())
+        ],
+        'risk_timeline': [
+            {'date': day.isoformat(), 'at_risk': float(at_risk)}
+            for day, at_risk in sorted(risk_by_day.items())
+        ],
+        'risk_distribution': [
+            {'level': level, 'count': cnt, 'revenue': float(rev)}
+            for level, (cnt, rev) in sorted(risk_levels.items())
+        ],
+        'service_breakdown': [
+            {**s, 'revenue': float(s['revenue']), 'risk_exposure': float(s['risk_exposure'])}
+            for s in service_breakdown
+        ],
+        'demand_heatmap': [
+            {'hour': hour, 'dow': dow, 'count': cnt}
+            for (dow, hour), cnt in sorted(heatmap.items())
+        ],
+    }
+
+
+# ════════════════════════════════════════════════════════════════
+# Insights — smart insights + recommended actions
+# ════════════════════════════════════════════════════════════════
+
+INSIGHTS_WINDOW_DAYS = 30
+DOW_NAMES = {0: 'Sunday', 1: 'Monday', 2: 'Tuesday', 3: 'Wednesday', 4: 'Thursday', 5: 'Friday', 6: 'Saturday'}
+
+
+def _insight_series(groups):
+    """Fold the grouped rows into the per-day-of-week, per-service and per-hour series."""
+    dow_revenue = defaultdict(Decimal)
+    service_ns = {}
+    hour_counts = defaultdict(int)
+    high_risk = [0, Decimal('0')]
+
+    for g in groups:
+        if g['status'] in REVENUE_STATUSES:
+            dow_revenue[g['dow']] += g['revenue'] or 0
+            hour_counts[g['hour']] += g['count']
+        if g['risk_level'] in HIGH_RISK_LEVELS and g['status'] in OPEN_STATUSES:
+            high_risk[0] += g['count']
+            high_risk[1] += g['at_risk'] or 0
+        svc = service_ns.setdefault(g['service__name'], {'service__name': g['service__name'], 'total': 0, 'ns': 0})
+        svc['total'] += g['count']
+        if g['status'] == 'no_show':
+            svc['ns'] += g['count']
+
+    return dow_revenue, service_ns, hour_counts, high_risk
+
+
+def _insights(groups, repeat_clients):
+    dow_revenue, service_ns, hour_counts, (hr_count, hr_revenue) = _insight_series(groups)
+    insights = []
+
+    # 1. Day-of-week performance analysis
+    if len(dow_revenue) >= 3:
+        avg_rev = sum(float(rev) for rev in dow_revenue.values()) / len(dow_revenue)
+        for dow, rev in sorted(dow_revenue.items()):
+            rev = float(rev)
+            day_name = DOW_NAMES.get(dow, f"Day {dow}")
+            if avg_rev > 0 and rev < avg_rev * 0.7:
+                pct = round((1 - rev / avg_rev) * 100)
+                insights.append({
+                    'type': 'warning',
+                    'message': f'{day_name}s underperform by {pct}% vs average',
+                    'metric': f'£{rev:.0f} vs £{avg_rev:.0f} avg',
+                })
+            elif avg_rev > 0 and rev > avg_rev * 1.3:
+                pct = round((rev / avg_rev - 1) * 100)
+                insights.append({
+                    'type': 'success',
+                    'message': f'{day_name}s outperform by {pct}%',
+                    'metric': f'£{rev:.0f} vs £{avg_rev:.0f} avg',
+                })
+
+    # 2. High risk client revenue exposure
+    if hr_count > 0:
+        insights.append({
+            'type': 'danger',
+            'message': f'{hr_count} high-risk clients contribute £{float(hr_revenue):.0f} at risk',
+            'metric': f'{hr_count} bookings',
+        })
+
+    # 3. Service no-show comparison
+    svc_ns = sorted((s for s in service_ns.values() if s['total'] >= 3), key=lambda s: -s['ns'])
+    if len(svc_ns) >= 2:
+        total = sum(s['total'] for s in svc_ns)
+        avg_ns_rate = sum(s['ns'] for s in svc_ns) / total * 100 if total > 0 else 0
+        for s in svc_ns:
+            rate = s['ns'] / s['total'] * 100
+            if rate > avg_ns_rate * 1.5 and rate > 5:
+                insights.append({
+                    'type': 'warning',
+                    'message': f'{s["service__name"]} has {rate:.0f}% no-show rate ({s["ns"]}/{s["total"]})',
+                    'metric': f'{rate:.1f}% vs {avg_ns_rate:.1f}% avg',
+                })
+
+    # 4. Peak hour pricing opportunity
+    if hour_counts:
+        # Ties go to the earliest hour
+        top_hour, top_count = max(hour_counts.items(), key=lambda h: (h[1], -h[0]))
+        avg_count = sum(hour_counts.values()) / len(hour_counts)
+        if top_count > avg_count * 1.5:
+            pct = round((top_count / avg_count - 1) * 100)
+            insights.append({
+                'type': 'info',
+                'message': f'Peak demand at {top_hour:02d}:00 ({pct}% above average) — pricing increase opportunity',
+                'metric': f'{top_count} bookings vs {avg_count:.0f} avg',
+            })
+
+    # 5. Repeat client loyalty
+    if repeat_clients > 0:
+        insights.append({
+            'type': 'success',
+            'message': f'{repeat_clients} loyal clients with 3+ bookings this month',
+            'metric': 'Consider loyalty incentive',
+        })
+
+    return insights
+
+
+def _actions():
+    from .models import Client, Service
+
+    # One pass over active services feeds the three service-level action types
+    deposit, off_peak, price = [], [], []
+    for svc in Service.objects.filter(active=True):
+        if svc.no_show_rate > 15 and svc.payment_type != 'full':
+            potential = float(svc.total_revenue) * 0.1 if svc.total_revenue else 0
+            deposit.append({
+                'severity': 'high',
+                'action': f'Increase deposit for "{svc.name}" — {svc.no_show_rate:.0f}% no-show rate',
+                'impact': f'+£{potential:.0f} protected revenue',
+            })
+        if svc.off_peak_utilisation_rate < 30 and svc.total_bookings > 0:
+            off_peak.append({
+                'severity': 'medium',
+                'action': f'Consider off-peak discount for "{svc.name}" — only {svc.off_peak_utilisation_rate:.0f}% off-peak utilisation',
+                'impact': 'Increase bookings in quiet periods',
+            })
+        if svc.peak_utilisation_rate > 80:
+            price.append({
+                'severity': 'medium',
+                'action': f'Price increase opportunity for "{svc.name}" — {svc.peak_utilisation_rate:.0f}% peak utilisation',
+                'impact': f'+£{float(svc.price) * 0.1:.0f} per booking potential',
+            })
+
+    risky = [
+        {
+            'severity': 'high',
+            'action': f'Require full payment for {name} — {no_shows} consecutive no-shows',
+            'impact': 'Reduce no-show risk',
+        }
+        for name, no_shows in Client.objects.filter(consecutive_no_shows__gte=2).values_list('name', 'consecutive_no_shows')[:3]
+    ]
+    return deposit + off_peak + price + risky
+
+
+def build_insights(now=None):
+    """Build the /api/reports/insights/ payload for the trailing 30-day window."""
+    from .models import Booking
+    now = now or timezone.now()
+    recent = Booking.objects.filter(start_time__gte=now - timedelta(days=INSIGHTS_WINDOW_DAYS))
+
+    groups = _overview_groups(recent)
+    repeat_clients = recent.values('client_id').annotate(cnt=Count('id')).filter(cnt__gte=3).count()
+
+    return {
+        'insights': _insights(groups, repeat_clients)[:8],
+        'actions': _actions()[:6],
+    }
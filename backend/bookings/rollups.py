@@ -0,0 +1,269 @@
+"""
+Booking Rollups — incremental maintenance and rebuild
+Keeps ServiceDailyStat (Service Intelligence) and BookingDailyRollup (Reports)
+in step with Booking writes. The Booking signals (bookings.signals) pass the
+before/after snapshot of each write; bulk paths that bypass signals call
+rebuild_rollups() for the affected services.
+"""
+import logging
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .time_buckets import local_date, local_datetime, local_hour
+
+logger = logging.getLogger(__name__)
+
+# Peak = 10:00-14:00 local time (REPORT_TIME_ZONE), off-peak = rest (4 peak hours, 6 off-peak hours of capacity)
+PEAK_START_HOUR = 10
+PEAK_END_HOUR = 14
+
+SNAPSHOT_FIELDS = (
+    'service_id', 'staff_id', 'start_time', 'status', 'risk_level', 'data_origin',
+    'payment_status', 'payment_amount', 'revenue_at_risk', 'risk_score',
+)
+
+
+def rollup_snapshot(booking, fallback=None):
+    """
+    Capture the fields of a booking that drive its rollup contributions as a dict.
+    Deferred (not loaded) fields are taken from `fallback`, the stored row's
+    snapshot; returns None if a field is deferred and there is no fallback.
+    """
+    state = booking.__dict__
+    values = {}
+    for field in SNAPSHOT_FIELDS:
+        if field in state:
+            values[field] = state[field]
+        elif fallback is not None:
+            values[field] = fallback[field]
+        else:
+            return None
+    return values
+
+
+def stored_snapshot(model, pk):
+    """Snapshot of the booking row as currently stored, or None if it doesn't exist."""
+    return model.objects.filter(pk=pk).values(*SNAPSHOT_FIELDS).first()
+
+
+# ============================================================
+# Per-rollup contributions: snapshot → (key, counters)
+# ============================================================
+
+def _service_daily_contribution(snap, price):
+    local = local_datetime(snap['start_time'])
+    is_peak = PEAK_START_HOUR <= local.hour < PEAK_END_HOUR
+    status = snap['status']
+    risk_score = snap['risk_score']
+    key = {'service_id': snap['service_id'], 'date': local.date()}
+    return key, {
+        'total': 1,
+        'completed': 1 if status == 'completed' else 0,
+        'no_shows': 1 if status == 'no_show' else 0,
+        'cancelled': 1 if status == 'cancelled' else 0,
+        'revenue': price if status == 'completed' else Decimal('0'),
+        'peak_count': 1 if is_peak else 0,
+        'off_peak_count': 0 if is_peak else 1,
+        'risk_sum': float(risk_score) if risk_score is not None else 0.0,
+        'risk_count': 1 if risk_score is not None else 0,
+    }
+
+
+def _booking_daily_contribution(snap, price):
+    risk_score = snap['risk_score']
+    key = {
+        'date': local_datetime(snap['start_time']).date(),
+        'staff_id': snap['staff_id'],
+        'service_id': snap['service_id'],
+        'status': snap['status'],
+        'risk_level': snap['risk_level'] or '',
+        'data_origin': snap['data_origin'],
+    }
+    paid = snap['payment_status'] == 'paid'
+    return key, {
+        'bookings': 1,
+        'revenue': price,
+        'deposits': (snap['payment_amount'] or Decimal('0')) if paid else Decimal('0'),
+        'revenue_at_risk': snap['revenue_at_risk'] or Decimal('0'),
+        'risk_sum': float(risk_score) if risk_score is not None else 0.0,
+        'risk_count': 1 if risk_score is not None else 0,
+    }
+
+
+def _rollups():
+    from .models_rollups import ServiceDailyStat, BookingDailyRollup
+    return (
+        (ServiceDailyStat, _service_daily_contribution),
+        (BookingDailyRollup, _booking_daily_contribution),
+    )
+
+
+# ============================================================
+# Incremental maintenance
+# ============================================================
+
+def _service_price(booking, service_id):
+    """Current price of the service, reusing the cached relation when possible."""
+    from .models import Booking, Service
+
+    if booking is not None and booking.service_id == service_id and Booking.service.is_cached(booking):
+        return booking.service.price or Decimal('0')
+    price = Service.objects.filter(pk=service_id).values_list('price', flat=True).first()
+    return price or Decimal('0')
+
+
+def _apply(model, key, counters, sign):
+    changes = {f: F(f) + (v * sign) for f, v in counters.items() if v}
+    if not changes:
+        return
+    row, _ = model.objects.get_or_create(**key)
+    model.objects.filter(pk=row.pk).update(updated_at=timezone.now(), **changes)
+
+
+def apply_booking_change(old_snapshot, new_snapshot, booking=None):
+    """
+    Move a booking's contributions in every rollup from old_snapshot to
+    new_snapshot. Pass old_snapshot=None for a new booking and new_snapshot=None
+    for a deletion. Revenue uses the service's current price; a price change
+    rebuilds that service's rollups (bookings.signals.reprice_rollups).
+    """
+    if old_snapshot == new_snapshot:
+        return
+
+    prices = {}
+
+    def price_for(snap):
+        sid = snap['service_id']
+        if sid not in prices:
+            prices[sid] = _service_price(booking, sid)
+        return prices[sid]
+
+    for model, contribute in _rollups():
+        old = contribute(old_snapshot, price_for(old_snapshot)) if old_snapshot else None
+        new = contribute(new_snapshot, price_for(new_snapshot)) if new_snapshot else None
+        if old and new and old[0] == new[0]:
+            delta = {f: new[1][f] - old[1][f] for f in new[1]}
+            _apply(model, new[0], delta, 1)
+            continue
+        if old:
+            _apply(model, old[0], old[1], -1)
+        if new:
+            _apply(model, new[0], new[1], 1)
+
+
+# ============================================================
+# Rebuild from raw bookings
+# ============================================================
+
+def rebuild_service_daily_stats(service_ids=None):
+    """Rebuild ServiceDailyStat rows from raw bookings in one grouped query."""
+    from .models import Booking
+    from .models_rollups import ServiceDailyStat
+
+    bookings = Booking.objects.all()
+    stats = ServiceDailyStat.objects.all()
+    if service_ids is not None:
+        bookings = bookings.filter(service_id__in=service_ids)
+        stats = stats.filter(service_id__in=service_ids)
+
+    peak = Q(hour__gte=PEAK_START_HOUR, hour__lt=PEAK_END_HOUR)
+    rows = (
+        bookings.annotate(day=local_date(), hour=local_hour())
+        .values('service_id', 'day')
+        .annotate(
+            n_total=Count('id'),
+            n_completed=Count('id', filter=Q(status='completed')),
+            n_no_shows=Count('id', filter=Q(status='no_show')),
+            n_cancelled=Count('id', filter=Q(status='cancelled')),
+            n_revenue=Sum('service__price', filter=Q(status='completed')),
+            n_peak=Count('id', filter=peak),
+            n_risk_sum=Sum('risk_score'),
+            n_risk_count=Count('risk_score'),
+        )
+    )
+    objs = [
+        ServiceDailyStat(
+            service_id=r['service_id'],
+            date=r['day'],
+            total=r['n_total'],
+            completed=r['n_completed'],
+            no_shows=r['n_no_shows'],
+            cancelled=r['n_cancelled'],
+            revenue=r['n_revenue'] or Decimal('0'),
+            peak_count=r['n_peak'],
+            off_peak_count=r['n_total'] - r['n_peak'],
+            risk_sum=r['n_risk_sum'] or 0.0,
+            risk_count=r['n_risk_count'],
+        )
+        for r in rows
+    ]
+    with transaction.atomic():
+        stats.delete()
+        ServiceDailyStat.objects.bulk_create(objs, batch_size=500)
+
+    logger.info(f"[ROLLUP] Rebuilt {len(objs)} service daily stat rows")
+    return len(objs)
+
+
+def rebuild_booking_daily_rollups(service_ids=None):
+    """Rebuild BookingDailyRollup rows from raw bookings in one grouped query."""
+    from .models import Booking
+    from .models_rollups import BookingDailyRollup
+
+    bookings = Booking.objects.all()
+    rollups = BookingDailyRollup.objects.all()
+    if service_ids is not None:
+        bookings = bookings.filter(service_id__in=service_ids)
+        rollups = rollups.filter(service_id__in=service_ids)
+
+    rows = (
+        bookings.annotate(day=local_date())
+        .values('day', 'staff_id', 'service_id', 'status', 'risk_level', 'data_origin')
+        .annotate(
+            n_bookings=Count('id'),
+            n_revenue=Sum('service__price'),
+            n_deposits=Sum('payment_amount', filter=Q(payment_status='paid')),
+            n_at_risk=Sum('revenue_at_risk'),
+            n_risk_sum=Sum('risk_score'),
+            n_risk_count=Count('risk_score'),
+        )
+        .order_by()
+    )
+    objs = [
+        BookingDailyRollup(
+            date=r['day'],
+            staff_id=r['staff_id'],
+            service_id=r['service_id'],
+            status=r['status'],
+            risk_level=r['risk_level'] or '',
+            data_origin=r['data_origin'],
+            bookings=r['n_bookings'],
+            revenue=r['n_revenue'] or Decimal('0'),
+            deposits=r['n_deposits'] or Decimal('0'),
+            revenue_at_risk=r['n_at_risk'] or Decimal('0'),
+            risk_sum=r['n_risk_sum'] or 0.0,
+            risk_count=r['n_risk_count'],
+        )
+        for r in rows
+    ]
+    with transaction.atomic():
+        rollups.delete()
+        BookingDailyRollup.objects.bulk_create(objs, batch_size=500)
+
+    logger.info(f"[ROLLUP] Rebuilt {len(objs)} booking daily rollup rows")
+    return len(objs)
+
+
+def rebuild_rollups(service_ids=None):
+    """Rebuild every booking rollup, optionally limited to some services."""
+    from .report_cache import invalidate_reports
+    from .snapshots import mark_changed
+    counts = {
+        'service_daily_stats': rebuild_service_daily_stats(service_ids),
+        'booking_daily_rollups': rebuild_booking_daily_rollups(service_ids),
+    }
+    invalidate_reports()
+    mark_changed()
+    return counts
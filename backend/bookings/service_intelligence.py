@@ -0,0 +1,232 @@
+"""
+Service Intelligence Engine
+Per-service metrics and pricing recommendations derived from ServiceDailyStat rollups.
+
+The rollups are kept current from Booking writes (see bookings.rollups), so a
+recalculation is a sliding-window sum over at most ~90 rows per service rather
+than a rescan of raw booking history.
+"""
+import logging
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+
+from .rollups import rebuild_service_daily_stats
+from .time_buckets import local_today
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# Metrics + recommendations
+# ============================================================
+
+def _window_metrics(now):
+    """Sliding-window sums over the daily rollups, keyed by service_id."""
+    from .models_rollups import ServiceDailyStat
+
+    since_90 = local_today(now - timedelta(days=90))
+    since_30 = local_today(now - timedelta(days=30))
+    stat_fields = ('total', 'completed', 'no_shows', 'cancelled', 'revenue',
+                   'peak_count', 'off_peak_count', 'risk_sum', 'risk_count')
+    rows = (
+        ServiceDailyStat.objects.filter(date__gte=since_90)
+        .values('service_id')
+        .annotate(
+            recent_30=Sum('total', filter=Q(date__gte=since_30)),
+            **{f'sum_{f}': Sum(f) for f in stat_fields},
+        )
+    )
+    return {
+        r['service_id']: {
+            'recent_30': r['recent_30'],
+            **{f: r[f'sum_{f}'] for f in stat_fields},
+        }
+        for r in rows
+    }
+
+
+def _build_recommendation(svc, m, avg_reliability, repeat_clients):
+    """Phase 3 pricing recommendation for one service. Returns a dict of fields to store."""
+    total = m['total']
+    ns_rate = m['ns_rate']
+    peak_util = m['peak_util']
+    off_peak_util = m['off_peak_util']
+
+    rec_price = None
+    rec_deposit = None
+    rec_payment = ''
+    rec_reason = ''
+    confidence = 0
+
+    if total >= 3:  # need minimum data
+        reasons = []
+
+        # High utilisation + reliable clients → price increase
+        if peak_util > 80:
+            if avg_reliability > 70:
+                increase = round(float(svc.price) * 0.08, 2)
+                rec_price = svc.price + Decimal(str(increase))
+                reasons.append(f'Peak utilisation {peak_util:.0f}% with avg reliability {avg_reliability:.0f}% — suggest +8% price increase')
+                confidence = max(confidence, 75)
+            else:
+                increase = round(float(svc.price) * 0.05, 2)
+                rec_price = svc.price + Decimal(str(increase))
+                reasons.append(f'Peak utilisation {peak_util:.0f}% — suggest +5% price increase')
+                confidence = max(confidence, 60)
+
+        # Low utilisation → off-peak discount
+        if off_peak_util < 40 and svc.off_peak_discount_allowed:
+            reasons.append(f'Off-peak utilisation only {off_peak_util:.0f}% — suggest off-peak discount window')
+            confidence = max(confidence, 55)
+
+        # High no-show rate → deposit/full payment
+        if ns_rate > 15:
+            rec_deposit = 100
+            rec_payment = 'full'
+            reasons.append(f'No-show rate {ns_rate:.1f}% — recommend full prepayment')
+            confidence = max(confidence, 80)
+        elif ns_rate > 8:
+            rec_deposit = 50
+            rec_payment = 'deposit'
+            reasons.append(f'No-show rate {ns_rate:.1f}% — recommend 50% deposit')
+            confidence = max(confidence, 65)
+
+        # Loyalty detection
+        if repeat_clients >= 2 and total >= 5:
+            reasons.append(f'{repeat_clients} loyal repeat clients — consider loyalty incentive')
+            confidence = max(confidence, 50)
+
+        rec_reason = ' | '.join(reasons) if reasons else ''
+
+    return {
+        'recommended_base_price': rec_price,
+        'recommended_deposit_percent': rec_deposit,
+        'recommended_payment_type': rec_payment,
+        'recommendation_reason': rec_reason,
+        'recommendation_confidence': confidence,
+    }
+
+
+def recalculate_service_intelligence(now=None):
+    """
+    Recalculate metrics and recommendations for every service from the daily
+    rollups. Constant query count regardless of booking history size.
+    Returns the number of services updated.
+    """
+    from .models import Service, Booking, ServiceOptimisationLog
+    from .models_rollups import ServiceDailyStat
+
+    now = now or timezone.now()
+    ninety_days_ago = now - timedelta(days=90)
+
+    # First run after deploy: seed the rollups from history
+    if not ServiceDailyStat.objects.exists() and Booking.objects.exists():
+        rebuild_service_daily_stats()
+
+    windows = _window_metrics(now)
+    services = list(Service.objects.all())
+
+    metrics = {}
+    for svc in services:
+        w = windows.get(svc.id, {})
+        total = w.get('total') or 0
+        completed = w.get('completed') or 0
+        no_shows = w.get('no_shows') or 0
+        peak_bookings = w.get('peak_count') or 0
+        revenue = w.get('revenue') or Decimal('0')
+        risk_count = w.get('risk_count') or 0
+
+        # Estimate capacity: 4 peak hours * 90 days / duration
+        slots_per_hour = 60 / max(svc.duration_minutes, 15)
+        peak_capacity = max(1, 4 * slots_per_hour * 90)
+        off_peak_capacity = max(1, 6 * slots_per_hour * 90)
+
+        metrics[svc.id] = {
+            'total': total,
+            'completed': completed,
+            'no_shows': no_shows,
+            'cancelled': w.get('cancelled') or 0,
+            'revenue': revenue,
+            'avg_value': revenue / completed if completed > 0 else Decimal('0'),
+            'avg_risk': (w.get('risk_sum') or 0) / risk_count if risk_count else 0,
+            'ns_rate': round(no_shows / total * 100, 1) if total > 0 else 0,
+            'peak_util': min(100, round(peak_bookings / peak_capacity * 100, 1)),
+            'off_peak_util': min(100, round((total - peak_bookings) / off_peak_capacity * 100, 1)),
+            # normalise ~30 bookings/month = 100
+            'demand': min(100, round((w.get('recent_30') or 0) * 3.3, 1)),
+        }
+
+    # Client-level inputs are only needed for services with enough data
+    eligible = [sid for sid, m in metrics.items() if m['total'] >= 3]
+    recent = Booking.objects.filter(start_time__gte=ninety_days_ago, service_id__in=eligible)
+
+    reliability = {}
+    high_util = [sid for sid in eligible if metrics[sid]['peak_util'] > 80]
+    if high_util:
+        reliability = {
+            r['service_id']: r['avg'] or 0
+            for r in recent.filter(service_id__in=high_util)
+            .values('service_id').annotate(avg=Avg('client__reliability_score'))
+        }
+
+    repeat = Counter()
+    if eligible:
+        repeat = Counter(
+            r['service_id']
+            for r in recent.values('service_id', 'client_id')
+            .annotate(cnt=Count('id')).filter(cnt__gte=3)
+        )
+
+    updated = 0
+    for svc in services:
+        m = metrics[svc.id]
+        rec = _build_recommendation(svc, m, reliability.get(svc.id, 0), repeat.get(svc.id, 0))
+
+        svc.total_bookings = m['total']
+        svc.total_revenue = m['revenue']
+        svc.avg_booking_value = m['avg_value']
+        svc.no_show_rate = m['ns_rate']
+        svc.avg_risk_score = round(m['avg_risk'], 1)
+        svc.peak_utilisation_rate = m['peak_util']
+        svc.off_peak_utilisation_rate = m['off_peak_util']
+        svc.demand_index = m['demand']
+        for field, value in rec.items():
+            setattr(svc, field, value)
+        svc.recommendation_snapshot = {
+            'total_bookings': m['total'],
+            'completed': m['completed'],
+            'no_shows': m['no_shows'],
+            'cancelled': m['cancelled'],
+            'revenue': float(m['revenue']),
+            'avg_risk': round(m['avg_risk'], 1),
+            'peak_util': m['peak_util'],
+            'off_peak_util': m['off_peak_util'],
+            'demand_index': m['demand'],
+            'ns_rate': m['ns_rate'],
+        }
+        svc.last_optimised_at = now
+        svc.save()
+
+        # Log if recommendation changed
+        if rec['recommendation_reason']:
+            ServiceOptimisationLog.objects.create(
+                service=svc,
+                reason=rec['recommendation_reason'],
+                ai_recommended=True,
+                owner_override=False,
+                input_metrics=svc.recommendation_snapshot,
+                output_recommendation={
+                    'recommended_price': float(rec['recommended_base_price']) if rec['recommended_base_price'] else None,
+                    'recommended_deposit': rec['recommended_deposit_percent'],
+                    'recommended_payment': rec['recommended_payment_type'],
+                    'confidence': rec['recommendation_confidence'],
+                },
+            )
+
+        updated += 1
+
+    logger.info(f"[SI] Intelligence updated for {updated} services")
+    return updated
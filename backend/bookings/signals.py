@@ -0,0 +1,126 @@
+"""
+Booking write hooks — keep the daily rollups in step with Booking changes.
+Bulk paths that bypass signals (bulk_create / queryset.update) must call
+bookings.rollups.rebuild_rollups() for the affected services instead.
+
+Rollup revenue is priced at each service's current price, so a price change
+re-derives that service's rollups; Service.objects.update(price=...) must
+call rebuild_rollups() itself.
+
+Deletes and service changes don't move the report cache watermark, so they
+invalidate cached report responses explicitly. Writes to a model mark the
+precomputed report snapshots that read it stale (bookings.snapshots).
+"""
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+ROLLUP_FIELDS = {
+    'service', 'service_id', 'staff', 'staff_id', 'start_time', 'status',
+    'risk_level', 'data_origin', 'payment_status', 'payment_amount',
+    'revenue_at_risk', 'risk_score',
+}
+
+# Snapshot keys the insights are computed from
+INSIGHT_KEYS = ('service_id', 'start_time', 'status', 'risk_level', 'revenue_at_risk')
+
+
+def _insights_changed(old, new):
+    if old is None or new is None:
+        return True
+    return any(old.get(k) != new.get(k) for k in INSIGHT_KEYS)
+
+
+@receiver(post_init, sender='bookings.Booking')
+def remember_rollup_state(sender, instance, **kwargs):
+    from .rollups import rollup_snapshot
+    instance._rollup_snapshot = rollup_snapshot(instance)
+
+
+@receiver(pre_save, sender='bookings.Booking')
+def load_rollup_state(sender, instance, raw=False, **kwargs):
+    """Fall back to the stored row when the instance was loaded with deferred fields."""
+    if raw or instance._state.adding or getattr(instance, '_rollup_snapshot', None) is not None:
+        return
+    from .rollups import stored_snapshot
+    instance._rollup_snapshot = stored_snapshot(sender, instance.pk)
+
+
+@receiver(post_save, sender='bookings.Booking')
+def update_rollups_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not ROLLUP_FIELDS.intersection(update_fields):
+        return
+    from .rollups import apply_booking_change, rollup_snapshot
+    old = None if created else getattr(instance, '_rollup_snapshot', None)
+    new = rollup_snapshot(instance, fallback=old)
+    apply_booking_change(old, new, instance)
+    # Picked up by mark_dependent_snapshots, which runs next
+    instance._insights_changed = _insights_changed(old, new)
+    instance._rollup_snapshot = new
+
+
+@receiver(post_delete, sender='bookings.Booking')
+def update_rollups_on_delete(sender, instance, **kwargs):
+    from .rollups import apply_booking_change
+    apply_booking_change(getattr(instance, '_rollup_snapshot', None), None, instance)
+    instance._insights_changed = True
+
+
+@receiver(post_init, sender='bookings.Service')
+def remember_service_price(sender, instance, **kwargs):
+    instance._rollup_price = instance.__dict__.get('price')
+
+
+@receiver(pre_save, sender='bookings.Service')
+def load_service_price(sender, instance, raw=False, **kwargs):
+    """Fall back to the stored price when the instance was loaded without it."""
+    if raw or instance._state.adding or getattr(instance, '_rollup_price', None) is not None:
+        return
+    instance._rollup_price = sender.objects.filter(pk=instance.pk).values_list('price', flat=True).first()
+
+
+@receiver(post_save, sender='bookings.Service')
+def reprice_rollups(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if not created and instance.price != getattr(instance, '_rollup_price', instance.price):
+        from .rollups import rebuild_booking_daily_rollups, rebuild_service_daily_stats
+        rebuild_service_daily_stats([instance.pk])
+        rebuild_booking_daily_rollups([instance.pk])
+    instance._rollup_price = instance.price
+
+
+@receiver(post_delete, sender='bookings.Booking')
+@receiver(post_delete, sender='bookings.TimesheetEntry')
+@receiver(post_delete, sender='bookings.LeaveRequest')
+@receiver(post_save, sender='bookings.Service')
+@receiver(post_delete, sender='bookings.Service')
+def invalidate_report_cache(sender, raw=False, **kwargs):
+    if raw:
+        return
+    from .report_cache import invalidate_reports
+    invalidate_reports()
+
+
+SNAPSHOT_SOURCES = (
+    'bookings.Booking', 'bookings.Client', 'bookings.Service', 'bookings.Staff',
+    'bookings.TimesheetEntry', 'bookings.LeaveRequest',
+)
+
+
+def mark_dependent_snapshots(sender, instance, raw=False, **kwargs):
+    """Mark the snapshots that read the written model stale, in one UPDATE."""
+    if raw:
+        return
+    from .snapshots import INSIGHTS, dependents, mark_changed
+    names = dependents(sender._meta.label)
+    if instance.__dict__.pop('_insights_changed', False):
+        names.append(INSIGHTS)
+    if names:
+        mark_changed(*names)
+
+
+for _label in SNAPSHOT_SOURCES:
+    post_save.connect(mark_dependent_snapshots, sender=_label, dispatch_uid=f'snapshots_save_{_label}')
+    post_delete.connect(mark_dependent_snapshots, sender=_label, dispatch_uid=f'snapshots_delete_{_label}')
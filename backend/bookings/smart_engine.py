@@ -272,6 +272,7 @@ def update_service_demand_index():
     Should be run daily (management command or cron).
     """
     from .models import Service, Booking
+    from .time_buckets import local_hour
 
     thirty_days_ago = timezone.now() - timedelta(days=30)
 
@@ -305,9 +306,9 @@ def update_service_demand_index():
                 start_time__gte=thirty_days_ago,
                 status__in=['confirmed', 'completed']
             )
-            .extra(select={'hour': 'EXTRACT(hour FROM start_time)'})
-            .values('hour')
+            .values(hour=local_hour())
             .annotate(count=Count('id'))
+            .order_by()
         )
         # Peak hours: if bookings cluster in certain hours, demand is higher
         if hour_bookings:
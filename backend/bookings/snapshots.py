@@ -0,0 +1,135 @@
+"""
+Report Snapshots — precomputed report payloads
+Each snapshot is built by a registered builder and stored as JSON in
+ReportSnapshot. Readers get the stored payload unless it is stale: source
+data changed after the build started (see mark_changed), or it was computed
+on an earlier day and its rolling window has moved. Stale snapshots are
+rebuilt on read and by the refresh_report_snapshots job.
+
+Every snapshot declares the models it reads; writes to one of those models
+(bookings.signals) mark only the snapshots that depend on it.
+"""
+import logging
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .time_buckets import local_today
+
+logger = logging.getLogger(__name__)
+
+INSIGHTS = 'reports_insights'
+
+# name → (builder path, models whose writes make it stale)
+SNAPSHOTS = {
+    # Booking writes are filtered to insight inputs in bookings.signals. Insights
+    # are one unfiltered 30-day view, so a single snapshot serves every caller.
+    INSIGHTS: ('bookings.reports_engine.build_insights', ('bookings.Service', 'bookings.Client')),
+    'dashboard.revenue': (
+        'bookings.views_dashboard.build_revenue_section',
+        ('bookings.Booking', 'bookings.Service'),
+    ),
+    'dashboard.reliability': (
+        'bookings.views_dashboard.build_reliability_section',
+        ('bookings.Client',),
+    ),
+    'dashboard.client_quadrant': (
+        'bookings.views_dashboard.build_client_quadrant_section',
+        ('bookings.Booking', 'bookings.Client'),
+    ),
+    'dashboard.demand_calendar': (
+        'bookings.views_dashboard.build_demand_calendar_section',
+        ('bookings.Booking', 'bookings.Service'),
+    ),
+    'dashboard.owner_actions': (
+        'bookings.views_dashboard.build_owner_actions_section',
+        ('bookings.Booking', 'bookings.Client', 'bookings.Service'),
+    ),
+    'dashboard.staff_hours': (
+        'bookings.views_dashboard.build_staff_hours_section',
+        ('bookings.TimesheetEntry', 'bookings.Staff'),
+    ),
+    'dashboard.leave': (
+        'bookings.views_dashboard.build_leave_section',
+        ('bookings.LeaveRequest', 'bookings.Staff'),
+    ),
+}
+
+DASHBOARD_SECTIONS = tuple(name for name in SNAPSHOTS if name.startswith('dashboard.'))
+
+
+def dependents(model_label):
+    """Names of the snapshots that read `model_label` ('app_label.ModelName')."""
+    return [name for name, (_, models) in SNAPSHOTS.items() if model_label in models]
+
+
+def is_fresh(snapshot, now=None):
+    now = now or timezone.now()
+    return not snapshot.is_stale and local_today(snapshot.computed_at) == local_today(now)
+
+
+def refresh_snapshot(name, now=None):
+    """Rebuild one snapshot and store it; returns the ReportSnapshot."""
+    from .models_rollups import ReportSnapshot
+    now = now or timezone.now()
+    payload = import_string(SNAPSHOTS[name][0])(now)
+    snapshot, _ = ReportSnapshot.objects.update_or_create(
+        name=name,
+        # changed_at is left alone: a change recorded while this build ran
+        # is later than `now` and keeps the new snapshot stale
+        defaults={'payload': payload, 'computed_at': now},
+    )
+    return snapshot
+
+
+def get_snapshots(names, refresh=False):
+    """
+    The stored snapshots for `names` as {name: ReportSnapshot}, read in one
+    query; only missing or stale ones (all of them with `refresh`) are rebuilt.
+    """
+    from .models_rollups import ReportSnapshot
+    now = timezone.now()
+    stored = {} if refresh else {s.name: s for s in ReportSnapshot.objects.filter(name__in=names)}
+    snapshots = {}
+    for name in names:
+        snapshot = stored.get(name)
+        if snapshot is None or not is_fresh(snapshot, now):
+            snapshot = refresh_snapshot(name, now)
+        snapshots[name] = snapshot
+    return snapshots
+
+
+def get_snapshot(name, refresh=False):
+    """The stored snapshot, rebuilt first when missing, stale or `refresh` is set."""
+    return get_snapshots([name], refresh=refresh)[name]
+
+
+def mark_changed(*names):
+    """
+    Record that the source data of these snapshots (default: all) changed.
+    One UPDATE; any snapshot whose build started before now becomes stale.
+    """
+    from .models_rollups import ReportSnapshot
+    ReportSnapshot.objects.filter(name__in=names or list(SNAPSHOTS)).update(changed_at=timezone.now())
+
+
+def refresh_stale_snapshots(names=None, now=None):
+    """Rebuild every missing or stale snapshot (optionally only `names`); returns the names rebuilt."""
+    from .models_rollups import ReportSnapshot
+    now = now or timezone.now()
+    names = list(names or SNAPSHOTS)
+    stored = {s.name: s for s in ReportSnapshot.objects.filter(name__in=names)}
+    rebuilt = []
+    for name in names:
+        snapshot = stored.get(name)
+        if snapshot is not None and is_fresh(snapshot, now):
+            continue
+        try:
+            refresh_snapshot(name, now)
+        except Exception:
+            # One failing builder must not hold back the others
+            logger.exception(f"[SNAPSHOT] Failed to rebuild {name}")
+            continue
+        rebuilt.append(name)
+    if rebuilt:
+        logger.info(f"[SNAPSHOT] Rebuilt {', '.join(rebuilt)}")
+    return rebuilt
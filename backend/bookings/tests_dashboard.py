@@ -0,0 +1,217 @@
+"""
+Dashboard — Unit Tests
+Client quadrant computed from one annotated query, with sampling and pagination;
+revenue breakdown totals aggregated in the database, bookings paginated apart;
+section snapshots recomputed only when their source models change; demand
+buckets taken in local (Europe/London) time.
+"""
+import zoneinfo
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Service, Staff, Client, Booking
+from .models_availability import TimesheetEntry
+from .models_rollups import ReportSnapshot
+from .snapshots import DASHBOARD_SECTIONS, get_snapshots
+from .time_buckets import local_date, local_hour, local_weekday
+from .views_dashboard import _client_quadrant, _day_bounds, _revenue_breakdown
+
+
+@override_settings(REPORT_CACHE_TTL=0)
+class ClientQuadrantTest(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        service = Service.objects.create(name='Massage', duration_minutes=60, price=Decimal('50.00'))
+        staff = Staff.objects.create(name='Ana', email='ana@example.com')
+        recent = timezone.now() - timedelta(days=10)
+        # (reliability, bookings in window, bookings outside window / not counted)
+        specs = [(90, 2, 0), (90, 1, 3), (30, 3, 0), (30, 0, 0)]
+        self.clients = []
+        for i, (rel, in_window, other) in enumerate(specs):
+            client = Client.objects.create(name=f'C{i}', email=f'c{i}@example.com', phone='0700')
+            for _ in range(in_window):
+                Booking.objects.create(client=client, service=service, staff=staff, start_time=recent, status='completed')
+            for _ in range(other):
+                Booking.objects.create(client=client, service=service, staff=staff,
+                                       start_time=recent - timedelta(days=120), status='completed')
+            Client.objects.filter(pk=client.pk).update(reliability_score=rel)
+            self.clients.append(client)
+
+    def test_zones_and_frequency(self):
+        points, meta = _client_quadrant()
+        self.assertEqual([(p['frequency'], p['zone']) for p in points], [
+            (2, 'VIP'), (1, 'Stable'), (3, 'Watch'), (0, 'High Risk'),
+        ])
+        self.assertEqual(meta, {
+            'total': 4,
+            'zones': {'VIP': 1, 'Stable': 1, 'Watch': 1, 'High Risk': 1},
+            'sample_step': 1,
+        })
+
+    def test_query_count_is_constant(self):
+        with self.assertNumQueries(2):
+            _client_quadrant()
+        for i in range(20):
+            Client.objects.create(name=f'Extra {i}', email=f'x{i}@example.com', phone='0701')
+        with self.assertNumQueries(2):
+            _client_quadrant()
+
+    def test_sampling_keeps_zone_totals(self):
+        for i in range(8):
+            Client.objects.create(name=f'Extra {i}', email=f'x{i}@example.com', phone='0701')
+        points, meta = _client_quadrant(max_points=4)
+        self.assertEqual(meta['total'], 12)
+        self.assertEqual(meta['sample_step'], 3)
+        self.assertEqual(meta['zones']['Stable'], 9)
+        self.assertLessEqual(len(points), 4)
+        self.assertTrue(all(p['id'] % 3 == 0 for p in points))
+
+    def test_paginated_endpoint(self):
+        resp = self.api.get('/api/dashboard-summary/client-quadrant/', {'page_size': 3})
+        data = resp.json()
+        self.assertEqual(data['count'], 4)
+        self.assertTrue(data['has_next'])
+        self.assertEqual(len(data['points']), 3)
+
+        data = self.api.get('/api/dashboard-summary/client-quadrant/', {'page_size': 3, 'page': 2}).json()
+        self.assertEqual([p['name'] for p in data['points']], ['C3'])
+        self.assertFalse(data['has_next'])
+
+        data = self.api.get('/api/dashboard-summary/client-quadrant/', {'zone': 'Watch'}).json()
+        self.assertEqual(data['count'], 1)
+        self.assertEqual([p['name'] for p in data['points']], ['C2'])
+
+        resp = self.api.get('/api/dashboard-summary/client-quadrant/', {'zone': 'Nope'})
+        self.assertEqual(resp.status_code, 400)
+
+
+@override_settings(REPORT_CACHE_TTL=0)
+class RevenueBreakdownTest(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        staff = Staff.objects.create(name='Ana', email='ana@example.com')
+        client = Client.objects.create(name='Cara', email='cara@example.com', phone='0700')
+        start = timezone.now() + timedelta(days=1)
+        # (price, payment status, deposit %, booking status)
+        specs = [
+            ('50.00', 'paid', None, 'confirmed'),
+            ('20.00', 'pending', 100, 'pending'),
+            ('40.00', 'pending', 25, 'confirmed'),
+            ('20.00', 'pending', None, 'confirmed'),
+            ('99.00', 'pending', None, 'cancelled'),
+        ]
+        for i, (price, payment, deposit, booking_status) in enumerate(specs):
+            service = Service.objects.create(name=f'S{i}', duration_minutes=60, price=Decimal(price))
+            booking = Booking.objects.create(client=client, service=service, staff=staff,
+                                             start_time=start + timedelta(hours=i), status=booking_status)
+            Booking.objects.filter(pk=booking.pk).update(
+                payment_status=payment, recommended_deposit_percent=deposit,
+            )
+
+    def test_totals_in_one_query(self):
+        today_start, _, week_end = _day_bounds(timezone.now())
+        with self.assertNumQueries(1):
+            breakdown = _revenue_breakdown(today_start, week_end)
+        self.assertEqual(breakdown, {
+            'total': 130.0,
+            'secured': 70.0,
+            'deposit': 10.0,
+            'at_risk': 50.0,
+            'counts': {'secured': 2, 'deposit': 1, 'at_risk': 1},
+        })
+
+    def test_bookings_sub_resource(self):
+        data = self.api.get('/api/dashboard-summary/revenue-bookings/', {'page_size': 3}).json()
+        self.assertTrue(data['has_next'])
+        self.assertEqual([b['service_name'] for b in data['bookings']], ['S0', 'S1', 'S2'])
+
+        data = self.api.get('/api/dashboard-summary/revenue-bookings/', {'category': 'deposit'}).json()
+        self.assertFalse(data['has_next'])
+        self.assertEqual(len(data['bookings']), 1)
+        self.assertEqual(data['bookings'][0]['client_name'], 'Cara')
+        self.assertEqual(data['bookings'][0]['price'], 40.0)
+
+        resp = self.api.get('/api/dashboard-summary/revenue-bookings/', {'category': 'Nope'})
+        self.assertEqual(resp.status_code, 400)
+
+
+class DashboardSectionSnapshotTest(TestCase):
+    SECTIONS = ['dashboard.revenue', 'dashboard.reliability', 'dashboard.staff_hours', 'dashboard.leave']
+
+    def setUp(self):
+        self.staff = Staff.objects.create(name='Ana', email='ana@example.com')
+        self.client_obj = Client.objects.create(name='Cara', email='cara@example.com', phone='0700', reliability_score=90)
+
+    def _stale(self):
+        return {s.name for s in ReportSnapshot.objects.filter(name__in=self.SECTIONS) if s.is_stale}
+
+    def test_sections_read_in_one_query(self):
+        first = get_snapshots(self.SECTIONS)
+        self.assertEqual(first['dashboard.reliability'].payload['reliability_distribution']['excellent'], 1)
+        with self.assertNumQueries(1):
+            second = get_snapshots(self.SECTIONS)
+        self.assertEqual(
+            {n: s.computed_at for n, s in second.items()},
+            {n: s.computed_at for n, s in first.items()},
+        )
+
+    def test_writes_mark_only_dependent_sections(self):
+        get_snapshots(self.SECTIONS)
+        TimesheetEntry.objects.create(staff_member=self.staff, date=timezone.localdate())
+        self.assertEqual(self._stale(), {'dashboard.staff_hours'})
+
+        self.client_obj.reliability_score = 30
+        self.client_obj.save()
+        self.assertEqual(self._stale(), {'dashboard.staff_hours', 'dashboard.reliability'})
+
+        rebuilt = get_snapshots(self.SECTIONS)
+        self.assertEqual(rebuilt['dashboard.reliability'].payload['reliability_distribution']['poor'], 1)
+        self.assertEqual(self._stale(), set())
+
+
+@override_settings(REPORT_CACHE_TTL=0, REPORT_TIME_ZONE='Europe/London')
+class DemandBucketsTest(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        self.service = Service.objects.create(name='Massage', duration_minutes=60, price=Decimal('50.00'))
+        self.staff = Staff.objects.create(name='Ana', email='ana@example.com')
+        self.client_obj = Client.objects.create(name='Cara', email='cara@example.com', phone='0700')
+
+    def _book(self, start, booking_status='completed'):
+        return Booking.objects.create(client=self.client_obj, service=self.service, staff=self.staff,
+                                      start_time=start, status=booking_status)
+
+    def test_buckets_follow_london_time(self):
+        utc = zoneinfo.ZoneInfo('UTC')
+        summer = self._book(datetime(2026, 7, 5, 23, 30, tzinfo=utc))  # Sunday 23:30 UTC = Monday 00:30 BST
+        winter = self._book(datetime(2026, 1, 4, 23, 30, tzinfo=utc))  # Sunday 23:30 UTC = GMT
+        rows = {
+            r['id']: (r['hour'], r['dow'], r['day'])
+            for r in Booking.objects.values('id', hour=local_hour(), dow=local_weekday(), day=local_date())
+        }
+        self.assertEqual(rows[summer.id], (0, 1, date(2026, 7, 6)))
+        self.assertEqual(rows[winter.id], (23, 0, date(2026, 1, 4)))
+
+    def test_dashboard_summary(self):
+        start = timezone.now() - timedelta(days=2)
+        self._book(start)
+        self._book(start, 'no_show')
+        self._book(start, 'cancelled')
+
+        resp = self.api.get('/api/dashboard-summary/')
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        local = start.astimezone(zoneinfo.ZoneInfo('Europe/London'))
+        self.assertEqual(data['demand_calendar']['cells'], [{
+            'hour': local.hour,
+            'day_of_week': local.isoweekday() % 7,
+            'total_bookings': 2,
+            'no_shows': 1,
+            'no_show_rate': 50.0,
+            'demand_intensity': 40,
+        }])
+        self.assertEqual(set(data['sections_computed_at']), {name.split('.', 1)[1] for name in DASHBOARD_SECTIONS})
+        self.assertEqual(data['revenue_breakdown']['total'], 0.0)
@@ -0,0 +1,83 @@
+"""
+CSV Exports — Unit Tests
+Exports stream row by row and keep the columns of the original exports.
+"""
+import csv
+from datetime import datetime, timedelta
+from decimal import Decimal
+from django.contrib.admin.sites import site
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .admin import BookingAdmin, ClientAdmin
+from .models import Service, Staff, Client, Booking
+from .models_availability import TimesheetEntry
+
+
+def _rows(response):
+    return list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+
+
+class StaffHoursCsvTest(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        self.staff = Staff.objects.create(name='Ana', email='ana@example.com')
+        for day, actual_end in ((3, 18), (4, 16)):
+            start = timezone.make_aware(datetime(2026, 3, day, 9))
+            TimesheetEntry.objects.create(
+                staff_member=self.staff, date=start.date(), break_minutes=60,
+                scheduled_start=start, scheduled_end=start.replace(hour=17),
+                actual_start=start, actual_end=start.replace(hour=actual_end),
+            )
+
+    def test_summary(self):
+        response = self.api.get('/api/reports/staff-hours/csv/', {'month': '2026-03'})
+        self.assertIsInstance(response, StreamingHttpResponse)
+        rows = _rows(response)
+        self.assertEqual(rows[1], ['2026-03', 'Ana', '14.00', '14.00', '1.00', '0.00', '2', '0'])
+        self.assertEqual(rows[-1][:4], ['', 'TOTAL', '14.00', '14.00'])
+
+    def test_detail(self):
+        response = self.api.get('/api/reports/staff-hours/csv/', {'month': '2026-03', 'detail': '1'})
+        rows = _rows(response)
+        self.assertEqual(rows[0][0], 'Month')
+        self.assertEqual(rows[1], ['2026-03', 'Ana', '2026-03-04', '7.00', '6.00', '60', '0.00', '-1.00', 'DRAFT'])
+        self.assertEqual(rows[2], ['2026-03', 'Ana', '2026-03-03', '7.00', '8.00', '60', '1.00', '1.00', 'DRAFT'])
+
+
+class AdminCsvExportTest(TestCase):
+    def setUp(self):
+        massage = Service.objects.create(name='Massage', duration_minutes=60, price=Decimal('50.00'))
+        yoga = Service.objects.create(name='Yoga', duration_minutes=45, price=Decimal('20.00'))
+        staff = Staff.objects.create(name='Ana', email='ana@example.com')
+        self.cara = Client.objects.create(name='Cara', email='cara@example.com', phone='0700')
+        self.dev = Client.objects.create(name='Dev', email='dev@example.com', phone='0701')
+        Client.objects.create(name='Eve', email='eve@example.com', phone='0702')
+        start = timezone.now() - timedelta(days=5)
+        for client, service, status in (
+            (self.cara, massage, 'completed'), (self.cara, yoga, 'confirmed'),
+            (self.cara, yoga, 'cancelled'), (self.dev, yoga, 'completed'),
+        ):
+            Booking.objects.create(client=client, service=service, staff=staff, start_time=start, status=status)
+
+    def test_clients_export(self):
+        admin = ClientAdmin(Client, site)
+        queryset = admin.get_queryset(None)
+        with self.assertNumQueries(2):
+            rows = _rows(admin.export_clients_csv(None, queryset))
+        self.assertEqual([r[:6] for r in rows[1:]], [
+            ['Cara', 'cara@example.com', '0700', '2', '£70.00', 'Massage, Yoga'],
+            ['Dev', 'dev@example.com', '0701', '1', '£20.00', 'Yoga'],
+            ['Eve', 'eve@example.com', '0702', '0', '£0.00', ''],
+        ])
+        self.assertEqual(rows[3][6], 'Never')
+
+    def test_bookings_export(self):
+        admin = BookingAdmin(Booking, site)
+        with self.assertNumQueries(1):
+            rows = _rows(admin.export_bookings_csv(None, Booking.objects.all()))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0][0], 'Booking ID')
+        self.assertEqual({r[4] for r in rows[1:]}, {'Massage', 'Yoga'})
@@ -0,0 +1,143 @@
+"""
+Service Intelligence — Unit Tests
+Rollup maintenance from Booking writes and metric derivation from the rollups.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import Service, Staff, Client, Booking
+from .models_rollups import ServiceDailyStat
+from .rollups import rebuild_service_daily_stats
+from .service_intelligence import recalculate_service_intelligence
+
+
+class ServiceIntelligenceTestBase(TestCase):
+    def setUp(self):
+        self.service = Service.objects.create(name='Massage', duration_minutes=60, price=Decimal('50.00'))
+        self.staff = Staff.objects.create(name='Sam', email='sam@example.com')
+        self.client_obj = Client.objects.create(name='Cara', email='cara@example.com', phone='0700')
+        self.start = (timezone.now() - timedelta(days=3)).replace(hour=11, minute=0, second=0, microsecond=0)
+
+    def _book(self, status='confirmed', start=None, risk_score=None):
+        return Booking.objects.create(
+            client=self.client_obj, service=self.service, staff=self.staff,
+            start_time=start or self.start, status=status, risk_score=risk_score,
+        )
+
+    def _stat(self):
+        return ServiceDailyStat.objects.get(service=self.service, date=timezone.localdate(self.start))
+
+
+class RollupMaintenanceTest(ServiceIntelligenceTestBase):
+    def test_create_adds_contribution(self):
+        self._book(risk_score=40)
+        stat = self._stat()
+        self.assertEqual(stat.total, 1)
+        self.assertEqual(stat.peak_count, 1)
+        self.assertEqual(stat.off_peak_count, 0)
+        self.assertEqual(stat.risk_count, 1)
+        self.assertEqual(stat.risk_sum, 40)
+
+    def test_status_change_moves_counts(self):
+        b = self._book()
+        b.status = 'completed'
+        b.save()
+        stat = self._stat()
+        self.assertEqual(stat.total, 1)
+        self.assertEqual(stat.completed, 1)
+        self.assertEqual(stat.revenue, Decimal('50.00'))
+
+        b.status = 'no_show'
+        b.save()
+        stat = self._stat()
+        self.assertEqual(stat.completed, 0)
+        self.assertEqual(stat.no_shows, 1)
+        self.assertEqual(stat.revenue, Decimal('0'))
+
+    def test_reloaded_instance_and_deferred_fields(self):
+        b = self._book()
+        Booking.objects.get(pk=b.pk).save()
+        deferred = Booking.objects.only('id', 'notes').get(pk=b.pk)
+        deferred.status = 'cancelled'
+        deferred.save()
+        stat = self._stat()
+        self.assertEqual(stat.total, 1)
+        self.assertEqual(stat.cancelled, 1)
+
+    def test_reschedule_moves_between_days(self):
+        b = self._book()
+        old_day = timezone.localdate(self.start)
+        b.start_time = self.start - timedelta(days=1)
+        b.end_time = b.start_time + timedelta(hours=1)
+        b.save()
+        self.assertEqual(ServiceDailyStat.objects.get(service=self.service, date=old_day).total, 0)
+        self.assertEqual(ServiceDailyStat.objects.get(service=self.service, date=old_day - timedelta(days=1)).total, 1)
+
+    def test_delete_removes_contribution(self):
+        b = self._book(status='completed')
+        b.delete()
+        stat = self._stat()
+        self.assertEqual(stat.total, 0)
+        self.assertEqual(stat.revenue, Decimal('0'))
+
+    def test_price_change_then_status_change(self):
+        b = self._book(status='completed')
+        self.service.price = Decimal('80.00')
+        self.service.save()
+        self.assertEqual(self._stat().revenue, Decimal('80.00'))
+
+        b.status = 'cancelled'
+        b.save()
+        stat = self._stat()
+        self.assertEqual((stat.completed, stat.cancelled, stat.revenue), (0, 1, Decimal('0')))
+
+        # Also when the service was loaded without its price
+        b.status = 'completed'
+        b.save()
+        service = Service.objects.only('id', 'name').get(pk=self.service.pk)
+        service.price = Decimal('65.00')
+        service.save()
+        self.assertEqual(self._stat().revenue, Decimal('65.00'))
+
+    def test_rebuild_matches_incremental(self):
+        self._book(status='completed', risk_score=20)
+        self._book(status='no_show', start=self.start.replace(hour=16))
+        incremental = {f: getattr(self._stat(), f) for f in ('total', 'completed', 'no_shows', 'peak_count', 'off_peak_count', 'revenue', 'risk_sum')}
+        rebuild_service_daily_stats()
+        rebuilt = {f: getattr(self._stat(), f) for f in incremental}
+        self.assertEqual(incremental, rebuilt)
+
+
+class RecalculateIntelligenceTest(ServiceIntelligenceTestBase):
+    def test_metrics_from_rollups(self):
+        for _ in range(3):
+            self._book(status='completed')
+        self._book(status='no_show', start=self.start.replace(hour=16))
+        self.assertEqual(recalculate_service_intelligence(), 1)
+
+        self.service.refresh_from_db()
+        self.assertEqual(self.service.total_bookings, 4)
+        self.assertEqual(self.service.total_revenue, Decimal('150.00'))
+        self.assertEqual(self.service.avg_booking_value, Decimal('50.00'))
+        self.assertEqual(self.service.no_show_rate, 25.0)
+        self.assertEqual(self.service.demand_index, round(4 * 3.3, 1))
+        # 25% no-shows → full prepayment recommended
+        self.assertEqual(self.service.recommended_payment_type, 'full')
+        self.assertIsNotNone(self.service.last_optimised_at)
+
+    def test_old_bookings_fall_out_of_window(self):
+        self._book(status='completed', start=self.start - timedelta(days=120))
+        recalculate_service_intelligence()
+        self.service.refresh_from_db()
+        self.assertEqual(self.service.total_bookings, 0)
+
+    def test_constant_query_count(self):
+        for i in range(10):
+            self._book(status='completed', start=self.start - timedelta(days=i))
+        recalculate_service_intelligence()
+        with self.assertNumQueries(8):
+            # rollup exists check, window sums, services, repeat clients, service save,
+            # report cache generation bump, snapshot change mark, opt log
+            recalculate_service_intelligence()
@@ -0,0 +1,271 @@
+"""
+Reports — Unit Tests
+Rollup-backed report endpoints must match aggregation over raw bookings,
+the response cache must revalidate against the data watermark, and insights
+are served from a snapshot rebuilt when bookings change.
+"""
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Service, Staff, Client, Booking
+from .models_rollups import BookingDailyRollup, ReportSnapshot
+from .rollups import rebuild_booking_daily_rollups
+from .snapshots import INSIGHTS, mark_changed, refresh_stale_snapshots
+
+User = get_user_model()
+
+
+@override_settings(REPORT_CACHE_TTL=0)
+class ReportsTestBase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        self.svc_a = Service.objects.create(name='Massage', duration_minutes=60, price=Decimal('50.00'))
+        self.svc_b = Service.objects.create(name='Yoga', duration_minutes=45, price=Decimal('20.00'))
+        self.staff_a = Staff.objects.create(name='Ana', email='ana@example.com')
+        self.staff_b = Staff.objects.create(name='Ben', email='ben@example.com')
+        self.client_obj = Client.objects.create(name='Cara', email='cara@example.com', phone='0700', reliability_score=80)
+        now = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        specs = [
+            (self.svc_a, self.staff_a, 0, 'confirmed', 'HIGH', 'paid'),
+            (self.svc_a, self.staff_a, 2, 'completed', 'LOW', 'paid'),
+            (self.svc_b, self.staff_b, 2, 'no_show', 'CRITICAL', 'pending'),
+            (self.svc_b, self.staff_a, 10, 'cancelled', '', 'refunded'),
+            (self.svc_a, self.staff_b, 40, 'completed', 'MEDIUM', 'paid'),
+        ]
+        for svc, staff, days_ago, status, risk, pay in specs:
+            Booking.objects.create(
+                client=self.client_obj, service=svc, staff=staff,
+                start_time=now - timedelta(days=days_ago), status=status,
+                risk_level=risk, risk_score=60 if risk else None,
+                revenue_at_risk=Decimal('10.00'), payment_status=pay,
+                payment_amount=svc.price if pay == 'paid' else None,
+            )
+        self.params = {'date_from': (now - timedelta(days=60)).date().isoformat()}
+
+    def _get(self, path, **extra):
+        return self.api.get(path, {**self.params, **extra}).json()
+
+
+class ReportsRollupTest(ReportsTestBase):
+    def _compare_with_live(self, path, **extra):
+        from_rollup = self._get(path, **extra)
+        with mock.patch('bookings.views_reports._rollup_qs', return_value=None):
+            live = self._get(path, **extra)
+        self.assertEqual(from_rollup, live)
+        return from_rollup
+
+    def test_rollup_maintained_on_write(self):
+        self.assertEqual(BookingDailyRollup.objects.aggregate(n=Sum('bookings'))['n'], 5)
+
+    def test_daily_matches_live(self):
+        data = self._compare_with_live('/api/reports/daily/')
+        self.assertEqual(sum(r['total'] for r in data['rows']), 5)
+        self.assertEqual(sum(r['revenue'] for r in data['rows']), 150.0)
+
+    def test_monthly_matches_live(self):
+        self._compare_with_live('/api/reports/monthly/')
+
+    def test_staff_matches_live(self):
+        data = self._compare_with_live('/api/reports/staff/')
+        self.assertEqual([r['staff_name'] for r in data['rows']], ['Ana', 'Ben'])
+
+    def test_filters_match_live(self):
+        self._compare_with_live('/api/reports/daily/', staff_id=self.staff_a.id)
+        self._compare_with_live('/api/reports/daily/', risk_level='HIGH')
+
+    def test_status_change_and_rebuild(self):
+        b = Booking.objects.get(status='no_show')
+        b.status = 'completed'
+        b.save()
+        before = self._compare_with_live('/api/reports/daily/')
+        rebuild_booking_daily_rollups()
+        self.assertEqual(self._get('/api/reports/daily/'), before)
+
+
+    def test_price_change_then_status_change(self):
+        self.svc_a.price = Decimal('80.00')
+        self.svc_a.save()
+        b = Booking.objects.get(service=self.svc_a, status='completed', start_time__lt=timezone.now() - timedelta(days=30))
+        b.status = 'cancelled'
+        b.save()
+        revenue = BookingDailyRollup.objects.filter(status='completed').aggregate(r=Sum('revenue'))['r']
+        self.assertEqual(revenue, Decimal('80.00'))
+        self.assertEqual(BookingDailyRollup.objects.get(status='cancelled', service=self.svc_a).revenue, Decimal('80.00'))
+        data = self._compare_with_live('/api/reports/daily/')
+        self.assertEqual(sum(r['revenue'] for r in data['rows']), 160.0)
+
+
+class ReportsOverviewTest(ReportsTestBase):
+    def test_overview_values(self):
+        data = self._get('/api/reports/overview/')
+        kpi = data['kpi']
+        self.assertEqual(kpi['total_bookings'], 5)
+        self.assertEqual(kpi['completed'], 3)
+        self.assertEqual(kpi['no_shows'], 1)
+        self.assertEqual(kpi['cancelled'], 1)
+        self.assertEqual(kpi['revenue'], 150.0)
+        self.assertEqual(kpi['revenue_at_risk'], 10.0)
+        self.assertEqual(kpi['deposits'], 150.0)
+        self.assertEqual(kpi['unique_clients'], 1)
+        self.assertEqual(kpi['repeat_client_pct'], 100.0)
+        self.assertEqual(kpi['avg_reliability'], 80.0)
+        self.assertEqual([s['name'] for s in data['service_breakdown']], ['Massage'])
+        self.assertEqual(sum(h['count'] for h in data['demand_heatmap']), 5)
+        self.assertEqual({r['level'] for r in data['risk_distribution']}, {'LOW', 'MEDIUM', 'HIGH', 'CRITICAL'})
+
+    def test_overview_query_count_is_constant(self):
+        # KPI aggregate + per-client stats + grouped series
+        with self.assertNumQueries(3):
+            self._get('/api/reports/overview/')
+        for i in range(20):
+            Booking.objects.create(
+                client=self.client_obj, service=self.svc_b, staff=self.staff_b,
+                start_time=timezone.now() - timedelta(days=i), status='completed',
+            )
+        with self.assertNumQueries(3):
+            self._get('/api/reports/overview/')
+
+
+@override_settings(REPORT_CACHE_TTL=0, REPORT_TIME_ZONE='Europe/London')
+class ReportTimeZoneTest(TestCase):
+    def test_bst_booking_bucketed_in_local_time(self):
+        svc = Service.objects.create(name='Massage', duration_minutes=60, price=Decimal('50.00'))
+        staff = Staff.objects.create(name='Ana', email='ana@example.com')
+        client = Client.objects.create(name='Cara', email='cara@example.com', phone='0700')
+        # 23:30 UTC on Wednesday 1 July is 00:30 BST on Thursday 2 July
+        start = datetime(2026, 7, 1, 23, 30, tzinfo=dt_timezone.utc)
+        Booking.objects.create(client=client, service=svc, staff=staff, start_time=start, status='completed')
+        rebuild_booking_daily_rollups()
+        self.assertEqual(list(BookingDailyRollup.objects.values_list('date', flat=True)), [date(2026, 7, 2)])
+
+        params = {'date_from': '2026-07-02', 'date_to': '2026-07-02'}
+        data = APIClient().get('/api/reports/overview/', params).json()
+        self.assertEqual(data['kpi']['total_bookings'], 1)
+        self.assertEqual(data['demand_heatmap'], [{'hour': 0, 'dow': 4, 'count': 1}])
+        self.assertEqual([r['date'] for r in data['revenue_timeline']], ['2026-07-02'])
+        daily = APIClient().get('/api/reports/daily/', params).json()
+        self.assertEqual([r['date'] for r in daily['rows']], ['2026-07-02'])
+
+
+@override_settings(REPORT_CACHE_TTL=300)
+class ReportCacheTest(ReportsTestBase):
+    def test_repeat_load_costs_one_query(self):
+        first = self.api.get('/api/reports/overview/', self.params)
+        self.assertEqual(first['X-Report-Cache'], 'MISS')
+        self.assertTrue(first.has_header('Last-Modified'))
+        with self.assertNumQueries(1):
+            second = self.api.get('/api/reports/overview/', self.params)
+        self.assertEqual(second['X-Report-Cache'], 'HIT')
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.json(), first.json())
+
+    def test_if_none_match_returns_304(self):
+        etag = self.api.get('/api/reports/daily/', self.params)['ETag']
+        with self.assertNumQueries(1):
+            resp = self.api.get('/api/reports/daily/', self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+
+    def test_param_order_and_blanks_share_entry(self):
+        etag = self.api.get('/api/reports/daily/?staff_id=&risk_level=HIGH&date_from=' + self.params['date_from'])['ETag']
+        other = self.api.get('/api/reports/daily/?date_from=' + self.params['date_from'] + '&risk_level=HIGH')
+        self.assertEqual(other['X-Report-Cache'], 'HIT')
+        self.assertEqual(other['ETag'], etag)
+
+    def test_write_changes_version(self):
+        etag = self.api.get('/api/reports/daily/', self.params)['ETag']
+        b = Booking.objects.get(status='no_show')
+        b.status = 'completed'
+        b.save()
+        resp = self.api.get('/api/reports/daily/', self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp['ETag'], etag)
+
+    def test_delete_and_explicit_invalidation(self):
+        etag = self.api.get('/api/reports/overview/', self.params)['ETag']
+        Booking.objects.filter(status='cancelled').first().delete()
+        etag2 = self.api.get('/api/reports/overview/', self.params)['ETag']
+        self.assertNotEqual(etag2, etag)
+        self.assertEqual(self.api.delete('/api/reports/cache/').status_code, 403)
+        self.assertEqual(self.api.get('/api/reports/overview/', self.params)['X-Report-Cache'], 'HIT')
+        self.api.force_authenticate(User.objects.create_user('mo', password='x', is_staff=True))
+        self.assertEqual(self.api.delete('/api/reports/cache/').status_code, 200)
+        self.assertEqual(self.api.get('/api/reports/overview/', self.params)['X-Report-Cache'], 'MISS')
+
+    def test_hit_ratio(self):
+        self.api.get('/api/reports/staff/', self.params)
+        self.api.get('/api/reports/staff/', self.params)
+        self.api.get('/api/reports/staff/', {**self.params, 'refresh': '1'})
+        stats = self.api.get('/api/reports/cache/').json()
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['hit_ratio'], round(1 / 3, 3))
+
+    def test_invalidation_reaches_other_workers(self):
+        # Per-process caches (LocMemCache without REDIS_URL) share only the database
+        worker_a = LocMemCache('reports-worker-a', {})
+        worker_b = LocMemCache('reports-worker-b', {})
+        with mock.patch('bookings.report_cache.cache', worker_a):
+            first = self.api.get('/api/reports/overview/', self.params)
+            self.assertEqual(self.api.get('/api/reports/overview/', self.params)['X-Report-Cache'], 'HIT')
+        with mock.patch('bookings.report_cache.cache', worker_b):
+            # Price changes are not covered by the watermark, only the generation
+            self.svc_a.price = Decimal('80.00')
+            self.svc_a.save()
+        with mock.patch('bookings.report_cache.cache', worker_a):
+            resp = self.api.get('/api/reports/overview/', self.params, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['X-Report-Cache'], 'MISS')
+        self.assertNotEqual(resp['ETag'], first['ETag'])
+
+        self.api.force_authenticate(User.objects.create_user('mo', password='x', is_staff=True))
+        with mock.patch('bookings.report_cache.cache', worker_b):
+            self.assertEqual(self.api.delete('/api/reports/cache/').status_code, 200)
+        with mock.patch('bookings.report_cache.cache', worker_a):
+            self.assertEqual(self.api.get('/api/reports/overview/', self.params)['X-Report-Cache'], 'MISS')
+
+
+class ReportsInsightsTest(ReportsTestBase):
+    def test_served_from_snapshot(self):
+        first = self._get('/api/reports/insights/')
+        self.assertIn('computed_at', first)
+        self.assertTrue(any('high-risk' in i['message'] for i in first['insights']))
+        with self.assertNumQueries(1):
+            second = self._get('/api/reports/insights/')
+        self.assertEqual(second, first)
+
+    def test_booking_change_marks_stale(self):
+        computed_at = self._get('/api/reports/insights/')['computed_at']
+        snapshot = ReportSnapshot.objects.get(name=INSIGHTS)
+        self.assertFalse(snapshot.is_stale)
+
+        b = Booking.objects.get(status='confirmed')
+        b.status = 'completed'
+        b.save()
+        self.assertTrue(ReportSnapshot.objects.get(name=INSIGHTS).is_stale)
+        data = self._get('/api/reports/insights/')
+        self.assertGreater(data['computed_at'], computed_at)
+        self.assertFalse(any('high-risk' in i['message'] for i in data['insights']))
+
+    def test_insignificant_change_keeps_snapshot(self):
+        self._get('/api/reports/insights/')
+        b = Booking.objects.get(status='confirmed')
+        b.notes = 'Parking at the back'
+        b.save()
+        self.assertFalse(ReportSnapshot.objects.get(name=INSIGHTS).is_stale)
+
+    def test_refresh_param_and_stale_job(self):
+        computed_at = self._get('/api/reports/insights/')['computed_at']
+        self.assertGreater(self._get('/api/reports/insights/', refresh='1')['computed_at'], computed_at)
+        self.assertEqual(refresh_stale_snapshots([INSIGHTS]), [])
+        mark_changed(INSIGHTS)
+        self.assertEqual(refresh_stale_snapshots([INSIGHTS]), [INSIGHTS])
@@ -0,0 +1,57 @@
+"""
+Time buckets — timezone-aware date/hour/weekday expressions for analytics
+Bookings are stored in UTC; heatmaps and demand figures bucket them by the
+business's wall-clock time (REPORT_TIME_ZONE, Europe/London by default), so a
+10:00 appointment lands in the 10:00 bucket in summer as well as winter.
+
+These are plain ORM expressions, portable across PostgreSQL and SQLite. On
+PostgreSQL they compile to EXTRACT(... FROM start_time AT TIME ZONE '...'),
+so filters on them can use a matching expression index.
+
+local_today() and local_day_start() give the matching Python-side values, for
+date windows and for keying rows written one booking at a time.
+
+Day of week is numbered 0=Sunday … 6=Saturday everywhere (PostgreSQL `dow`,
+JavaScript getDay()).
+"""
+import zoneinfo
+from datetime import datetime, time
+from django.conf import settings
+from django.utils import timezone
+from django.db.models import IntegerField, Value
+from django.db.models.functions import ExtractHour, ExtractWeekDay, TruncDate
+
+
+def report_tz():
+    return zoneinfo.ZoneInfo(getattr(settings, 'REPORT_TIME_ZONE', 'Europe/London'))
+
+
+def local_hour(field='start_time'):
+    """Hour of day (0-23) in the report time zone."""
+    return ExtractHour(field, tzinfo=report_tz())
+
+
+def local_weekday(field='start_time'):
+    """Day of week in the report time zone, 0=Sunday … 6=Saturday."""
+    # ExtractWeekDay counts 1=Sunday … 7=Saturday on every backend
+    return ExtractWeekDay(field, tzinfo=report_tz()) - Value(1, output_field=IntegerField())
+
+
+def local_date(field='start_time'):
+    """Calendar date in the report time zone."""
+    return TruncDate(field, tzinfo=report_tz())
+
+
+def local_today(now=None):
+    """Today's date (or `now`'s) in the report time zone."""
+    return timezone.localdate(now, timezone=report_tz())
+
+
+def local_day_start(day):
+    """The aware datetime at which `day` starts in the report time zone."""
+    return datetime.combine(day, time.min, tzinfo=report_tz())
+
+
+def local_datetime(value):
+    """An aware datetime converted to the report time zone."""
+    return timezone.localtime(value, report_tz())
@@ -1,17 +1,26 @@
 """
 Phase 7 — Dashboard Intelligence API (Visual Dashboard v2)
 GET /api/dashboard-summary/
+GET /api/dashboard-summary/client-quadrant/
+GET /api/dashboard-summary/revenue-bookings/
 POST /api/backfill-sbe/
 """
 from datetime import timedelta
 from decimal import Decimal
 from django.utils import timezone
-from django.db.models import Sum, Count, Q, F, Avg
+from django.db.models import (
+    Sum, Count, Q, F, Avg, Case, When, Value, CharField, DecimalField, ExpressionWrapper,
+)
+from django.db.models.functions import Cast, Coalesce, Mod
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from .models import Booking, Client, Service
 from .models_availability import TimesheetEntry, LeaveRequest
+from .report_cache import cached_report
+from .snapshots import DASHBOARD_SECTIONS, get_snapshots
+from .time_buckets import local_day_start, local_hour, local_today, local_weekday
 
 
 @api_view(['POST'])
@@ -32,92 +41,134 @@ def backfill_sbe(request):
     return Response({'backfilled': len([r for r in results if r['status'] == 'ok']), 'results': results})
 
 
-def _revenue_breakdown(today_start, week_end):
-    """Calculate secured / deposit / at-risk revenue breakdown."""
-    upcoming = Booking.objects.filter(
+REVENUE_STATUSES = ('confirmed', 'completed', 'pending')
+REVENUE_CATEGORIES = ('secured', 'deposit', 'at_risk')
+
+
+def _upcoming_revenue_qs(today_start, week_end):
+    """Upcoming bookings in the window, each annotated with its revenue category."""
+    return Booking.objects.filter(
         start_time__gte=today_start,
         start_time__lt=week_end,
-        status__in=['confirmed', 'completed', 'pending']
-    ).select_related('service')
-
-    total = Decimal('0')
-    secured = Decimal('0')
-    deposit = Decimal('0')
-    at_risk = Decimal('0')
-
-    bookings_breakdown = []
-    for b in upcoming:
-        price = b.service.price or Decimal('0')
-        total += price
-
-        if b.payment_status == 'paid':
-            secured += price
-            cat = 'secured'
-        elif b.recommended_deposit_percent and b.recommended_deposit_percent >= 100:
-            secured += price
-            cat = 'secured'
-        elif b.recommended_deposit_percent and b.recommended_deposit_percent > 0:
-            dep_amount = price * Decimal(str(b.recommended_deposit_percent / 100))
-            deposit += dep_amount
-            at_risk += price - dep_amount
-            cat = 'deposit'
-        else:
-            at_risk += price
-            cat = 'at_risk'
-
-        bookings_breakdown.append({
-            'id': b.id,
-            'client_name': b.client.name if b.client_id else '',
-            'service_name': b.service.name,
-            'price': float(price),
-            'risk_level': b.risk_level or '',
-            'category': cat,
-            'start_time': b.start_time.isoformat(),
-        })
+        status__in=REVENUE_STATUSES,
+    ).annotate(
+        category=Case(
+            When(Q(payment_status='paid') | Q(recommended_deposit_percent__gte=100), then=Value('secured')),
+            When(recommended_deposit_percent__gt=0, then=Value('deposit')),
+            default=Value('at_risk'),
+            output_field=CharField(),
+        ),
+    )
+
 
+def _revenue_breakdown(today_start, week_end):
+    """Secured / deposit / at-risk revenue totals, as one conditional aggregate."""
+    price = Coalesce('service__price', Value(Decimal('0')), output_field=DecimalField(max_digits=12, decimal_places=2))
+    deposit_amount = ExpressionWrapper(
+        price * Cast('recommended_deposit_percent', DecimalField(max_digits=9, decimal_places=4)) / Value(Decimal('100')),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+    totals = _upcoming_revenue_qs(today_start, week_end).aggregate(
+        total=Sum(price),
+        secured=Sum(price, filter=Q(category='secured')),
+        deposit=Sum(deposit_amount, filter=Q(category='deposit')),
+        **{f'{cat}_count': Count('id', filter=Q(category=cat)) for cat in REVENUE_CATEGORIES},
+    )
+    total = totals['total'] or Decimal('0')
+    secured = totals['secured'] or Decimal('0')
+    deposit = totals['deposit'] or Decimal('0')
     return {
         'total': float(total),
         'secured': float(secured),
         'deposit': float(deposit),
-        'at_risk': float(at_risk),
-        'bookings': bookings_breakdown,
+        # Unpaid balance of deposit bookings is still at risk
+        'at_risk': float(total - secured - deposit),
+        'counts': {cat: totals[f'{cat}_count'] for cat in REVENUE_CATEGORIES},
     }
 
 
-def _client_quadrant():
-    """Build client quadrant data: reliability vs booking frequency."""
+def _revenue_bookings(qs):
+    """Per-booking rows of the breakdown, read through values() with their joins."""
+    return [
+        {
+            'id': row['id'],
+            'client_name': row['client__name'] or '',
+            'service_name': row['service__name'],
+            'price': float(row['service__price'] or 0),
+            'risk_level': row['risk_level'] or '',
+            'category': row['category'],
+            'start_time': row['start_time'].isoformat(),
+        }
+        for row in qs.values(
+            'id', 'client__name', 'service__name', 'service__price', 'risk_level', 'category', 'start_time',
+        )
+    ]
+
+
+QUADRANT_ZONES = ('VIP', 'Stable', 'Watch', 'High Risk')
+QUADRANT_MAX_POINTS = 500
+
+
+def _client_quadrant_qs():
+    """Clients annotated with 90-day booking frequency and quadrant zone, in one query."""
     ninety_days_ago = timezone.now() - timedelta(days=90)
-    clients = Client.objects.all()
-    points = []
-    for c in clients:
-        freq = Booking.objects.filter(
-            client=c,
-            start_time__gte=ninety_days_ago,
-            status__in=['confirmed', 'completed']
-        ).count()
-        rel = c.reliability_score or 0
-
-        if rel >= 60 and freq >= 2:
-            zone = 'VIP'
-        elif rel >= 60:
-            zone = 'Stable'
-        elif freq >= 2:
-            zone = 'Watch'
-        else:
-            zone = 'High Risk'
-
-        points.append({
-            'id': c.id,
-            'name': c.name,
-            'email': c.email,
-            'reliability': round(rel, 1),
-            'frequency': freq,
-            'zone': zone,
-            'total_bookings': c.total_bookings,
-            'no_shows': c.no_show_count,
-            'lifetime_value': float(c.lifetime_value or 0),
-        })
-    return points
+    return Client.objects.annotate(
+        frequency=Count('bookings', filter=Q(
+            bookings__start_time__gte=ninety_days_ago,
+            bookings__status__in=['confirmed', 'completed'],
+        )),
+    ).annotate(
+        zone=Case(
+            When(reliability_score__gte=60, frequency__gte=2, then=Value('VIP')),
+            When(reliability_score__gte=60, then=Value('Stable')),
+            When(frequency__gte=2, then=Value('Watch')),
+            default=Value('High Risk'),
+            output_field=CharField(),
+        ),
+    )
+
+
+def _quadrant_zone_counts(qs):
+    """Client count per zone for the whole population (scatter legend)."""
+    totals = qs.aggregate(**{
+        f'zone_{i}': Count('id', filter=Q(zone=zone)) for i, zone in enumerate(QUADRANT_ZONES)
+    })
+    return {zone: totals[f'zone_{i}'] for i, zone in enumerate(QUADRANT_ZONES)}
+
+
+def _quadrant_points(qs):
+    return [{
+        'id': c['id'],
+        'name': c['name'],
+        'email': c['email'],
+        'reliability': round(c['reliability_score'] or 0, 1),
+        'frequency': c['frequency'],
+        'zone': c['zone'],
+        'total_bookings': c['total_bookings'],
+        'no_shows': c['no_show_count'],
+        'lifetime_value': float(c['lifetime_value'] or 0),
+    } for c in qs.values(
+        'id', 'name', 'email', 'reliability_score', 'frequency', 'zone',
+        'total_bookings', 'no_show_count', 'lifetime_value',
+    )]
+
+
+def _client_quadrant(max_points=QUADRANT_MAX_POINTS):
+    """
+    Build client quadrant data: reliability vs booking frequency.
+    Beyond max_points clients the scatter gets an evenly spread sample (every
+    n-th id); zone totals always cover every client.
+    """
+    qs = _client_quadrant_qs()
+    zones = _quadrant_zone_counts(qs)
+    total = sum(zones.values())
+
+    step = -(-total // max_points) if total > max_points else 1
+    if step > 1:
+        qs = qs.annotate(bucket=Mod('id', step)).filter(bucket=0)
+    points = _quadrant_points(qs.order_by('id')[:max_points])
+
+    return points, {'total': total, 'zones': zones, 'sample_step': step}
 
 
 def _demand_calendar():
@@ -131,15 +182,12 @@ def _demand_calendar():
             start_time__gte=thirty_days_ago,
             status__in=['confirmed', 'completed', 'no_show']
         )
-        .extra(select={
-            'hour': 'EXTRACT(hour FROM start_time)',
-            'dow': 'EXTRACT(dow FROM start_time)',
-        })
-        .values('hour', 'dow')
+        .values(hour=local_hour(), dow=local_weekday())
         .annotate(
             total=Count('id'),
             no_shows=Count('id', filter=Q(status='no_show')),
         )
+        .order_by()
     )
 
     # Service demand indices
@@ -230,13 +278,94 @@ def _generate_owner_actions(today_start, today_end):
     return actions[:5]
 
 
+def _page_params(request, default_size, max_size=1000):
+    """(page, page_size) from the query string; ValueError when not integers."""
+    page = max(1, int(request.query_params.get('page', 1)))
+    page_size = min(max_size, max(1, int(request.query_params.get('page_size', default_size))))
+    return page, page_size
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
-def dashboard_summary(request):
-    now = timezone.now()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    today_end = today_start + timedelta(days=1)
-    week_end = today_start + timedelta(days=7)
+@cached_report
+def dashboard_client_quadrant(request):
+    """
+    GET /api/dashboard-summary/client-quadrant/ — Paginated quadrant points
+    ?page=&page_size= (max 1000), optional ?zone= filter.
+    """
+    try:
+        page, page_size = _page_params(request, QUADRANT_MAX_POINTS)
+    except ValueError:
+        return Response({'error': 'page and page_size must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    qs = _client_quadrant_qs()
+    zones = _quadrant_zone_counts(qs)
+    zone = request.query_params.get('zone')
+    if zone:
+        if zone not in QUADRANT_ZONES:
+            return Response({'error': f'zone must be one of {", ".join(QUADRANT_ZONES)}'}, status=status.HTTP_400_BAD_REQUEST)
+        qs = qs.filter(zone=zone)
+        count = zones[zone]
+    else:
+        count = sum(zones.values())
+
+    offset = (page - 1) * page_size
+    return Response({
+        'count': count,
+        'page': page,
+        'page_size': page_size,
+        'has_next': offset + page_size < count,
+        'zones': zones,
+        'points': _quadrant_points(qs.order_by('id')[offset:offset + page_size]),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@cached_report
+def dashboard_revenue_bookings(request):
+    """
+    GET /api/dashboard-summary/revenue-bookings/ — Bookings behind the 7-day
+    revenue breakdown, ?page=&page_size= (max 1000), optional ?category= filter.
+    """
+    try:
+        page, page_size = _page_params(request, 50)
+    except ValueError:
+        return Response({'error': 'page and page_size must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    today_start, _, week_end = _day_bounds(timezone.now())
+    qs = _upcoming_revenue_qs(today_start, week_end)
+    category = request.query_params.get('category')
+    if category:
+        if category not in REVENUE_CATEGORIES:
+            return Response(
+                {'error': f'category must be one of {", ".join(REVENUE_CATEGORIES)}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        qs = qs.filter(category=category)
+
+    offset = (page - 1) * page_size
+    # One row past the page tells whether another page follows, without a COUNT
+    rows = _revenue_bookings(qs.order_by('start_time', 'id')[offset:offset + page_size + 1])
+    return Response({
+        'page': page,
+        'page_size': page_size,
+        'has_next': len(rows) > page_size,
+        'bookings': rows[:page_size],
+    })
+
+
+# ════════════════════════════════════════════════════════════════
+# Dashboard sections — snapshot builders (see bookings.snapshots)
+# ════════════════════════════════════════════════════════════════
+
+def _day_bounds(now):
+    today_start = local_day_start(local_today(now))
+    return today_start, today_start + timedelta(days=1), today_start + timedelta(days=7)
+
+
+def build_revenue_section(now):
+    today_start, today_end, week_end = _day_bounds(now)
 
     # Revenue breakdown
     revenue = _revenue_breakdown(today_start, week_end)
@@ -257,31 +386,54 @@ def dashboard_summary(request):
         status__in=['confirmed', 'pending']
     ).count()
 
-    # Reliability distribution
-    clients = Client.objects.all()
-    reliability_dist = {
-        'excellent': clients.filter(reliability_score__gte=85).count(),
-        'good': clients.filter(reliability_score__gte=60, reliability_score__lt=85).count(),
-        'fair': clients.filter(reliability_score__gte=40, reliability_score__lt=60).count(),
-        'poor': clients.filter(reliability_score__lt=40).count(),
-    }
-
     total_upcoming = Booking.objects.filter(
         start_time__gte=today_start,
         status__in=['confirmed', 'pending']
     ).count()
 
-    avg_reliability = clients.aggregate(avg=Avg('reliability_score'))['avg'] or 0
+    return {
+        'revenue_today': revenue_today,
+        'revenue_next_7_days': revenue['total'],
+        'revenue_breakdown': revenue,
+        'high_risk_bookings_today': high_risk_today,
+        'total_upcoming_bookings': total_upcoming,
+    }
+
 
-    # Client quadrant
-    client_quadrant = _client_quadrant()
+def build_reliability_section(now):
+    # Distribution bands + average in one conditional aggregate
+    stats = Client.objects.aggregate(
+        excellent=Count('id', filter=Q(reliability_score__gte=85)),
+        good=Count('id', filter=Q(reliability_score__gte=60, reliability_score__lt=85)),
+        fair=Count('id', filter=Q(reliability_score__gte=40, reliability_score__lt=60)),
+        poor=Count('id', filter=Q(reliability_score__lt=40)),
+        avg=Avg('reliability_score'),
+    )
+    return {
+        'reliability_distribution': {band: stats[band] for band in ('excellent', 'good', 'fair', 'poor')},
+        'average_reliability_score': round(float(stats['avg'] or 0), 1),
+    }
 
-    # Demand calendar
-    demand_calendar = _demand_calendar()
 
-    # Owner actions
-    owner_actions = _generate_owner_actions(today_start, today_end)
+def build_client_quadrant_section(now):
+    # Client quadrant (sampled scatter + zone totals)
+    client_quadrant, quadrant_meta = _client_quadrant()
+    return {
+        'client_quadrant': client_quadrant,
+        'client_quadrant_meta': quadrant_meta,
+    }
+
+
+def build_demand_calendar_section(now):
+    return {'demand_calendar': _demand_calendar()}
+
+
+def build_owner_actions_section(now):
+    today_start, today_end, _ = _day_bounds(now)
+    return {'owner_actions': _generate_owner_actions(today_start, today_end)}
 
+
+def build_staff_hours_section(now):
     # Staff hours this month (real-time from timesheets)
     from datetime import date as dt_date
     month_start = dt_date(now.year, now.month, 1)
@@ -308,10 +460,19 @@ def dashboard_summary(request):
         r['scheduled_hours'] = round(r['scheduled_hours'], 1)
         r['actual_hours'] = round(r['actual_hours'], 1)
 
-    total_scheduled = round(sum(r['scheduled_hours'] for r in staff_hours_list), 1)
-    total_actual = round(sum(r['actual_hours'] for r in staff_hours_list), 1)
+    return {
+        'staff_hours_this_month': {
+            'month': month_start.strftime('%Y-%m'),
+            'total_scheduled': round(sum(r['scheduled_hours'] for r in staff_hours_list), 1),
+            'total_actual': round(sum(r['actual_hours'] for r in staff_hours_list), 1),
+            'staff': staff_hours_list,
+        },
+    }
+
 
+def build_leave_section(now):
     # Leave this week (approved + requested, overlapping next 7 days)
+    today_start, _, week_end = _day_bounds(now)
     leave_qs = LeaveRequest.objects.filter(
         start_datetime__date__lte=week_end.date(),
         end_datetime__date__gte=today_start.date(),
@@ -333,22 +494,26 @@ def dashboard_summary(request):
             'reason': lv.reason,
         })
 
-    return Response({
-        'revenue_today': revenue_today,
-        'revenue_next_7_days': revenue['total'],
-        'revenue_breakdown': revenue,
-        'high_risk_bookings_today': high_risk_today,
-        'reliability_distribution': reliability_dist,
-        'client_quadrant': client_quadrant,
-        'demand_calendar': demand_calendar,
-        'owner_actions': owner_actions,
-        'total_upcoming_bookings': total_upcoming,
-        'average_reliability_score': round(float(avg_reliability), 1),
-        'staff_hours_this_month': {
-            'month': month_start.strftime('%Y-%m'),
-            'total_scheduled': total_scheduled,
-            'total_actual': total_actual,
-            'staff': staff_hours_list,
-        },
-        'leave_this_week': leave_this_week,
-    })
+    return {'leave_this_week': leave_this_week}
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@cached_report
+def dashboard_summary(request):
+    """
+    GET /api/dashboard-summary/ — Owner dashboard, assembled from per-section
+    snapshots. Only sections whose source models changed since they were
+    built are recomputed; sections_computed_at stamps each one. ?refresh=1
+    rebuilds every section.
+    """
+    refresh = request.query_params.get('refresh', '').lower() in ('1', 'true')
+    snapshots = get_snapshots(DASHBOARD_SECTIONS, refresh=refresh)
+
+    data = {}
+    for name in DASHBOARD_SECTIONS:
+        data.update(snapshots[name].payload)
+    data['sections_computed_at'] = {
+        name.split('.', 1)[1]: snapshots[name].computed_at.isoformat() for name in DASHBOARD_SECTIONS
+    }
+    return Response(data)
@@ -131,6 +131,9 @@ def demo_seed_view(request):
     # Create demo bookings
     demo_bookings = _build_demo_bookings(seed_id, demo_services, demo_clients, staff_qs)
     Booking.objects.bulk_create(demo_bookings)
+    # bulk_create bypasses the Booking signals — build the demo services' rollups directly
+    from .rollups import rebuild_rollups
+    rebuild_rollups(service_ids=[s.id for s in demo_services])
 
     demo_count = Booking.objects.filter(data_origin='DEMO').count()
     return Response({
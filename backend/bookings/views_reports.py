@@ -7,21 +7,32 @@ GET /api/reports/staff/
 GET /api/reports/insights/
 GET /api/reports/staff-hours/
 GET /api/reports/staff-hours/csv/
+GET /api/reports/leave/
+GET|DELETE /api/reports/cache/
+
+JSON endpoints are served through bookings.report_cache (ETag + 304).
 """
-import csv
 from datetime import timedelta, date
 from decimal import Decimal
 from collections import defaultdict
-from io import StringIO
-from django.http import HttpResponse
 from django.utils import timezone
-from django.db.models import Sum, Count, Avg, Q, F, FloatField
-from django.db.models.functions import TruncDate, TruncMonth, ExtractHour, ExtractWeekDay
+from django.db.models import Sum, Count, Avg, Q, F, FloatField, DateField
+from django.db.models.functions import TruncMonth
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from .models import Booking, Client, Service, Staff
-from .models_availability import TimesheetEntry
+from core.exports import iter_values, stream_csv
+from .models import Booking, Staff
+from .models_availability import TimesheetEntry, net_hours
+from .models_rollups import BookingDailyRollup
+from .reports_engine import build_overview
+from .snapshots import INSIGHTS, get_snapshot
+from .report_cache import cached_report, cache_stats, invalidate_reports, report_generation
+from .time_buckets import local_date, local_day_start, local_today, report_tz
+
+REVENUE_STATUSES = ['completed', 'confirmed']
+HIGH_RISK_LEVELS = ['HIGH', 'CRITICAL']
 
 
 def _parse_date(s, default=None):
@@ -36,13 +47,14 @@ def _parse_date(s, default=None):
 
 def _base_qs(request):
     """Build base booking queryset from request filters."""
-    now = timezone.now()
-    date_from = _parse_date(request.query_params.get('date_from'), (now - timedelta(days=30)).date())
-    date_to = _parse_date(request.query_params.get('date_to'), now.date())
+    today = local_today()
+    date_from = _parse_date(request.query_params.get('date_from'), today - timedelta(days=30))
+    date_to = _parse_date(request.query_params.get('date_to'), today)
 
+    # Calendar days in the report time zone, as the rollups are keyed
     qs = Booking.objects.filter(
-        start_time__date__gte=date_from,
-        start_time__date__lte=date_to,
+        start_time__gte=local_day_start(date_from),
+        start_time__lt=local_day_start(date_to + timedelta(days=1)),
     ).select_related('client', 'service', 'staff')
 
     # Exclude demo data unless explicitly requested
@@ -69,149 +81,127 @@ def _base_qs(request):
     return qs, date_from, date_to
 
 
+# ════════════════════════════════════════════════════════════════
+# Rollup-backed grouping — closed days from BookingDailyRollup,
+# today onwards from live Booking rows (still changing)
+# ════════════════════════════════════════════════════════════════
+
+METRIC_FIELDS = ('revenue', 'deposits', 'at_risk', 'bookings', 'no_shows', 'cancelled', 'total', 'risk_sum', 'risk_count')
+
+
+def _rollup_metrics():
+    return {
+        'm_revenue': Sum('revenue', filter=Q(status__in=REVENUE_STATUSES)),
+        'm_deposits': Sum('deposits'),
+        'm_at_risk': Sum('revenue_at_risk', filter=Q(risk_level__in=HIGH_RISK_LEVELS)),
+        'm_bookings': Sum('bookings', filter=Q(status__in=REVENUE_STATUSES)),
+        'm_no_shows': Sum('bookings', filter=Q(status='no_show')),
+        'm_cancelled': Sum('bookings', filter=Q(status='cancelled')),
+        'm_total': Sum('bookings'),
+        'm_risk_sum': Sum('risk_sum'),
+        'm_risk_count': Sum('risk_count'),
+    }
+
+
+def _live_metrics():
+    return {
+        'm_revenue': Sum('service__price', filter=Q(status__in=REVENUE_STATUSES)),
+        'm_deposits': Sum('payment_amount', filter=Q(payment_status='paid')),
+        'm_at_risk': Sum('revenue_at_risk', filter=Q(risk_level__in=HIGH_RISK_LEVELS)),
+        'm_bookings': Count('id', filter=Q(status__in=REVENUE_STATUSES)),
+        'm_no_shows': Count('id', filter=Q(status='no_show')),
+        'm_cancelled': Count('id', filter=Q(status='cancelled')),
+        'm_total': Count('id'),
+        'm_risk_sum': Sum('risk_score'),
+        'm_risk_count': Count('risk_score'),
+    }
+
+
+def _rollup_qs(request, date_from, date_to):
+    """BookingDailyRollup rows matching the report filters, or None if a filter isn't a rollup dimension."""
+    if request.query_params.get('payment_status'):
+        return None
+
+    qs = BookingDailyRollup.objects.filter(date__gte=date_from, date__lte=date_to)
+
+    include_demo = request.query_params.get('include_demo', '').lower() in ('1', 'true')
+    if not include_demo:
+        qs = qs.filter(data_origin='REAL')
+
+    staff_id = request.query_params.get('staff_id')
+    if staff_id:
+        qs = qs.filter(staff_id=staff_id)
+
+    service_id = request.query_params.get('service_id')
+    if service_id:
+        qs = qs.filter(service_id=service_id)
+
+    risk_level = request.query_params.get('risk_level')
+    if risk_level:
+        qs = qs.filter(risk_level=risk_level)
+
+    return qs
+
+
+def _grouped_metrics(request, group):
+    """
+    Report metrics grouped by 'day' or 'staff'. Days before today come from the
+    rollup table; today and later (or everything, when filtering on a
+    non-rollup dimension) are aggregated from live bookings and merged in.
+    """
+    live, date_from, date_to = _base_qs(request)
+    today = local_today()
+    rollup = _rollup_qs(request, date_from, min(date_to, today - timedelta(days=1)))
+
+    sources = []
+    if rollup is not None:
+        live = live.filter(start_time__gte=local_day_start(today))
+        if group == 'day':
+            sources.append(rollup.values(key=F('date')).annotate(**_rollup_metrics()))
+        else:
+            sources.append(rollup.values('staff_id', 'staff__name').annotate(**_rollup_metrics()))
+    if rollup is None or date_to >= today:
+        if group == 'day':
+            sources.append(live.values(key=local_date()).annotate(**_live_metrics()))
+        else:
+            sources.append(live.values('staff_id', 'staff__name').annotate(**_live_metrics()))
+
+    merged = {}
+    for source in sources:
+        for r in source.order_by():
+            k = r['key'] if group == 'day' else r['staff_id']
+            row = merged.setdefault(k, {
+                'key': k, 'staff_name': r.get('staff__name'),
+                **{f: 0 for f in METRIC_FIELDS},
+            })
+            for f in METRIC_FIELDS:
+                row[f] += r[f'm_{f}'] or 0
+
+    return [row for _, row in sorted(merged.items()) if row['total'] > 0]
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_report
 def reports_overview(request):
     """GET /api/reports/overview/ — KPI summary + revenue time series + risk distribution + service breakdown"""
     qs, date_from, date_to = _base_qs(request)
-
-    total = qs.count()
-    completed = qs.filter(status__in=['completed', 'confirmed']).count()
-    no_shows = qs.filter(status='no_show').count()
-    cancelled = qs.filter(status='cancelled').count()
-    ns_rate = round(no_shows / total * 100, 1) if total > 0 else 0
-
-    revenue = float(qs.filter(status__in=['completed', 'confirmed']).aggregate(
-        t=Sum('service__price'))['t'] or 0)
-    revenue_at_risk = float(qs.filter(
-        risk_level__in=['HIGH', 'CRITICAL'],
-        status__in=['confirmed', 'pending']
-    ).aggregate(t=Sum('revenue_at_risk'))['t'] or 0)
-
-    deposits = float(qs.filter(payment_status='paid').aggregate(
-        t=Sum('payment_amount'))['t'] or 0)
-
-    # Average reliability + risk
-    client_ids = list(qs.values_list('client_id', flat=True).distinct())
-    clients = Client.objects.filter(id__in=client_ids)
-    avg_reliability = float(clients.aggregate(a=Avg('reliability_score'))['a'] or 0)
-    avg_risk = float(qs.exclude(risk_score__isnull=True).aggregate(a=Avg('risk_score'))['a'] or 0)
-
-    # Repeat client %
-    client_booking_counts = qs.values('client_id').annotate(cnt=Count('id'))
-    repeat_clients = client_booking_counts.filter(cnt__gte=2).count()
-    unique_clients = client_booking_counts.count()
-    repeat_pct = round(repeat_clients / unique_clients * 100, 1) if unique_clients > 0 else 0
-
-    # Revenue time series (daily)
-    rev_series = list(
-        qs.filter(status__in=['completed', 'confirmed'])
-        .annotate(day=TruncDate('start_time'))
-        .values('day')
-        .annotate(revenue=Sum('service__price'), count=Count('id'))
-        .order_by('day')
-    )
-    revenue_timeline = [{'date': r['day'].isoformat(), 'revenue': float(r['revenue'] or 0), 'count': r['count']} for r in rev_series]
-
-    # Revenue at risk time series
-    risk_series = list(
-        qs.filter(risk_level__in=['HIGH', 'CRITICAL'], status__in=['confirmed', 'pending'])
-        .annotate(day=TruncDate('start_time'))
-        .values('day')
-        .annotate(at_risk=Sum('revenue_at_risk'))
-        .order_by('day')
-    )
-    risk_timeline = [{'date': r['day'].isoformat(), 'at_risk': float(r['at_risk'] or 0)} for r in risk_series]
-
-    # Risk distribution
-    risk_dist = list(
-        qs.exclude(risk_level__isnull=True).exclude(risk_level='')
-        .values('risk_level')
-        .annotate(count=Count('id'), revenue=Sum('service__price'))
-        .order_by('risk_level')
-    )
-    risk_distribution = [{'level': r['risk_level'], 'count': r['count'], 'revenue': float(r['revenue'] or 0)} for r in risk_dist]
-
-    # Service breakdown
-    svc_breakdown = list(
-        qs.filter(status__in=['completed', 'confirmed'])
-        .values('service__id', 'service__name')
-        .annotate(
-            revenue=Sum('service__price'),
-            volume=Count('id'),
-            no_shows=Count('id', filter=Q(status='no_show')),
-            risk_exposure=Sum('revenue_at_risk'),
-        )
-        .order_by('-revenue')
-    )
-    service_breakdown = [{
-        'id': s['service__id'], 'name': s['service__name'],
-        'revenue': float(s['revenue'] or 0), 'volume': s['volume'],
-        'no_shows': s['no_shows'], 'risk_exposure': float(s['risk_exposure'] or 0),
-    } for s in svc_breakdown]
-
-    # Demand heatmap (hour x day_of_week)
-    heatmap_data = list(
-        qs.annotate(
-            hour=ExtractHour('start_time'),
-            dow=ExtractWeekDay('start_time'),
-        )
-        .values('hour', 'dow')
-        .annotate(count=Count('id'))
-        .order_by('dow', 'hour')
-    )
-    demand_heatmap = [{'hour': h['hour'], 'dow': h['dow'], 'count': h['count']} for h in heatmap_data]
-
-    return Response({
-        'kpi': {
-            'revenue': revenue,
-            'revenue_at_risk': revenue_at_risk,
-            'deposits': deposits,
-            'total_bookings': total,
-            'completed': completed,
-            'no_shows': no_shows,
-            'cancelled': cancelled,
-            'no_show_rate': ns_rate,
-            'avg_reliability': round(avg_reliability, 1),
-            'avg_risk_score': round(avg_risk, 1),
-            'repeat_client_pct': repeat_pct,
-            'unique_clients': unique_clients,
-        },
-        'revenue_timeline': revenue_timeline,
-        'risk_timeline': risk_timeline,
-        'risk_distribution': risk_distribution,
-        'service_breakdown': service_breakdown,
-        'demand_heatmap': demand_heatmap,
-    })
+    return Response(build_overview(qs))
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_report
 def reports_daily(request):
     """GET /api/reports/daily/ — Daily takings with no-show overlay"""
-    qs, date_from, date_to = _base_qs(request)
-
-    rows = list(
-        qs.annotate(day=TruncDate('start_time'))
-        .values('day')
-        .annotate(
-            revenue=Sum('service__price', filter=Q(status__in=['completed', 'confirmed'])),
-            deposits=Sum('payment_amount', filter=Q(payment_status='paid')),
-            at_risk=Sum('revenue_at_risk', filter=Q(risk_level__in=['HIGH', 'CRITICAL'])),
-            bookings=Count('id', filter=Q(status__in=['completed', 'confirmed'])),
-            no_shows=Count('id', filter=Q(status='no_show')),
-            cancelled=Count('id', filter=Q(status='cancelled')),
-            total=Count('id'),
-        )
-        .order_by('day')
-    )
+    rows = _grouped_metrics(request, 'day')
 
     return Response({
         'rows': [{
-            'date': r['day'].isoformat(),
-            'revenue': float(r['revenue'] or 0),
-            'deposits': float(r['deposits'] or 0),
-            'at_risk': float(r['at_risk'] or 0),
+            'date': r['key'].isoformat(),
+            'revenue': float(r['revenue']),
+            'deposits': float(r['deposits']),
+            'at_risk': float(r['at_risk']),
             'bookings': r['bookings'],
             'no_shows': r['no_shows'],
             'cancelled': r['cancelled'],
@@ -222,38 +212,43 @@ def reports_daily(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_report
 def reports_monthly(request):
     """GET /api/reports/monthly/ — Monthly aggregation with MoM growth"""
     qs, date_from, date_to = _base_qs(request)
 
-    rows = list(
-        qs.annotate(month=TruncMonth('start_time'))
-        .values('month')
-        .annotate(
-            revenue=Sum('service__price', filter=Q(status__in=['completed', 'confirmed'])),
-            deposits=Sum('payment_amount', filter=Q(payment_status='paid')),
-            at_risk=Sum('revenue_at_risk', filter=Q(risk_level__in=['HIGH', 'CRITICAL'])),
-            bookings=Count('id', filter=Q(status__in=['completed', 'confirmed'])),
-            no_shows=Count('id', filter=Q(status='no_show')),
-            total=Count('id'),
-            avg_reliability=Avg('client__reliability_score'),
-            avg_risk=Avg('risk_score'),
-        )
-        .order_by('month')
-    )
+    months = {}
+    for r in _grouped_metrics(request, 'day'):
+        month = r['key'].replace(day=1)
+        row = months.setdefault(month, {'month': month, **{f: 0 for f in METRIC_FIELDS}})
+        for f in METRIC_FIELDS:
+            row[f] += r[f]
+
+    # Client reliability is live state, so it's averaged over raw bookings
+    reliability = {
+        r['month']: r['avg']
+        for r in qs.annotate(month=TruncMonth('start_time', output_field=DateField(), tzinfo=report_tz())).values('month')
+        .annotate(avg=Avg('client__reliability_score')).order_by()
+    }
+
+    rows = []
+    for month, r in sorted(months.items()):
+        r['avg_reliability'] = reliability.get(month)
+        r['avg_risk'] = r['risk_sum'] / r['risk_count'] if r['risk_count'] else None
+        rows.append(r)
 
     result = []
     prev_rev = None
     for r in rows:
-        rev = float(r['revenue'] or 0)
+        rev = float(r['revenue'])
         growth = None
         if prev_rev is not None and prev_rev > 0:
             growth = round((rev - prev_rev) / prev_rev * 100, 1)
         result.append({
             'month': r['month'].strftime('%Y-%m'),
             'revenue': rev,
-            'deposits': float(r['deposits'] or 0),
-            'at_risk': float(r['at_risk'] or 0),
+            'deposits': float(r['deposits']),
+            'at_risk': float(r['at_risk']),
             'bookings': r['bookings'],
             'no_shows': r['no_shows'],
             'total': r['total'],
@@ -268,41 +263,36 @@ def reports_monthly(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_report
 def reports_staff(request):
     """GET /api/reports/staff/ — Per-staff performance"""
     qs, date_from, date_to = _base_qs(request)
 
-    rows = list(
-        qs.filter(staff__isnull=False)
-        .values('staff__id', 'staff__name')
-        .annotate(
-            revenue=Sum('service__price', filter=Q(status__in=['completed', 'confirmed'])),
-            bookings=Count('id', filter=Q(status__in=['completed', 'confirmed'])),
-            no_shows=Count('id', filter=Q(status='no_show')),
-            total=Count('id'),
-            avg_reliability=Avg('client__reliability_score'),
-            avg_risk=Avg('risk_score'),
-            at_risk=Sum('revenue_at_risk', filter=Q(risk_level__in=['HIGH', 'CRITICAL'])),
-        )
-        .order_by('-revenue')
-    )
+    rows = _grouped_metrics(request, 'staff')
+    rows.sort(key=lambda r: r['revenue'], reverse=True)
+
+    # Client reliability is live state, so it's averaged over raw bookings
+    reliability = {
+        r['staff_id']: r['avg']
+        for r in qs.values('staff_id').annotate(avg=Avg('client__reliability_score')).order_by()
+    }
 
     result = []
     for r in rows:
-        total = r['total'] or 0
-        ns = r['no_shows'] or 0
+        total = r['total']
+        ns = r['no_shows']
         ns_rate = round(ns / total * 100, 1) if total > 0 else 0
         result.append({
-            'staff_id': r['staff__id'],
-            'staff_name': r['staff__name'],
-            'revenue': float(r['revenue'] or 0),
+            'staff_id': r['key'],
+            'staff_name': r['staff_name'],
+            'revenue': float(r['revenue']),
             'bookings': r['bookings'],
             'no_shows': ns,
             'total': total,
             'no_show_rate': ns_rate,
-            'avg_reliability': round(float(r['avg_reliability'] or 0), 1),
-            'avg_risk': round(float(r['avg_risk'] or 0), 1),
-            'at_risk': float(r['at_risk'] or 0),
+            'avg_reliability': round(float(reliability.get(r['key']) or 0), 1),
+            'avg_risk': round(r['risk_sum'] / r['risk_count'], 1) if r['risk_count'] else 0,
+            'at_risk': float(r['at_risk']),
         })
 
     return Response({'rows': result})
@@ -310,146 +300,17 @@ def reports_staff(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_report
 def reports_insights(request):
-    """GET /api/reports/insights/ — AI-generated smart insights + recommended actions"""
-    now = timezone.now()
-    thirty_days_ago = now - timedelta(days=30)
-    ninety_days_ago = now - timedelta(days=90)
-
-    recent = Booking.objects.filter(start_time__gte=thirty_days_ago).select_related('client', 'service', 'staff')
-    insights = []
-    actions = []
-
-    # 1. Day-of-week performance analysis
-    dow_data = list(
-        recent.filter(status__in=['completed', 'confirmed'])
-        .annotate(dow=ExtractWeekDay('start_time'))
-        .values('dow')
-        .annotate(revenue=Sum('service__price'), count=Count('id'))
-        .order_by('dow')
-    )
-    if len(dow_data) >= 3:
-        avg_rev = sum(float(d['revenue'] or 0) for d in dow_data) / len(dow_data)
-        dow_names = {1: 'Sunday', 2: 'Monday', 3: 'Tuesday', 4: 'Wednesday', 5: 'Thursday', 6: 'Friday', 7: 'Saturday'}
-        for d in dow_data:
-            rev = float(d['revenue'] or 0)
-            if avg_rev > 0 and rev < avg_rev * 0.7:
-                pct = round((1 - rev / avg_rev) * 100)
-                day_name = dow_names.get(d['dow'], f"Day {d['dow']}")
-                insights.append({
-                    'type': 'warning',
-                    'message': f'{day_name}s underperform by {pct}% vs average',
-                    'metric': f'£{rev:.0f} vs £{avg_rev:.0f} avg',
-                })
-            elif avg_rev > 0 and rev > avg_rev * 1.3:
-                pct = round((rev / avg_rev - 1) * 100)
-                day_name = dow_names.get(d['dow'], f"Day {d['dow']}")
-                insights.append({
-                    'type': 'success',
-                    'message': f'{day_name}s outperform by {pct}%',
-                    'metric': f'£{rev:.0f} vs £{avg_rev:.0f} avg',
-                })
-
-    # 2. High risk client revenue exposure
-    high_risk = recent.filter(risk_level__in=['HIGH', 'CRITICAL'], status__in=['confirmed', 'pending'])
-    hr_revenue = float(high_risk.aggregate(t=Sum('revenue_at_risk'))['t'] or 0)
-    hr_count = high_risk.count()
-    if hr_count > 0:
-        insights.append({
-            'type': 'danger',
-            'message': f'{hr_count} high-risk clients contribute £{hr_revenue:.0f} at risk',
-            'metric': f'{hr_count} bookings',
-        })
-
-    # 3. Service no-show comparison
-    svc_ns = list(
-        recent.values('service__name')
-        .annotate(
-            total=Count('id'),
-            ns=Count('id', filter=Q(status='no_show')),
-        )
-        .filter(total__gte=3)
-        .order_by('-ns')
-    )
-    if len(svc_ns) >= 2:
-        avg_ns_rate = sum(s['ns'] for s in svc_ns) / sum(s['total'] for s in svc_ns) * 100 if sum(s['total'] for s in svc_ns) > 0 else 0
-        for s in svc_ns:
-            rate = s['ns'] / s['total'] * 100 if s['total'] > 0 else 0
-            if rate > avg_ns_rate * 1.5 and rate > 5:
-                insights.append({
-                    'type': 'warning',
-                    'message': f'{s["service__name"]} has {rate:.0f}% no-show rate ({s["ns"]}/{s["total"]})',
-                    'metric': f'{rate:.1f}% vs {avg_ns_rate:.1f}% avg',
-                })
-
-    # 4. Peak hour pricing opportunity
-    peak_data = list(
-        recent.filter(status__in=['completed', 'confirmed'])
-        .annotate(hour=ExtractHour('start_time'))
-        .values('hour')
-        .annotate(count=Count('id'))
-        .order_by('-count')
-    )
-    if peak_data:
-        top = peak_data[0]
-        avg_count = sum(p['count'] for p in peak_data) / len(peak_data)
-        if top['count'] > avg_count * 1.5:
-            pct = round((top['count'] / avg_count - 1) * 100)
-            insights.append({
-                'type': 'info',
-                'message': f'Peak demand at {top["hour"]:02d}:00 ({pct}% above average) — pricing increase opportunity',
-                'metric': f'{top["count"]} bookings vs {avg_count:.0f} avg',
-            })
-
-    # 5. Repeat client loyalty
-    repeat = recent.values('client_id').annotate(cnt=Count('id')).filter(cnt__gte=3)
-    if repeat.count() > 0:
-        insights.append({
-            'type': 'success',
-            'message': f'{repeat.count()} loyal clients with 3+ bookings this month',
-            'metric': 'Consider loyalty incentive',
-        })
-
-    # --- Recommended Actions ---
-    # Action 1: Services needing deposit increase
-    for svc in Service.objects.filter(active=True):
-        if svc.no_show_rate > 15 and svc.payment_type != 'full':
-            potential = float(svc.total_revenue) * 0.1 if svc.total_revenue else 0
-            actions.append({
-                'severity': 'high',
-                'action': f'Increase deposit for "{svc.name}" — {svc.no_show_rate:.0f}% no-show rate',
-                'impact': f'+£{potential:.0f} protected revenue',
-            })
-
-    # Action 2: Off-peak discount opportunities
-    for svc in Service.objects.filter(active=True, off_peak_utilisation_rate__lt=30, total_bookings__gt=0):
-        actions.append({
-            'severity': 'medium',
-            'action': f'Consider off-peak discount for "{svc.name}" — only {svc.off_peak_utilisation_rate:.0f}% off-peak utilisation',
-            'impact': 'Increase bookings in quiet periods',
-        })
-
-    # Action 3: Price increase candidates
-    for svc in Service.objects.filter(active=True, peak_utilisation_rate__gt=80):
-        increase = float(svc.price) * 0.1
-        actions.append({
-            'severity': 'medium',
-            'action': f'Price increase opportunity for "{svc.name}" — {svc.peak_utilisation_rate:.0f}% peak utilisation',
-            'impact': f'+£{increase:.0f} per booking potential',
-        })
-
-    # Action 4: Clients needing full payment
-    risky_clients = Client.objects.filter(consecutive_no_shows__gte=2)
-    for c in risky_clients[:3]:
-        actions.append({
-            'severity': 'high',
-            'action': f'Require full payment for {c.name} — {c.consecutive_no_shows} consecutive no-shows',
-            'impact': 'Reduce no-show risk',
-        })
-
+    """
+    GET /api/reports/insights/ — AI-generated smart insights + recommended actions
+    Served from the precomputed snapshot; ?refresh=1 rebuilds it first.
+    """
+    refresh = request.query_params.get('refresh', '').lower() in ('1', 'true')
+    snapshot = get_snapshot(INSIGHTS, refresh=refresh)
     return Response({
-        'insights': insights[:8],
-        'actions': actions[:6],
+        **snapshot.payload,
+        'computed_at': snapshot.computed_at.isoformat(),
     })
 
 
@@ -457,8 +318,8 @@ def reports_insights(request):
 # Staff Hours — Monthly per-staff hours summary (real-time)
 # ════════════════════════════════════════════════════════════════
 
-def _staff_hours_data(request):
-    """Build per-staff monthly hours data from TimesheetEntry records."""
+def _staff_hours_qs(request):
+    """Month window + filtered TimesheetEntry queryset for the staff hours reports."""
     now = timezone.now()
     # Default: current month
     month_str = request.query_params.get('month')  # YYYY-MM
@@ -481,7 +342,7 @@ def _staff_hours_data(request):
     qs = TimesheetEntry.objects.filter(
         date__gte=month_start,
         date__lte=month_end,
-    ).select_related('staff_member')
+    )
 
     # Exclude demo data
     include_demo = request.query_params.get('include_demo', '').lower() in ('1', 'true')
@@ -492,6 +353,14 @@ def _staff_hours_data(request):
     if staff_filter:
         qs = qs.filter(staff_member_id=staff_filter)
 
+    return month_start, month_end, qs
+
+
+def _staff_hours_data(request):
+    """Build per-staff monthly hours data from TimesheetEntry records."""
+    month_start, month_end, qs = _staff_hours_qs(request)
+    qs = qs.select_related('staff_member')
+
     # Build per-staff summary
     staff_map = {}
     for entry in qs:
@@ -556,6 +425,7 @@ def _staff_hours_data(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_report
 def reports_staff_hours(request):
     """GET /api/reports/staff-hours/ — Monthly per-staff hours summary"""
     data = _staff_hours_data(request)
@@ -569,69 +439,76 @@ def reports_staff_hours(request):
 @permission_classes([AllowAny])
 def reports_staff_hours_csv(request):
     """GET /api/reports/staff-hours/csv/ — Download monthly staff hours as CSV for payroll"""
-    data = _staff_hours_data(request)
-    month_label = data['month']
-
-    output = StringIO()
-    writer = csv.writer(output)
-
     # Summary mode (default) — one row per staff
     detail = request.query_params.get('detail', '').lower() in ('1', 'true')
 
     if detail:
-        # Detailed: one row per staff per day
-        writer.writerow([
-            'Month', 'Staff Name', 'Date', 'Scheduled Hours',
-            'Actual Hours', 'Break (min)', 'Overtime', 'Variance', 'Status',
-        ])
-        for staff_row in data['staff']:
-            for entry in staff_row['entries']:
-                sh = entry['scheduled_hours']
-                ah = entry['actual_hours']
+        # Detailed: one row per staff per day, streamed straight from the timesheet rows
+        month_start, _, qs = _staff_hours_qs(request)
+        month_label = month_start.strftime('%Y-%m')
+        fields = (
+            'staff_member__name', 'date', 'scheduled_start', 'scheduled_end',
+            'actual_start', 'actual_end', 'break_minutes', 'status',
+        )
+
+        def rows():
+            entries = qs.order_by('staff_member__name', 'staff_member_id', '-date')
+            for name, day, s_start, s_end, a_start, a_end, break_minutes, entry_status in iter_values(entries, fields):
+                s_hours = net_hours(s_start, s_end, break_minutes)
+                a_hours = net_hours(a_start, a_end, break_minutes)
+                sh = s_hours or 0
+                ah = a_hours or 0
                 ot = round(max(0, ah - sh), 2) if sh > 0 else 0
-                writer.writerow([
+                variance = round(a_hours - s_hours, 2) if s_hours is not None and a_hours is not None else 0
+                yield [
                     month_label,
-                    staff_row['staff_name'],
-                    entry['date'],
+                    name,
+                    day.isoformat(),
                     f"{sh:.2f}",
                     f"{ah:.2f}",
-                    entry['break_minutes'],
+                    break_minutes,
                     f"{ot:.2f}",
-                    f"{entry['variance']:.2f}",
-                    entry['status'],
-                ])
+                    f"{variance:.2f}",
+                    entry_status,
+                ]
+
+        header = [
+            'Month', 'Staff Name', 'Date', 'Scheduled Hours',
+            'Actual Hours', 'Break (min)', 'Overtime', 'Variance', 'Status',
+        ]
     else:
-        # Summary: one row per staff
-        writer.writerow([
+        # Summary: one row per staff, plus a totals row
+        data = _staff_hours_data(request)
+        month_label = data['month']
+
+        def rows():
+            for staff_row in data['staff']:
+                yield [
+                    month_label,
+                    staff_row['staff_name'],
+                    f"{staff_row['scheduled_hours']:.2f}",
+                    f"{staff_row['actual_hours']:.2f}",
+                    f"{staff_row['overtime_hours']:.2f}",
+                    f"{staff_row['variance_hours']:.2f}",
+                    staff_row['days_worked'],
+                    staff_row['days_absent'],
+                ]
+            yield []
+            yield [
+                '', 'TOTAL',
+                f"{data['totals']['scheduled_hours']:.2f}",
+                f"{data['totals']['actual_hours']:.2f}",
+                f"{data['totals']['overtime_hours']:.2f}",
+                f"{data['totals']['variance_hours']:.2f}",
+                '', '',
+            ]
+
+        header = [
             'Month', 'Staff Name', 'Scheduled Hours', 'Actual Hours',
             'Overtime Hours', 'Variance Hours', 'Days Worked', 'Days Absent',
-        ])
-        for staff_row in data['staff']:
-            writer.writerow([
-                month_label,
-                staff_row['staff_name'],
-                f"{staff_row['scheduled_hours']:.2f}",
-                f"{staff_row['actual_hours']:.2f}",
-                f"{staff_row['overtime_hours']:.2f}",
-                f"{staff_row['variance_hours']:.2f}",
-                staff_row['days_worked'],
-                staff_row['days_absent'],
-            ])
-
-        # Totals row
-        writer.writerow([])
-        writer.writerow([
-            '', 'TOTAL',
-            f"{data['totals']['scheduled_hours']:.2f}",
-            f"{data['totals']['actual_hours']:.2f}",
-            f"{data['totals']['overtime_hours']:.2f}",
-            f"{data['totals']['variance_hours']:.2f}",
-            '', '',
-        ])
-
-    response = HttpResponse(output.getvalue(), content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="staff-hours-{month_label}.csv"'
-    return response
+        ]
+
+    return stream_csv(f'staff-hours-{month_label}.csv', header, rows())
 
 
 # ════════════════════════════════════════════════════════════════
@@ -640,6 +517,7 @@ def reports_staff_hours_csv(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cached_report
 def reports_leave(request):
     """GET /api/reports/leave/ — Monthly leave summary with per-staff breakdown"""
     from .models_availability import LeaveRequest
@@ -701,3 +579,19 @@ def reports_leave(request):
             'staff_count': len(staff_rows),
         },
     })
+
+
+# ════════════════════════════════════════════════════════════════
+# Report Cache — hit ratio + explicit invalidation
+# ════════════════════════════════════════════════════════════════
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([AllowAny])
+def reports_cache(request):
+    """GET /api/reports/cache/ — cache hit ratio; DELETE (managers only) invalidates every cached report"""
+    if request.method == 'DELETE':
+        if not request.user.is_staff:
+            return Response({'error': 'Only managers can clear the report cache'}, status=status.HTTP_403_FORBIDDEN)
+        invalidate_reports()
+        return Response({'invalidated': True, 'generation': report_generation()})
+    return Response(cache_stats())
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CommsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "comms"
+
+    def ready(self):
+        import comms.signals  # noqa: F401
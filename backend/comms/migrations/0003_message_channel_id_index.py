@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comms', '0002_attachment_derivatives'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['channel', 'id'], name='message_channel_id_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
 
+from core.thumbnails import DERIVATIVE_STATUS_CHOICES
+
 
 class Channel(models.Model):
     CHANNEL_TYPES = [
@@ -43,6 +45,10 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # New-message reads: a channel's messages past a since_id cursor
+            models.Index(fields=['channel', 'id'], name='message_channel_id_idx'),
+        ]
 
     def __str__(self):
         return f'{self.sender} in {self.channel}: {self.body[:40]}'
@@ -54,10 +60,18 @@ class MessageAttachment(models.Model):
     filename = models.CharField(max_length=255)
     content_type = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # WebP derivatives of image attachments, rendered in the background (core.thumbnails)
+    thumbnail = models.ImageField(max_length=255, null=True, blank=True, editable=False)
+    preview = models.ImageField(max_length=255, null=True, blank=True, editable=False)
+    derivatives_status = models.CharField(
+        max_length=12, choices=DERIVATIVE_STATUS_CHOICES, default='pending', db_index=True, editable=False,
+    )
+    derivatives_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.filename
 
     @property
     def url(self):
-        return self.file.url if self.file else ''
+        from core.file_serving import protected_file_url
+        return protected_file_url('attachment', self.pk) if self.file else ''
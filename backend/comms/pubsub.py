@@ -0,0 +1,159 @@
+"""
+Comms Pub/Sub — waking message streams when a channel gets a new message
+The database stays the source of truth: a notification only says "channel N
+has something new", and a woken stream reads the messages past its cursor
+itself. A missed notification therefore costs latency, never a message, and
+waiting streams re-check the database every COMMS_STREAM_POLL_SECONDS anyway.
+
+- LocalBroker wakes streams served by this process. Enough for a single
+  server process.
+- RedisBroker, used when COMMS_PUBSUB_URL (default: REDIS_URL) is set, also
+  relays notifications through Redis pub/sub so every worker and instance
+  hears about messages posted on any other. If Redis is unreachable it
+  degrades to local delivery.
+
+Publishers call notify_channel() once the message and its attachments are
+committed. Streams hold a subscription from before their first read, so a
+message committed between reading and waiting still wakes them.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+REDIS_CHANNEL = 'comms:messages'
+
+
+class Subscription:
+    """Wake-ups for one channel, delivered to the event loop that subscribed."""
+
+    def __init__(self, broker, channel_id):
+        self.broker = broker
+        self.channel_id = channel_id
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    def notify(self):
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            pass  # the subscriber's loop has closed
+
+    async def wait(self, timeout):
+        """True when notified within `timeout` seconds (since the last wait)."""
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.event.clear()
+        return True
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LocalBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, channel_id):
+        """A Subscription for `channel_id`; must be called from a running event loop."""
+        subscription = Subscription(self, channel_id)
+        with self._lock:
+            self._subscriptions[channel_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel_id)
+            if subscriptions:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel_id]
+
+    def deliver(self, channel_id):
+        """Wake this process's subscribers to `channel_id`."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel_id, ()))
+        for subscription in subscriptions:
+            subscription.notify()
+
+    def publish(self, channel_id):
+        self.deliver(channel_id)
+
+
+class RedisBroker(LocalBroker):
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+        self._client = None
+        self._listener = None
+
+    def _redis(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url, socket_connect_timeout=2)
+        return self._client
+
+    def subscribe(self, channel_id):
+        self._start_listener()
+        return super().subscribe(channel_id)
+
+    def publish(self, channel_id):
+        try:
+            self._redis().publish(REDIS_CHANNEL, str(channel_id))
+        except Exception:
+            logger.warning('[COMMS] Redis publish failed; delivering locally only', exc_info=True)
+            self.deliver(channel_id)
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(target=self._listen, name='comms-pubsub', daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        """Relay Redis notifications to local subscribers, reconnecting after errors."""
+        import time
+        while True:
+            try:
+                pubsub = self._redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(REDIS_CHANNEL)
+                for item in pubsub.listen():
+                    try:
+                        self.deliver(int(item['data']))
+                    except (TypeError, ValueError):
+                        continue
+            except Exception:
+                logger.warning('[COMMS] Redis subscription lost; retrying', exc_info=True)
+                time.sleep(5)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            url = getattr(settings, 'COMMS_PUBSUB_URL', '')
+            _broker = RedisBroker(url) if url else LocalBroker()
+        return _broker
+
+
+def notify_channel(channel_id):
+    """Tell waiting streams about a new message in `channel_id` once the transaction commits."""
+    transaction.on_commit(lambda: get_broker().publish(channel_id))
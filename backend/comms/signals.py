@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender='comms.MessageAttachment')
+def render_attachment_derivatives(sender, instance, created, **kwargs):
+    from core.thumbnails import schedule_derivatives
+    if created:
+        schedule_derivatives('attachment', instance.pk)
+
+
+@receiver(post_delete, sender='comms.MessageAttachment')
+def delete_attachment_derivatives(sender, instance, **kwargs):
+    from core.thumbnails import delete_derivatives
+    delete_derivatives(instance)
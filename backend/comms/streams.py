@@ -0,0 +1,127 @@
+"""
+Comms Streams — push delivery of new channel messages
+Async views, served without holding a worker thread while they wait when the
+app runs under ASGI (start.sh):
+
+- Long-poll: GET channels/<id>/messages/poll/?since_id=&timeout= answers as
+  soon as the channel has messages past since_id, or with [] after `timeout`
+  seconds. The client calls again with the id of the last message it holds.
+- Server-Sent Events: GET channels/<id>/stream/?since_id= sends each new
+  message as an event whose id is the message id, so a reconnecting
+  EventSource resumes from Last-Event-ID. The stream closes after
+  STREAM_DURATION seconds and the browser reconnects.
+
+Without since_id both start from the channel's latest message, so only new
+messages are delivered. Requests authenticate like the rest of the API: a
+session, or a JWT bearer token.
+"""
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .models import Channel, Message
+from .pubsub import get_broker
+from .views import messages_after
+
+POLL_TIMEOUT = 25
+MAX_POLL_TIMEOUT = 55
+STREAM_DURATION = 300
+KEEPALIVE_SECONDS = 15
+RECONNECT_MS = 3000
+
+
+async def _authenticate(request):
+    user = await request.auser()
+    if user.is_authenticated:
+        return user
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+async def _check_request(request, channel_id):
+    """An error response when the request may not read the channel, else None."""
+    if await _authenticate(request) is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided.'}, status=401)
+    if not await Channel.objects.filter(id=channel_id).aexists():
+        return JsonResponse({'error': 'Channel not found'}, status=404)
+    return None
+
+
+async def _latest_id(channel_id):
+    latest = await Message.objects.filter(channel_id=channel_id).order_by('-id').values_list('id', flat=True).afirst()
+    return latest or 0
+
+
+async def _next_messages(subscription, channel_id, since_id, timeout):
+    """Messages past `since_id`, waiting up to `timeout` seconds for the first to arrive."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        messages = await sync_to_async(messages_after)(channel_id, since_id)
+        remaining = deadline - loop.time()
+        if messages or remaining <= 0:
+            return messages
+        # A notification ends the wait early; the periodic re-check covers any that went astray
+        await subscription.wait(min(remaining, settings.COMMS_STREAM_POLL_SECONDS))
+
+
+@require_GET
+async def poll_messages(request, channel_id):
+    """GET /api/comms/channels/<id>/messages/poll/ — wait for messages after ?since_id= (long-poll)."""
+    error = await _check_request(request, channel_id)
+    if error:
+        return error
+    try:
+        since_id = int(request.GET['since_id']) if 'since_id' in request.GET else None
+        timeout = min(MAX_POLL_TIMEOUT, max(0.0, float(request.GET.get('timeout', POLL_TIMEOUT))))
+    except ValueError:
+        return JsonResponse({'error': 'since_id and timeout must be numbers'}, status=400)
+
+    # Subscribed before the first read, so a message committed in between still wakes us
+    with get_broker().subscribe(channel_id) as subscription:
+        if since_id is None:
+            since_id = await _latest_id(channel_id)
+        messages = await _next_messages(subscription, channel_id, since_id, timeout)
+    return JsonResponse(messages, safe=False)
+
+
+async def _event_stream(channel_id, since_id):
+    loop = asyncio.get_running_loop()
+    with get_broker().subscribe(channel_id) as subscription:
+        if since_id is None:
+            since_id = await _latest_id(channel_id)
+        yield f'retry: {RECONNECT_MS}\n\n'
+        end = loop.time() + STREAM_DURATION
+        while loop.time() < end:
+            messages = await _next_messages(subscription, channel_id, since_id, KEEPALIVE_SECONDS)
+            if not messages:
+                yield ': keepalive\n\n'
+            for message in messages:
+                since_id = message['id']
+                yield f'id: {since_id}\nevent: message\ndata: {json.dumps(message)}\n\n'
+
+
+@require_GET
+async def stream_messages(request, channel_id):
+    """GET /api/comms/channels/<id>/stream/ — new messages as Server-Sent Events."""
+    error = await _check_request(request, channel_id)
+    if error:
+        return error
+    try:
+        since_id = request.headers.get('Last-Event-ID') or request.GET.get('since_id')
+        since_id = int(since_id) if since_id else None
+    except ValueError:
+        return JsonResponse({'error': 'since_id must be a whole number'}, status=400)
+
+    response = StreamingHttpResponse(_event_stream(channel_id, since_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
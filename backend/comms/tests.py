@@ -1,3 +1,83 @@
-from django.test import TestCase
+"""
+Comms — Unit Tests
+New messages pushed to long-poll and Server-Sent Events streams: woken by a
+pub/sub notification on commit, catching up from a since_id cursor, and
+timing out empty.
+"""
+import asyncio
+import json
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from . import streams
+from .models import Channel, Message
+from .pubsub import get_broker
+
+User = get_user_model()
+
+
+@override_settings(COMMS_STREAM_POLL_SECONDS=30)
+class MessageDeliveryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('mo', password='x')
+        self.channel = Channel.objects.create(name='General')
+        self.first = Message.objects.create(channel=self.channel, sender=self.user, body='Morning')
+        self.poll_url = f'/api/comms/channels/{self.channel.pk}/messages/poll/'
+        self.auth = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    def test_since_id_catch_up(self):
+        second = Message.objects.create(channel=self.channel, sender=self.user, body='Hello')
+        api = APIClient()
+        api.force_authenticate(self.user)
+        data = api.get(f'/api/comms/channels/{self.channel.pk}/messages/', {'since_id': self.first.pk}).json()
+        self.assertEqual([m['id'] for m in data], [second.pk])
+        self.assertEqual(api.get(f'/api/comms/channels/{self.channel.pk}/messages/', {'since_id': 'x'}).status_code, 400)
+
+    def test_send_publishes_on_commit(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        with mock.patch.object(get_broker(), 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = api.post(f'/api/comms/channels/{self.channel.pk}/messages/create/', {'body': 'Hi'})
+        self.assertEqual(resp.status_code, 201)
+        publish.assert_called_once_with(self.channel.pk)
+
+    async def test_long_poll_woken_by_notification(self):
+        poll = asyncio.create_task(self.async_client.get(self.poll_url, {'timeout': 20}, headers=self.auth))
+        await asyncio.sleep(0.2)
+        self.assertFalse(poll.done())
+
+        message = await Message.objects.acreate(channel=self.channel, sender=self.user, body='New rota is up')
+        get_broker().publish(self.channel.pk)
+        resp = await asyncio.wait_for(poll, 5)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([m['body'] for m in resp.json()], ['New rota is up'])
+
+        # Messages already past the cursor come straight back
+        resp = await self.async_client.get(self.poll_url, {'since_id': self.first.pk}, headers=self.auth)
+        self.assertEqual([m['id'] for m in resp.json()], [message.pk])
+
+    async def test_long_poll_timeout_and_auth(self):
+        resp = await self.async_client.get(self.poll_url, {'timeout': 0.1}, headers=self.auth)
+        self.assertEqual((resp.status_code, resp.json()), (200, []))
+        self.assertEqual((await self.async_client.get(self.poll_url)).status_code, 401)
+        resp = await self.async_client.get('/api/comms/channels/999/messages/poll/', headers=self.auth)
+        self.assertEqual(resp.status_code, 404)
+
+    async def test_event_stream(self):
+        second = await Message.objects.acreate(channel=self.channel, sender=self.user, body='Hello')
+        with mock.patch.object(streams, 'STREAM_DURATION', 0.5), mock.patch.object(streams, 'KEEPALIVE_SECONDS', 0.1):
+            resp = await self.async_client.get(
+                f'/api/comms/channels/{self.channel.pk}/stream/',
+                headers={**self.auth, 'Last-Event-ID': str(self.first.pk)},
+            )
+            self.assertEqual(resp['Content-Type'], 'text/event-stream')
+            body = ''.join([chunk.decode() async for chunk in resp.streaming_content])
+        events = [block for block in body.split('\n\n') if block.startswith('id:')]
+        self.assertEqual(len(events), 1)
+        self.assertIn(f'id: {second.pk}\nevent: message\n', events[0])
+        self.assertEqual(json.loads(events[0].split('data: ', 1)[1])['body'], 'Hello')
+        self.assertIn(': keepalive', body)
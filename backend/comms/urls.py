@@ -1,9 +1,11 @@
 from django.urls import path
-from . import views
+from . import streams, views
 
 urlpatterns = [
     path('channels/', views.list_channels, name='comms-channels'),
     path('channels/<int:channel_id>/messages/', views.list_messages, name='comms-messages'),
     path('channels/<int:channel_id>/messages/create/', views.create_message, name='comms-message-create'),
+    path('channels/<int:channel_id>/messages/poll/', streams.poll_messages, name='comms-messages-poll'),
+    path('channels/<int:channel_id>/stream/', streams.stream_messages, name='comms-stream'),
     path('ensure-general/', views.ensure_general_channel, name='comms-ensure-general'),
 ]
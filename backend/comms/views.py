@@ -3,7 +3,11 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.response import Response
 from rest_framework import status
+from core.file_serving import derivative_urls
 from .models import Channel, ChannelMember, Message, MessageAttachment
+from .pubsub import notify_channel
+
+MAX_MESSAGE_BATCH = 200
 
 
 def _serialize_channel(ch):
@@ -29,6 +33,7 @@ def _serialize_message(msg):
                 'filename': att.filename,
                 'content_type': att.content_type,
                 'url': att.url,
+                **derivative_urls('attachment', att),
             }
             for att in msg.attachments.all()
         ],
@@ -36,6 +41,15 @@ def _serialize_message(msg):
     }
 
 
+def messages_after(channel_id, since_id, limit=MAX_MESSAGE_BATCH):
+    """Serialized messages of a channel with an id past `since_id`, oldest first."""
+    msgs = (
+        Message.objects.filter(channel_id=channel_id, id__gt=since_id)
+        .select_related('sender').prefetch_related('attachments').order_by('id')[:limit]
+    )
+    return [_serialize_message(m) for m in msgs]
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def list_channels(request):
@@ -51,13 +65,23 @@ def list_channels(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def list_messages(request, channel_id):
-    """GET /api/comms/channels/<id>/messages/ — list messages in a channel."""
+    """
+    GET /api/comms/channels/<id>/messages/ — list the latest messages in a channel.
+    With ?since_id= only the messages after that one, oldest first.
+    """
     try:
         channel = Channel.objects.get(id=channel_id)
     except Channel.DoesNotExist:
         return Response({'error': 'Channel not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    limit = int(request.query_params.get('limit', 100))
+    try:
+        limit = min(MAX_MESSAGE_BATCH, max(1, int(request.query_params.get('limit', 100))))
+        since_id = request.query_params.get('since_id')
+        if since_id is not None:
+            return Response(messages_after(channel.id, int(since_id), limit))
+    except ValueError:
+        return Response({'error': 'limit and since_id must be whole numbers'}, status=status.HTTP_400_BAD_REQUEST)
+
     msgs = channel.messages.select_related('sender').prefetch_related('attachments').order_by('-created_at')[:limit]
     return Response([_serialize_message(m) for m in reversed(msgs)])
 
@@ -87,6 +111,7 @@ def create_message(request, channel_id):
             filename=f.name,
             content_type=f.content_type or '',
         )
+    notify_channel(channel.id)
 
     return Response(_serialize_message(msg), status=status.HTTP_201_CREATED)
 
@@ -2,8 +2,9 @@ from django.contrib import admin
 from .models import (
     IncidentReport, IncidentPhoto, SignOff, RAMSDocument,
     RiskAssessment, HazardFinding, Equipment, EquipmentInspection, ComplianceCategory,
-    ComplianceItem, PeaceOfMindScore, ScoreAuditLog,
+    ComplianceItem, PeaceOfMindScore, ScoreAuditLog, ScoreDailySummary,
 )
+from .scoring import suspend_scoring
 
 
 # --- Inlines ---
@@ -44,7 +45,7 @@ class IncidentReportAdmin(admin.ModelAdmin):
 
 @admin.register(IncidentPhoto)
 class IncidentPhotoAdmin(admin.ModelAdmin):
-    list_display = ['incident', 'caption', 'uploaded_at']
+    list_display = ['incident', 'caption', 'derivatives_status', 'uploaded_at']
 
 
 @admin.register(SignOff)
@@ -146,26 +147,28 @@ class ComplianceItemAdmin(admin.ModelAdmin):
 
     def mark_compliant(self, request, queryset):
         from django.utils import timezone
-        queryset.update(status='COMPLIANT', completed_at=timezone.now())
-        from .models import PeaceOfMindScore
-        PeaceOfMindScore.recalculate()
+        with suspend_scoring():
+            queryset.update(status='COMPLIANT', completed_at=timezone.now())
         self.message_user(request, f'{queryset.count()} item(s) marked compliant. Score recalculated.')
     mark_compliant.short_description = 'Mark selected as Compliant'
 
     def mark_due_soon(self, request, queryset):
-        queryset.update(status='DUE_SOON')
-        from .models import PeaceOfMindScore
-        PeaceOfMindScore.recalculate()
+        with suspend_scoring():
+            queryset.update(status='DUE_SOON')
         self.message_user(request, f'{queryset.count()} item(s) marked due soon. Score recalculated.')
     mark_due_soon.short_description = 'Mark selected as Due Soon'
 
     def mark_overdue(self, request, queryset):
-        queryset.update(status='OVERDUE')
-        from .models import PeaceOfMindScore
-        PeaceOfMindScore.recalculate()
+        with suspend_scoring():
+            queryset.update(status='OVERDUE')
         self.message_user(request, f'{queryset.count()} item(s) marked overdue. Score recalculated.')
     mark_overdue.short_description = 'Mark selected as Overdue'
 
+    def delete_queryset(self, request, queryset):
+        # "Delete selected": one recalculation instead of one per item
+        with suspend_scoring():
+            super().delete_queryset(request, queryset)
+
 
 @admin.register(PeaceOfMindScore)
 class PeaceOfMindScoreAdmin(admin.ModelAdmin):
@@ -203,6 +206,18 @@ class ScoreAuditLogAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(ScoreDailySummary)
+class ScoreDailySummaryAdmin(admin.ModelAdmin):
+    list_display = ['date', 'last_score', 'min_score', 'max_score', 'open_score', 'samples', 'last_trigger']
+    date_hierarchy = 'date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 # --- RAMS ---
 
 @admin.register(RAMSDocument)
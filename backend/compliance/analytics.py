@@ -0,0 +1,194 @@
+"""
+Compliance Analytics — the register summarised in one pass
+The compliance register is loaded once with values() (plus one query for the
+categories). Time horizons, priority scores, the priority action list, the
+per-category breakdown and the dashboard summary counts are all derived from
+that single pass. Each item is serialised once.
+
+The result is shared by the breakdown, priorities and dashboard-v2 endpoints
+through a short-lived cache entry keyed on PeaceOfMindScore.last_calculated_at.
+Every scored change moves that timestamp, so a new key is used as soon as the
+register changes. COMPLIANCE_ANALYTICS_TTL (seconds, 0 disables) bounds how
+long edits that do not affect the score, such as a title change, can take to
+show.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.file_serving import protected_file_url
+
+ITEM_FIELDS = (
+    'id', 'title', 'description', 'category_id', 'category__name', 'item_type', 'status',
+    'frequency_type', 'due_date', 'next_due_date', 'last_completed_date', 'completed_at',
+    'completed_by', 'regulatory_ref', 'legal_reference', 'evidence_required', 'document',
+    'notes', 'created_at',
+)
+
+# (days ahead, bucket) — an item lands in the first bucket its due date fits
+HORIZONS = ((7, 'next_7'), (30, 'next_30'), (90, 'next_90'))
+
+PRIORITY_ACTION_FIELDS = (
+    'id', 'title', 'category', 'item_type', 'status', 'due_date', 'next_due_date',
+    'regulatory_ref', 'legal_reference', 'frequency_type', 'evidence_required', 'weight',
+)
+PRIORITY_ACTIONS_LIMIT = 10
+
+
+def analytics_ttl():
+    return getattr(settings, 'COMPLIANCE_ANALYTICS_TTL', 60)
+
+
+def _iso(val):
+    return val.isoformat() if val is not None else None
+
+
+def serialize_row(row):
+    """The item dict of the compliance API (see views._serialize_item), from a values() row."""
+    from .models import ComplianceItem
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'description': row['description'],
+        'category': row['category__name'],
+        'category_id': row['category_id'],
+        'item_type': row['item_type'],
+        'status': row['status'],
+        'frequency_type': row['frequency_type'],
+        'due_date': _iso(row['due_date']),
+        'next_due_date': _iso(row['next_due_date']),
+        'last_completed_date': _iso(row['last_completed_date']),
+        'completed_at': _iso(row['completed_at']),
+        'completed_by': row['completed_by'],
+        'regulatory_ref': row['regulatory_ref'],
+        'legal_reference': row['legal_reference'],
+        'evidence_required': row['evidence_required'],
+        'document': protected_file_url('evidence', row['id']) if row['document'] else None,
+        'notes': row['notes'],
+        'weight': ComplianceItem.weights_for(row['item_type'], row['status'])[0],
+        'created_at': row['created_at'].isoformat(),
+    }
+
+
+def _priority(row, today):
+    """(priority score, level) of an item on the dashboard, or None if it needs no attention."""
+    due = row['next_due_date']
+    legal = row['item_type'] == 'LEGAL'
+    score = 0
+    if legal and row['status'] == 'OVERDUE':
+        score = 50
+    elif legal and due and due <= today + timedelta(days=14):
+        score = 30
+    elif not legal and row['status'] == 'OVERDUE':
+        score = 20
+    elif not legal and due and due <= today + timedelta(days=30):
+        score = 10
+    if score == 0 and row['status'] == 'COMPLIANT':
+        return None
+    return score, 'high' if score >= 30 else ('medium' if score >= 10 else 'low')
+
+
+def build_analytics(today=None):
+    """Everything the compliance dashboards show about the register, from one item query."""
+    from .models import ComplianceCategory, ComplianceItem
+    today = today or timezone.now().date()
+
+    horizon = {'overdue': [], 'next_7': [], 'next_30': [], 'next_90': []}
+    priority_items = []
+    open_items = []
+    # (category_id, item_type) → counts and weights
+    groups = defaultdict(lambda: {'total': 0, 'COMPLIANT': 0, 'DUE_SOON': 0, 'OVERDUE': 0, 'weight': 0, 'achieved': 0})
+    overdue_legal = legal_due_14 = 0
+
+    for row in ComplianceItem.objects.values(*ITEM_FIELDS):
+        item = serialize_row(row)
+        status, due = row['status'], row['next_due_date']
+
+        if due:
+            if due < today:
+                horizon['overdue'].append(item)
+            else:
+                for days, bucket in HORIZONS:
+                    if due <= today + timedelta(days=days):
+                        horizon[bucket].append(item)
+                        break
+
+        priority = _priority(row, today)
+        if priority:
+            priority_items.append({**item, 'priority_score': priority[0], 'priority_level': priority[1]})
+        if status != 'COMPLIANT':
+            open_items.append(item)
+
+        weight, achieved = ComplianceItem.weights_for(row['item_type'], status)
+        group = groups[(row['category_id'], row['item_type'])]
+        group['total'] += 1
+        group[status if status in ('COMPLIANT', 'DUE_SOON') else 'OVERDUE'] += 1
+        group['weight'] += weight
+        group['achieved'] += achieved
+
+        if row['item_type'] == 'LEGAL':
+            if status == 'OVERDUE':
+                overdue_legal += 1
+            elif status == 'DUE_SOON' and due and due <= today + timedelta(days=14):
+                legal_due_14 += 1
+
+    priority_items.sort(key=lambda x: -x['priority_score'])
+    # Overdue before due soon, legal before best practice, then earliest due
+    open_items.sort(key=lambda x: (
+        x['status'] != 'OVERDUE', x['item_type'] != 'LEGAL', x['due_date'] is None, x['due_date'] or '',
+    ))
+
+    categories = [
+        {**cat, 'by_type': {t: groups[(cat['id'], t)] for t in ('LEGAL', 'BEST_PRACTICE') if (cat['id'], t) in groups}}
+        for cat in ComplianceCategory.objects.values('id', 'name', 'max_score', 'current_score')
+    ]
+
+    return {
+        'horizon': horizon,
+        'priority_items': priority_items,
+        'priority_actions': [
+            {f: item[f] for f in PRIORITY_ACTION_FIELDS} for item in open_items[:PRIORITY_ACTIONS_LIMIT]
+        ],
+        'categories': categories,
+        'overdue_legal': overdue_legal,
+        'legal_due_14': legal_due_14,
+    }
+
+
+def get_analytics(score):
+    """build_analytics() for the current register, cached against `score` (a PeaceOfMindScore)."""
+    ttl = analytics_ttl()
+    today = timezone.now().date()
+    if ttl <= 0:
+        return build_analytics(today)
+    key = f'compliance:analytics:{score.last_calculated_at.isoformat()}:{today.isoformat()}'
+    data = cache.get(key)
+    if data is None:
+        data = build_analytics(today)
+        cache.set(key, data, ttl)
+    return data
+
+
+def category_breakdown(analytics, item_type=None):
+    """Per-category counts and score for the breakdown endpoint, optionally for one item type."""
+    result = []
+    for cat in analytics['categories']:
+        groups = [g for t, g in cat['by_type'].items() if not item_type or t == item_type]
+        total = sum(g['total'] for g in groups)
+        if total == 0:
+            continue
+        weight = sum(g['weight'] for g in groups)
+        achieved = sum(g['achieved'] for g in groups)
+        result.append({
+            'category': cat['name'],
+            'total_items': total,
+            'compliant': sum(g['COMPLIANT'] for g in groups),
+            'due_soon': sum(g['DUE_SOON'] for g in groups),
+            'overdue': sum(g['OVERDUE'] for g in groups),
+            'score_pct': round((achieved / weight) * 100) if weight > 0 else 100,
+            'max_score': cat['max_score'],
+            'current_score': cat['current_score'],
+        })
+    return result
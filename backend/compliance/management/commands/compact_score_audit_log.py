@@ -0,0 +1,56 @@
+"""
+Management command: compact_score_audit_log
+Keeps Peace of Mind Score audit rows at full resolution for the last few
+days; older rows are deleted once their day is captured in ScoreDailySummary.
+
+Usage:
+    python manage.py compact_score_audit_log                 # Run once
+    python manage.py compact_score_audit_log --keep-days 14  # Longer raw retention
+    python manage.py compact_score_audit_log --loop          # Run continuously (for Railway)
+"""
+import time
+import logging
+from django.core.management.base import BaseCommand
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Summarise and prune old Peace of Mind Score audit log rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-days', type=int, default=None, help='Days of raw rows to keep (default: 7)')
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Run continuously in a loop (for Railway background worker)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=1440,
+            help='Interval in minutes between runs (default: 1440)',
+        )
+
+    def handle(self, *args, **options):
+        from compliance.score_history import AUDIT_LOG_KEEP_DAYS, compact_audit_log
+
+        keep_days = options['keep_days'] or AUDIT_LOG_KEEP_DAYS
+
+        if options['loop']:
+            interval = options['interval']
+            self.stdout.write(self.style.SUCCESS(
+                f'[COMPLIANCE] Starting audit log compaction loop (every {interval} minutes)'
+            ))
+            while True:
+                try:
+                    compact_audit_log(keep_days)
+                except Exception as e:
+                    self.stderr.write(self.style.ERROR(f'[COMPLIANCE] Error: {e}'))
+                    logger.exception('[COMPLIANCE] Unhandled error in audit log compaction loop')
+                time.sleep(interval * 60)
+        else:
+            result = compact_audit_log(keep_days)
+            self.stdout.write(self.style.SUCCESS(
+                f"Audit log compacted — {result['deleted']} rows deleted, {result['backfilled']} days summarised"
+            ))
@@ -1,10 +1,11 @@
 """
 Seed UK baseline compliance items with legal references.
 """
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from datetime import timedelta
 from compliance.models import ComplianceCategory, ComplianceItem
+from compliance.scoring import suspend_scoring
 
 
 UK_BASELINE = [
@@ -205,12 +206,22 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write('Seeding UK compliance baseline...')
 
-        # Disconnect signal to avoid recalculate during bulk creation
-        from django.db.models.signals import post_save, post_delete
-        from compliance.signals import recalculate_score_on_save, recalculate_score_on_delete
-        post_save.disconnect(recalculate_score_on_save)
-        post_delete.disconnect(recalculate_score_on_delete)
+        # One score recalculation at the end instead of one per item; only a
+        # failure of that recalculation is tolerated, seeding errors fail the command
+        seeded = False
+        try:
+            with suspend_scoring():
+                created_count = self._seed()
+                seeded = True
+                self.stdout.write(self.style.SUCCESS(f'\nSeeded {created_count} compliance items.'))
+        except Exception as e:
+            if not seeded:
+                raise CommandError(f'Seeding compliance baseline failed: {e}') from e
+            self.stderr.write(f'Score recalculation error: {e}')
+            return
+        self.stdout.write(self.style.SUCCESS('Peace of Mind Score recalculated.'))
 
+    def _seed(self):
         today = timezone.now().date()
         created_count = 0
 
@@ -249,16 +260,4 @@ class Command(BaseCommand):
             except Exception as e:
                 self.stderr.write(f'  ERROR with category {cat_data["category"]}: {e}')
 
-        # Reconnect signals
-        post_save.connect(recalculate_score_on_save)
-        post_delete.connect(recalculate_score_on_delete)
-
-        self.stdout.write(self.style.SUCCESS(f'\nSeeded {created_count} compliance items.'))
-
-        # Recalculate score
-        try:
-            from compliance.models import PeaceOfMindScore
-            PeaceOfMindScore.recalculate()
-            self.stdout.write(self.style.SUCCESS('Peace of Mind Score recalculated.'))
-        except Exception as e:
-            self.stderr.write(f'Score recalculation error: {e}')
+        return created_count
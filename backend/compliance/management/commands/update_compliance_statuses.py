@@ -0,0 +1,52 @@
+"""
+Management command: update_compliance_statuses
+Moves compliance items to DUE_SOON / OVERDUE as their due dates approach
+and pass, then recalculates the Peace of Mind Score once.
+
+Usage:
+    python manage.py update_compliance_statuses          # Run once
+    python manage.py update_compliance_statuses --loop   # Run continuously (for Railway)
+"""
+import time
+import logging
+from django.core.management.base import BaseCommand
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Apply date-driven compliance status transitions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Run continuously in a loop (for Railway background worker)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=60,
+            help='Interval in minutes between checks (default: 60)',
+        )
+
+    def handle(self, *args, **options):
+        from compliance.status_engine import apply_status_transitions
+
+        if options['loop']:
+            interval = options['interval']
+            self.stdout.write(self.style.SUCCESS(
+                f'[COMPLIANCE] Starting status transition loop (every {interval} minutes)'
+            ))
+            while True:
+                try:
+                    apply_status_transitions()
+                except Exception as e:
+                    self.stderr.write(self.style.ERROR(f'[COMPLIANCE] Error: {e}'))
+                    logger.exception('[COMPLIANCE] Unhandled error in status transition loop')
+                time.sleep(interval * 60)
+        else:
+            moved = apply_status_transitions()
+            self.stdout.write(self.style.SUCCESS(
+                f"Status transitions — overdue: {moved['OVERDUE']}, due soon: {moved['DUE_SOON']}"
+            ))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0002_enhance_compliance_add_accidents'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='compliancecategory',
+            name='achieved_weight',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='compliancecategory',
+            name='total_weight',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='peaceofmindscore',
+            name='achieved_weight',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='peaceofmindscore',
+            name='total_weight',
+            field=models.FloatField(default=0),
+        ),
+    ]
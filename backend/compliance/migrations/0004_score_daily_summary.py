@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0003_score_running_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('open_score', models.IntegerField(help_text='Score before the first recalculation of the day')),
+                ('min_score', models.IntegerField()),
+                ('max_score', models.IntegerField()),
+                ('last_score', models.IntegerField()),
+                ('last_trigger', models.CharField(choices=[('auto', 'Automatic (item change)'), ('manual', 'Manual recalculation'), ('scheduled', 'Scheduled (daily)')], default='auto', max_length=20)),
+                ('samples', models.IntegerField(default=0, help_text='Recalculations that day')),
+                ('last_calculated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Score Daily Summary',
+                'verbose_name_plural': 'Score Daily Summaries',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='scoreauditlog',
+            index=models.Index(fields=['calculated_at'], name='compliance__calcula_cd5a46_idx'),
+        ),
+    ]
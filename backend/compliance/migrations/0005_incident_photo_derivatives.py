@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0004_score_daily_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incidentphoto',
+            name='derivatives_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('skipped', 'Not an image'), ('failed', 'Failed')], db_index=True, default='pending', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='incidentphoto',
+            name='preview',
+            field=models.ImageField(blank=True, editable=False, max_length=255, null=True, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='incidentphoto',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, max_length=255, null=True, upload_to=''),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0005_incident_photo_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='accidentreport',
+            index=models.Index(fields=['date', 'time', 'id'], name='accident_date_time_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0006_list_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incidentphoto',
+            name='derivatives_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.db import models
 
+from core.thumbnails import DERIVATIVE_STATUS_CHOICES
+
 
 class IncidentReport(models.Model):
     SEVERITY_CHOICES = [('LOW', 'Low'), ('MEDIUM', 'Medium'), ('HIGH', 'High'), ('CRITICAL', 'Critical')]
@@ -34,6 +36,13 @@ class IncidentPhoto(models.Model):
     caption = models.CharField(max_length=255, blank=True, default='')
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # WebP derivatives, rendered in the background (core.thumbnails)
+    thumbnail = models.ImageField(max_length=255, null=True, blank=True, editable=False)
+    preview = models.ImageField(max_length=255, null=True, blank=True, editable=False)
+    derivatives_status = models.CharField(
+        max_length=12, choices=DERIVATIVE_STATUS_CHOICES, default='pending', db_index=True, editable=False,
+    )
+    derivatives_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name = 'Incident Photo'
@@ -42,6 +51,13 @@ class IncidentPhoto(models.Model):
     def __str__(self):
         return f"Photo for {self.incident.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'image' in field_names:
+            instance._stored_image = instance.image.name
+        return instance
+
 
 class SignOff(models.Model):
     incident = models.ForeignKey(IncidentReport, on_delete=models.CASCADE, related_name='sign_offs')
@@ -207,6 +223,9 @@ class ComplianceCategory(models.Model):
     name = models.CharField(max_length=255, unique=True)
     max_score = models.IntegerField(default=10)
     current_score = models.IntegerField(default=0)
+    # Running totals of this category's item weights (see compliance.scoring)
+    total_weight = models.FloatField(default=0)
+    achieved_weight = models.FloatField(default=0)
     notes = models.TextField(blank=True, default='')
     order = models.IntegerField(default=0)
 
@@ -222,6 +241,12 @@ class ComplianceCategory(models.Model):
     def percentage(self):
         return round((self.current_score / self.max_score) * 100) if self.max_score > 0 else 0
 
+    def set_weights(self, total, achieved):
+        """Store the category's weight totals and derive current_score from them."""
+        self.total_weight = total
+        self.achieved_weight = achieved
+        self.current_score = round((achieved / total) * self.max_score) if total > 0 else self.max_score
+
 
 class ComplianceItem(models.Model):
     """
@@ -277,19 +302,41 @@ class ComplianceItem(models.Model):
     def __str__(self):
         return f"[{self.get_item_type_display()}] {self.title} — {self.get_status_display()}"
 
+    STATUS_FACTORS = {'COMPLIANT': 1.0, 'DUE_SOON': 0.5}
+    # Items due within this many days are DUE_SOON
+    DUE_SOON_DAYS = 30
+
+    # Fields the score depends on; their values as loaded are kept on the
+    # instance so a save can be scored as a delta (compliance.scoring)
+    SCORE_FIELDS = ('category_id', 'item_type', 'status')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Skipped for .only()/.defer() loads missing a score field
+        if all(f in field_names for f in cls.SCORE_FIELDS):
+            instance._score_state = instance.score_state
+        return instance
+
+    @property
+    def score_state(self):
+        return tuple(getattr(self, f) for f in self.SCORE_FIELDS)
+
+    @staticmethod
+    def weights_for(item_type, status):
+        """(weight, achieved weight) of an item with this type and status."""
+        weight = 2 if item_type == 'LEGAL' else 1
+        return weight, weight * ComplianceItem.STATUS_FACTORS.get(status, 0.0)
+
     @property
     def weight(self):
         """LEGAL items weight 2, BEST_PRACTICE weight 1"""
-        return 2 if self.item_type == 'LEGAL' else 1
+        return self.weights_for(self.item_type, self.status)[0]
 
     @property
     def status_factor(self):
         """COMPLIANT=1.0, DUE_SOON=0.5, OVERDUE=0.0"""
-        if self.status == 'COMPLIANT':
-            return 1.0
-        elif self.status == 'DUE_SOON':
-            return 0.5
-        return 0.0
+        return self.STATUS_FACTORS.get(self.status, 0.0)
 
     @property
     def achieved_weight(self):
@@ -318,7 +365,7 @@ class ComplianceItem(models.Model):
             return 'COMPLIANT'
         if due < today:
             return 'OVERDUE'
-        elif due <= today + timedelta(days=30):
+        elif due <= today + timedelta(days=self.DUE_SOON_DAYS):
             return 'DUE_SOON'
         return 'COMPLIANT'
 
@@ -405,6 +452,10 @@ class AccidentReport(models.Model):
     class Meta:
         ordering = ['-date', '-time']
         verbose_name = 'Accident Report'
+        indexes = [
+            # Keyset pagination of accidents_list
+            models.Index(fields=['date', 'time', 'id'], name='accident_date_time_idx'),
+        ]
         verbose_name_plural = 'Accident Reports'
 
     def __str__(self):
@@ -414,7 +465,7 @@ class AccidentReport(models.Model):
 class PeaceOfMindScore(models.Model):
     """
     Cached Peace of Mind Score (0–100).
-    Single row — recalculated on item changes and daily.
+    Single row — updated incrementally on item changes, recalculated daily.
     """
     score = models.IntegerField(default=0)
     previous_score = models.IntegerField(default=0)
@@ -424,6 +475,9 @@ class PeaceOfMindScore(models.Model):
     overdue_count = models.IntegerField(default=0)
     legal_items = models.IntegerField(default=0)
     best_practice_items = models.IntegerField(default=0)
+    # Running totals the score is derived from (see compliance.scoring)
+    total_weight = models.FloatField(default=0)
+    achieved_weight = models.FloatField(default=0)
     last_calculated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -455,83 +509,81 @@ class PeaceOfMindScore(models.Model):
             return 'amber'
         return 'red'
 
+    @staticmethod
+    def count_fields(item_type, status):
+        """The count fields an item with this type and status adds one to."""
+        status_field = {'COMPLIANT': 'compliant_count', 'DUE_SOON': 'due_soon_count'}.get(status, 'overdue_count')
+        type_field = 'legal_items' if item_type == 'LEGAL' else 'best_practice_items'
+        return ('total_items', status_field, type_field)
+
     @classmethod
-    def recalculate(cls):
+    def load_for_update(cls):
+        """The score row, locked for the rest of the transaction (unsaved if missing)."""
+        return cls.objects.select_for_update().filter(pk=1).first() or cls(pk=1)
+
+    def record(self, trigger='auto'):
+        """
+        Derive the score from the stored weight totals, save, and write one
+        ScoreAuditLog entry.
+        """
+        self.previous_score = self.score
+        self.score = round((self.achieved_weight / self.total_weight) * 100) if self.total_weight > 0 else 100
+        self.save()
+        log = ScoreAuditLog.objects.create(
+            score=self.score,
+            previous_score=self.previous_score,
+            total_items=self.total_items,
+            compliant_count=self.compliant_count,
+            due_soon_count=self.due_soon_count,
+            overdue_count=self.overdue_count,
+            trigger=trigger,
+        )
+        ScoreDailySummary.add_sample(log)
+        return self
+
+    @classmethod
+    def recalculate(cls, trigger='auto'):
         """
         Core scoring algorithm:
         Total possible weight = sum(all item weights)
         Achieved weight = sum(weight * status_factor)
         Score = (achieved / total) * 100, rounded to nearest int
-        """
-        from django.utils import timezone
-
-        items = ComplianceItem.objects.all()
-        total_possible = 0
-        achieved = 0
-        compliant = 0
-        due_soon = 0
-        overdue = 0
-        legal = 0
-        best_practice = 0
-
-        for item in items:
-            total_possible += item.weight
-            achieved += item.achieved_weight
-
-            if item.status == 'COMPLIANT':
-                compliant += 1
-            elif item.status == 'DUE_SOON':
-                due_soon += 1
-            else:
-                overdue += 1
-
-            if item.item_type == 'LEGAL':
-                legal += 1
-            else:
-                best_practice += 1
-
-        new_score = round((achieved / total_possible) * 100) if total_possible > 0 else 100
-
-        obj, created = cls.objects.get_or_create(pk=1, defaults={
-            'score': new_score,
-            'previous_score': 0,
-            'total_items': items.count(),
-            'compliant_count': compliant,
-            'due_soon_count': due_soon,
-            'overdue_count': overdue,
-            'legal_items': legal,
-            'best_practice_items': best_practice,
-        })
-
-        if not created:
-            obj.previous_score = obj.score
-            obj.score = new_score
-            obj.total_items = items.count()
-            obj.compliant_count = compliant
-            obj.due_soon_count = due_soon
-            obj.overdue_count = overdue
-            obj.legal_items = legal
-            obj.best_practice_items = best_practice
-            obj.save()
-
-        # Log the recalculation
-        ScoreAuditLog.objects.create(
-            score=new_score,
-            previous_score=obj.previous_score if not created else 0,
-            total_items=items.count(),
-            compliant_count=compliant,
-            due_soon_count=due_soon,
-            overdue_count=overdue,
-            trigger='auto',
-        )
 
-        # Update ComplianceCategory scores based on their items
-        for cat in ComplianceCategory.objects.all():
-            cat_items = cat.items.all()
-            cat_total = sum(i.weight for i in cat_items)
-            cat_achieved = sum(i.achieved_weight for i in cat_items)
-            cat.current_score = round((cat_achieved / cat_total) * cat.max_score) if cat_total > 0 else cat.max_score
-            cat.save()
+        Full rebuild from one grouped query over the items. Individual item
+        changes are applied incrementally instead (compliance.scoring).
+        """
+        from collections import defaultdict
+        from django.db import transaction
+        from django.db.models import Count
+
+        counts = defaultdict(int)
+        total_weight = achieved = 0
+        category_weights = defaultdict(lambda: [0, 0])
+        rows = ComplianceItem.objects.values('category_id', 'item_type', 'status').annotate(n=Count('id')).order_by()
+        for row in rows:
+            n = row['n']
+            weight, got = ComplianceItem.weights_for(row['item_type'], row['status'])
+            total_weight += weight * n
+            achieved += got * n
+            category_weights[row['category_id']][0] += weight * n
+            category_weights[row['category_id']][1] += got * n
+            for field in cls.count_fields(row['item_type'], row['status']):
+                counts[field] += n
+
+        with transaction.atomic():
+            obj = cls.load_for_update()
+            for field in ('total_items', 'compliant_count', 'due_soon_count', 'overdue_count',
+                          'legal_items', 'best_practice_items'):
+                setattr(obj, field, counts[field])
+            obj.total_weight = total_weight
+            obj.achieved_weight = achieved
+            obj.record(trigger)
+
+            # Update ComplianceCategory scores based on their items
+            categories = list(ComplianceCategory.objects.all())
+            for cat in categories:
+                cat.set_weights(*category_weights.get(cat.id, (0, 0)))
+            ComplianceCategory.objects.bulk_update(categories, ['total_weight', 'achieved_weight', 'current_score'])
 
         return obj
 
@@ -555,6 +607,7 @@ class ScoreAuditLog(models.Model):
 
     class Meta:
         ordering = ['-calculated_at']
+        indexes = [models.Index(fields=['calculated_at'])]
         verbose_name = 'Score Audit Log'
         verbose_name_plural = 'Score Audit Logs'
 
@@ -564,6 +617,63 @@ class ScoreAuditLog(models.Model):
         return f"{self.calculated_at.strftime('%Y-%m-%d %H:%M')} — Score: {self.score}% ({direction})"
 
 
+class ScoreDailySummary(models.Model):
+    """
+    One row per day of score history: opening, min, max and last score.
+    Kept current by every recalculation; ScoreAuditLog rows older than the
+    retention window are folded into it and deleted (compliance.score_history).
+    """
+    date = models.DateField(unique=True)
+    open_score = models.IntegerField(help_text='Score before the first recalculation of the day')
+    min_score = models.IntegerField()
+    max_score = models.IntegerField()
+    last_score = models.IntegerField()
+    last_trigger = models.CharField(max_length=20, choices=ScoreAuditLog.TRIGGER_CHOICES, default='auto')
+    samples = models.IntegerField(default=0, help_text='Recalculations that day')
+    last_calculated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name = 'Score Daily Summary'
+        verbose_name_plural = 'Score Daily Summaries'
+
+    def __str__(self):
+        return f"{self.date} — {self.last_score}% (min {self.min_score}%, max {self.max_score}%)"
+
+    @classmethod
+    def add_sample(cls, log):
+        """Fold one ScoreAuditLog entry into its day's summary."""
+        from django.db import IntegrityError, transaction
+        from django.db.models import F, Value
+        from django.db.models.functions import Greatest, Least
+        from django.utils import timezone
+
+        day = timezone.localdate(log.calculated_at)
+
+        def update():
+            return cls.objects.filter(date=day).update(
+                min_score=Least('min_score', Value(log.score)),
+                max_score=Greatest('max_score', Value(log.score)),
+                last_score=log.score,
+                last_trigger=log.trigger,
+                samples=F('samples') + 1,
+                last_calculated_at=log.calculated_at,
+            )
+
+        if update():
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    date=day, open_score=log.previous_score, min_score=log.score, max_score=log.score,
+                    last_score=log.score, last_trigger=log.trigger, samples=1,
+                    last_calculated_at=log.calculated_at,
+                )
+        except IntegrityError:
+            # Created concurrently for the same day
+            update()
+
+
 class RAMSDocument(models.Model):
     STATUS_CHOICES = [('DRAFT', 'Draft'), ('ACTIVE', 'Active'), ('EXPIRED', 'Expired'), ('ARCHIVED', 'Archived')]
 
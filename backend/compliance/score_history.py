@@ -0,0 +1,87 @@
+"""
+Score History — audit log retention and the daily trend series
+Every recalculation writes a ScoreAuditLog row and folds it into that day's
+ScoreDailySummary (opening, min, max and last score). Raw rows are kept at
+full resolution for AUDIT_LOG_KEEP_DAYS; compact_audit_log() deletes older
+ones, so the log stays bounded while the daily history is kept for good.
+
+Trend charts read the summaries: one row per day, whatever the number of
+recalculations.
+"""
+import logging
+from datetime import timedelta
+from django.db import transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+AUDIT_LOG_KEEP_DAYS = 7
+TREND_MAX_DAYS = 365
+
+
+def _backfill_summaries(days):
+    """Build summaries for `days` from their raw audit rows (history from before summaries existed)."""
+    from .models import ScoreAuditLog, ScoreDailySummary
+    summaries = {}
+    rows = (
+        ScoreAuditLog.objects.annotate(day=TruncDate('calculated_at'))
+        .filter(day__in=days)
+        .order_by('calculated_at')
+        .values('day', 'score', 'previous_score', 'trigger', 'calculated_at')
+    )
+    for row in rows:
+        s = summaries.get(row['day'])
+        if s is None:
+            s = summaries[row['day']] = ScoreDailySummary(
+                date=row['day'], open_score=row['previous_score'],
+                min_score=row['score'], max_score=row['score'], samples=0,
+            )
+        s.min_score = min(s.min_score, row['score'])
+        s.max_score = max(s.max_score, row['score'])
+        s.last_score = row['score']
+        s.last_trigger = row['trigger']
+        s.last_calculated_at = row['calculated_at']
+        s.samples += 1
+    ScoreDailySummary.objects.bulk_create(summaries.values())
+    return len(summaries)
+
+
+def compact_audit_log(keep_days=AUDIT_LOG_KEEP_DAYS, now=None):
+    """
+    Make sure every logged day has a summary, then delete raw rows older than
+    `keep_days`. Returns {'backfilled': days summarised, 'deleted': rows removed}.
+    """
+    from .models import ScoreAuditLog, ScoreDailySummary
+    now = now or timezone.now()
+    with transaction.atomic():
+        logged_days = set(
+            ScoreAuditLog.objects.annotate(day=TruncDate('calculated_at'))
+            .order_by().values_list('day', flat=True).distinct()
+        )
+        summarised = set(ScoreDailySummary.objects.filter(date__in=logged_days).values_list('date', flat=True))
+        backfilled = _backfill_summaries(logged_days - summarised) if logged_days - summarised else 0
+        deleted, _ = ScoreAuditLog.objects.filter(calculated_at__lt=now - timedelta(days=keep_days)).delete()
+    if backfilled or deleted:
+        logger.info(f"[COMPLIANCE] Audit log compacted: {deleted} rows deleted, {backfilled} days summarised")
+    return {'backfilled': backfilled, 'deleted': deleted}
+
+
+def trend_series(days=30, today=None):
+    """Daily score points for the last `days` days, oldest first; days without recalculations are skipped."""
+    from .models import ScoreAuditLog, ScoreDailySummary
+    today = today or timezone.localdate()
+    triggers = dict(ScoreAuditLog.TRIGGER_CHOICES)
+    summaries = ScoreDailySummary.objects.filter(date__gt=today - timedelta(days=days), date__lte=today).order_by('date')
+    return [
+        {
+            'date': s.date.isoformat(),
+            'score': s.last_score,
+            'min': s.min_score,
+            'max': s.max_score,
+            'change': s.last_score - s.open_score,
+            'trigger': triggers.get(s.last_trigger, s.last_trigger),
+            'samples': s.samples,
+        }
+        for s in summaries
+    ]
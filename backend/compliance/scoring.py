@@ -0,0 +1,197 @@
+"""
+Compliance Scoring — incremental Peace of Mind Score updates
+The score row and every category keep running weight totals. A ComplianceItem
+save or delete contributes only the difference between the item's old and new
+(category, type, status), so a change costs O(1) instead of a rescan of every
+item.
+
+Changes made inside one transaction are accumulated and applied together on
+commit: one score update, one ScoreAuditLog entry and one write per touched
+category, however many items changed. Outside a transaction each change is
+applied immediately.
+
+Deltas are kept per savepoint: each layer registers its own on_commit
+callback from inside the savepoint it belongs to, so rolling that savepoint
+back (or the whole transaction) makes Django drop the callback, and with it
+the only strong reference to the layer. The thread keeps weak references,
+so a dropped layer simply disappears. A layer that outlives its savepoint
+was released into the enclosing one and is folded into it; at commit the
+first flush applies every surviving layer at once.
+
+PeaceOfMindScore.recalculate() remains the full rebuild. It is used when an
+item's previous state is unknown, when the totals were never initialised, and
+by the scheduled recalculate_compliance_score job, which also corrects any
+drift.
+
+Bulk operations (seeding, admin actions) run under suspend_scoring(): item
+changes inside it are not scored one by one, and the score is rebuilt once
+when it exits.
+"""
+import logging
+import threading
+import weakref
+from collections import defaultdict
+from contextlib import contextmanager
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+# Previous state of an item saved without having been loaded from the database
+UNKNOWN = object()
+
+
+class PendingChanges:
+    """Score deltas accumulated during one transaction."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.full = False
+        self.counts = defaultdict(int)
+        self.total_weight = 0
+        self.achieved_weight = 0
+        self.categories = defaultdict(lambda: [0, 0])
+
+    def add(self, state, sign):
+        """Add (sign=1) or remove (sign=-1) one item's contribution."""
+        from .models import ComplianceItem, PeaceOfMindScore
+        category_id, item_type, status = state
+        weight, achieved = ComplianceItem.weights_for(item_type, status)
+        self.total_weight += sign * weight
+        self.achieved_weight += sign * achieved
+        self.categories[category_id][0] += sign * weight
+        self.categories[category_id][1] += sign * achieved
+        for field in PeaceOfMindScore.count_fields(item_type, status):
+            self.counts[field] += sign
+
+    def is_empty(self):
+        return not self.full and not any(self.counts.values()) and not any(
+            total or achieved for total, achieved in self.categories.values()
+        )
+
+    def merge(self, other):
+        """Take over `other`'s deltas, leaving it empty."""
+        self.full = self.full or other.full
+        for field, delta in other.counts.items():
+            self.counts[field] += delta
+        self.total_weight += other.total_weight
+        self.achieved_weight += other.achieved_weight
+        for category_id, (total, achieved) in other.categories.items():
+            self.categories[category_id][0] += total
+            self.categories[category_id][1] += achieved
+        other.clear()
+
+    def flush(self):
+        # Every layer still alive at commit survived: fold them in, apply once
+        for layer in _live_layers().values():
+            if layer is not self:
+                self.merge(layer)
+        _local.layers = {}
+        apply_changes(self)
+
+
+def _live_layers():
+    """{savepoint chain: PendingChanges} whose commit callbacks Django still holds."""
+    layers = {}
+    for key, ref in getattr(_local, 'layers', {}).items():
+        layer = ref()
+        if layer is not None:
+            layers[key] = layer
+    _local.layers = {key: weakref.ref(layer) for key, layer in layers.items()}
+    return layers
+
+
+def _pending_for(connection):
+    """The layer collecting changes for the current savepoint, created on first use."""
+    key = tuple(connection.savepoint_ids)
+    layers = _live_layers()
+    pending = layers.get(key)
+    if pending is None:
+        pending = PendingChanges()
+        _local.layers[key] = weakref.ref(pending)
+        transaction.on_commit(pending.flush)
+    # Deeper layers still alive were released into this savepoint, not rolled back
+    for other_key, layer in layers.items():
+        if len(other_key) > len(key) and other_key[:len(key)] == key:
+            pending.merge(layer)
+    return pending
+
+
+def record_change(old_state, new_state):
+    """
+    Record that an item went from `old_state` to `new_state`, each a
+    (category_id, item_type, status) tuple, None when the item did not
+    exist, or UNKNOWN.
+    """
+    if old_state == new_state or getattr(_local, 'suspended', 0):
+        return
+    connection = transaction.get_connection()
+    pending = _pending_for(connection) if connection.in_atomic_block else PendingChanges()
+
+    if old_state is UNKNOWN:
+        pending.full = True
+    else:
+        if old_state is not None:
+            pending.add(old_state, -1)
+        if new_state is not None:
+            pending.add(new_state, 1)
+
+    if not connection.in_atomic_block:
+        apply_changes(pending)
+
+
+def apply_changes(pending):
+    """Apply accumulated deltas to the score and categories; returns the score."""
+    from .models import ComplianceCategory, PeaceOfMindScore
+
+    if pending.is_empty():
+        return None
+    with transaction.atomic():
+        score = PeaceOfMindScore.load_for_update()
+        uninitialised = score._state.adding or (score.total_items and not score.total_weight)
+        if pending.full or uninitialised:
+            return PeaceOfMindScore.recalculate()
+
+        for field, delta in pending.counts.items():
+            setattr(score, field, getattr(score, field) + delta)
+        score.total_weight += pending.total_weight
+        score.achieved_weight += pending.achieved_weight
+        if score.total_items < 0 or score.total_weight < 0:
+            logger.warning('[COMPLIANCE] Running score totals drifted; recalculating in full')
+            return PeaceOfMindScore.recalculate()
+        score.record()
+
+        categories = list(ComplianceCategory.objects.select_for_update().filter(pk__in=list(pending.categories)))
+        for cat in categories:
+            total, achieved = pending.categories[cat.pk]
+            cat.set_weights(cat.total_weight + total, cat.achieved_weight + achieved)
+        ComplianceCategory.objects.bulk_update(categories, ['total_weight', 'achieved_weight', 'current_score'])
+    return score
+
+
+@contextmanager
+def suspend_scoring(trigger='auto'):
+    """
+    Context manager / decorator for bulk item changes: per-item scoring is
+    switched off inside it (on this thread) and the score is recalculated
+    once on leaving the outermost block.
+
+        with suspend_scoring():
+            for row in rows:
+                ComplianceItem.objects.create(**row)
+    """
+    from .models import PeaceOfMindScore
+    depth = getattr(_local, 'suspended', 0)
+    _local.suspended = depth + 1
+    try:
+        yield
+    finally:
+        _local.suspended = depth
+    if depth == 0:
+        # Earlier changes in this transaction are covered by the rebuild
+        for pending in _live_layers().values():
+            pending.clear()
+        PeaceOfMindScore.recalculate(trigger=trigger)
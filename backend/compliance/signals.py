@@ -3,12 +3,30 @@ from django.dispatch import receiver
 
 
 @receiver(post_save, sender='compliance.ComplianceItem')
-def recalculate_score_on_save(sender, instance, **kwargs):
-    from .models import PeaceOfMindScore
-    PeaceOfMindScore.recalculate()
+def recalculate_score_on_save(sender, instance, created, **kwargs):
+    from .scoring import UNKNOWN, record_change
+    old_state = None if created else getattr(instance, '_score_state', UNKNOWN)
+    instance._score_state = instance.score_state
+    record_change(old_state, instance._score_state)
 
 
 @receiver(post_delete, sender='compliance.ComplianceItem')
 def recalculate_score_on_delete(sender, instance, **kwargs):
-    from .models import PeaceOfMindScore
-    PeaceOfMindScore.recalculate()
+    from .scoring import record_change
+    record_change(getattr(instance, '_score_state', instance.score_state), None)
+
+
+@receiver(post_save, sender='compliance.IncidentPhoto')
+def render_photo_derivatives(sender, instance, created, **kwargs):
+    from core.thumbnails import queue_derivatives, schedule_derivatives
+    if created:
+        schedule_derivatives('incident-photo', instance.pk)
+    elif instance.image.name != getattr(instance, '_stored_image', instance.image.name):
+        queue_derivatives(instance, 'incident-photo')
+    instance._stored_image = instance.image.name
+
+
+@receiver(post_delete, sender='compliance.IncidentPhoto')
+def delete_photo_derivatives(sender, instance, **kwargs):
+    from core.thumbnails import delete_derivatives
+    delete_derivatives(instance)
@@ -0,0 +1,55 @@
+"""
+Compliance Status Engine — time-driven status transitions
+An item's status follows its next_due_date, but save() only recomputes it
+when the item is edited. As days pass, items cross two thresholds without
+anyone touching them:
+
+    COMPLIANT → DUE_SOON   next_due_date within DUE_SOON_DAYS
+    COMPLIANT/DUE_SOON → OVERDUE   next_due_date in the past
+
+apply_status_transitions() finds exactly those rows with one indexed range
+query on next_due_date per threshold and moves them with one UPDATE each.
+It then recalculates the Peace of Mind Score once. Statuses are only ever
+moved forward in time; completing an item (save) is what resets it.
+Run daily or more often by the update_compliance_statuses command.
+"""
+import logging
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def pending_transitions(today=None):
+    """{new status: queryset of the items that must move to it} as of `today`."""
+    from .models import ComplianceItem
+    today = today or timezone.now().date()
+    return {
+        'OVERDUE': ComplianceItem.objects.filter(
+            next_due_date__lt=today, status__in=['COMPLIANT', 'DUE_SOON'],
+        ),
+        'DUE_SOON': ComplianceItem.objects.filter(
+            next_due_date__range=(today, today + timedelta(days=ComplianceItem.DUE_SOON_DAYS)),
+            status='COMPLIANT',
+        ),
+    }
+
+
+def apply_status_transitions(today=None):
+    """
+    Move items whose due date crossed a threshold; returns {status: count}.
+    The score is recalculated (trigger 'scheduled') only when something moved.
+    """
+    from .models import PeaceOfMindScore
+    now = timezone.now()
+    with transaction.atomic():
+        moved = {
+            new_status: items.update(status=new_status, updated_at=now)
+            for new_status, items in pending_transitions(today).items()
+        }
+        if any(moved.values()):
+            PeaceOfMindScore.recalculate(trigger='scheduled')
+    if any(moved.values()):
+        logger.info(f"[COMPLIANCE] Status transitions: {moved['OVERDUE']} overdue, {moved['DUE_SOON']} due soon")
+    return moved
@@ -1,9 +1,21 @@
 """
 Phase 8: Compliance Intelligence test scenarios.
-Tests the Peace of Mind Score calculation engine.
+Tests the Peace of Mind Score calculation engine and its incremental updates.
 """
-from django.test import TestCase
-from .models import ComplianceCategory, ComplianceItem, PeaceOfMindScore, ScoreAuditLog
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from .models import ComplianceCategory, ComplianceItem, PeaceOfMindScore, ScoreAuditLog, ScoreDailySummary
+from .score_history import compact_audit_log
+from .scoring import suspend_scoring
+from .status_engine import apply_status_transitions
 
 
 class PeaceOfMindScoreTests(TestCase):
@@ -160,3 +172,299 @@ class PeaceOfMindScoreTests(TestCase):
         self.cat_fire.refresh_from_db()
         # Fire Safety has 2 LEGAL items: 1 compliant (2), 1 overdue (0) = 2/4 = 50% of max_score 10 = 5
         self.assertEqual(self.cat_fire.current_score, 5)
+
+
+class IncrementalScoreTests(TestCase):
+    """Item changes are applied as deltas, once per transaction."""
+
+    def setUp(self):
+        self.cat_fire = ComplianceCategory.objects.create(name='Fire Safety', max_score=10, order=1)
+        self.cat_first_aid = ComplianceCategory.objects.create(name='First Aid', max_score=10, order=2)
+        today = timezone.now().date()
+        self.due = {'COMPLIANT': None, 'DUE_SOON': today + timedelta(days=10), 'OVERDUE': today - timedelta(days=1)}
+
+    def _item(self, title, category, item_type, status):
+        return ComplianceItem.objects.create(
+            title=title, category=category, item_type=item_type, next_due_date=self.due[status],
+        )
+
+    def _state(self):
+        score = PeaceOfMindScore.objects.get(pk=1)
+        cats = {c.name: c.current_score for c in ComplianceCategory.objects.all()}
+        return (score.score, score.total_items, score.compliant_count, score.due_soon_count,
+                score.overdue_count, score.legal_items, score.best_practice_items, cats)
+
+    def test_deltas_match_full_recalculation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            legal = self._item('Fire risk assessment', self.cat_fire, 'LEGAL', 'COMPLIANT')
+            self._item('Extinguisher check', self.cat_fire, 'LEGAL', 'OVERDUE')
+            bp = self._item('First aid kit', self.cat_first_aid, 'BEST_PRACTICE', 'DUE_SOON')
+        with self.captureOnCommitCallbacks(execute=True):
+            legal.next_due_date = self.due['DUE_SOON']
+            legal.save()
+            bp.delete()
+            ComplianceItem.objects.get(title='Extinguisher check').save()
+        incremental = self._state()
+        self.assertEqual(incremental[:2], (25, 2))
+
+        PeaceOfMindScore.recalculate()
+        self.assertEqual(self._state(), incremental)
+
+    def test_changes_in_one_transaction_coalesce(self):
+        PeaceOfMindScore.recalculate()
+        logs = ScoreAuditLog.objects.count()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for i in range(20):
+                self._item(f'Item {i}', self.cat_fire, 'LEGAL', 'OVERDUE' if i % 2 else 'COMPLIANT')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(ScoreAuditLog.objects.count(), logs + 1)
+        score = PeaceOfMindScore.objects.get(pk=1)
+        self.assertEqual((score.score, score.total_items, score.overdue_count), (50, 20, 10))
+
+    def test_unchanged_status_is_not_rescored(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            item = self._item('Fire risk assessment', self.cat_fire, 'LEGAL', 'COMPLIANT')
+        logs = ScoreAuditLog.objects.count()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            item.notes = 'Reviewed'
+            item.save()
+        self.assertEqual(callbacks, [])
+        self.assertEqual(ScoreAuditLog.objects.count(), logs)
+
+    def test_rolled_back_changes_are_discarded(self):
+        PeaceOfMindScore.recalculate()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self._item('Rolled back', self.cat_fire, 'LEGAL', 'OVERDUE')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self._item('Kept', self.cat_first_aid, 'BEST_PRACTICE', 'COMPLIANT')
+        score = PeaceOfMindScore.objects.get(pk=1)
+        self.assertEqual((score.score, score.total_items, score.overdue_count), (100, 1, 0))
+
+
+    def test_savepoint_rollback_after_earlier_changes(self):
+        PeaceOfMindScore.recalculate()
+        logs = ScoreAuditLog.objects.count()
+        with self.captureOnCommitCallbacks(execute=True):
+            self._item('Kept', self.cat_first_aid, 'BEST_PRACTICE', 'COMPLIANT')
+            try:
+                with transaction.atomic():
+                    self._item('Rolled back', self.cat_fire, 'LEGAL', 'OVERDUE')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            with transaction.atomic():
+                self._item('Released', self.cat_fire, 'LEGAL', 'COMPLIANT')
+            self._item('Also kept', self.cat_first_aid, 'BEST_PRACTICE', 'COMPLIANT')
+        self.assertEqual(ScoreAuditLog.objects.count(), logs + 1)
+        incremental = self._state()
+        self.assertEqual(incremental[1:5], (3, 3, 0, 0))
+        PeaceOfMindScore.recalculate()
+        self.assertEqual(self._state(), incremental)
+
+class SuspendScoringTests(TestCase):
+    """Bulk changes under suspend_scoring() are scored once, on exit."""
+
+    def setUp(self):
+        self.cat = ComplianceCategory.objects.create(name='Fire Safety', max_score=10, order=1)
+        self.overdue = timezone.now().date() - timedelta(days=1)
+
+    def test_one_recalculation_for_a_bulk_change(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with suspend_scoring():
+                for i in range(10):
+                    ComplianceItem.objects.create(title=f'Item {i}', category=self.cat, item_type='LEGAL',
+                                                  next_due_date=self.overdue if i < 5 else None)
+                with suspend_scoring():
+                    ComplianceItem.objects.filter(title='Item 9').delete()
+                self.assertFalse(ScoreAuditLog.objects.exists())
+        self.assertEqual(callbacks, [])
+        self.assertEqual(ScoreAuditLog.objects.count(), 1)
+        score = PeaceOfMindScore.objects.get(pk=1)
+        self.assertEqual((score.total_items, score.overdue_count, score.score), (9, 5, 44))
+
+    def test_works_as_decorator(self):
+        @suspend_scoring()
+        def seed():
+            for i in range(3):
+                ComplianceItem.objects.create(title=f'Item {i}', category=self.cat)
+
+        seed()
+        self.assertEqual(ScoreAuditLog.objects.count(), 1)
+        self.assertEqual(PeaceOfMindScore.objects.get(pk=1).total_items, 3)
+
+    def test_earlier_pending_changes_are_not_applied_twice(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ComplianceItem.objects.create(title='Before', category=self.cat)
+            with suspend_scoring():
+                ComplianceItem.objects.create(title='During', category=self.cat)
+            ComplianceItem.objects.create(title='After', category=self.cat, next_due_date=self.overdue)
+        score = PeaceOfMindScore.objects.get(pk=1)
+        self.assertEqual((score.total_items, score.compliant_count, score.overdue_count), (3, 2, 1))
+
+    def test_seed_command_recalculates_once(self):
+        call_command('seed_compliance', stdout=StringIO(), stderr=StringIO())
+        items = ComplianceItem.objects.count()
+        self.assertGreater(items, 0)
+        self.assertEqual(ScoreAuditLog.objects.count(), 1)
+        self.assertEqual(PeaceOfMindScore.objects.get(pk=1).total_items, items)
+
+    def test_seed_command_reports_failures(self):
+        with mock.patch('compliance.management.commands.seed_compliance.Command._seed', side_effect=DatabaseError('boom')):
+            with self.assertRaisesMessage(CommandError, 'Seeding compliance baseline failed: boom'):
+                call_command('seed_compliance', stdout=StringIO(), stderr=StringIO())
+
+        stderr = StringIO()
+        with mock.patch('compliance.models.PeaceOfMindScore.recalculate', side_effect=DatabaseError('locked')):
+            call_command('seed_compliance', stdout=StringIO(), stderr=stderr)
+        self.assertIn('Score recalculation error: locked', stderr.getvalue())
+
+
+class StatusTransitionTests(TestCase):
+    """Items move to DUE_SOON / OVERDUE as time passes, without being edited."""
+
+    def setUp(self):
+        cat = ComplianceCategory.objects.create(name='Fire Safety', max_score=10, order=1)
+        self.today = timezone.now().date()
+        with suspend_scoring():
+            self.later = ComplianceItem.objects.create(
+                title='Later', category=cat, item_type='LEGAL', next_due_date=self.today + timedelta(days=40))
+            self.soon = ComplianceItem.objects.create(
+                title='Soon', category=cat, item_type='LEGAL', next_due_date=self.today + timedelta(days=10))
+            self.undated = ComplianceItem.objects.create(title='Undated', category=cat)
+        # Marked overdue by hand (admin action); the engine leaves it alone
+        ComplianceItem.objects.filter(pk=self.undated.pk).update(status='OVERDUE')
+        ScoreAuditLog.objects.all().delete()
+
+    def _statuses(self):
+        return dict(ComplianceItem.objects.values_list('title', 'status'))
+
+    def test_thresholds_crossed(self):
+        self.assertEqual(apply_status_transitions(self.today), {'OVERDUE': 0, 'DUE_SOON': 0})
+        self.assertFalse(ScoreAuditLog.objects.exists())
+
+        moved = apply_status_transitions(self.today + timedelta(days=15))
+        self.assertEqual(moved, {'OVERDUE': 1, 'DUE_SOON': 1})
+        self.assertEqual(self._statuses(), {'Later': 'DUE_SOON', 'Soon': 'OVERDUE', 'Undated': 'OVERDUE'})
+
+        log = ScoreAuditLog.objects.get()
+        self.assertEqual(log.trigger, 'scheduled')
+        self.assertEqual((log.overdue_count, log.due_soon_count, log.score), (2, 1, 20))
+
+    def test_repeat_run_is_a_no_op(self):
+        day = self.today + timedelta(days=45)
+        self.assertEqual(apply_status_transitions(day), {'OVERDUE': 2, 'DUE_SOON': 0})
+        self.assertEqual(apply_status_transitions(day), {'OVERDUE': 0, 'DUE_SOON': 0})
+        self.assertEqual(ScoreAuditLog.objects.count(), 1)
+
+
+@override_settings(COMPLIANCE_ANALYTICS_TTL=60)
+class ComplianceAnalyticsTests(TestCase):
+    """Breakdown, priorities and dashboard-v2 share one pass over the register."""
+
+    def setUp(self):
+        cache.clear()
+        self.api = APIClient()
+        self.cat = ComplianceCategory.objects.create(name='Fire Safety', max_score=10, order=1)
+        self.today = timezone.now().date()
+        with suspend_scoring():
+            for i, days in enumerate([None, -3, 5, 20, 60]):
+                ComplianceItem.objects.create(
+                    title=f'Item {i}', category=self.cat, item_type='LEGAL' if i % 2 else 'BEST_PRACTICE',
+                    next_due_date=self.today + timedelta(days=days) if days is not None else None,
+                )
+
+    def test_endpoints_share_one_item_query(self):
+        # score row, items, categories
+        with self.assertNumQueries(3):
+            data = self.api.get('/api/compliance/breakdown/').json()
+        self.assertEqual(data['categories'][0]['total_items'], 5)
+        self.assertEqual(data['categories'][0]['overdue'], 1)
+
+        # score row, trend, accidents — the item analytics come from the cache
+        with self.assertNumQueries(3):
+            data = self.api.get('/api/compliance/dashboard-v2/').json()
+        horizon = data['time_horizon']
+        self.assertEqual([horizon[k] for k in ('overdue', 'next_7', 'next_30', 'next_90')], [1, 1, 1, 1])
+        self.assertEqual(data['priority_items'][0]['title'], 'Item 1')
+        self.assertIn('1 legal item overdue', data['summary_text'])
+
+        with self.assertNumQueries(1):
+            actions = self.api.get('/api/compliance/priorities/').json()['actions']
+        self.assertEqual([a['title'] for a in actions], ['Item 1', 'Item 3', 'Item 2'])
+
+    def test_type_filter(self):
+        data = self.api.get('/api/compliance/breakdown/', {'type': 'LEGAL'}).json()
+        self.assertEqual(data['filter'], 'LEGAL')
+        self.assertEqual(data['categories'][0]['total_items'], 2)
+        self.assertEqual(data['categories'][0]['score_pct'], 25)
+
+    def test_scored_change_refreshes_cached_analytics(self):
+        self.api.get('/api/compliance/breakdown/')
+        with self.captureOnCommitCallbacks(execute=True):
+            item = ComplianceItem.objects.get(title='Item 1')
+            item.next_due_date = self.today + timedelta(days=365)
+            item.save()
+        data = self.api.get('/api/compliance/breakdown/').json()
+        self.assertEqual(data['categories'][0]['overdue'], 0)
+
+
+class ScoreHistoryTests(TestCase):
+    """Daily summaries, audit log retention and the compact trend series."""
+
+    def setUp(self):
+        self.api = APIClient()
+        self.cat = ComplianceCategory.objects.create(name='Fire Safety', max_score=10, order=1)
+        self.now = timezone.now()
+
+    def _log(self, days_ago, score, previous_score):
+        log = ScoreAuditLog.objects.create(score=score, previous_score=previous_score, total_items=1,
+                                           compliant_count=1, due_soon_count=0, overdue_count=0)
+        ScoreAuditLog.objects.filter(pk=log.pk).update(calculated_at=self.now - timedelta(days=days_ago))
+
+    def test_recalculations_fold_into_daily_summary(self):
+        item = ComplianceItem.objects.create(title='Item', category=self.cat)
+        PeaceOfMindScore.recalculate()
+        ComplianceItem.objects.filter(pk=item.pk).update(status='OVERDUE')
+        PeaceOfMindScore.recalculate()
+        ComplianceItem.objects.filter(pk=item.pk).update(status='DUE_SOON')
+        PeaceOfMindScore.recalculate(trigger='manual')
+
+        summary = ScoreDailySummary.objects.get()
+        self.assertEqual(
+            (summary.open_score, summary.min_score, summary.max_score, summary.last_score, summary.samples),
+            (0, 0, 100, 50, 3),
+        )
+        self.assertEqual(summary.last_trigger, 'manual')
+
+    def test_compaction_keeps_recent_rows_and_summarises_old_days(self):
+        self._log(10, 80, 70)
+        self._log(10, 60, 80)
+        self._log(9, 90, 60)
+        self._log(1, 95, 90)
+
+        self.assertEqual(compact_audit_log(), {'backfilled': 3, 'deleted': 3})
+        self.assertEqual(list(ScoreAuditLog.objects.values_list('score', flat=True)), [95])
+        day10 = ScoreDailySummary.objects.get(date=timezone.localdate(self.now - timedelta(days=10)))
+        self.assertEqual((day10.open_score, day10.min_score, day10.max_score, day10.last_score, day10.samples),
+                         (70, 60, 80, 60, 2))
+        self.assertEqual(compact_audit_log(), {'backfilled': 0, 'deleted': 0})
+
+    def test_trend_endpoint(self):
+        self._log(40, 50, 40)
+        self._log(3, 70, 50)
+        self._log(3, 90, 70)
+        compact_audit_log()
+
+        with self.assertNumQueries(1):
+            data = self.api.get('/api/compliance/trend/', {'days': 30}).json()
+        self.assertEqual(data['days'], 30)
+        self.assertEqual(len(data['series']), 1)
+        point = data['series'][0]
+        self.assertEqual((point['score'], point['min'], point['max'], point['change'], point['samples']),
+                         (90, 70, 90, 40, 2))
+        self.assertEqual(len(self.api.get('/api/compliance/trend/', {'days': 60}).json()['series']), 2)
+        self.assertEqual(self.api.get('/api/compliance/trend/', {'days': 'x'}).status_code, 400)
@@ -10,6 +10,7 @@ urlpatterns = [
     path('breakdown/', views.breakdown, name='breakdown'),
     path('priorities/', views.priority_actions, name='priorities'),
     path('audit-log/', views.audit_log, name='audit-log'),
+    path('trend/', views.score_trend, name='trend'),
     path('recalculate/', views.recalculate, name='recalculate'),
     path('categories/', views.categories_list, name='categories'),
     # Compliance register CRUD
@@ -25,4 +26,6 @@ urlpatterns = [
     path('accidents/create/', views.accidents_create, name='accidents-create'),
     path('accidents/<int:accident_id>/update/', views.accidents_update, name='accidents-update'),
     path('accidents/<int:accident_id>/delete/', views.accidents_delete, name='accidents-delete'),
+    # Incidents
+    path('incidents/', views.incidents_list, name='incidents-list'),
 ]
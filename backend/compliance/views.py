@@ -1,7 +1,7 @@
 """
 Compliance Intelligence API views.
 Provides Peace of Mind Score dashboard, compliance register CRUD,
-calendar data, accident log, and priority actions.
+calendar data, accident log, incidents, and priority actions.
 """
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
@@ -9,13 +9,21 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.utils import timezone
 from django.db.models import Count, Q
-from datetime import timedelta
 import calendar as cal_mod
 
+from core.file_serving import derivative_urls, protected_file_url
+from core.pagination import paginate
+
 from .models import (
     ComplianceItem, ComplianceCategory, PeaceOfMindScore,
     ScoreAuditLog, IncidentReport, Equipment, AccidentReport,
 )
+from .analytics import category_breakdown, get_analytics
+from .score_history import TREND_MAX_DAYS, trend_series
+
+
+# The register's order (ComplianceItem.Meta.ordering, with the category's own order), made unique
+ITEM_ORDERING = ('category__order', 'category__name', 'item_type', 'title', 'id')
 
 
 def _safe_date(val):
@@ -27,6 +35,11 @@ def _safe_date(val):
     return val.isoformat()
 
 
+def _current_score():
+    """The cached PeaceOfMindScore row, calculated first if it does not exist yet."""
+    return PeaceOfMindScore.objects.filter(pk=1).first() or PeaceOfMindScore.recalculate()
+
+
 def _serialize_item(item):
     """Serialize a ComplianceItem to dict."""
     return {
@@ -46,7 +59,7 @@ def _serialize_item(item):
         'regulatory_ref': item.regulatory_ref,
         'legal_reference': item.legal_reference,
         'evidence_required': item.evidence_required,
-        'document': item.document.url if item.document else None,
+        'document': protected_file_url('evidence', item.id) if item.document else None,
         'notes': item.notes,
         'weight': item.weight,
         'created_at': item.created_at.isoformat(),
@@ -72,12 +85,38 @@ def _serialize_accident(a):
         'follow_up_notes': a.follow_up_notes,
         'follow_up_completed': a.follow_up_completed,
         'follow_up_completed_date': _safe_date(a.follow_up_completed_date),
-        'document': a.document.url if a.document else None,
+        'document': protected_file_url('accident', a.id) if a.document else None,
         'reported_by': a.reported_by,
         'created_at': a.created_at.isoformat(),
     }
 
 
+def _serialize_incident(inc):
+    """Serialize an IncidentReport (photos prefetched) to dict; photos link their WebP derivatives."""
+    return {
+        'id': inc.id,
+        'title': inc.title,
+        'description': inc.description,
+        'severity': inc.severity,
+        'status': inc.status,
+        'location': inc.location,
+        'incident_date': inc.incident_date.isoformat(),
+        'reported_by_name': (inc.reported_by.get_full_name() or inc.reported_by.username) if inc.reported_by else None,
+        'resolved_at': inc.resolved_at.isoformat() if inc.resolved_at else None,
+        'photos': [
+            {
+                'id': p.id,
+                'caption': p.caption,
+                'url': protected_file_url('incident-photo', p.id),
+                **derivative_urls('incident-photo', p),
+                'uploaded_at': p.uploaded_at.isoformat(),
+            }
+            for p in inc.photos.all()
+        ],
+        'created_at': inc.created_at.isoformat(),
+    }
+
+
 # ========== DASHBOARD ==========
 
 @api_view(['GET'])
@@ -86,9 +125,7 @@ def dashboard(request):
     """
     GET /api/compliance/dashboard/
     """
-    score_obj = PeaceOfMindScore.objects.filter(pk=1).first()
-    if not score_obj:
-        score_obj = PeaceOfMindScore.recalculate()
+    score_obj = _current_score()
 
     change_message = None
     change = score_obj.score_change
@@ -139,6 +176,7 @@ def items_list(request):
     """
     GET /api/compliance/items/
     Optional filters: ?status=OVERDUE&type=LEGAL&category=Fire+Safety
+    Paginated: {results, next_cursor}; ?cursor=, ?page_size= (max 200)
     """
     qs = ComplianceItem.objects.select_related('category').all()
     if request.query_params.get('status'):
@@ -148,7 +186,7 @@ def items_list(request):
     if request.query_params.get('category'):
         qs = qs.filter(category__name=request.query_params['category'])
 
-    return Response([_serialize_item(i) for i in qs])
+    return paginate(qs, request, _serialize_item, ordering=ITEM_ORDERING)
 
 
 @api_view(['POST'])
@@ -248,7 +286,7 @@ def mark_complete(request, item_id):
         'next_due_date': _safe_date(item.next_due_date),
         'last_completed_date': _safe_date(item.last_completed_date),
         'completed_by': item.completed_by,
-        'document': item.document.url if item.document else None,
+        'document': protected_file_url('evidence', item.id) if item.document else None,
         'message': f'"{item.title}" marked as compliant. Next due: {item.next_due_date}',
     })
 
@@ -303,13 +341,25 @@ def calendar_data(request):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def accidents_list(request):
-    """GET /api/compliance/accidents/"""
+    """GET /api/compliance/accidents/ — newest first; paginated like items_list"""
     qs = AccidentReport.objects.all()
     if request.query_params.get('status'):
         qs = qs.filter(status=request.query_params['status'])
     if request.query_params.get('riddor'):
         qs = qs.filter(riddor_reportable=True)
-    return Response([_serialize_accident(a) for a in qs])
+    return paginate(qs, request, _serialize_accident, ordering=('-date', '-time', '-id'))
+
+
+# ========== INCIDENTS ==========
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def incidents_list(request):
+    """GET /api/compliance/incidents/?status="""
+    qs = IncidentReport.objects.select_related('reported_by').prefetch_related('photos')
+    if request.query_params.get('status'):
+        qs = qs.filter(status=request.query_params['status'])
+    return Response([_serialize_incident(i) for i in qs])
 
 
 @api_view(['POST'])
@@ -382,67 +432,15 @@ def accidents_update(request, accident_id):
 def breakdown(request):
     """GET /api/compliance/breakdown/"""
     item_type_filter = request.query_params.get('type')
-    categories = ComplianceCategory.objects.all()
-    result = []
-
-    for cat in categories:
-        items = cat.items.all()
-        if item_type_filter:
-            items = items.filter(item_type=item_type_filter)
-        total = items.count()
-        if total == 0:
-            continue
-        compliant = items.filter(status='COMPLIANT').count()
-        due_soon = items.filter(status='DUE_SOON').count()
-        overdue = items.filter(status='OVERDUE').count()
-        cat_total_weight = sum(i.weight for i in items)
-        cat_achieved = sum(i.achieved_weight for i in items)
-        cat_pct = round((cat_achieved / cat_total_weight) * 100) if cat_total_weight > 0 else 100
-
-        result.append({
-            'category': cat.name,
-            'total_items': total,
-            'compliant': compliant,
-            'due_soon': due_soon,
-            'overdue': overdue,
-            'score_pct': cat_pct,
-            'max_score': cat.max_score,
-            'current_score': cat.current_score,
-        })
-
-    return Response({'categories': result, 'filter': item_type_filter or 'all'})
+    analytics = get_analytics(_current_score())
+    return Response({'categories': category_breakdown(analytics, item_type_filter), 'filter': item_type_filter or 'all'})
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def priority_actions(request):
     """GET /api/compliance/priorities/"""
-    overdue_legal = ComplianceItem.objects.filter(status='OVERDUE', item_type='LEGAL').order_by('due_date')
-    overdue_bp = ComplianceItem.objects.filter(status='OVERDUE', item_type='BEST_PRACTICE').order_by('due_date')
-    due_soon_legal = ComplianceItem.objects.filter(status='DUE_SOON', item_type='LEGAL').order_by('due_date')
-    due_soon_bp = ComplianceItem.objects.filter(status='DUE_SOON', item_type='BEST_PRACTICE').order_by('due_date')
-
-    combined = list(overdue_legal) + list(overdue_bp) + list(due_soon_legal) + list(due_soon_bp)
-    top_items = combined[:10]
-
-    actions = []
-    for item in top_items:
-        actions.append({
-            'id': item.id,
-            'title': item.title,
-            'category': item.category.name,
-            'item_type': item.item_type,
-            'status': item.status,
-            'due_date': item.due_date.isoformat() if item.due_date else None,
-            'next_due_date': item.next_due_date.isoformat() if item.next_due_date else None,
-            'regulatory_ref': item.regulatory_ref,
-            'legal_reference': item.legal_reference,
-            'frequency_type': item.frequency_type,
-            'evidence_required': item.evidence_required,
-            'weight': item.weight,
-        })
-
-    return Response({'actions': actions})
+    return Response({'actions': get_analytics(_current_score())['priority_actions']})
 
 
 @api_view(['GET'])
@@ -480,15 +478,25 @@ def audit_log(request):
     })
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def score_trend(request):
+    """
+    GET /api/compliance/trend/?days=30
+    Daily score series (last, min, max, change) from the daily summaries.
+    """
+    try:
+        days = min(TREND_MAX_DAYS, max(1, int(request.query_params.get('days', 30))))
+    except ValueError:
+        return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'days': days, 'series': trend_series(days)})
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def recalculate(request):
     """POST /api/compliance/recalculate/"""
-    result = PeaceOfMindScore.recalculate()
-    latest_log = ScoreAuditLog.objects.order_by('-calculated_at').first()
-    if latest_log:
-        latest_log.trigger = 'manual'
-        latest_log.save(update_fields=['trigger'])
+    result = PeaceOfMindScore.recalculate(trigger='manual')
     return Response({
         'score': result.score,
         'previous_score': result.previous_score,
@@ -505,83 +513,32 @@ def dashboard_v2(request):
     GET /api/compliance/dashboard-v2/
     Enhanced dashboard with time horizon, trend, priority scoring.
     """
-    score_obj = PeaceOfMindScore.objects.filter(pk=1).first()
-    if not score_obj:
-        score_obj = PeaceOfMindScore.recalculate()
-
-    today = timezone.now().date()
+    score_obj = _current_score()
+    # Horizons, priorities and summary counts from one pass over the items
+    analytics = get_analytics(score_obj)
+    horizon = analytics['horizon']
 
-    # --- Time horizon buckets ---
-    items = list(ComplianceItem.objects.select_related('category').all())
-
-    horizon = {'next_7': [], 'next_30': [], 'next_90': [], 'overdue': []}
-    for item in items:
-        due = item.next_due_date
-        if not due:
-            continue
-        if due < today:
-            horizon['overdue'].append(_serialize_item(item))
-        elif due <= today + timedelta(days=7):
-            horizon['next_7'].append(_serialize_item(item))
-        elif due <= today + timedelta(days=30):
-            horizon['next_30'].append(_serialize_item(item))
-        elif due <= today + timedelta(days=90):
-            horizon['next_90'].append(_serialize_item(item))
-
-    # --- Priority scoring ---
-    priority_items = []
-    for item in items:
-        p_score = 0
-        due = item.next_due_date
-        if item.item_type == 'LEGAL' and item.status == 'OVERDUE':
-            p_score += 50
-        elif item.item_type == 'LEGAL' and due and due <= today + timedelta(days=14):
-            p_score += 30
-        elif item.item_type == 'BEST_PRACTICE' and item.status == 'OVERDUE':
-            p_score += 20
-        elif item.item_type == 'BEST_PRACTICE' and due and due <= today + timedelta(days=30):
-            p_score += 10
-
-        if p_score > 0 or item.status != 'COMPLIANT':
-            level = 'high' if p_score >= 30 else ('medium' if p_score >= 10 else 'low')
-            serialized = _serialize_item(item)
-            serialized['priority_score'] = p_score
-            serialized['priority_level'] = level
-            priority_items.append(serialized)
-
-    priority_items.sort(key=lambda x: -x['priority_score'])
-
-    # --- Trend data (last 30 days from audit log) ---
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    logs = ScoreAuditLog.objects.filter(
-        calculated_at__gte=thirty_days_ago
-    ).order_by('calculated_at')
-    trend = [{
-        'date': log.calculated_at.isoformat(),
-        'score': log.score,
-        'trigger': log.get_trigger_display(),
-        'change': log.score - log.previous_score,
-    } for log in logs]
+    # --- Trend data (last 30 days, one point per day) ---
+    trend = trend_series(30)
 
     # --- Dynamic summary text ---
     summary_parts = []
     if score_obj.score >= 80:
         summary_parts.append("You are fully compliant.")
-    overdue_legal = ComplianceItem.objects.filter(status='OVERDUE', item_type='LEGAL').count()
+    overdue_legal = analytics['overdue_legal']
     if overdue_legal > 0:
         summary_parts.append(f"{overdue_legal} legal item{'s' if overdue_legal != 1 else ''} overdue — immediate action required.")
-    due_14 = ComplianceItem.objects.filter(
-        status='DUE_SOON', item_type='LEGAL',
-        next_due_date__lte=today + timedelta(days=14)
-    ).count()
+    due_14 = analytics['legal_due_14']
     if due_14 > 0:
         summary_parts.append(f"{due_14} legal item{'s' if due_14 != 1 else ''} due within 14 days.")
     if not summary_parts:
         summary_parts.append(score_obj.interpretation)
 
     # Accident stats
-    open_accidents = AccidentReport.objects.exclude(status='CLOSED').count()
-    riddor_count = AccidentReport.objects.filter(riddor_reportable=True).count()
+    accidents = AccidentReport.objects.aggregate(
+        open=Count('id', filter=~Q(status='CLOSED')),
+        riddor=Count('id', filter=Q(riddor_reportable=True)),
+    )
 
     return Response({
         'score': score_obj.score,
@@ -606,7 +563,7 @@ def dashboard_v2(request):
             'next_90_items': horizon['next_90'],
         },
         'trend': trend,
-        'priority_items': priority_items,
-        'open_accidents': open_accidents,
-        'riddor_count': riddor_count,
+        'priority_items': analytics['priority_items'],
+        'open_accidents': accidents['open'],
+        'riddor_count': accidents['riddor'],
     })
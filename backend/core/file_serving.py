@@ -0,0 +1,214 @@
+"""
+Protected File Serving — vault documents, compliance evidence, incident photos, chat attachments
+
+GET /api/files/<kind>/<id>/                     the uploaded file
+GET /api/files/<kind>/<id>/?variant=thumbnail   its WebP thumbnail / preview (core.thumbnails)
+
+Uploaded files are served through this endpoint instead of their public
+/media/ URL. Each request is authenticated (JWT or session) and vault
+documents also enforce Document.access_level.
+
+- ETag: the SHA-256 of the content where it is known (vault documents,
+  content-addressed blobs), otherwise a weak tag from size and mtime
+- Last-Modified from the file's mtime; If-None-Match / If-Modified-Since
+  answer 304 without touching the file
+- Range: a single byte range is served as 206 Partial Content, so large PDFs
+  open progressively (If-Range is honoured, multiple ranges get the whole file)
+- FILE_SERVE_OFFLOAD='x-accel-redirect' hands the body to nginx through an
+  internal location at FILE_SERVE_ACCEL_PREFIX mapped onto MEDIA_ROOT;
+  'x-sendfile' does the same for Apache/lighttpd. Django still checks access
+  and preconditions, the proxy sends the bytes and handles ranges.
+- Otherwise the body streams from disk in blocks, under ASGI too
+  (core.streaming)
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .streaming import StreamingFileResponse, StreamingResponse
+
+CHUNK_SIZE = 64 * 1024
+
+# kind → (model label, file field, field holding the download name or None)
+PROTECTED_FILES = {
+    'document': ('documents.Document', 'file', 'filename'),
+    'evidence': ('compliance.ComplianceItem', 'document', None),
+    'accident': ('compliance.AccidentReport', 'document', None),
+    'rams': ('compliance.RAMSDocument', 'document', None),
+    'incident-photo': ('compliance.IncidentPhoto', 'image', None),
+    'attachment': ('comms.MessageAttachment', 'file', 'filename'),
+}
+
+# Upload directories only reachable through this endpoint, not /media/
+PROTECTED_MEDIA_PREFIXES = ('vault/', 'compliance/', 'chat_attachments/')
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def protected_file_url(kind, pk, variant=None):
+    url = reverse('protected-file', args=[kind, pk])
+    return f'{url}?variant={variant}' if variant else url
+
+
+def derivative_urls(kind, obj):
+    """{'thumbnail_url', 'preview_url'} of a record with image derivatives, None until rendered."""
+    return {
+        f'{field}_url': protected_file_url(kind, obj.pk, field) if getattr(obj, field) else None
+        for field in ('thumbnail', 'preview')
+    }
+
+
+def is_protected_media(path):
+    return os.path.normpath(path).lstrip('/').startswith(PROTECTED_MEDIA_PREFIXES)
+
+
+def _etag(fieldfile, stat, sha256=''):
+    from documents.storage import is_blob
+    if not sha256 and is_blob(fieldfile.name):
+        sha256 = os.path.splitext(os.path.basename(fieldfile.name))[0]
+    if sha256:
+        return f'"{sha256}"'
+    return f'W/"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _byte_range(request, size, etag, last_modified):
+    """
+    (start, end) of the single byte range requested, inclusive; None to send
+    the whole file; False when the range cannot be satisfied.
+    """
+    header = request.META.get('HTTP_RANGE', '')
+    if not header or request.method not in ('GET', 'HEAD'):
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range != etag and parse_http_date_safe(if_range) != last_modified:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size or size == 0:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(request, fieldfile, filename='', content_type='', sha256=''):
+    """A conditional, range-capable response for a stored FieldFile."""
+    try:
+        path = fieldfile.storage.path(fieldfile.name)
+        stat = os.stat(path)
+    except (NotImplementedError, OSError):
+        return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    filename = filename or os.path.basename(fieldfile.name)
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    etag = _etag(fieldfile, stat, sha256)
+    last_modified = int(stat.st_mtime)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': 'private, no-cache',
+        'Accept-Ranges': 'bytes',
+    }
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    offload = getattr(settings, 'FILE_SERVE_OFFLOAD', '')
+    if offload in ('x-accel-redirect', 'x-sendfile'):
+        response = HttpResponse(content_type=content_type)
+        if offload == 'x-accel-redirect':
+            prefix = getattr(settings, 'FILE_SERVE_ACCEL_PREFIX', '/protected-media/')
+            response['X-Accel-Redirect'] = quote(prefix.rstrip('/') + '/' + fieldfile.name)
+        else:
+            response['X-Sendfile'] = path
+    else:
+        byte_range = _byte_range(request, stat.st_size, etag, last_modified)
+        if byte_range is False:
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        if byte_range is None:
+            response = StreamingFileResponse(open(path, 'rb'), content_type=content_type)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingResponse(
+                _read_range(path, start, length), status=status.HTTP_206_PARTIAL_CONTENT,
+                content_type=content_type,
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = str(length)
+
+    response['Content-Disposition'] = content_disposition_header(False, filename)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def serve_protected_file(request, kind, pk):
+    """GET /api/files/<kind>/<id>/ — the file attached to one record, if the user may see it."""
+    source = PROTECTED_FILES.get(kind)
+    if source is None:
+        return Response({'error': 'Unknown file type'}, status=status.HTTP_404_NOT_FOUND)
+    label, field_name, name_field = source
+    obj = apps.get_model(label).objects.filter(pk=pk).first()
+    fieldfile = getattr(obj, field_name, None)
+    if not fieldfile:
+        return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    if hasattr(obj, 'can_access') and not obj.can_access(request.user):
+        return Response({'error': 'You do not have access to this file'}, status=status.HTTP_403_FORBIDDEN)
+
+    filename = (getattr(obj, name_field, '') if name_field else '') or os.path.basename(fieldfile.name)
+    variant = request.query_params.get('variant')
+    if variant:
+        from .thumbnails import DERIVATIVE_SIZES, DERIVATIVE_SOURCES
+        known = kind in DERIVATIVE_SOURCES and variant in [field for field, _, _ in DERIVATIVE_SIZES]
+        derivative = getattr(obj, variant) if known else None
+        if not derivative:
+            return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
+        return file_response(
+            request, derivative,
+            filename=f'{os.path.splitext(filename)[0]}.webp', content_type='image/webp',
+        )
+
+    return file_response(
+        request, fieldfile,
+        filename=filename,
+        content_type=getattr(obj, 'content_type', ''),
+        sha256=getattr(obj, 'sha256', ''),
+    )
@@ -0,0 +1,61 @@
+"""
+Management command: generate_thumbnails
+Renders the WebP thumbnails and previews of incident photos and chat image
+attachments that are still pending: uploads made before derivatives existed,
+or ones whose background render was lost to a restart. Every run re-queues
+renders left 'processing' for longer than core.thumbnails.STALE_AFTER.
+
+Usage:
+    python manage.py generate_thumbnails                  # Render pending derivatives once
+    python manage.py generate_thumbnails --retry-failed   # Also retry failed/interrupted renders
+    python manage.py generate_thumbnails --loop           # Run continuously (for Railway)
+"""
+import time
+import logging
+from django.core.management.base import BaseCommand
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Render pending WebP thumbnails and previews for uploaded images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=200, help='Records per source per run (default: 200)')
+        parser.add_argument('--retry-failed', action='store_true', help='Re-queue failed and interrupted renders first')
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Run continuously in a loop (for Railway background worker)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=10,
+            help='Interval in minutes between checks (default: 10)',
+        )
+
+    def handle(self, *args, **options):
+        from core.thumbnails import process_pending
+
+        if options['loop']:
+            interval = options['interval']
+            self.stdout.write(self.style.SUCCESS(
+                f'[THUMBNAILS] Starting thumbnail sweep loop (every {interval} minutes)'
+            ))
+            while True:
+                try:
+                    results = process_pending(limit=options['limit'])
+                    if results:
+                        self.stdout.write(self.style.SUCCESS(f'[THUMBNAILS] {self._summary(results)}'))
+                except Exception as e:
+                    self.stderr.write(self.style.ERROR(f'[THUMBNAILS] Error: {e}'))
+                    logger.exception('[THUMBNAILS] Unhandled error in thumbnail loop')
+                time.sleep(interval * 60)
+        else:
+            results = process_pending(limit=options['limit'], retry_failed=options['retry_failed'])
+            self.stdout.write(self.style.SUCCESS(f'Thumbnails — {self._summary(results)}'))
+
+    @staticmethod
+    def _summary(results):
+        return ', '.join(f'{status}: {count}' for status, count in sorted(results.items())) or 'nothing pending'
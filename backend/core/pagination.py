@@ -0,0 +1,172 @@
+"""
+Pagination — opaque cursors for list endpoints
+Paginated lists respond with
+
+    {"results": [...], "next_cursor": "<opaque>" | null}
+
+and the client passes next_cursor back as ?cursor= for the following page,
+with an optional ?page_size=. Cursors are URL-safe base64 JSON; clients must
+not build or interpret them, so the paging strategy behind an endpoint can
+change without breaking callers.
+
+Lists with a stable ordering page by keyset (keyset_page): the cursor holds
+the ordering values of the last row sent and the next page starts strictly
+after them, so rows inserted or deleted meanwhile never shift a page and
+every page is an index range scan, however deep. Relevance-ordered results
+page by offset (offset_page). Views normally call paginate(), which picks
+one of the two and answers bad parameters with a 400.
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import json
+from functools import reduce
+from operator import and_, or_
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(data):
+    raw = json.dumps(data, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """The dict encoded in `value`; InvalidCursor when it was not issued by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+        data = json.loads(raw)
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(data, dict):
+        raise InvalidCursor('Invalid cursor')
+    return data
+
+
+def page_size_param(request, default_size, max_size):
+    """?page_size= clamped to 1..max_size; ValueError when not an integer."""
+    return min(max_size, max(1, int(request.query_params.get('page_size', default_size))))
+
+
+def offset_page(qs, request, default_size=50, max_size=200):
+    """
+    One page of `qs` (already ordered) and the cursor of the next one, or None.
+    For orderings with no usable key, such as search relevance. Raises
+    ValueError (InvalidCursor included) for bad parameters.
+    """
+    page_size = page_size_param(request, default_size, max_size)
+    cursor = request.query_params.get('cursor')
+    offset = 0
+    if cursor:
+        offset = decode_cursor(cursor).get('o')
+        if not isinstance(offset, int) or offset < 0:
+            raise InvalidCursor('Invalid cursor')
+    rows = list(qs[offset:offset + page_size + 1])
+    next_cursor = encode_cursor({'o': offset + page_size}) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def _ordering_field(model, path):
+    """The field at the end of `path`, and whether its value can be NULL (a nullable join included)."""
+    field, nullable = None, False
+    for part in path.split('__'):
+        field = model._meta.get_field(part)
+        nullable = nullable or field.null
+        model = field.related_model
+    return field, nullable
+
+
+def _order_by(name, desc, nullable):
+    if not nullable:
+        return f'-{name}' if desc else name
+    return F(name).desc(nulls_first=True) if desc else F(name).asc(nulls_last=True)
+
+
+def _cursor_value(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def _row_value(row, path):
+    for part in path.split('__'):
+        row = getattr(row, part) if row is not None else None
+    return row.pk if hasattr(row, '_meta') else row
+
+
+def keyset_page(qs, request, ordering, default_size=50, max_size=200):
+    """
+    One page of `qs` ordered by `ordering` and the cursor of the next one, or
+    None. `ordering` is a tuple of field paths ('-created_at', '-id') ending in
+    a unique column; NULLs sort as the largest value, as PostgreSQL indexes do.
+    Raises ValueError (InvalidCursor included) for bad parameters.
+    """
+    page_size = page_size_param(request, default_size, max_size)
+    keys = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+    fields = [_ordering_field(qs.model, name) for name, _ in keys]
+    qs = qs.order_by(*[_order_by(name, desc, nullable) for (name, desc), (_, nullable) in zip(keys, fields)])
+
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        values = decode_cursor(cursor).get('k')
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise InvalidCursor('Invalid cursor')
+        try:
+            values = [None if v is None else f.to_python(v) for (f, _), v in zip(fields, values)]
+        except (ValidationError, TypeError):
+            raise InvalidCursor('Invalid cursor')
+        qs = qs.filter(_after(keys, fields, values))
+
+    rows = list(qs[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        last = rows[page_size - 1]
+        next_cursor = encode_cursor({'k': [_cursor_value(_row_value(last, name)) for name, _ in keys]})
+    return rows[:page_size], next_cursor
+
+
+def _after(keys, fields, values):
+    """Rows sorting strictly after `values`: equal on a prefix of the keys, then past the next one."""
+    branches = []
+    for i, ((name, desc), (_, nullable), value) in enumerate(zip(keys, fields, values)):
+        if value is None:
+            # NULL is the largest value: nothing is past it ascending, every non-NULL is descending
+            past = Q(**{f'{name}__isnull': False}) if desc else None
+        else:
+            past = Q(**{f'{name}__{"lt" if desc else "gt"}': value})
+            if nullable and not desc:
+                past |= Q(**{f'{name}__isnull': True})
+        if past is not None:
+            equal = [
+                Q(**{f'{n}__isnull': True}) if v is None else Q(**{n: v})
+                for (n, _), v in zip(keys[:i], values[:i])
+            ]
+            branches.append(reduce(and_, equal, past))
+    return reduce(or_, branches) if branches else Q(pk__in=[])
+
+
+def paginate(qs, request, serialize, ordering=None, default_size=50, max_size=200):
+    """
+    The paginated response for `qs`, each row passed through `serialize`.
+    Keyset pages by `ordering` when given; otherwise offset pages `qs` in its
+    own (already applied) order.
+    """
+    try:
+        if ordering:
+            rows, next_cursor = keyset_page(qs, request, ordering, default_size, max_size)
+        else:
+            rows, next_cursor = offset_page(qs, request, default_size, max_size)
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError:
+        return Response({'error': 'page_size must be a whole number'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'results': [serialize(row) for row in rows], 'next_cursor': next_cursor})
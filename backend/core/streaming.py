@@ -0,0 +1,50 @@
+"""
+Streaming responses under ASGI
+Django hands an ASGI server a StreamingHttpResponse built on a sync iterator
+by reading the whole iterator into a list first, so a CSV export or a file
+download would sit in memory before its first byte went out. These
+responses keep the sync iterator for WSGI and, under ASGI, read it in the
+worker thread a block of about STREAM_BLOCK_SIZE bytes at a time.
+
+Iteration stays on the thread Django runs sync views on (sync_to_async is
+thread-sensitive by default), so a queryset iterator keeps using the
+connection that opened its cursor.
+"""
+from asgiref.sync import sync_to_async
+from django.http import FileResponse, StreamingHttpResponse
+
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+def _next_block(iterator, size):
+    """Join parts from `iterator` until at least `size` bytes; b'' once it is exhausted."""
+    parts = []
+    length = 0
+    for part in iterator:
+        parts.append(part)
+        length += len(part)
+        if length >= size:
+            break
+    return b''.join(parts)
+
+
+class BlockStreamingMixin:
+    block_size = STREAM_BLOCK_SIZE
+
+    async def __aiter__(self):
+        if self.is_async:
+            async for part in super().__aiter__():
+                yield part
+            return
+        content = self.streaming_content
+        read_block = sync_to_async(_next_block)
+        while block := await read_block(content, self.block_size):
+            yield block
+
+
+class StreamingResponse(BlockStreamingMixin, StreamingHttpResponse):
+    pass
+
+
+class StreamingFileResponse(BlockStreamingMixin, FileResponse):
+    pass
@@ -1,3 +1,312 @@
-from django.test import TestCase
+"""
+Core — Unit Tests
+Protected file serving: access levels, ETag/Last-Modified revalidation,
+byte ranges and proxy offload. CSV exports and files streamed in blocks
+through the ASGI handler. WebP derivatives rendered after commit,
+stale renders re-queued and derivative files deleted with their record.
+Keyset cursor pagination of list endpoints.
+"""
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import warnings
+from datetime import date, time
+from io import BytesIO
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from comms.models import Channel, Message, MessageAttachment
+from compliance.models import AccidentReport, ComplianceCategory, ComplianceItem, IncidentPhoto, IncidentReport
+from crm.models import Lead
+from documents.models import Document
+from .streaming import STREAM_BLOCK_SIZE, StreamingResponse
+from .thumbnails import STALE_AFTER, process_pending
+
+User = get_user_model()
+
+
+class ProtectedFileServingTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.body = bytes(range(256)) * 400
+        self.doc = Document.objects.create(
+            title='Insurance', access_level='manager',
+            file=SimpleUploadedFile('insurance.pdf', self.body, content_type='application/pdf'),
+        )
+        self.url = f'/api/files/document/{self.doc.pk}/'
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user('mo', password='x', is_staff=True))
+
+    def _content(self, resp):
+        return b''.join(resp.streaming_content)
+
+    def test_full_file_with_validators(self):
+        resp = self.api.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self._content(resp), self.body)
+        self.assertEqual(resp['ETag'], f'"{hashlib.sha256(self.body).hexdigest()}"')
+        self.assertEqual(resp['Content-Type'], 'application/pdf')
+        self.assertEqual(resp['Accept-Ranges'], 'bytes')
+        self.assertIn('insurance.pdf', resp['Content-Disposition'])
+
+        self.assertEqual(self.api.get(self.url, HTTP_IF_NONE_MATCH=resp['ETag']).status_code, 304)
+        self.assertEqual(self.api.get(self.url, HTTP_IF_MODIFIED_SINCE=resp['Last-Modified']).status_code, 304)
+
+    def test_byte_ranges(self):
+        resp = self.api.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp['Content-Range'], f'bytes 100-199/{len(self.body)}')
+        self.assertEqual(self._content(resp), self.body[100:200])
+
+        resp = self.api.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(self._content(resp), self.body[-10:])
+
+        resp = self.api.get(self.url, HTTP_RANGE=f'bytes={len(self.body)}-')
+        self.assertEqual(resp.status_code, 416)
+
+        # A stale If-Range gets the whole (changed) file
+        resp = self.api.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(resp.status_code, 200)
+
+    def test_access_level_enforced(self):
+        staff = APIClient()
+        staff.force_authenticate(User.objects.create_user('sam', password='x'))
+        self.assertEqual(staff.get(self.url).status_code, 403)
+        self.assertEqual(APIClient().get(self.url).status_code, 401)
+        self.assertEqual(self.api.get('/api/files/nope/1/').status_code, 404)
+        self.assertEqual(self.api.get(f'/media/{self.doc.file.name}').status_code, 404)
+
+    @override_settings(FILE_SERVE_OFFLOAD='x-accel-redirect', FILE_SERVE_ACCEL_PREFIX='/protected-media/')
+    def test_offload_to_proxy(self):
+        resp = self.api.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['X-Accel-Redirect'], f'/protected-media/{self.doc.file.name}')
+        self.assertEqual(resp.content, b'')
+
+
+class AsgiStreamingTests(TestCase):
+    """Responses served through the ASGI handler, as under the uvicorn workers in start.sh."""
+
+    def setUp(self):
+        # As the test clients do: the handler's request signals would close the test transaction
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+
+    async def _asgi_get(self, path, headers=()):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+            'headers': [(b'host', b'testserver'), *headers], 'server': ('testserver', 80),
+            'client': ('127.0.0.1', 5000),
+        }
+        sent = []
+        messages = asyncio.Queue()
+        messages.put_nowait({'type': 'http.request', 'body': b'', 'more_body': False})
+
+        async def receive():
+            # After the request body the handler listens for a disconnect that never comes
+            return await messages.get()
+
+        async def send(message):
+            sent.append(message)
+
+        with warnings.catch_warnings():
+            # Django warns when it has to buffer a sync iterator for ASGI
+            warnings.simplefilter('error')
+            await ASGIHandler()(scope, receive, send)
+        self.assertEqual(sent[0]['type'], 'http.response.start')
+        return sent[0]['status'], [m['body'] for m in sent[1:] if m.get('body')]
+
+    async def test_csv_export_streams_in_blocks(self):
+        await Lead.objects.abulk_create(Lead(name=f'Lead {i}', email=f'lead{i}@example.com') for i in range(300))
+        with mock.patch.object(StreamingResponse, 'block_size', 1024):
+            status, blocks = await self._asgi_get('/api/crm/leads/export/')
+        self.assertEqual(status, 200)
+        self.assertGreater(len(blocks), 10)
+        self.assertTrue(all(len(block) < 1200 for block in blocks))
+        lines = b''.join(blocks).decode().splitlines()
+        self.assertEqual((len(lines), lines[0].split(',')[0]), (301, 'Name'))
+
+    async def test_protected_file_streams_in_blocks(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        body = bytes(range(256)) * 1024
+        with override_settings(MEDIA_ROOT=media):
+            user = await User.objects.acreate_user('mo', password='x', is_staff=True)
+            doc = await sync_to_async(Document.objects.create)(
+                title='Insurance', file=SimpleUploadedFile('insurance.pdf', body, content_type='application/pdf'),
+            )
+            auth = (b'authorization', f'Bearer {RefreshToken.for_user(user).access_token}'.encode())
+            status, blocks = await self._asgi_get(f'/api/files/document/{doc.pk}/', [auth])
+            self.assertEqual((status, b''.join(blocks)), (200, body))
+            self.assertEqual(len(blocks), len(body) // STREAM_BLOCK_SIZE)
+
+            status, blocks = await self._asgi_get(
+                f'/api/files/document/{doc.pk}/', [auth, (b'range', b'bytes=1000-199999')],
+            )
+            self.assertEqual((status, b''.join(blocks)), (206, body[1000:200000]))
+
+
+@override_settings(THUMBNAILS_ASYNC=False)
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user('mo', password='x')
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+        self.incident = IncidentReport.objects.create(
+            title='Slip', description='Wet floor', incident_date=timezone.now(),
+        )
+
+    def _jpeg(self, size=(2400, 1600)):
+        buf = BytesIO()
+        Image.new('RGB', size, (200, 80, 40)).save(buf, 'JPEG')
+        return SimpleUploadedFile('IMG_0001.jpg', buf.getvalue(), content_type='image/jpeg')
+
+    def test_photo_derivatives_rendered_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            photo = IncidentPhoto.objects.create(incident=self.incident, image=self._jpeg())
+        photo.refresh_from_db()
+        self.assertEqual(photo.derivatives_status, 'ready')
+        self.assertTrue(photo.thumbnail.name.endswith('IMG_0001.thumb.webp'))
+        with Image.open(photo.thumbnail.path) as thumb, Image.open(photo.preview.path) as preview:
+            self.assertEqual((thumb.format, thumb.size), ('WEBP', (320, 213)))
+            self.assertEqual(preview.size, (1280, 853))
+
+        data = self.api.get('/api/compliance/incidents/').json()
+        urls = data[0]['photos'][0]
+        self.assertEqual(urls['thumbnail_url'], f'/api/files/incident-photo/{photo.pk}/?variant=thumbnail')
+        resp = self.api.get(urls['thumbnail_url'])
+        self.assertEqual(resp['Content-Type'], 'image/webp')
+        self.assertEqual(resp['Content-Disposition'], 'inline; filename="IMG_0001.webp"')
+        self.assertEqual(self.api.get(f'/api/files/incident-photo/{photo.pk}/?variant=delete').status_code, 404)
+
+    def test_attachments_and_pending_sweep(self):
+        message = Message.objects.create(channel=Channel.objects.create(name='General'), sender=self.user)
+        # Created without the commit hook running, as before derivatives existed
+        image = MessageAttachment.objects.create(
+            message=message, file=self._jpeg((400, 300)), filename='photo.jpg', content_type='image/jpeg',
+        )
+        pdf = MessageAttachment.objects.create(
+            message=message, file=SimpleUploadedFile('rota.pdf', b'%PDF-1.4'), filename='rota.pdf',
+            content_type='application/pdf',
+        )
+        self.assertEqual(process_pending(), {'ready': 1, 'skipped': 1})
+        self.assertEqual(process_pending(), {})
+        image.refresh_from_db()
+        pdf.refresh_from_db()
+        self.assertEqual((image.derivatives_status, pdf.derivatives_status), ('ready', 'skipped'))
+        self.assertFalse(pdf.thumbnail)
+
+    def test_stale_processing_requeued(self):
+        photo = IncidentPhoto.objects.create(incident=self.incident, image=self._jpeg((400, 300)))
+        claimed = timezone.now() - STALE_AFTER
+        IncidentPhoto.objects.filter(pk=photo.pk).update(derivatives_status='processing', derivatives_claimed_at=claimed)
+        fresh = IncidentPhoto.objects.create(incident=self.incident, image=self._jpeg((400, 300)))
+        IncidentPhoto.objects.filter(pk=fresh.pk).update(
+            derivatives_status='processing', derivatives_claimed_at=timezone.now(),
+        )
+        self.assertEqual(process_pending(), {'ready': 1})
+        photo.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual((photo.derivatives_status, fresh.derivatives_status), ('ready', 'processing'))
+
+    def test_derivative_files_deleted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            photo = IncidentPhoto.objects.create(incident=self.incident, image=self._jpeg())
+        photo.refresh_from_db()
+        old_paths = [photo.thumbnail.path, photo.preview.path]
+
+        photo.image = self._jpeg((400, 300))
+        with self.captureOnCommitCallbacks(execute=True):
+            photo.save()
+        photo.refresh_from_db()
+        self.assertEqual(photo.derivatives_status, 'ready')
+        self.assertFalse(any(os.path.exists(path) for path in old_paths))
+
+        paths = [photo.thumbnail.path, photo.preview.path]
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+        with self.captureOnCommitCallbacks(execute=True):
+            photo.delete()
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+
+    def _walk(self, url, page_size, **params):
+        ids, cursor = [], None
+        while True:
+            query = dict(params, page_size=page_size, **({'cursor': cursor} if cursor else {}))
+            resp = self.api.get(url, query)
+            self.assertEqual(resp.status_code, 200)
+            data = resp.json()
+            self.assertLessEqual(len(data['results']), page_size)
+            ids += [row['id'] for row in data['results']]
+            cursor = data['next_cursor']
+            if not cursor:
+                return ids
+
+    def test_leads_stable_under_inserts(self):
+        leads = [Lead.objects.create(name=f'Lead {i}') for i in range(5)]
+        # Ties on created_at are broken by id
+        Lead.objects.update(created_at=timezone.now())
+        first = self.api.get('/api/crm/leads/', {'page_size': 2}).json()
+        self.assertEqual([r['id'] for r in first['results']], [leads[4].pk, leads[3].pk])
+
+        Lead.objects.create(name='Newer')
+        rest = self.api.get('/api/crm/leads/', {'page_size': 10, 'cursor': first['next_cursor']}).json()
+        self.assertEqual([r['id'] for r in rest['results']], [leads[2].pk, leads[1].pk, leads[0].pk])
+        self.assertIsNone(rest['next_cursor'])
+
+        self.assertEqual(self._walk('/api/crm/leads/', 4, status='NEW'), list(
+            Lead.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        ))
+        self.assertEqual(self.api.get('/api/crm/leads/', {'cursor': first['next_cursor'][:-3]}).status_code, 400)
+
+    def test_nullable_keys(self):
+        specs = [(date(2026, 3, 1), None), (date(2026, 3, 1), time(9)), (date(2026, 3, 1), time(14)),
+                 (date(2026, 2, 1), None), (date(2026, 4, 1), time(8)), (date(2026, 3, 1), None)]
+        made = [AccidentReport.objects.create(date=d, time=t, person_involved='Sam', description='Fall')
+                for d, t in specs]
+        expected = [made[i].pk for i in (4, 5, 0, 2, 1, 3)]
+        self.assertEqual(self._walk('/api/compliance/accidents/', 1), expected)
+        self.assertEqual(self._walk('/api/compliance/accidents/', 4), expected)
+
+    def test_compliance_register_order(self):
+        later = ComplianceCategory.objects.create(name='Admin', order=2)
+        first = ComplianceCategory.objects.create(name='Fire Safety', order=1)
+        items = [
+            ComplianceItem.objects.create(title='Zebra check', category=first, item_type='LEGAL'),
+            ComplianceItem.objects.create(title='Alarm test', category=first, item_type='LEGAL'),
+            ComplianceItem.objects.create(title='Alarm test', category=first, item_type='LEGAL'),
+            ComplianceItem.objects.create(title='Insurance', category=later, item_type='LEGAL'),
+        ]
+        self.assertEqual(
+            self._walk('/api/compliance/items/', 1),
+            [items[1].pk, items[2].pk, items[0].pk, items[3].pk],
+        )
@@ -0,0 +1,193 @@
+"""
+Image Derivatives — WebP thumbnails and previews generated off the request path
+Incident photos and chat image attachments get two downscaled WebP copies,
+stored next to the original:
+
+    <original dir>/<name>.preview.webp      longest edge 1280px
+    <original dir>/<name>.thumb.webp        longest edge 320px
+
+A new upload is queued with derivatives_status='pending'. Once the
+transaction commits a background thread renders it (THUMBNAILS_ASYNC=False
+renders inline instead, e.g. in tests), and the generate_thumbnails job
+sweeps up anything left pending: uploads from before this existed, or work
+lost to a restart (a render still 'processing' STALE_AFTER after it was
+claimed is queued again). Rendering decodes the original once (JPEGs at reduced
+scale via draft()), applies the EXIF orientation and derives the thumbnail
+from the preview.
+
+Lists and dashboards link the derivatives through the protected file endpoint
+(?variant=thumbnail|preview) and fall back to the original while pending.
+Derivative files are deleted when the image is replaced or its record deleted.
+"""
+import logging
+import mimetypes
+import os
+import threading
+from datetime import timedelta
+from io import BytesIO
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_STATUS_CHOICES = [
+    ('pending', 'Pending'),
+    ('processing', 'Processing'),
+    ('ready', 'Ready'),
+    ('skipped', 'Not an image'),
+    ('failed', 'Failed'),
+]
+
+# kind (as in core.file_serving) → (model label, source image field)
+DERIVATIVE_SOURCES = {
+    'incident-photo': ('compliance.IncidentPhoto', 'image'),
+    'attachment': ('comms.MessageAttachment', 'file'),
+}
+
+# (derivative field, file suffix, longest edge in px), largest first
+DERIVATIVE_SIZES = (
+    ('preview', 'preview', 1280),
+    ('thumbnail', 'thumb', 320),
+)
+WEBP_QUALITY = 80
+
+# A render claimed longer ago than this is taken to have died with its worker
+STALE_AFTER = timedelta(minutes=15)
+
+# Image types Pillow cannot rasterise
+UNSUPPORTED_TYPES = ('image/svg+xml',)
+
+
+def derivative_name(source_name, suffix):
+    stem = os.path.splitext(source_name)[0]
+    return f'{stem}.{suffix}.webp'
+
+
+def _is_image(obj, source):
+    content_type = getattr(obj, 'content_type', '') or mimetypes.guess_type(source.name)[0] or ''
+    return content_type.startswith('image/') and content_type not in UNSUPPORTED_TYPES
+
+
+def render_derivatives(source):
+    """Write the WebP derivatives of a stored image; returns {field: stored name}."""
+    from PIL import Image, ImageOps
+
+    storage = source.storage
+    largest = DERIVATIVE_SIZES[0][2]
+    names = {}
+    with storage.open(source.name, 'rb') as f, Image.open(f) as original:
+        original.draft('RGB', (largest, largest))
+        img = ImageOps.exif_transpose(original)
+        has_alpha = img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+        for field, suffix, edge in DERIVATIVE_SIZES:
+            img.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            buf = BytesIO()
+            img.save(buf, 'WEBP', quality=WEBP_QUALITY, method=4)
+            names[field] = storage.save(derivative_name(source.name, suffix), ContentFile(buf.getvalue()))
+    return names
+
+
+def generate_derivatives(kind, pk):
+    """
+    Render the derivatives of one pending record. Returns the new status, or
+    None when the record is gone or another worker already claimed it.
+    """
+    label, field_name = DERIVATIVE_SOURCES[kind]
+    model = apps.get_model(label)
+    claimed_at = timezone.now()
+    claimed = model.objects.filter(pk=pk, derivatives_status='pending').update(
+        derivatives_status='processing', derivatives_claimed_at=claimed_at,
+    )
+    if not claimed:
+        return None
+    obj = model.objects.filter(pk=pk).first()
+    if obj is None:
+        return None
+
+    source = getattr(obj, field_name)
+    updates = {}
+    if not source or not _is_image(obj, source):
+        result = 'skipped'
+    else:
+        try:
+            updates = render_derivatives(source)
+            result = 'ready'
+        except Exception:
+            logger.exception(f'[THUMBNAILS] Could not render {kind} #{pk}')
+            result = 'failed'
+    # Only while the claim still holds: the record may have been deleted,
+    # given a new image or re-queued as stale while this render ran
+    if not model.objects.filter(pk=pk, derivatives_status='processing', derivatives_claimed_at=claimed_at).update(
+        derivatives_status=result, **updates
+    ):
+        _delete_files(source.storage, updates.values())
+        return None
+    return result
+
+
+def _generate_in_background(kind, pk):
+    try:
+        generate_derivatives(kind, pk)
+    finally:
+        connection.close()
+
+
+def schedule_derivatives(kind, pk):
+    """Render derivatives once the current transaction commits, without holding up the request."""
+    def start():
+        if getattr(settings, 'THUMBNAILS_ASYNC', True):
+            threading.Thread(target=_generate_in_background, args=(kind, pk), daemon=True).start()
+        else:
+            generate_derivatives(kind, pk)
+    transaction.on_commit(start)
+
+
+def _delete_files(storage, names):
+    for name in names:
+        if name:
+            storage.delete(name)
+
+
+def delete_derivatives(instance):
+    """Delete a record's derivative files once the current transaction commits."""
+    names = [getattr(instance, field).name for field, _, _ in DERIVATIVE_SIZES if getattr(instance, field)]
+    if names:
+        storage = getattr(instance, DERIVATIVE_SIZES[0][0]).storage
+        transaction.on_commit(lambda: _delete_files(storage, names))
+
+
+def queue_derivatives(instance, kind):
+    """Mark a record's derivatives out of date, delete the old files and schedule the rebuild."""
+    stale = type(instance).objects.filter(pk=instance.pk).values(*(field for field, _, _ in DERIVATIVE_SIZES)).first()
+    type(instance).objects.filter(pk=instance.pk).update(
+        derivatives_status='pending', **{field: None for field, _, _ in DERIVATIVE_SIZES}
+    )
+    if stale:
+        storage = getattr(instance, DERIVATIVE_SIZES[0][0]).storage
+        transaction.on_commit(lambda: _delete_files(storage, stale.values()))
+    schedule_derivatives(kind, instance.pk)
+
+
+def process_pending(limit=200, retry_failed=False):
+    """Render up to `limit` pending records per source; returns {status: count}."""
+    results = {}
+    for kind, (label, _) in DERIVATIVE_SOURCES.items():
+        model = apps.get_model(label)
+        if retry_failed:
+            model.objects.filter(derivatives_status__in=['failed', 'processing']).update(derivatives_status='pending')
+        else:
+            model.objects.filter(
+                Q(derivatives_claimed_at__lt=timezone.now() - STALE_AFTER) | Q(derivatives_claimed_at__isnull=True),
+                derivatives_status='processing',
+            ).update(derivatives_status='pending')
+        pending = model.objects.filter(derivatives_status='pending').order_by('pk').values_list('pk', flat=True)[:limit]
+        for pk in list(pending):
+            result = generate_derivatives(kind, pk)
+            if result:
+                results[result] = results.get(result, 0) + 1
+    return results
@@ -0,0 +1,146 @@
+"""
+Lead Deduplication — finding and merging leads for the same person
+Leads carry normalised match keys (Lead.email_key, Lead.phone_key). Leads
+sharing either key belong to one cluster, transitively: A and B share an
+email, B and C a phone, so A, B and C are one person.
+
+Clusters are found by hash bucket rather than by comparing leads pairwise:
+the database returns only the keys held by more than one lead, the leads
+holding them are bucketed by key, and a union-find joins the buckets.
+
+Merging keeps one lead, folds the others' details into it and deletes them.
+Leads linked to different booking clients are never merged.
+"""
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Lead
+
+# Shorter phone keys are fragments, not numbers worth matching on
+MIN_PHONE_DIGITS = 7
+
+# Pipeline progress; a merged lead keeps the furthest stage of its parts
+STATUS_RANK = {'LOST': 0, 'NEW': 1, 'CONTACTED': 2, 'QUALIFIED': 3, 'CONVERTED': 4}
+
+
+class MergeError(ValueError):
+    pass
+
+
+def _shared_keys(leads, field, valid):
+    return (
+        leads.filter(valid).values(field)
+        .annotate(n=Count('pk')).filter(n__gt=1).values(field)
+    )
+
+
+def duplicate_clusters(leads=None):
+    """Lists of lead ids (oldest first) that look like the same person; clusters of two or more only."""
+    leads = Lead.objects.all() if leads is None else leads
+    emails = _shared_keys(leads, 'email_key', Q(email_key__contains='@'))
+    phones = _shared_keys(leads, 'phone_key', Q(phone_key__regex=rf'^\d{{{MIN_PHONE_DIGITS},}}$'))
+    rows = (
+        leads.filter(Q(email_key__in=emails) | Q(phone_key__in=phones))
+        .order_by('created_at', 'pk').values_list('pk', 'email_key', 'phone_key')
+    )
+
+    parent = {}
+
+    def find(pk):
+        while parent[pk] != pk:
+            parent[pk] = parent[parent[pk]]
+            pk = parent[pk]
+        return pk
+
+    buckets = {}
+    order = []
+    for pk, email_key, phone_key in rows:
+        parent[pk] = pk
+        order.append(pk)
+        for bucket in (('email', email_key), ('phone', phone_key)):
+            if not bucket[1]:
+                continue
+            first = buckets.setdefault(bucket, pk)
+            parent[find(pk)] = find(first)
+
+    clusters = defaultdict(list)
+    for pk in order:
+        clusters[find(pk)].append(pk)
+    return [cluster for cluster in clusters.values() if len(cluster) > 1]
+
+
+def choose_primary(leads):
+    """The lead to keep: linked to a booking client, then furthest along the pipeline, then oldest."""
+    return min(leads, key=lambda lead: (
+        lead.client_id is None, -STATUS_RANK.get(lead.status, 0), lead.created_at, lead.pk,
+    ))
+
+
+def _merge_tags(leads):
+    tags = []
+    for lead in leads:
+        for tag in (lead.tags or '').split(','):
+            tag = tag.strip()
+            if tag and tag.lower() not in {t.lower() for t in tags}:
+                tags.append(tag)
+    return ','.join(tags)
+
+
+def merge_leads(primary_id, duplicate_ids):
+    """
+    Fold the duplicates into the primary lead and delete them; returns the
+    primary. Raises Lead.DoesNotExist for unknown ids and MergeError when
+    the leads are linked to different booking clients.
+    """
+    duplicate_ids = [pk for pk in duplicate_ids if pk != primary_id]
+    with transaction.atomic():
+        leads = list(
+            Lead.objects.select_for_update()
+            .filter(pk__in=[primary_id, *duplicate_ids]).order_by('created_at', 'pk')
+        )
+        if len(leads) != len(set(duplicate_ids)) + 1:
+            raise Lead.DoesNotExist('Lead not found')
+        primary = next(lead for lead in leads if lead.pk == primary_id)
+        others = [lead for lead in leads if lead.pk != primary_id]
+        clients = {lead.client_id for lead in leads if lead.client_id}
+        if len(clients) > 1:
+            raise MergeError('Leads are linked to different booking clients')
+
+        for field in ('name', 'email', 'phone'):
+            if not getattr(primary, field):
+                setattr(primary, field, next((getattr(o, field) for o in others if getattr(o, field)), ''))
+        primary.status = max(leads, key=lambda lead: STATUS_RANK.get(lead.status, 0)).status
+        primary.value_pence = max(lead.value_pence for lead in leads)
+        primary.tags = _merge_tags([primary, *others])
+        notes = []
+        for lead in [primary, *others]:
+            if lead.notes and lead.notes not in notes:
+                notes.append(lead.notes)
+        primary.notes = '\n\n'.join(notes)
+        follow_ups = [lead.follow_up_date for lead in leads if lead.follow_up_date]
+        primary.follow_up_date = min(follow_ups) if follow_ups else None
+        contacts = [lead.last_contact_date for lead in leads if lead.last_contact_date]
+        primary.last_contact_date = max(contacts) if contacts else None
+        primary.client_id = clients.pop() if clients else None
+
+        # The duplicates go first: one of them may hold the client link the primary takes over
+        Lead.objects.filter(pk__in=[lead.pk for lead in others]).delete()
+        primary.save()
+    return primary
+
+
+def merge_all_duplicates():
+    """Merge every duplicate cluster into its chosen primary; returns counts."""
+    results = {'clusters': 0, 'merged': 0, 'skipped': 0}
+    for cluster in duplicate_clusters():
+        results['clusters'] += 1
+        leads = list(Lead.objects.filter(pk__in=cluster))
+        primary = choose_primary(leads)
+        try:
+            merge_leads(primary.pk, [lead.pk for lead in leads if lead.pk != primary.pk])
+        except (MergeError, Lead.DoesNotExist):
+            results['skipped'] += 1
+            continue
+        results['merged'] += len(leads) - 1
+    return results
@@ -0,0 +1,258 @@
+"""
+Lead Import — bulk CSV / JSON lead import
+Rows are parsed one at a time from the uploaded file (CSV with a header row,
+a JSON array of objects, or JSON Lines), validated, checked against the
+leads already on file and inserted with bulk_create a batch at a time, so
+memory stays flat however long the file is.
+
+Columns (case-insensitive; common aliases such as "Email address" or
+"Mobile" are accepted): name, email, phone, source, status, value (pounds)
+or value_pence, notes, tags. A row needs a name or an email.
+
+A row is a duplicate when its normalised email or phone (crm.models) matches
+a lead already on file or an earlier row of the same file; the keys of every
+existing lead are loaded into a set up front, so checking costs no queries.
+Importing the same file twice creates nothing the second time.
+
+Every rejected row is reported by line number with its reasons, up to
+MAX_REPORTED_ROWS; the counts always cover the whole file.
+"""
+import codecs
+import csv
+import json
+import re
+from decimal import Decimal, InvalidOperation
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from .dedupe import MIN_PHONE_DIGITS
+from .models import Lead
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ROWS = 1000
+JSON_READ_SIZE = 64 * 1024
+
+COLUMN_ALIASES = {
+    'name': ('name', 'full name', 'full_name', 'contact', 'contact name'),
+    'first_name': ('first name', 'first_name', 'firstname', 'forename'),
+    'last_name': ('last name', 'last_name', 'lastname', 'surname'),
+    'email': ('email', 'email address', 'email_address', 'e-mail'),
+    'phone': ('phone', 'phone number', 'phone_number', 'telephone', 'tel', 'mobile'),
+    'source': ('source',),
+    'status': ('status',),
+    'value': ('value', 'value (£)', 'value_gbp'),
+    'value_pence': ('value_pence',),
+    'notes': ('notes', 'note', 'comments'),
+    'tags': ('tags', 'tag', 'labels'),
+}
+_COLUMNS = {alias: column for column, aliases in COLUMN_ALIASES.items() for alias in aliases}
+
+_SOURCES = {key.lower(): key for key, _ in Lead.SOURCE_CHOICES}
+_STATUSES = {key.lower(): key for key, _ in Lead.STATUS_CHOICES}
+_LIMITS = {field: Lead._meta.get_field(field).max_length for field in ('name', 'email', 'phone', 'tags')}
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+# ── Parsing ──────────────────────────────────────────────────
+
+def iter_csv_rows(stream):
+    """(line number, row dict) for each record of a CSV file opened in binary mode."""
+    reader = csv.DictReader(codecs.iterdecode(stream, 'utf-8-sig'))
+    try:
+        if not reader.fieldnames:
+            raise ImportFormatError('The CSV file has no header row')
+        for row in reader:
+            yield reader.line_num, row
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise ImportFormatError(f'Unreadable CSV after line {reader.line_num}: {e}')
+
+
+def iter_json_rows(stream):
+    """
+    (record number, row dict) for each object of a JSON array or JSON Lines
+    file opened in binary mode, decoded a chunk at a time.
+    """
+    decoder = json.JSONDecoder()
+    chunks = codecs.iterdecode(iter(lambda: stream.read(JSON_READ_SIZE), b''), 'utf-8-sig')
+    buffer = ''
+    in_array = None
+    number = 0
+    try:
+        for chunk in chunks:
+            buffer += chunk
+            while True:
+                buffer = buffer.lstrip()
+                if in_array is None:
+                    if not buffer:
+                        break
+                    in_array = buffer.startswith('[')
+                    if in_array:
+                        buffer = buffer[1:]
+                    continue
+                if in_array and buffer[:1] in (',', ']'):
+                    buffer = buffer[1:]
+                    continue
+                if not buffer:
+                    break
+                try:
+                    value, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    break  # incomplete: wait for the next chunk
+                buffer = buffer[end:]
+                number += 1
+                yield number, value if isinstance(value, dict) else {'__invalid__': value}
+    except UnicodeDecodeError as e:
+        raise ImportFormatError(f'Unreadable JSON after record {number}: {e}')
+    if buffer.strip():
+        raise ImportFormatError(f'Invalid JSON after record {number}')
+
+
+def iter_rows(stream, fmt):
+    if fmt == 'csv':
+        return iter_csv_rows(stream)
+    if fmt in ('json', 'jsonl'):
+        return iter_json_rows(stream)
+    raise ImportFormatError(f'Unsupported format: {fmt}')
+
+
+def detect_format(filename, content_type=''):
+    """'csv' or 'json' from a file name or content type; ImportFormatError otherwise."""
+    name = (filename or '').lower()
+    if name.endswith('.csv') or 'csv' in content_type:
+        return 'csv'
+    if name.endswith(('.json', '.jsonl', '.ndjson')) or 'json' in content_type:
+        return 'json'
+    raise ImportFormatError('Upload a .csv or .json file')
+
+
+# ── Validation ───────────────────────────────────────────────
+
+def _normalise_columns(raw):
+    row = {}
+    for key, value in raw.items():
+        column = _COLUMNS.get(str(key or '').strip().lower())
+        if column and value not in (None, ''):
+            row[column] = str(value).strip()
+    return row
+
+
+def _pence(row):
+    if row.get('value_pence'):
+        return int(row['value_pence'])
+    if row.get('value'):
+        return int((Decimal(re.sub(r'[£,\s]', '', row['value'])) * 100).to_integral_value())
+    return 0
+
+
+def is_known_source(source):
+    """True if `source` names one of Lead.SOURCE_CHOICES (any case)."""
+    return source.lower() in _SOURCES
+
+
+def build_lead(raw, default_source='other'):
+    """An unsaved Lead for one imported row, or None and the reasons it was rejected."""
+    if '__invalid__' in raw:
+        return None, ['Row is not an object']
+    row = _normalise_columns(raw)
+    errors = []
+    name = row.get('name') or ' '.join(filter(None, [row.get('first_name'), row.get('last_name')]))
+    email = row.get('email', '')
+    if not name and not email:
+        errors.append('A name or email is required')
+    if email:
+        try:
+            validate_email(email)
+        except ValidationError:
+            errors.append(f'Invalid email: {email}')
+
+    source = _SOURCES.get(row.get('source', default_source).lower())
+    if source is None:
+        errors.append(f"Unknown source: {row.get('source', default_source)}")
+    status = _STATUSES.get(row.get('status', 'NEW').lower())
+    if status is None:
+        errors.append(f"Unknown status: {row['status']}")
+    try:
+        value_pence = _pence(row)
+    except (ValueError, InvalidOperation):
+        errors.append(f"Invalid value: {row.get('value_pence') or row.get('value')}")
+        value_pence = 0
+
+    fields = {'name': name or email, 'email': email, 'phone': row.get('phone', ''), 'tags': row.get('tags', '')}
+    for field, limit in _LIMITS.items():
+        if len(fields[field]) > limit:
+            errors.append(f'{field} is longer than {limit} characters')
+    if errors:
+        return None, errors
+
+    lead = Lead(
+        source=source, status=status, value_pence=value_pence, notes=row.get('notes', ''), **fields,
+    )
+    lead.refresh_match_keys()
+    return lead, []
+
+
+# ── Import ───────────────────────────────────────────────────
+
+def _existing_keys():
+    emails = set(
+        Lead.objects.exclude(email_key='').order_by()
+        .values_list('email_key', flat=True).iterator(chunk_size=5000)
+    )
+    phones = set(
+        Lead.objects.filter(phone_key__regex=rf'^\d{{{MIN_PHONE_DIGITS},}}$').order_by()
+        .values_list('phone_key', flat=True).iterator(chunk_size=5000)
+    )
+    return emails, phones
+
+
+def import_leads(rows, default_source='other', dry_run=False, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import (line, row dict) pairs. Returns {'created', 'duplicates', 'failed',
+    'errors': [{'row', 'errors'}], 'errors_truncated'}; with dry_run nothing
+    is written but the counts are the same. When the file turns out to be
+    unreadable part way, the rows before that point are imported and 'error'
+    says where it stopped.
+    """
+    emails, phones = _existing_keys()
+    result = {'created': 0, 'duplicates': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+    batch = []
+
+    def reject(line, reasons):
+        result['failed'] += 1
+        if len(result['errors']) < MAX_REPORTED_ROWS:
+            result['errors'].append({'row': line, 'errors': reasons})
+        else:
+            result['errors_truncated'] = True
+
+    def flush():
+        if batch and not dry_run:
+            with transaction.atomic():
+                Lead.objects.bulk_create(batch, batch_size=batch_size)
+        result['created'] += len(batch)
+        batch.clear()
+
+    try:
+        for line, raw in rows:
+            lead, reasons = build_lead(raw, default_source)
+            if reasons:
+                reject(line, reasons)
+                continue
+            phone_key = lead.phone_key if len(lead.phone_key) >= MIN_PHONE_DIGITS else ''
+            if (lead.email_key and lead.email_key in emails) or (phone_key and phone_key in phones):
+                result['duplicates'] += 1
+                continue
+            if lead.email_key:
+                emails.add(lead.email_key)
+            if phone_key:
+                phones.add(phone_key)
+            batch.append(lead)
+            if len(batch) >= batch_size:
+                flush()
+    except ImportFormatError as e:
+        result['error'] = str(e)
+    flush()
+    return result
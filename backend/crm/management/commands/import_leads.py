@@ -0,0 +1,54 @@
+"""
+Management command: import_leads
+Bulk-imports leads from a CSV or JSON file (see crm.imports), skipping
+duplicates of existing leads, and optionally writes the rejected rows to a
+CSV error report.
+
+Usage:
+    python manage.py import_leads mailing_list.csv
+    python manage.py import_leads leads.json --source website --dry-run
+    python manage.py import_leads mailing_list.csv --errors rejected.csv
+"""
+import csv
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Bulk import CRM leads from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with a header row), JSON array or JSON Lines file')
+        parser.add_argument('--format', choices=['csv', 'json'], help='File format (default: from the extension)')
+        parser.add_argument('--source', default='other', help='Source for rows without one (default: other)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate and count without saving')
+        parser.add_argument('--errors', metavar='PATH', help='Write rejected rows and reasons to this CSV file')
+
+    def handle(self, *args, **options):
+        from crm.imports import ImportFormatError, detect_format, import_leads, is_known_source, iter_rows
+
+        if not is_known_source(options['source']):
+            raise CommandError(f"Unknown source: {options['source']}")
+        try:
+            fmt = options['format'] or detect_format(options['path'])
+            with open(options['path'], 'rb') as f:
+                result = import_leads(iter_rows(f, fmt), default_source=options['source'],
+                                      dry_run=options['dry_run'])
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e))
+
+        if options['errors']:
+            with open(options['errors'], 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Row', 'Errors'])
+                for error in result['errors']:
+                    writer.writerow([error['row'], '; '.join(error['errors'])])
+
+        prefix = '[CRM] Dry run: ' if options['dry_run'] else '[CRM] '
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{result['created']} leads imported, {result['duplicates']} duplicates skipped, "
+            f"{result['failed']} rows rejected"
+        ))
+        if result['errors_truncated']:
+            self.stdout.write(self.style.WARNING(f"Only the first {len(result['errors'])} rejected rows are reported"))
+        if result.get('error'):
+            self.stderr.write(self.style.ERROR(f"Import stopped early: {result['error']}"))
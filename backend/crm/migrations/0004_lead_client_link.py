@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:15
+
+import re
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def prepare_leads(apps, schema_editor):
+    """
+    Fill the match keys, and clear client ids that the new one-to-one link
+    would reject: clients since deleted, and every lead but the oldest for a client.
+    """
+    Lead = apps.get_model('crm', 'Lead')
+    Client = apps.get_model('bookings', 'Client')
+
+    changed = []
+    for lead in Lead.objects.only('id', 'email', 'phone'):
+        lead.email_key = (lead.email or '').strip().lower()
+        digits = re.sub(r'\D', '', lead.phone or '')
+        for prefix in ('0044', '44'):
+            national = digits[len(prefix):].lstrip('0')
+            if digits.startswith(prefix) and len(national) in (9, 10):
+                digits = '0' + national
+                break
+        lead.phone_key = digits
+        changed.append(lead)
+    Lead.objects.bulk_update(changed, ['email_key', 'phone_key'], batch_size=500)
+
+    linked = Lead.objects.filter(client_id__isnull=False)
+    linked.exclude(client_id__in=Client.objects.values('pk')).update(client_id=None)
+    seen = set()
+    duplicates = []
+    for pk, client_id in linked.order_by('client_id', 'pk').values_list('pk', 'client_id'):
+        if client_id in seen:
+            duplicates.append(pk)
+        seen.add(client_id)
+    Lead.objects.filter(pk__in=duplicates).update(client_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0019_booking_start_status_index'),
+        ('crm', '0003_list_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lead',
+            name='email_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='phone_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=30),
+        ),
+        migrations.RunPython(prepare_leads, migrations.RunPython.noop),
+        # client_id (plain integer) becomes the `client` one-to-one, keeping the column's values
+        migrations.RenameField(
+            model_name='lead',
+            old_name='client_id',
+            new_name='client',
+        ),
+        migrations.AlterField(
+            model_name='lead',
+            name='client',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lead', to='bookings.client'),
+        ),
+    ]
@@ -1,6 +1,22 @@
+import re
 from django.db import models
 
 
+def normalise_email(email):
+    return (email or '').strip().lower()
+
+
+def normalise_phone(phone):
+    """Digits only, UK international prefixes folded to the national 0 (+44 (0)7700… → 07700…)."""
+    digits = re.sub(r'\D', '', phone or '')
+    for prefix in ('0044', '44'):
+        if digits.startswith(prefix):
+            national = digits[len(prefix):].lstrip('0')
+            if len(national) in (9, 10):
+                return '0' + national
+    return digits
+
+
 class Lead(models.Model):
     STATUS_CHOICES = [
         ('NEW', 'New'),
@@ -28,13 +44,35 @@ class Lead(models.Model):
     tags = models.CharField(max_length=500, blank=True, help_text='Comma-separated tags e.g. VIP,Lapsed')
     follow_up_date = models.DateField(null=True, blank=True)
     last_contact_date = models.DateField(null=True, blank=True)
-    # Link to booking client if auto-created
-    client_id = models.IntegerField(null=True, blank=True, help_text='bookings.Client FK')
+    # Match keys for deduplication (crm.dedupe), kept in step with email/phone by save()
+    email_key = models.CharField(max_length=254, blank=True, default='', db_index=True, editable=False)
+    phone_key = models.CharField(max_length=30, blank=True, default='', db_index=True, editable=False)
+    # The booking client this lead is for; at most one lead per client
+    client = models.OneToOneField(
+        'bookings.Client', on_delete=models.SET_NULL, null=True, blank=True, related_name='lead',
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of list_leads, newest first, optionally by status
+            models.Index(fields=['created_at', 'id'], name='lead_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='lead_status_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.name} ({self.status})'
+
+    def refresh_match_keys(self):
+        """Recompute email_key/phone_key; bulk_create callers must call this themselves."""
+        self.email_key = normalise_email(self.email)
+        self.phone_key = normalise_phone(self.phone)
+
+    def save(self, *args, **kwargs):
+        self.refresh_match_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'email', 'phone'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'email_key', 'phone_key'}
+        super().save(*args, **kwargs)
@@ -0,0 +1,109 @@
+"""
+CRM Sync — leads for booking clients
+Every booking client without a lead gets one, valued at the price of their
+confirmed and completed bookings. A client with a completed booking is
+CONVERTED, one with only confirmed bookings QUALIFIED, anyone else NEW.
+A lead already on file for the client's email (from the website, say) is
+linked to the client instead of gaining a duplicate.
+
+The work is set-based so the query count does not grow with the number of
+clients: one anti-join picks the clients without a lead, with their booking
+count, value and status flags aggregated in the same query; one lookup finds
+unlinked leads by email, and the rest are inserted with bulk_create.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+
+from .models import Lead, normalise_email
+
+VALUED_STATUSES = ('confirmed', 'completed')
+
+
+def clients_without_leads():
+    """Client rows (values) with no lead yet, annotated with their booking totals."""
+    from bookings.models import Client
+
+    valued = Q(bookings__status__in=VALUED_STATUSES)
+    return (
+        Client.objects
+        .filter(~Exists(Lead.objects.filter(client_id=OuterRef('pk'))))
+        .annotate(
+            booking_count=Count('bookings', filter=valued),
+            booking_value=Sum('bookings__service__price', filter=valued),
+            completed_count=Count('bookings', filter=Q(bookings__status='completed')),
+            confirmed_count=Count('bookings', filter=Q(bookings__status='confirmed')),
+        )
+        .order_by('pk')
+        .values('pk', 'name', 'email', 'phone', 'booking_count', 'booking_value',
+                'completed_count', 'confirmed_count')
+    )
+
+
+def _lead_status(row):
+    if row['completed_count']:
+        return 'CONVERTED'
+    if row['confirmed_count']:
+        return 'QUALIFIED'
+    return 'NEW'
+
+
+def _unlinked_leads_by_email(email_keys):
+    """The oldest lead with no client for each of `email_keys`."""
+    found = {}
+    for lead in Lead.objects.filter(client__isnull=True, email_key__in=email_keys).order_by('-created_at', '-pk'):
+        found[lead.email_key] = lead
+    return found
+
+
+def sync_leads_from_bookings(batch_size=500):
+    """Link or create the missing leads; returns how many were created."""
+    with transaction.atomic():
+        rows = list(clients_without_leads())
+        unlinked = _unlinked_leads_by_email({normalise_email(row['email']) for row in rows} - {''})
+        linked, leads = [], []
+        for row in rows:
+            existing = unlinked.pop(normalise_email(row['email']), None)
+            if existing:
+                existing.client_id = row['pk']
+                linked.append(existing)
+                continue
+            lead = Lead(
+                name=row['name'],
+                email=row['email'],
+                phone=row['phone'],
+                source='booking',
+                status=_lead_status(row),
+                value_pence=int((row['booking_value'] or 0) * 100),
+                notes=f"Auto-imported from bookings. {row['booking_count']} booking(s).",
+                client_id=row['pk'],
+            )
+            lead.refresh_match_keys()
+            leads.append(lead)
+        if linked:
+            Lead.objects.bulk_update(linked, ['client'], batch_size=batch_size)
+        Lead.objects.bulk_create(leads, batch_size=batch_size)
+    return len(leads)
+
+
+def ensure_client_lead(client, **defaults):
+    """
+    The client's lead: the linked one, else an unlinked lead with the same
+    email (linked now), else a new one built from `defaults`. One indexed
+    lookup when the lead already exists.
+    """
+    lead = Lead.objects.filter(client=client).first()
+    if lead:
+        return lead
+    email_key = normalise_email(client.email)
+    lead = email_key and Lead.objects.filter(client__isnull=True, email_key=email_key).order_by('created_at', 'pk').first()
+    if lead:
+        lead.client = client
+        lead.save(update_fields=['client', 'updated_at'])
+        return lead
+    defaults = {'name': client.name, 'email': client.email, 'phone': client.phone, 'source': 'booking', **defaults}
+    try:
+        with transaction.atomic():
+            return Lead.objects.create(client=client, **defaults)
+    except IntegrityError:
+        # Another request linked a lead to this client first
+        return Lead.objects.get(client=client)
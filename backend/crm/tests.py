@@ -0,0 +1,228 @@
+"""
+CRM — Unit Tests
+Leads synced from booking clients in a constant number of queries, linking
+existing leads by email; duplicate clusters by email/phone and merging;
+bulk CSV / JSON import with dedupe and a per-row error report; pipeline
+summary and list filters.
+"""
+import json
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookings.models import Booking, Client, Service, Staff
+from .dedupe import duplicate_clusters
+from .imports import import_leads, iter_csv_rows, iter_json_rows
+from .models import Lead, normalise_phone
+from .sync import ensure_client_lead, sync_leads_from_bookings
+
+User = get_user_model()
+
+
+class SyncFromBookingsTests(TestCase):
+    def setUp(self):
+        self.massage = Service.objects.create(name='Massage', duration_minutes=60, price=Decimal('50.00'))
+        self.facial = Service.objects.create(name='Facial', duration_minutes=30, price=Decimal('32.50'))
+        self.staff = Staff.objects.create(name='Ana', email='ana@example.com')
+
+    def _client(self, name, *bookings):
+        client = Client.objects.create(name=name, email=f'{name.lower()}@example.com', phone='0700')
+        start = timezone.now() + timedelta(days=1)
+        for service, booking_status in bookings:
+            Booking.objects.create(client=client, service=service, staff=self.staff,
+                                   start_time=start, status=booking_status)
+        return client
+
+    def test_leads_created_once_with_totals(self):
+        done = self._client('Done', (self.massage, 'completed'), (self.facial, 'confirmed'), (self.massage, 'cancelled'))
+        booked = self._client('Booked', (self.facial, 'confirmed'))
+        idle = self._client('Idle', (self.massage, 'pending'))
+        self._client('Known')
+        Lead.objects.create(name='Known', client_id=Client.objects.get(name='Known').pk)
+        web = self._client('Web', (self.facial, 'confirmed'))
+        enquiry = Lead.objects.create(name='Web enquiry', email=' WEB@example.com', source='website')
+
+        # savepoint, clients, unlinked leads by email, link, insert, release
+        with self.assertNumQueries(6):
+            self.assertEqual(sync_leads_from_bookings(), 3)
+        enquiry.refresh_from_db()
+        self.assertEqual(enquiry.client_id, web.pk)
+
+        leads = {lead.client_id: lead for lead in Lead.objects.filter(source='booking')}
+        self.assertEqual(
+            [(leads[c.pk].status, leads[c.pk].value_pence) for c in (done, booked, idle)],
+            [('CONVERTED', 8250), ('QUALIFIED', 3250), ('NEW', 0)],
+        )
+        self.assertEqual(leads[done.pk].notes, 'Auto-imported from bookings. 2 booking(s).')
+
+        resp = APIClient().post('/api/crm/sync/')
+        self.assertEqual(resp.json()['created'], 0)
+        self.assertEqual(Lead.objects.count(), 5)
+
+    def test_booking_lead_is_one_indexed_lookup(self):
+        client = self._client('Repeat')
+        lead = ensure_client_lead(client, status='QUALIFIED')
+        with self.assertNumQueries(1):
+            self.assertEqual(ensure_client_lead(client), lead)
+
+
+class LeadDedupeTests(TestCase):
+    def test_phone_normalised(self):
+        self.assertEqual(normalise_phone('+44 (0)7700 900123'), '07700900123')
+        self.assertEqual(normalise_phone('+44 7700 900123'), '07700900123')
+        self.assertEqual(normalise_phone('0044 7700-900123'), '07700900123')
+        self.assertEqual(normalise_phone('07700 900123'), '07700900123')
+
+    def test_clusters_join_through_shared_keys(self):
+        a = Lead.objects.create(name='Ana', email='Ana@Example.com')
+        b = Lead.objects.create(name='Ana B', email='ana@example.com ', phone='+44 7700 900123')
+        c = Lead.objects.create(name='A. B.', phone='07700 900123')
+        Lead.objects.create(name='Other', email='other@example.com', phone='123')
+        Lead.objects.create(name='Also short', phone='123')
+        self.assertEqual(duplicate_clusters(), [[a.pk, b.pk, c.pk]])
+
+    def test_merge_and_api(self):
+        client = Client.objects.create(name='Ana', email='ana@example.com', phone='0700')
+        a = Lead.objects.create(name='Ana', email='ana@example.com', tags='VIP', notes='Website form',
+                                status='CONTACTED', value_pence=1000)
+        b = Lead.objects.create(name='Ana', phone='0770090012', email='ana@example.com', tags='vip,Lapsed',
+                                status='CONVERTED', value_pence=5000, client=client)
+
+        api = APIClient()
+        clusters = api.get('/api/crm/leads/duplicates/').json()['clusters']
+        self.assertEqual(clusters[0]['primary_id'], b.pk)
+        merge = {'primary_id': a.pk, 'duplicate_ids': [b.pk]}
+        self.assertEqual(api.post('/api/crm/leads/merge/', merge, format='json').status_code, 401)
+        api.force_authenticate(User.objects.create_user('mo', password='x'))
+        self.assertEqual(api.post('/api/crm/leads/merge/', merge, format='json').status_code, 403)
+        self.assertEqual(Lead.objects.count(), 2)
+
+        api.force_authenticate(User.objects.create_user('sam', password='x', is_staff=True))
+        self.assertEqual(api.post('/api/crm/leads/merge/', {'primary_id': a.pk, 'duplicate_ids': [999]},
+                                  format='json').status_code, 404)
+
+        merged = api.post('/api/crm/leads/merge/', merge, format='json').json()
+        self.assertEqual(
+            (merged['status'], merged['value_pence'], merged['tags'], merged['phone'], merged['client_id']),
+            ('CONVERTED', 5000, 'VIP,Lapsed', '0770090012', client.pk),
+        )
+        self.assertEqual(list(Lead.objects.values_list('pk', flat=True)), [a.pk])
+
+        other = Client.objects.create(name='Ana 2', email='ana@example.com', phone='0701')
+        Lead.objects.create(name='Ana', email='ana@example.com', client=other)
+        self.assertEqual(api.post('/api/crm/leads/merge/', {'all': True}, format='json').json(),
+                         {'clusters': 1, 'merged': 0, 'skipped': 1})
+
+
+class LeadImportTests(TestCase):
+    CSV = (
+        'Full Name,Email Address,Mobile,Status,Value,Tags\n'
+        'Ana Silva,ana@example.com,+44 7700 900123,qualified,£45.50,VIP\n'
+        'Ana again,ANA@example.com,,,,\n'
+        'Ben,ben@example.com,07700 900123,,,\n'
+        ',not-an-email,,,,\n'
+        'Cara,cara@example.com,,SOLD,abc,\n'
+        'Dan,,07700 900999,,,\n'
+    ).encode()
+
+    def test_csv_import_dedupes_and_reports(self):
+        Lead.objects.create(name='Known', email='dan.known@example.com', phone='07700900999')
+        result = import_leads(iter_csv_rows(BytesIO(self.CSV)), default_source='website')
+        self.assertEqual((result['created'], result['duplicates'], result['failed']), (1, 3, 2))
+        self.assertEqual(result['errors'], [
+            {'row': 5, 'errors': ['Invalid email: not-an-email']},
+            {'row': 6, 'errors': ['Unknown status: SOLD', 'Invalid value: abc']},
+        ])
+        ana = Lead.objects.get(email='ana@example.com')
+        self.assertEqual((ana.status, ana.value_pence, ana.source, ana.phone_key), ('QUALIFIED', 4550, 'website', '07700900123'))
+
+        again = import_leads(iter_csv_rows(BytesIO(self.CSV)))
+        self.assertEqual((again['created'], again['duplicates']), (0, 4))
+
+    def test_json_array_and_lines_read_in_chunks(self):
+        rows = [{'name': f'Lead {i}', 'email': f'lead{i}@example.com'} for i in range(5)] + ['oops']
+        with mock.patch('crm.imports.JSON_READ_SIZE', 7):
+            parsed = list(iter_json_rows(BytesIO(json.dumps(rows, indent=2).encode())))
+            lines = list(iter_json_rows(BytesIO('\n'.join(json.dumps(r) for r in rows[:2]).encode())))
+        self.assertEqual([n for n, _ in parsed], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(parsed[4][1], rows[4])
+        self.assertEqual([row for _, row in lines], rows[:2])
+
+        result = import_leads(iter_json_rows(BytesIO(b'[{"name": "Ok"}, {"name": ')))
+        self.assertEqual((result['created'], result['error']), (1, 'Invalid JSON after record 1'))
+
+    def test_bulk_insert_in_batches(self):
+        body = 'name,email\n' + ''.join(f'Lead {i},lead{i}@example.com\n' for i in range(250))
+        # existing emails, existing phones, then savepoint + insert + release per batch of 50
+        with self.assertNumQueries(2 + 5 * 3):
+            result = import_leads(iter_csv_rows(BytesIO(body.encode())), batch_size=50)
+        self.assertEqual(result['created'], 250)
+        self.assertEqual(Lead.objects.filter(email_key='lead249@example.com').count(), 1)
+
+    def test_endpoint(self):
+        api = APIClient()
+        upload = SimpleUploadedFile('list.csv', self.CSV, content_type='text/csv')
+        self.assertEqual(api.post('/api/crm/leads/import/', {'file': upload}, format='multipart').status_code, 401)
+        api.force_authenticate(User.objects.create_user('mo', password='x'))
+        self.assertEqual(api.post('/api/crm/leads/import/', {'file': upload}, format='multipart').status_code, 403)
+        self.assertFalse(Lead.objects.exists())
+
+        api.force_authenticate(User.objects.create_user('ana', password='x', is_staff=True))
+        upload = SimpleUploadedFile('list.csv', self.CSV, content_type='text/csv')
+        resp = api.post('/api/crm/leads/import/', {'file': upload, 'dry_run': 'true'}, format='multipart')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['created'], 2)
+        self.assertFalse(Lead.objects.exists())
+
+        upload = SimpleUploadedFile('list.txt', b'x', content_type='text/plain')
+        self.assertEqual(api.post('/api/crm/leads/import/', {'file': upload}, format='multipart').status_code, 400)
+        upload = SimpleUploadedFile('empty.csv', b'', content_type='text/csv')
+        self.assertEqual(api.post('/api/crm/leads/import/', {'file': upload}, format='multipart').json(),
+                         {'error': 'The CSV file has no header row'})
+        upload = SimpleUploadedFile('list.csv', self.CSV, content_type='text/csv')
+        resp = api.post('/api/crm/leads/import/', {'file': upload, 'source': 'fax'}, format='multipart')
+        self.assertEqual((resp.status_code, resp.json()), (400, {'error': 'Unknown source: fax'}))
+
+    def test_unknown_default_source(self):
+        result = import_leads(iter_csv_rows(BytesIO(b'name\nAna\n')), default_source='fax')
+        self.assertEqual(result['errors'][0], {'row': 2, 'errors': ['Unknown source: fax']})
+        with tempfile.NamedTemporaryFile(suffix='.csv') as f:
+            f.write(b'name\nAna\n')
+            f.flush()
+            with self.assertRaisesMessage(CommandError, 'Unknown source: fax'):
+                call_command('import_leads', f.name, source='fax', stdout=StringIO())
+        self.assertFalse(Lead.objects.exists())
+
+
+class LeadSummaryTests(TestCase):
+    def test_summary_and_filters(self):
+        yesterday = timezone.now().date() - timedelta(days=1)
+        Lead.objects.create(name='Ana', email='ana@example.com', status='NEW', value_pence=1000,
+                            tags='VIP, Lapsed', follow_up_date=yesterday)
+        Lead.objects.create(name='Bo', phone='07700 900123', status='NEW', value_pence=500, source='website')
+        Lead.objects.create(name='Cy', status='CONVERTED', value_pence=9000, tags='vip', follow_up_date=yesterday)
+
+        api = APIClient()
+        with self.assertNumQueries(5):
+            data = api.get('/api/crm/leads/summary/').json()
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(data['by_status'], {
+            'NEW': {'count': 2, 'value_pence': 1500}, 'CONVERTED': {'count': 1, 'value_pence': 9000},
+        })
+        self.assertEqual(data['by_source'], {'manual': 2, 'website': 1})
+        self.assertEqual((data['pipeline_pence'], data['overdue_follow_ups']), (1500, 1))
+        self.assertEqual(data['tags'], ['Lapsed', 'VIP', 'vip'])
+
+        names = lambda params: [l['name'] for l in api.get('/api/crm/leads/', params).json()['results']]
+        self.assertEqual(names({'tag': 'vip'}), ['Cy', 'Ana'])
+        self.assertEqual(names({'search': '900123'}), ['Bo'])
+        self.assertEqual(names({'search': 'ANA@', 'status': 'NEW'}), ['Ana'])
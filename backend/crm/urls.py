@@ -3,8 +3,12 @@ from . import views
 
 urlpatterns = [
     path('leads/', views.list_leads, name='crm-leads'),
+    path('leads/summary/', views.lead_summary, name='crm-lead-summary'),
     path('leads/create/', views.create_lead, name='crm-lead-create'),
     path('leads/<int:lead_id>/status/', views.update_lead_status, name='crm-lead-status'),
     path('leads/export/', views.export_leads_csv, name='crm-leads-export'),
+    path('leads/duplicates/', views.lead_duplicates, name='crm-lead-duplicates'),
+    path('leads/merge/', views.merge_leads, name='crm-lead-merge'),
+    path('leads/import/', views.import_leads, name='crm-lead-import'),
     path('sync/', views.sync_from_bookings, name='crm-sync'),
 ]
@@ -1,12 +1,17 @@
-import csv
-from django.http import HttpResponse
+from django.db.models import Count, Q, Sum
 from django.utils import timezone
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import api_view, parser_classes, permission_classes
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from core.exports import iter_values, stream_csv
+from core.pagination import paginate
 from .models import Lead
 
+# Leads no longer in the pipeline
+CLOSED_STATUSES = ('CONVERTED', 'LOST')
+
 
 def _serialize_lead(lead):
     return {
@@ -30,11 +35,46 @@ def _serialize_lead(lead):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def list_leads(request):
+    """
+    Leads, newest first, a page at a time ({results, next_cursor}; ?cursor=, ?page_size=).
+    Filters: ?status=, ?tag=, ?search= (name, email or phone).
+    """
     qs = Lead.objects.all()
     status_filter = request.query_params.get('status')
     if status_filter and status_filter != 'ALL':
         qs = qs.filter(status=status_filter)
-    return Response([_serialize_lead(l) for l in qs])
+    tag = request.query_params.get('tag', '').strip()
+    if tag:
+        qs = qs.filter(tags__icontains=tag)
+    search = request.query_params.get('search', '').strip()
+    if search:
+        qs = qs.filter(Q(name__icontains=search) | Q(email__icontains=search) | Q(phone__icontains=search))
+    return paginate(qs, request, _serialize_lead, ordering=('-created_at', '-id'))
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def lead_summary(request):
+    """GET /api/crm/leads/summary/ — Pipeline totals over every lead, counted in the database"""
+    leads = Lead.objects.all()
+    by_status = {
+        row['status']: {'count': row['count'], 'value_pence': row['value_pence'] or 0}
+        for row in leads.values('status').annotate(count=Count('id'), value_pence=Sum('value_pence')).order_by()
+    }
+    by_source = dict(leads.values_list('source').annotate(count=Count('id')).order_by())
+    open_leads = leads.exclude(status__in=CLOSED_STATUSES)
+    tags = set()
+    for value in leads.exclude(tags='').values_list('tags', flat=True).distinct():
+        tags.update(t.strip() for t in value.split(',') if t.strip())
+
+    return Response({
+        'total': sum(s['count'] for s in by_status.values()),
+        'by_status': by_status,
+        'by_source': by_source,
+        'pipeline_pence': open_leads.aggregate(total=Sum('value_pence'))['total'] or 0,
+        'overdue_follow_ups': open_leads.filter(follow_up_date__lt=timezone.now().date()).count(),
+        'tags': sorted(tags, key=lambda t: (t.lower(), t)),
+    })
 
 
 @api_view(['POST'])
@@ -86,6 +126,88 @@ def update_lead_status(request, lead_id):
     return Response(_serialize_lead(lead))
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser, FormParser])
+def import_leads(request):
+    """
+    POST /api/crm/leads/import/ — Bulk import from an uploaded CSV or JSON file
+    Form fields: file, format (csv|json, else taken from the file name),
+    source (default for rows without one), dry_run. Duplicates of existing
+    leads are skipped; rejected rows are listed with their line numbers.
+    """
+    from .imports import ImportFormatError, detect_format, import_leads as run_import, is_known_source, iter_rows
+
+    if not request.user.is_staff:
+        return Response({'error': 'Only managers can import leads'}, status=status.HTTP_403_FORBIDDEN)
+    upload = request.FILES.get('file')
+    if not upload:
+        return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        fmt = request.data.get('format') or detect_format(upload.name, upload.content_type or '')
+        rows = iter_rows(upload, fmt)
+    except ImportFormatError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    source = request.data.get('source') or 'other'
+    if not is_known_source(source):
+        return Response({'error': f'Unknown source: {source}'}, status=status.HTTP_400_BAD_REQUEST)
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+    result = run_import(rows, default_source=source, dry_run=dry_run)
+    processed = result['created'] + result['duplicates'] + result['failed']
+    if result.get('error') and not processed:
+        return Response({'error': result['error']}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(result, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def lead_duplicates(request):
+    """GET /api/crm/leads/duplicates/ — Clusters of leads sharing an email or phone number"""
+    from .dedupe import choose_primary, duplicate_clusters
+
+    clusters = duplicate_clusters()
+    leads = Lead.objects.in_bulk([pk for cluster in clusters for pk in cluster])
+    data = []
+    for cluster in clusters:
+        members = [leads[pk] for pk in cluster if pk in leads]
+        data.append({
+            'primary_id': choose_primary(members).id,
+            'leads': [_serialize_lead(lead) for lead in members],
+        })
+    return Response({'clusters': data})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def merge_leads(request):
+    """
+    POST /api/crm/leads/merge/
+    {"primary_id": 1, "duplicate_ids": [2, 3]} folds the duplicates into the
+    primary lead; {"all": true} merges every cluster from lead_duplicates.
+    """
+    from .dedupe import MergeError, merge_all_duplicates, merge_leads as merge
+
+    if not request.user.is_staff:
+        return Response({'error': 'Only managers can merge leads'}, status=status.HTTP_403_FORBIDDEN)
+    if request.data.get('all'):
+        return Response(merge_all_duplicates())
+    try:
+        primary_id = int(request.data.get('primary_id'))
+        duplicate_ids = [int(pk) for pk in request.data.get('duplicate_ids') or []]
+    except (TypeError, ValueError):
+        return Response({'error': 'primary_id and duplicate_ids must be lead ids'}, status=status.HTTP_400_BAD_REQUEST)
+    if not duplicate_ids:
+        return Response({'error': 'duplicate_ids is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        lead = merge(primary_id, duplicate_ids)
+    except Lead.DoesNotExist:
+        return Response({'error': 'Lead not found'}, status=status.HTTP_404_NOT_FOUND)
+    except MergeError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(_serialize_lead(lead))
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def export_leads_csv(request):
@@ -95,23 +217,18 @@ def export_leads_csv(request):
     if status_filter and status_filter != 'ALL':
         leads = leads.filter(status=status_filter)
 
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="crm_leads_{timezone.now().strftime("%Y%m%d")}.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(['Name', 'Email', 'Phone', 'Source', 'Status', 'Value (£)', 'Notes', 'Created'])
-    for lead in leads:
-        writer.writerow([
-            lead.name,
-            lead.email,
-            lead.phone,
-            lead.source,
-            lead.status,
-            f'{lead.value_pence / 100:.2f}',
-            lead.notes,
-            lead.created_at.strftime('%Y-%m-%d %H:%M'),
-        ])
-    return response
+    fields = ('name', 'email', 'phone', 'source', 'status', 'value_pence', 'notes', 'created_at')
+    rows = (
+        [name, email, phone, source, lead_status, f'{value_pence / 100:.2f}', notes,
+         created_at.strftime('%Y-%m-%d %H:%M')]
+        for name, email, phone, source, lead_status, value_pence, notes, created_at
+        in iter_values(leads, fields)
+    )
+    return stream_csv(
+        f'crm_leads_{timezone.now().strftime("%Y%m%d")}.csv',
+        ['Name', 'Email', 'Phone', 'Source', 'Status', 'Value (£)', 'Notes', 'Created'],
+        rows,
+    )
 
 
 @api_view(['POST'])
@@ -120,35 +237,9 @@ def sync_from_bookings(request):
     """POST /api/crm/sync/ — Create leads from booking clients that don't already exist"""
     import traceback
     try:
-        from bookings.models import Client, Booking
-
-        created_count = 0
-        for client in Client.objects.all():
-            if Lead.objects.filter(client_id=client.id).exists():
-                continue
-            # Calculate total booking value for this client
-            total_pence = 0
-            bookings = Booking.objects.filter(client=client, status__in=['confirmed', 'completed'])
-            for b in bookings:
-                if b.service:
-                    total_pence += b.service.price_pence
-
-            lead_status = 'CONVERTED' if bookings.filter(status='completed').exists() else 'NEW'
-            if bookings.filter(status='confirmed').exists() and lead_status == 'NEW':
-                lead_status = 'QUALIFIED'
-
-            Lead.objects.create(
-                name=client.name,
-                email=client.email,
-                phone=client.phone,
-                source='booking',
-                status=lead_status,
-                value_pence=total_pence,
-                notes=f'Auto-imported from bookings. {bookings.count()} booking(s).',
-                client_id=client.id,
-            )
-            created_count += 1
+        from .sync import sync_leads_from_bookings
 
+        created_count = sync_leads_from_bookings()
         return Response({'created': created_count, 'message': f'{created_count} leads synced from bookings'})
     except Exception as e:
         return Response({'error': str(e), 'traceback': traceback.format_exc()}, status=500)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Document, DocumentTag
+from .models import Blob, Document, DocumentTag
 
 
 @admin.register(DocumentTag)
@@ -13,5 +13,12 @@ class DocumentAdmin(admin.ModelAdmin):
     list_display = ['title', 'category', 'access_level', 'status', 'expiry_date', 'is_placeholder', 'created_at']
     list_filter = ['category', 'access_level', 'is_placeholder', 'is_archived']
     search_fields = ['title', 'description', 'regulatory_ref']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['sha256', 'reminder_sent_for', 'created_at', 'updated_at']
     raw_id_fields = ['uploaded_by', 'linked_staff', 'compliance_item']
+
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'content_type', 'size_bytes', 'ref_count', 'created_at']
+    search_fields = ['name', 'sha256']
+    readonly_fields = ['name', 'sha256', 'size_bytes', 'content_type', 'ref_count', 'created_at']
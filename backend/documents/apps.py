@@ -6,3 +6,6 @@ class DocumentsConfig(AppConfig):
     name = "documents"
     verbose_name = "Document Vault"
     label = "documents"
+
+    def ready(self):
+        import documents.signals  # noqa: F401
@@ -0,0 +1,171 @@
+"""
+Document Expiry Digest — one reminder email per owner
+Documents inside their reminder window (Document.expiring_soon) are grouped
+by recipient: the user who uploaded them, or every active owner account when
+the uploader is gone or has no email address. Each recipient gets a single
+email listing all of their documents instead of one email per document.
+
+A document is reminded once per expiry: after a successful send it records
+the expiry date it was reminded for (reminder_sent_for). Renewing it with a
+new expiry date re-arms the reminder.
+
+Sent from the reminder mailbox (IONOS SMTP, Resend fallback) used for
+booking reminders.
+"""
+import logging
+from collections import defaultdict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _display_name(user):
+    return user.get_full_name() or user.username
+
+
+def digest_batches(today=None):
+    """
+    Documents due a reminder, grouped per recipient:
+    {email: {'name': str, 'documents': [Document, ...]}}, soonest expiry first.
+    """
+    from .models import Document
+    today = today or timezone.now().date()
+    docs = list(
+        Document.expiring_soon(today)
+        .exclude(reminder_sent_for=F('expiry_date'))
+        .select_related('uploaded_by')
+        .order_by('expiry_date', 'title')
+    )
+    if not docs:
+        return {}
+
+    owners = None
+    batches = defaultdict(lambda: {'name': '', 'documents': []})
+    for doc in docs:
+        uploader = doc.uploaded_by
+        if uploader and uploader.is_active and uploader.email:
+            recipients = [uploader]
+        else:
+            if owners is None:
+                owners = list(get_user_model().objects.filter(is_superuser=True, is_active=True).exclude(email=''))
+            recipients = owners
+        for user in recipients:
+            batch = batches[user.email.lower()]
+            batch['name'] = batch['name'] or _display_name(user)
+            batch['documents'].append(doc)
+    return dict(batches)
+
+
+def _document_line(doc, today):
+    days = (doc.expiry_date - today).days
+    return doc.title, doc.get_category_display(), doc.expiry_date.strftime('%d %B %Y'), days
+
+
+def _build_digest_html(name, documents, today, url):
+    rows = ''.join(
+        f'<tr><td style="padding:6px 0;color:#0f172a;font-size:14px;font-weight:600;">{title}</td>'
+        f'<td style="padding:6px 0;color:#64748b;font-size:13px;">{category}</td>'
+        f'<td style="padding:6px 0;color:#0f172a;font-size:14px;">{expiry}</td>'
+        f'<td style="padding:6px 0;color:#6366f1;font-size:13px;text-align:right;">{days} day{"s" if days != 1 else ""}</td></tr>'
+        for title, category, expiry, days in (_document_line(d, today) for d in documents)
+    )
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1"></head>
+<body style="margin:0;padding:0;background:#f8fafc;font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,sans-serif;">
+<div style="max-width:560px;margin:0 auto;padding:20px;">
+  <div style="background:#0f172a;border-radius:12px 12px 0 0;padding:24px 28px;text-align:center;">
+    <h1 style="margin:0;color:#f8fafc;font-size:20px;font-weight:700;">The Mind Department</h1>
+    <p style="margin:6px 0 0;color:#94a3b8;font-size:13px;">Document Vault</p>
+  </div>
+  <div style="background:#ffffff;padding:28px;border-left:1px solid #e2e8f0;border-right:1px solid #e2e8f0;">
+    <p style="margin:0 0 16px;color:#334155;font-size:15px;">Hi {name},</p>
+    <p style="margin:0 0 20px;color:#334155;font-size:15px;">The following documents are due to expire soon and may need renewing:</p>
+    <div style="background:#f1f5f9;border-radius:10px;padding:16px 20px;margin:0 0 20px;">
+      <table style="width:100%;border-collapse:collapse;">{rows}</table>
+    </div>
+    <div style="text-align:center;margin:24px 0 0;">
+      <a href="{url}" style="display:inline-block;padding:12px 32px;background:#6366f1;color:#ffffff;text-decoration:none;border-radius:8px;font-weight:700;font-size:15px;">Open Document Vault</a>
+    </div>
+  </div>
+  <div style="background:#f1f5f9;border-radius:0 0 12px 12px;padding:16px 28px;border:1px solid #e2e8f0;border-top:none;">
+    <p style="margin:0;color:#94a3b8;font-size:11px;text-align:center;">The Mind Department &middot; Document expiry reminder</p>
+  </div>
+</div>
+</body></html>"""
+
+
+def _build_digest_text(name, documents, today, url):
+    lines = '\n'.join(
+        f'- {title} ({category}): expires {expiry}, in {days} day{"s" if days != 1 else ""}'
+        for title, category, expiry, days in (_document_line(d, today) for d in documents)
+    )
+    return f"""Hi {name},
+
+The following documents are due to expire soon and may need renewing:
+
+{lines}
+
+Open the Document Vault: {url}
+
+The Mind Department"""
+
+
+def send_digest_email(to_email, name, documents, today=None):
+    """Send one digest email. Returns True on success, False on failure."""
+    from bookings.email_reminders import _send_via_resend, _send_via_smtp
+
+    today = today or timezone.now().date()
+    count = len(documents)
+    subject = f"{count} document{'s' if count != 1 else ''} expiring soon"
+    url = f"{getattr(settings, 'FRONTEND_URL', 'https://theminddepartmentwebsite.vercel.app')}/admin/documents"
+    html_body = _build_digest_html(name, documents, today, url)
+    text_body = _build_digest_text(name, documents, today, url)
+
+    from_email = getattr(settings, 'REMINDER_FROM_EMAIL', 'minddept.bookings@nbne.uk')
+    from_name = 'The Mind Department'
+
+    if getattr(settings, 'REMINDER_EMAIL_HOST_PASSWORD', ''):
+        try:
+            return _send_via_smtp(from_name, from_email, to_email, subject, text_body, html_body)
+        except Exception as e:
+            logger.warning(f"[VAULT] SMTP failed for expiry digest to {to_email}: {e}, trying Resend fallback")
+
+    resend_key = getattr(settings, 'RESEND_API_KEY', '')
+    if resend_key:
+        try:
+            return _send_via_resend(resend_key, from_name, from_email, to_email, subject, text_body, html_body)
+        except Exception as e:
+            logger.error(f"[VAULT] Resend also failed for expiry digest to {to_email}: {e}")
+            return False
+
+    logger.error(f"[VAULT] No email credentials configured — cannot send expiry digest to {to_email}")
+    return False
+
+
+def process_expiry_digest(today=None):
+    """
+    Send every recipient their digest and mark the documents reminded.
+    A document is only marked once all of its recipients were sent to, so a
+    failed send is retried on the next run. Returns counts of sent/failed.
+    """
+    from .models import Document
+    today = today or timezone.now().date()
+    results = {'sent': 0, 'failed': 0, 'documents': 0}
+
+    sent_ids, failed_ids = set(), set()
+    for email, batch in digest_batches(today).items():
+        ids = {doc.pk for doc in batch['documents']}
+        if send_digest_email(email, batch['name'], batch['documents'], today):
+            results['sent'] += 1
+            sent_ids |= ids
+        else:
+            results['failed'] += 1
+            failed_ids |= ids
+
+    reminded = sent_ids - failed_ids
+    if reminded:
+        results['documents'] = Document.objects.filter(pk__in=reminded).update(reminder_sent_for=F('expiry_date'))
+    return results
@@ -0,0 +1,22 @@
+"""
+Management command: rebuild_document_search
+Rebuilds the vault's full-text search index (tag names, and the PostgreSQL
+tsvector or SQLite FTS5 rows) from the documents table. Saves keep the index
+current; run this after bulk SQL edits or restoring a backup.
+
+Usage:
+    python manage.py rebuild_document_search
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the document vault full-text search index'
+
+    def handle(self, *args, **options):
+        from documents.search import rebuild_search_index, search_backend
+
+        count = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'[VAULT] Search index rebuilt for {count} documents ({search_backend()})'
+        ))
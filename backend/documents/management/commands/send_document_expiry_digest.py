@@ -0,0 +1,58 @@
+"""
+Management command: send_document_expiry_digest
+Emails each owner one digest of their vault documents that have entered their
+expiry reminder window. Each document is reminded once per expiry date.
+
+Usage:
+    python manage.py send_document_expiry_digest           # Run once
+    python manage.py send_document_expiry_digest --loop    # Run continuously (for Railway)
+"""
+import time
+import logging
+from django.core.management.base import BaseCommand
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Send per-owner digests of documents approaching expiry'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Run continuously in a loop (for Railway background worker)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=60,
+            help='Interval in minutes between checks (default: 60)',
+        )
+
+    def handle(self, *args, **options):
+        from documents.expiry_digest import process_expiry_digest
+
+        if options['loop']:
+            interval = options['interval']
+            self.stdout.write(self.style.SUCCESS(
+                f'[VAULT] Starting document expiry digest loop (every {interval} minutes)'
+            ))
+            while True:
+                try:
+                    results = process_expiry_digest()
+                    if results['sent'] or results['failed']:
+                        self.stdout.write(self.style.SUCCESS(
+                            f"[VAULT] Digests sent: {results['sent']}, failed: {results['failed']}, "
+                            f"documents reminded: {results['documents']}"
+                        ))
+                except Exception as e:
+                    self.stderr.write(self.style.ERROR(f'[VAULT] Error: {e}'))
+                    logger.exception('[VAULT] Unhandled error in expiry digest loop')
+                time.sleep(interval * 60)
+        else:
+            results = process_expiry_digest()
+            self.stdout.write(self.style.SUCCESS(
+                f"Expiry digests sent: {results['sent']}, failed: {results['failed']}, "
+                f"documents reminded: {results['documents']}"
+            ))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:57
+
+import documents.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0019_booking_start_status_index'),
+        ('compliance', '0004_score_daily_summary'),
+        ('documents', '0002_alter_document_file'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='reminder_sent_for',
+            field=models.DateField(blank=True, editable=False, help_text='Expiry date the last reminder digest was sent for', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(documents.models.DateMinusDays('expiry_date', 'reminder_days_before'), models.F('expiry_date'), condition=models.Q(('expiry_date__isnull', False), ('is_archived', False)), name='document_reminder_from_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:07
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+from django.db.utils import OperationalError
+
+FTS_TABLE = 'documents_document_fts'
+
+
+def create_search_index(apps, schema_editor):
+    """GIN index over search_vector on PostgreSQL, an FTS5 table on SQLite; both filled from existing rows."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX document_search_vector_idx ON documents_document USING gin (search_vector)'
+        )
+        schema_editor.execute(
+            "UPDATE documents_document d SET search_tags = COALESCE(("
+            "SELECT string_agg(t.name, ' ' ORDER BY t.name) FROM documents_document_tags dt "
+            "JOIN documents_documenttag t ON t.id = dt.documenttag_id WHERE dt.document_id = d.id), '')"
+        )
+        schema_editor.execute(
+            "UPDATE documents_document SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(search_tags, '') || ' ' || coalesce(regulatory_ref, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+        )
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+                f"title, tags, regulatory_ref, description, tokenize='porter unicode61')"
+            )
+        except OperationalError:
+            # SQLite built without FTS5: documents.search falls back to icontains
+            return
+        schema_editor.execute(
+            "UPDATE documents_document SET search_tags = COALESCE(("
+            "SELECT group_concat(name, ' ') FROM (SELECT t.name FROM documents_document_tags dt "
+            "JOIN documents_documenttag t ON t.id = dt.documenttag_id "
+            "WHERE dt.document_id = documents_document.id ORDER BY t.name)), '')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, tags, regulatory_ref, description) '
+            'SELECT id, title, search_tags, regulatory_ref, description FROM documents_document'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS document_search_vector_idx')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='search_tags',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0019_booking_start_status_index'),
+        ('compliance', '0006_list_pagination_indexes'),
+        ('documents', '0005_document_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['created_at', 'id'], name='document_created_idx'),
+        ),
+    ]
@@ -1,5 +1,31 @@
+import os
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+
+from .storage import get_vault_storage, is_blob
+
+
+class DateMinusDays(models.Func):
+    """
+    A date minus a number of days taken from another column, as a date.
+    PostgreSQL evaluates `date - integer` natively; SQLite goes through date().
+    Deterministic on both, so it can back an expression index.
+    """
+    arg_joiner = ' - '
+    template = '(%(expressions)s)'
+    output_field = models.DateField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template="date(%(expressions)s || ' days')", arg_joiner=", '-' || ",
+            **extra_context,
+        )
+
+
+# First day of a document's reminder window: expiry_date - reminder_days_before
+REMINDER_FROM = DateMinusDays('expiry_date', 'reminder_days_before')
 
 
 class DocumentTag(models.Model):
@@ -14,6 +40,53 @@ class DocumentTag(models.Model):
         return self.name
 
 
+class Blob(models.Model):
+    """A content-addressed file in the vault store and how many documents use it."""
+    name = models.CharField(max_length=255, unique=True, help_text='Storage name, vault/sha256/...')
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size_bytes = models.PositiveBigIntegerField(default=0)
+    content_type = models.CharField(max_length=100, blank=True, default='')
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def acquire(cls, name, sha256='', size_bytes=0, content_type=''):
+        """
+        Count one more reference to the blob stored as `name`. The row stays
+        locked until the surrounding transaction ends, so _delete_file cannot
+        remove the file in between.
+        """
+        if not is_blob(name):
+            return
+        with transaction.atomic():
+            blob, created = cls.objects.select_for_update().get_or_create(name=name, defaults={
+                'sha256': sha256, 'size_bytes': size_bytes, 'content_type': content_type, 'ref_count': 1,
+            })
+            if not created:
+                cls.objects.filter(pk=blob.pk).update(ref_count=models.F('ref_count') + 1)
+
+    @classmethod
+    def release(cls, name):
+        """Count one reference less; the last one removes the blob once the transaction commits."""
+        if not is_blob(name):
+            return
+        cls.objects.filter(name=name, ref_count__gt=0).update(ref_count=models.F('ref_count') - 1)
+        if cls.objects.filter(name=name, ref_count=0).exists():
+            transaction.on_commit(lambda: cls._delete_file(name))
+
+    @classmethod
+    def _delete_file(cls, name):
+        # Re-checked under the row lock: a new upload of the same content may have claimed it meanwhile
+        with transaction.atomic():
+            blob = cls.objects.select_for_update().filter(name=name, ref_count=0).first()
+            if blob is not None:
+                get_vault_storage().delete(name)
+                blob.delete()
+
+
 class Document(models.Model):
     """A securely stored document with optional expiry and category."""
     CATEGORY_CHOICES = [
@@ -36,10 +109,11 @@ class Document(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, default='')
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default='GENERAL', db_index=True)
-    file = models.FileField(upload_to='vault/%Y/%m/', null=True, blank=True)
+    file = models.FileField(upload_to='vault/%Y/%m/', storage=get_vault_storage, null=True, blank=True)
     filename = models.CharField(max_length=255, blank=True, default='')
     content_type = models.CharField(max_length=100, blank=True, default='')
     size_bytes = models.PositiveIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True, default='', help_text='SHA-256 of the file content')
     tags = models.ManyToManyField(DocumentTag, related_name='documents', blank=True)
     expiry_date = models.DateField(null=True, blank=True, db_index=True)
     reminder_days_before = models.PositiveIntegerField(
@@ -70,15 +144,89 @@ class Document(models.Model):
         null=True, blank=True, related_name='vault_documents',
         help_text='Link to a compliance register item'
     )
+    # Full-text search (documents.search): tag names copied from `tags`, and on
+    # PostgreSQL the weighted tsvector, GIN-indexed by migration 0005
+    search_tags = models.TextField(blank=True, default='', editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+    reminder_sent_for = models.DateField(
+        null=True, blank=True, editable=False,
+        help_text='Expiry date the last reminder digest was sent for'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['category', '-created_at']
+        indexes = [
+            # Serves expiring_soon(): live documents by the day their reminder window opens
+            models.Index(
+                REMINDER_FROM, 'expiry_date',
+                name='document_reminder_from_idx',
+                condition=models.Q(is_archived=False, expiry_date__isnull=False),
+            ),
+            # Keyset pagination of document_list, newest first
+            models.Index(fields=['created_at', 'id'], name='document_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'file' in field_names:
+            instance._stored_file = instance.file.name or ''
+        return instance
+
+    def save(self, *args, **kwargs):
+        # A new upload is hashed and stored here rather than by FileField, so
+        # its size, type and hash are known without reopening it
+        if self.file and not self.file._committed:
+            with transaction.atomic():
+                self._store_upload(kwargs)
+                super().save(*args, **kwargs)
+            return
+        super().save(*args, **kwargs)
+
+    def _store_upload(self, save_kwargs):
+        # The reference is taken before the store looks for an existing file
+        # and held locked until the save commits (Blob.acquire)
+        upload_name = os.path.basename(self.file.name)
+        blob = self.file.storage.store(
+            self.file.file, upload_name, claim=lambda stored: Blob.acquire(*stored),
+        )
+        self._acquired_file = blob.name
+        self.file = blob.name
+        self.size_bytes = blob.size_bytes
+        self.content_type = blob.content_type
+        self.sha256 = blob.sha256
+        if not self.filename or getattr(self, '_stored_file', ''):
+            self.filename = upload_name
+        update_fields = save_kwargs.get('update_fields')
+        if update_fields is not None:
+            save_kwargs['update_fields'] = {*update_fields, 'filename', 'size_bytes', 'content_type', 'sha256'}
+
+    def can_access(self, user):
+        """Owner-only documents need a superuser, Manager+ staff status; All Staff any signed-in user."""
+        if self.access_level == 'owner':
+            return user.is_superuser
+        if self.access_level == 'manager':
+            return user.is_superuser or user.is_staff
+        return user.is_authenticated
+
+    @classmethod
+    def expiring_soon(cls, today=None):
+        """
+        Live documents inside their reminder window, filtered in the database:
+        today < expiry_date <= today + reminder_days_before days, evaluated as
+        expiry_date - reminder_days_before <= today so the index applies.
+        """
+        from django.utils import timezone
+        today = today or timezone.now().date()
+        return cls.objects.filter(
+            is_archived=False, expiry_date__isnull=False, expiry_date__gt=today,
+        ).alias(reminder_from=REMINDER_FROM).filter(reminder_from__lte=today)
+
     @property
     def is_expired(self):
         if not self.expiry_date:
@@ -0,0 +1,138 @@
+"""
+Document Search — ranked full-text search over the vault
+Searches title, description, regulatory reference and tag names.
+
+- PostgreSQL: Document.search_vector, a weighted tsvector (title A, tags and
+  regulatory ref B, description C) behind a GIN index, matched with a
+  websearch query and ordered by ts_rank.
+- SQLite: an FTS5 table (documents_document_fts) keyed by document id,
+  matched by prefix terms and ordered by bm25 with the same column weighting.
+- Anything else (or SQLite built without FTS5): icontains over the same
+  fields, unranked.
+
+Tag names are denormalised onto Document.search_tags so the index can be
+rebuilt from the document row alone. documents.signals refreshes the index
+when a document is saved or deleted, its tags change, or a tag is renamed;
+the rebuild_document_search command rebuilds it in full.
+"""
+import re
+from collections import defaultdict
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'documents_document_fts'
+SEARCH_CONFIG = 'english'
+# bm25 column weights for title, tags, regulatory_ref, description
+FTS_WEIGHTS = (10.0, 5.0, 5.0, 1.0)
+
+
+def search_backend():
+    """'postgres', 'fts5' or 'basic' for the default database."""
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    if connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+        return 'fts5'
+    return 'basic'
+
+
+def search_vector():
+    from django.contrib.postgres.search import SearchVector
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('search_tags', 'regulatory_ref', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def refresh_search_index(pks):
+    """Recompute search_tags and the search index entries of the documents in `pks`."""
+    from .models import Document
+    pks = list(pks)
+    if not pks:
+        return
+
+    tags = defaultdict(list)
+    for doc_id, name in (
+        Document.tags.through.objects.filter(document_id__in=pks)
+        .order_by('documenttag__name').values_list('document_id', 'documenttag__name')
+    ):
+        tags[doc_id].append(name)
+    docs = list(Document.objects.filter(pk__in=pks).only('id', 'search_tags'))
+    changed = []
+    for doc in docs:
+        text = ' '.join(tags[doc.pk])
+        if doc.search_tags != text:
+            doc.search_tags = text
+            changed.append(doc)
+    if changed:
+        Document.objects.bulk_update(changed, ['search_tags'])
+
+    backend = search_backend()
+    if backend == 'postgres':
+        Document.objects.filter(pk__in=pks).update(search_vector=search_vector())
+    elif backend == 'fts5':
+        placeholders = ', '.join(['%s'] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})', pks)
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, tags, regulatory_ref, description) '
+                f'SELECT id, title, search_tags, regulatory_ref, description FROM {Document._meta.db_table} '
+                f'WHERE id IN ({placeholders})',
+                pks,
+            )
+
+
+def remove_from_search_index(pk):
+    if search_backend() == 'fts5':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [pk])
+
+
+def rebuild_search_index():
+    """Re-index every document; returns how many were indexed."""
+    from .models import Document
+    pks = list(Document.objects.values_list('pk', flat=True))
+    if search_backend() == 'fts5':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    for start in range(0, len(pks), 500):
+        refresh_search_index(pks[start:start + 500])
+    return len(pks)
+
+
+def _fts_query(query):
+    # Every word must match, as a prefix; quoting keeps FTS5 syntax out of user input
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_documents(qs, query):
+    """`qs` narrowed to documents matching `query`, annotated with search_rank, best first."""
+    from .models import Document
+    backend = search_backend()
+    if backend == 'postgres':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        qs = qs.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F('search_vector'), search_query),
+        )
+    elif backend == 'fts5':
+        match = _fts_query(query)
+        if not match:
+            return qs.none()
+        table = Document._meta.db_table
+        weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+        qs = qs.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]),
+        ).annotate(search_rank=RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{table}"."id"',
+            [match], output_field=FloatField(),
+        ))
+    else:
+        qs = qs.filter(
+            Q(title__icontains=query) | Q(description__icontains=query)
+            | Q(regulatory_ref__icontains=query) | Q(search_tags__icontains=query)
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return qs.order_by('-search_rank', '-created_at', '-id')
@@ -0,0 +1,69 @@
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .models import Document
+
+
+@receiver(post_save, sender='documents.Document')
+def count_blob_references_on_save(sender, instance, created, **kwargs):
+    from .models import Blob
+    old_name = '' if created else getattr(instance, '_stored_file', '')
+    new_name = instance.file.name or ''
+    if new_name != old_name:
+        # A fresh upload already took its reference when it was stored (Document.save)
+        if getattr(instance, '_acquired_file', None) != new_name:
+            Blob.acquire(new_name, instance.sha256, instance.size_bytes, instance.content_type)
+        Blob.release(old_name)
+    instance._acquired_file = None
+    instance._stored_file = new_name
+
+
+@receiver(post_delete, sender='documents.Document')
+def release_blob_on_delete(sender, instance, **kwargs):
+    from .models import Blob
+    Blob.release(instance.file.name or '')
+
+
+@receiver(post_save, sender='documents.Document')
+def index_document_on_save(sender, instance, **kwargs):
+    from .search import refresh_search_index
+    refresh_search_index([instance.pk])
+
+
+@receiver(post_delete, sender='documents.Document')
+def unindex_document_on_delete(sender, instance, **kwargs):
+    from .search import remove_from_search_index
+    remove_from_search_index(instance.pk)
+
+
+@receiver(m2m_changed, sender=Document.tags.through)
+def index_document_on_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    from .search import refresh_search_index
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_search_index([instance.pk])
+    elif action == 'pre_clear':
+        # tag.documents.clear(): the affected documents are unknown afterwards
+        instance._indexed_documents = list(instance.documents.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        refresh_search_index(getattr(instance, '_indexed_documents', []))
+    elif action in ('post_add', 'post_remove'):
+        refresh_search_index(pk_set)
+
+
+@receiver(post_save, sender='documents.DocumentTag')
+def reindex_documents_on_tag_rename(sender, instance, created, **kwargs):
+    from .search import refresh_search_index
+    if not created:
+        refresh_search_index(instance.documents.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender='documents.DocumentTag')
+def remember_tag_documents(sender, instance, **kwargs):
+    instance._indexed_documents = list(instance.documents.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender='documents.DocumentTag')
+def reindex_documents_on_tag_delete(sender, instance, **kwargs):
+    from .search import refresh_search_index
+    refresh_search_index(getattr(instance, '_indexed_documents', []))
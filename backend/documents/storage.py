@@ -1,2 +1,133 @@
-# Storage backend placeholder — using Django's default FileSystemStorage
-# with Railway Volume for persistent media storage.
+"""
+Document Vault Storage — content-addressed blobs on the media volume
+Uploads are stored once per distinct content, under their SHA-256:
+
+    vault/sha256/<first two hex digits>/<sha256><.ext>
+
+The hash is computed while the upload is streamed to a temporary file in
+chunks, and the file is moved into place only when no blob with that hash
+exists yet, so re-uploading the same certificate or policy costs no extra
+disk. The size, hash and content type come out of the same pass and are
+written to the Document without reopening the file.
+
+Each blob has a Blob row counting the documents that reference it. An
+upload takes its reference, and locks the row, before the store checks for
+an existing copy (Document.save); when the count drops to zero the file and
+the row are removed after the transaction commits, under the same row lock
+and only if no new reference arrived meanwhile.
+
+Files uploaded before content addressing keep their vault/%Y/%m/ names and
+are served as before; they have no Blob row and are never deleted by it.
+"""
+import hashlib
+import mimetypes
+import os
+import tempfile
+from collections import namedtuple
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+CHUNK_SIZE = 64 * 1024
+BLOB_PREFIX = 'vault/sha256'
+
+StoredBlob = namedtuple('StoredBlob', 'name sha256 size_bytes content_type')
+
+
+def blob_name(sha256, ext=''):
+    return f'{BLOB_PREFIX}/{sha256[:2]}/{sha256}{ext}'
+
+
+def _extension(name):
+    return os.path.splitext(name or '')[1].lower()[:16]
+
+
+def _chunks(content):
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    if hasattr(content, 'chunks'):
+        yield from content.chunks(CHUNK_SIZE)
+        return
+    while True:
+        chunk = content.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names every upload after the SHA-256 of its content."""
+
+    def store(self, content, name='', claim=None):
+        """
+        Stream `content` (a File or file-like object) into the store; returns a
+        StoredBlob. `name` is the original filename, used for the extension and
+        to guess the content type when the upload does not carry one. `claim`,
+        if given, is called with the StoredBlob once the content is hashed and
+        before the store checks for an existing copy, so a reference it takes
+        is in place before that copy is relied on.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        tmp_dir = self.path(BLOB_PREFIX)
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in _chunks(content):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+
+            sha256 = digest.hexdigest()
+            final_name = blob_name(sha256, _extension(name or getattr(content, 'name', '')))
+            content_type = (
+                getattr(content, 'content_type', None)
+                or mimetypes.guess_type(name or final_name)[0]
+                or 'application/octet-stream'
+            )
+            stored = StoredBlob(final_name, sha256, size, content_type[:100])
+            if claim is not None:
+                claim(stored)
+
+            final_path = self.path(final_name)
+            if os.path.exists(final_path):
+                os.unlink(tmp_path)  # same content already stored
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(final_path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return stored
+
+    def _save(self, name, content):
+        return self.store(content, name).name
+
+    def get_available_name(self, name, max_length=None):
+        # The stored name depends on the content, not on `name`
+        return name
+
+    def verify(self, name, sha256):
+        """True if the stored file still hashes to `sha256`."""
+        digest = hashlib.sha256()
+        with self.open(name, 'rb') as f:
+            for chunk in f.chunks(CHUNK_SIZE):
+                digest.update(chunk)
+        return digest.hexdigest() == sha256
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_PREFIX + '/')
+
+
+vault_storage = ContentAddressedStorage()
+
+
+def get_vault_storage():
+    return vault_storage
@@ -1,3 +1,237 @@
-from django.test import TestCase
+"""
+Document Vault — Unit Tests
+Expiry reminder window filtered in the database; per-owner expiry digests,
+sent once per document expiry; content-addressed, reference-counted storage;
+ranked full-text search and the paginated list.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from core.file_serving import protected_file_url
+from .expiry_digest import digest_batches, process_expiry_digest
+from .models import Blob, Document, DocumentTag
+from .search import search_backend, search_documents
+from .storage import vault_storage
+
+User = get_user_model()
+TODAY = date(2026, 10, 19)
+
+
+class ExpiryWindowTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana', email='ana@example.com', password='x')
+        # (title, days until expiry, reminder days, archived)
+        specs = [
+            ('inside', 10, 30, False),
+            ('window edge', 30, 30, False),
+            ('outside', 31, 30, False),
+            ('short window', 10, 7, False),
+            ('expires today', 0, 30, False),
+            ('expired', -5, 30, False),
+            ('archived', 10, 30, True),
+        ]
+        for title, days, reminder, archived in specs:
+            Document.objects.create(
+                title=title, expiry_date=TODAY + timedelta(days=days),
+                reminder_days_before=reminder, is_archived=archived, uploaded_by=self.user,
+            )
+        Document.objects.create(title='no expiry')
+
+    def test_window_in_one_query(self):
+        with self.assertNumQueries(1):
+            titles = set(Document.expiring_soon(TODAY).values_list('title', flat=True))
+        self.assertEqual(titles, {'inside', 'window edge'})
+
+    def test_endpoint(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        Document.objects.update(expiry_date=None)
+        doc = Document.objects.get(title='inside')
+        Document.objects.filter(pk=doc.pk).update(expiry_date=date.today() + timedelta(days=3))
+        resp = api.get('/api/documents/expiring/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([d['title'] for d in resp.json()], ['inside'])
+        self.assertEqual(resp.json()[0]['uploaded_by_name'], 'ana')
+
+
+class ExpiryDigestTests(TestCase):
+    def setUp(self):
+        self.ana = User.objects.create_user('ana', email='ana@example.com', password='x')
+        self.owner = User.objects.create_superuser('aly', email='aly@example.com', password='x')
+        for title, user in (('Insurance', self.ana), ('Gas safety', self.ana), ('Fire risk', None)):
+            Document.objects.create(title=title, expiry_date=TODAY + timedelta(days=5), uploaded_by=user)
+
+    def test_batches_per_owner(self):
+        batches = digest_batches(TODAY)
+        self.assertEqual(
+            {email: [d.title for d in b['documents']] for email, b in batches.items()},
+            {'ana@example.com': ['Gas safety', 'Insurance'], 'aly@example.com': ['Fire risk']},
+        )
+
+    @mock.patch('documents.expiry_digest.send_digest_email', return_value=True)
+    def test_sent_once_per_expiry(self, send):
+        self.assertEqual(process_expiry_digest(TODAY), {'sent': 2, 'failed': 0, 'documents': 3})
+        self.assertEqual(send.call_count, 2)
+
+        self.assertEqual(process_expiry_digest(TODAY), {'sent': 0, 'failed': 0, 'documents': 0})
+
+        # Renewed to a new date still inside the window: reminded again
+        Document.objects.filter(title='Insurance').update(expiry_date=TODAY + timedelta(days=20))
+        self.assertEqual(process_expiry_digest(TODAY), {'sent': 1, 'failed': 0, 'documents': 1})
+
+    @mock.patch('documents.expiry_digest.send_digest_email', return_value=False)
+    def test_failed_send_is_retried(self, send):
+        self.assertEqual(process_expiry_digest(TODAY), {'sent': 0, 'failed': 2, 'documents': 0})
+        self.assertFalse(Document.objects.filter(reminder_sent_for__isnull=False).exists())
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user('ana', password='x'))
+        self.body = b'%PDF-1.4 certificate' * 5000
+        self.sha256 = hashlib.sha256(self.body).hexdigest()
+
+    def _upload(self, title, body=None, name='Cert.PDF'):
+        upload = SimpleUploadedFile(name, body or self.body, content_type='application/pdf')
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.api.post('/api/documents/create/', {'title': title, 'file': upload}, format='multipart')
+        self.assertEqual(resp.status_code, 201)
+        return Document.objects.get(pk=resp.json()['id'])
+
+    def test_upload_metadata_recorded_at_write(self):
+        doc = self._upload('Insurance')
+        self.assertEqual(doc.file.name, f'vault/sha256/{self.sha256[:2]}/{self.sha256}.pdf')
+        self.assertEqual((doc.filename, doc.size_bytes, doc.content_type, doc.sha256),
+                         ('Cert.PDF', len(self.body), 'application/pdf', self.sha256))
+        self.assertTrue(vault_storage.verify(doc.file.name, doc.sha256))
+
+    def test_only_download_url_exposed(self):
+        doc = self._upload('Insurance')
+        data = self.api.get(f'/api/documents/{doc.pk}/').json()
+        self.assertNotIn('file', data)
+        self.assertEqual(data['file_url'], protected_file_url('document', doc.pk))
+
+    def test_duplicates_share_one_blob(self):
+        first = self._upload('Insurance 2025')
+        second = self._upload('Insurance copy')
+        self.assertEqual(first.file.name, second.file.name)
+        blob = Blob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        blob_dir = os.path.dirname(vault_storage.path(first.file.name))
+        self.assertEqual(os.listdir(blob_dir), [os.path.basename(first.file.name)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(Blob.objects.get().ref_count, 1)
+        self.assertTrue(vault_storage.exists(second.file.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(vault_storage.exists(second.file.name))
+
+    def test_reupload_before_pending_delete_keeps_file(self):
+        doc = self._upload('Insurance')
+        with self.captureOnCommitCallbacks() as callbacks:
+            doc.delete()
+        self.assertEqual(Blob.objects.get().ref_count, 0)
+
+        # The same content comes back and the last release's cleanup runs
+        # right after the upload claims the blob
+        acquire = Blob.acquire
+
+        def acquire_then_clean_up(*args):
+            acquire(*args)
+            for callback in callbacks:
+                callback()
+
+        with mock.patch.object(Blob, 'acquire', side_effect=acquire_then_clean_up):
+            again = self._upload('Insurance again')
+        self.assertEqual(Blob.objects.get().ref_count, 1)
+        self.assertTrue(vault_storage.exists(again.file.name))
+
+    def test_replacing_file_releases_old_blob(self):
+        doc = self._upload('Policy')
+        old_name = doc.file.name
+        upload = SimpleUploadedFile('policy-v2.docx', b'second version')
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.api.patch(f'/api/documents/{doc.pk}/', {'file': upload}, format='multipart')
+        self.assertEqual(resp.status_code, 200)
+        doc.refresh_from_db()
+        self.assertEqual(doc.filename, 'policy-v2.docx')
+        self.assertEqual(doc.size_bytes, len(b'second version'))
+        self.assertEqual(list(Blob.objects.values_list('name', 'ref_count')), [(doc.file.name, 1)])
+        self.assertFalse(vault_storage.exists(old_name))
+
+
+class DocumentSearchTests(TestCase):
+    def setUp(self):
+        self.fire = Document.objects.create(title='Fire risk assessment', description='Annual review')
+        self.drill = Document.objects.create(title='Evacuation log', description='Record of each fire drill')
+        self.insurance = Document.objects.create(
+            title='Employer liability', regulatory_ref='Employers Liability Act 1969',
+        )
+        self.tag = DocumentTag.objects.create(name='Certificates')
+        self.insurance.tags.add(self.tag)
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user('mo', password='x'))
+
+    def _search(self, query):
+        return list(search_documents(Document.objects.all(), query))
+
+    def test_sqlite_uses_fts5(self):
+        self.assertEqual(search_backend(), 'fts5')
+
+    def test_title_match_ranks_above_description(self):
+        self.assertEqual(self._search('fire'), [self.fire, self.drill])
+        self.assertEqual(self._search('fire review'), [self.fire])
+        self.assertEqual(self._search('"'), [])
+
+    def test_tags_and_regulatory_ref_indexed(self):
+        self.assertEqual(self._search('certif'), [self.insurance])
+        self.assertEqual(self._search('1969'), [self.insurance])
+
+        self.tag.name = 'Policies'
+        self.tag.save()
+        self.assertEqual(self._search('certif'), [])
+        self.assertEqual(self._search('polic'), [self.insurance])
+
+        self.insurance.tags.clear()
+        self.assertEqual(self._search('polic'), [])
+        self.tag.documents.add(self.fire)
+        self.assertEqual(self._search('polic'), [self.fire])
+        self.tag.delete()
+        self.assertEqual(self._search('polic'), [])
+
+        self.drill.delete()
+        self.assertEqual(self._search('drill'), [])
+
+    def test_list_is_paginated(self):
+        resp = self.api.get('/api/documents/', {'page_size': 2})
+        self.assertEqual(resp.status_code, 200)
+        first = resp.json()
+        self.assertEqual([d['id'] for d in first['results']], [self.insurance.pk, self.drill.pk])
+
+        second = self.api.get('/api/documents/', {'page_size': 2, 'cursor': first['next_cursor']}).json()
+        self.assertEqual([d['id'] for d in second['results']], [self.fire.pk])
+        self.assertIsNone(second['next_cursor'])
+
+        found = self.api.get('/api/documents/', {'search': 'fire'}).json()
+        self.assertEqual([d['id'] for d in found['results']], [self.fire.pk, self.drill.pk])
+
+        self.assertEqual(self.api.get('/api/documents/', {'cursor': 'nope'}).status_code, 400)
+        self.assertEqual(self.api.get('/api/documents/', {'page_size': 'all'}).status_code, 400)
@@ -5,7 +5,10 @@ from rest_framework.response import Response
 from rest_framework import status, serializers
 from django.utils import timezone
 from datetime import timedelta
+from core.file_serving import protected_file_url
+from core.pagination import paginate
 from .models import Document, DocumentTag
+from .search import search_documents
 
 
 # ── Serializers ──────────────────────────────────────────────
@@ -33,7 +36,7 @@ class DocumentSerializer(serializers.ModelSerializer):
         model = Document
         fields = [
             'id', 'title', 'description', 'category', 'file', 'file_url',
-            'filename', 'content_type', 'size_bytes', 'file_size_display',
+            'filename', 'content_type', 'size_bytes', 'sha256', 'file_size_display',
             'tags', 'tag_ids', 'expiry_date', 'reminder_days_before',
             'access_level', 'is_expired', 'is_expiring_soon', 'status',
             'is_archived', 'is_placeholder', 'regulatory_ref',
@@ -43,10 +46,12 @@ class DocumentSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at',
         ]
         read_only_fields = [
-            'id', 'uploaded_by', 'uploaded_by_name', 'is_expired',
+            'id', 'sha256', 'uploaded_by', 'uploaded_by_name', 'is_expired',
             'is_expiring_soon', 'status', 'file_size_display', 'file_url',
             'created_at', 'updated_at',
         ]
+        # Stored files are served by the download endpoint, never from MEDIA_URL
+        extra_kwargs = {'file': {'write_only': True}}
 
     def get_uploaded_by_name(self, obj):
         if obj.uploaded_by:
@@ -60,16 +65,24 @@ class DocumentSerializer(serializers.ModelSerializer):
 
     def get_file_url(self, obj):
         if obj.file:
-            return obj.file.url
+            return protected_file_url('document', obj.pk)
         return None
 
 
+def _serialize_document(doc):
+    return DocumentSerializer(doc).data
+
+
 # ── Views ────────────────────────────────────────────────────
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def document_list(request):
-    """List documents with optional filters."""
+    """
+    List documents with optional filters, newest first, a page at a time
+    ({results, next_cursor}; ?cursor=, ?page_size= up to 200). ?search= ranks
+    full-text matches on title, tags, regulatory ref and description.
+    """
     docs = Document.objects.prefetch_related('tags').select_related('uploaded_by', 'linked_staff')
 
     # Exclude archived by default
@@ -99,10 +112,10 @@ def document_list(request):
         docs = docs.filter(is_placeholder=True, file='')
 
     search = request.query_params.get('search')
-    if search:
-        docs = docs.filter(title__icontains=search)
-
-    return Response(DocumentSerializer(docs[:200], many=True).data)
+    if search and search.strip():
+        # Relevance has no stable key to resume from, so search results page by offset
+        return paginate(search_documents(docs, search.strip()), request, _serialize_document)
+    return paginate(docs, request, _serialize_document, ordering=('-created_at', '-id'))
 
 
 @api_view(['POST'])
@@ -114,19 +127,8 @@ def document_create(request):
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    # Filename, size, type and hash are recorded as the upload is stored
     doc = serializer.save(uploaded_by=request.user)
-
-    # Auto-populate filename and size from uploaded file
-    if doc.file:
-        if not doc.filename:
-            doc.filename = doc.file.name.split('/')[-1]
-        if not doc.size_bytes:
-            try:
-                doc.size_bytes = doc.file.size
-            except Exception:
-                pass
-        doc.save(update_fields=['filename', 'size_bytes'])
-
     return Response(DocumentSerializer(doc).data, status=status.HTTP_201_CREATED)
 
 
@@ -153,16 +155,10 @@ def document_detail(request, doc_id):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     doc = serializer.save()
 
-    # Update filename/size if new file uploaded
-    if 'file' in request.data and doc.file:
-        doc.filename = doc.file.name.split('/')[-1]
-        try:
-            doc.size_bytes = doc.file.size
-        except Exception:
-            pass
-        if doc.is_placeholder:
-            doc.is_placeholder = False
-        doc.save(update_fields=['filename', 'size_bytes', 'is_placeholder'])
+    # A placeholder is fulfilled once its file is uploaded
+    if 'file' in request.data and doc.file and doc.is_placeholder:
+        doc.is_placeholder = False
+        doc.save(update_fields=['is_placeholder'])
 
     return Response(DocumentSerializer(doc).data)
 
@@ -202,15 +198,8 @@ def document_summary(request):
 @permission_classes([IsAuthenticated])
 def expiry_reminders(request):
     """List documents expiring within their reminder window."""
-    today = timezone.now().date()
-    docs = Document.objects.filter(
-        is_archived=False,
-        expiry_date__isnull=False,
-        expiry_date__gt=today,
-    ).prefetch_related('tags')
-
-    expiring = [d for d in docs if d.is_expiring_soon]
-    return Response(DocumentSerializer(expiring, many=True).data)
+    docs = Document.expiring_soon().prefetch_related('tags').select_related('uploaded_by', 'linked_staff')
+    return Response(DocumentSerializer(docs, many=True).data)
 
 
 @api_view(['GET'])
@@ -23,6 +23,9 @@ echo "Seeding Document Vault..."
 echo "Syncing CRM leads from bookings..."
 (python manage.py sync_crm_leads) || echo "WARNING: sync_crm_leads failed"
 
+echo "Rebuilding booking rollups..."
+(python manage.py rebuild_booking_rollups) || echo "WARNING: rebuild_booking_rollups failed"
+
 echo "Updating service demand indices..."
 (python manage.py update_demand_index) || echo "WARNING: update_demand_index failed"
 
@@ -32,5 +35,22 @@ echo "Backfilling Smart Booking Engine scores..."
 echo "Starting booking reminder worker (background)..."
 python manage.py send_booking_reminders --loop &
 
-echo "Starting Gunicorn..."
-exec gunicorn booking_platform.wsgi:application --bind 0.0.0.0:$PORT --timeout 120
+echo "Starting report snapshot refresher (background)..."
+python manage.py refresh_report_snapshots --loop &
+
+echo "Starting compliance status engine (background)..."
+python manage.py update_compliance_statuses --loop &
+
+echo "Starting score audit log compaction (background, daily)..."
+python manage.py compact_score_audit_log --loop &
+
+echo "Starting document expiry digest worker (background)..."
+python manage.py send_document_expiry_digest --loop &
+
+echo "Starting thumbnail sweep (background)..."
+python manage.py generate_thumbnails --loop &
+
+# ASGI (uvicorn workers) so comms message streams wait without holding a worker thread;
+# CSV exports and file downloads still stream in blocks (core.streaming)
+echo "Starting Gunicorn (ASGI)..."
+exec gunicorn booking_platform.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:$PORT --timeout 120
@@ -1,7 +1,7 @@
 'use client'
 
 import { useEffect, useState, useCallback } from 'react'
-import { getAnalyticsDashboard, getLeads, getIntakeProfiles, getDisclaimers, getActiveDisclaimer, getDocumentSummary, getDashboardSummary } from '@/lib/api'
+import { getAnalyticsDashboard, getLeadSummary, getIntakeProfiles, getDisclaimers, getActiveDisclaimer, getDocumentSummary, getDashboardSummary } from '@/lib/api'
 
 const C = {
   bg: '#0f172a', card: '#1e293b', cardAlt: '#273548', text: '#f8fafc', muted: '#94a3b8',
@@ -15,7 +15,7 @@ function pct(part: number, total: number) { return total > 0 ? Math.round((part
 
 export default function AdminAnalyticsPage() {
   const [analytics, setAnalytics] = useState<any>({})
-  const [leads, setLeads] = useState<any[]>([])
+  const [leadSummary, setLeadSummary] = useState<any>(null)
   const [intakes, setIntakes] = useState<any[]>([])
   const [disclaimers, setDisclaimers] = useState<any[]>([])
   const [activeDisclaimer, setActiveDisclaimer] = useState<any>(null)
@@ -27,7 +27,7 @@ export default function AdminAnalyticsPage() {
     setLoading(true)
     const [aRes, lRes, iRes, dRes, adRes, dsRes, dbRes] = await Promise.all([
       getAnalyticsDashboard(),
-      getLeads(),
+      getLeadSummary(),
       getIntakeProfiles(),
       getDisclaimers(),
       getActiveDisclaimer(),
@@ -35,7 +35,7 @@ export default function AdminAnalyticsPage() {
       getDashboardSummary(),
     ])
     setAnalytics(aRes.data || {})
-    setLeads(Array.isArray(lRes.data) ? lRes.data : (lRes.data as any)?.results || [])
+    setLeadSummary(lRes.data || null)
     const iData: any = iRes.data
     setIntakes(Array.isArray(iData) ? iData : iData?.results || [])
     const dData: any = dRes.data
@@ -64,12 +64,14 @@ export default function AdminAnalyticsPage() {
   const noShowRate = pct(noShowBookings, totalBookings)
 
   // CRM
-  const totalLeads = leads.length
-  const convertedLeads = leads.filter(l => l.status === 'CONVERTED').length
-  const lostLeads = leads.filter(l => l.status === 'LOST').length
+  const leadsByStatus: Record<string, { count: number; value_pence: number }> = leadSummary?.by_status || {}
+  const stageCount = (key: string) => leadsByStatus[key]?.count || 0
+  const totalLeads = leadSummary?.total || 0
+  const convertedLeads = stageCount('CONVERTED')
+  const lostLeads = stageCount('LOST')
   const conversionRate = pct(convertedLeads, totalLeads)
-  const pipelineValue = leads.filter(l => !['CONVERTED', 'LOST'].includes(l.status)).reduce((s: number, l: any) => s + (l.value_pence || 0), 0)
-  const leadSources = leads.reduce((acc: Record<string, number>, l: any) => { acc[l.source || 'other'] = (acc[l.source || 'other'] || 0) + 1; return acc }, {})
+  const pipelineValue = leadSummary?.pipeline_pence || 0
+  const leadSources: Record<string, number> = leadSummary?.by_source || {}
 
   const PIPELINE_STAGES = [
     { key: 'NEW', label: 'New', color: C.blue },
@@ -217,9 +219,9 @@ export default function AdminAnalyticsPage() {
           {/* Visual funnel */}
           <div style={{ marginBottom: 12 }}>
             {PIPELINE_STAGES.map((stage, i) => {
-              const count = leads.filter(l => l.status === stage.key).length
-              const value = leads.filter(l => l.status === stage.key).reduce((s: number, l: any) => s + (l.value_pence || 0), 0)
-              const maxCount = Math.max(1, ...PIPELINE_STAGES.map(s => leads.filter(l => l.status === s.key).length))
+              const count = stageCount(stage.key)
+              const value = leadsByStatus[stage.key]?.value_pence || 0
+              const maxCount = Math.max(1, ...PIPELINE_STAGES.map(s => stageCount(s.key)))
               const barW = Math.max(8, (count / maxCount) * 100)
               return (
                 <div key={stage.key} style={{ display: 'flex', alignItems: 'center', gap: 8, marginBottom: 4 }}>
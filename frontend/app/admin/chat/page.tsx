@@ -1,7 +1,7 @@
 'use client'
 
 import { useState, useRef, useEffect, useCallback } from 'react'
-import { ensureGeneralChannel, getChannels, getMessages, sendMessage as apiSendMessage, getCurrentUser, getMediaUrl, isImageFile, isVideoFile } from '@/lib/api'
+import { ensureGeneralChannel, getChannels, getMessages, subscribeMessages, mergeMessages, sendMessage as apiSendMessage, getCurrentUser, getMediaUrl, isImageFile, isVideoFile } from '@/lib/api'
 
 const C = {
   bg: '#0f172a', card: '#1e293b', cardAlt: '#273548', text: '#f8fafc', muted: '#94a3b8',
@@ -46,10 +46,19 @@ export default function AdminChatPage() {
 
   useEffect(() => { init() }, [init])
 
-  // Load messages when channel is set
+  // Load messages when channel is set, then receive new ones as they are sent
   useEffect(() => {
     if (!channel) return
-    getMessages(channel.id).then(r => setMessages(r.data || []))
+    let cancelled = false
+    let stop: (() => void) | undefined
+    getMessages(channel.id).then(r => {
+      if (cancelled) return
+      const initial = r.data || []
+      setMessages(initial)
+      const lastId = initial.length > 0 ? initial[initial.length - 1].id : 0
+      stop = subscribeMessages(channel.id, lastId, incoming => setMessages(prev => mergeMessages(prev, incoming)))
+    })
+    return () => { cancelled = true; stop?.() }
   }, [channel?.id])
 
   // Auto-scroll to bottom
@@ -57,22 +66,13 @@ export default function AdminChatPage() {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })
   }, [messages.length])
 
-  // Poll every 4 seconds
-  useEffect(() => {
-    if (!channel) return
-    const interval = setInterval(() => {
-      getMessages(channel.id).then(r => { if (r.data) setMessages(r.data) })
-    }, 4000)
-    return () => clearInterval(interval)
-  }, [channel?.id])
-
   async function handleSend(e: React.FormEvent) {
     e.preventDefault()
     if ((!input.trim() && files.length === 0) || !channel) return
     setSending(true)
     const res = await apiSendMessage(channel.id, input.trim(), files.length > 0 ? files : undefined)
     if (res.data) {
-      setMessages(prev => [...prev, res.data])
+      setMessages(prev => mergeMessages(prev, [res.data]))
     }
     setInput('')
     setFiles([])
@@ -111,7 +111,7 @@ export default function AdminChatPage() {
           const url = getMediaUrl(att.url)
           const isImg = att.content_type?.startsWith('image/') || isImageFile(att.filename || '')
           const isVid = att.content_type?.startsWith('video/') || isVideoFile(att.filename || '')
-          if (isImg) return <a key={att.id} href={url} target="_blank" rel="noopener"><img src={url} alt={att.filename} style={{ maxWidth: 220, maxHeight: 160, borderRadius: 8, objectFit: 'cover' }} /></a>
+          if (isImg) return <a key={att.id} href={url} target="_blank" rel="noopener"><img src={att.thumbnail_url ? getMediaUrl(att.thumbnail_url) : url} alt={att.filename} loading="lazy" style={{ maxWidth: 220, maxHeight: 160, borderRadius: 8, objectFit: 'cover' }} /></a>
           if (isVid) return <video key={att.id} src={url} controls style={{ maxWidth: 260, maxHeight: 180, borderRadius: 8 }} />
           return <a key={att.id} href={url} target="_blank" rel="noopener" style={{ fontSize: '0.8rem', color: C.accent, textDecoration: 'none' }}>📎 {att.filename}</a>
         })}
@@ -1,7 +1,7 @@
 'use client'
 
-import { useEffect, useState, useCallback } from 'react'
-import { getLeads, createLead, updateLeadStatus, updateLead, syncLeadsFromBookings } from '@/lib/api'
+import { useEffect, useState, useCallback, useRef } from 'react'
+import { getLeads, getLeadSummary, createLead, updateLeadStatus, updateLead, syncLeadsFromBookings, getLeadDuplicates, mergeLeads, importLeads } from '@/lib/api'
 
 const C = {
   bg: '#0f172a', card: '#1e293b', cardAlt: '#273548', text: '#f8fafc', muted: '#94a3b8',
@@ -15,23 +15,53 @@ const STATUS_COLORS: Record<string, string> = { NEW: C.blue, CONTACTED: C.amber,
 const SOURCE_LABELS: Record<string, string> = { booking: 'Booking', website: 'Website', referral: 'Referral', social: 'Social', manual: 'Manual', other: 'Other' }
 
 export default function AdminClientsPage() {
-  const [allLeads, setAllLeads] = useState<any[]>([])
+  const [leads, setLeads] = useState<any[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [summary, setSummary] = useState<any>(null)
   const [filter, setFilter] = useState('ALL')
   const [tagFilter, setTagFilter] = useState('')
   const [search, setSearch] = useState('')
   const [loading, setLoading] = useState(true)
   const [syncing, setSyncing] = useState(false)
+  const [merging, setMerging] = useState(false)
+  const [importing, setImporting] = useState(false)
+  const importRef = useRef<HTMLInputElement>(null)
   const [showAdd, setShowAdd] = useState(false)
   const [selected, setSelected] = useState<any>(null)
   const [editForm, setEditForm] = useState<any>({})
   const [saving, setSaving] = useState(false)
   const [toast, setToast] = useState<{ msg: string; type: 'ok' | 'err' } | null>(null)
 
+  // Status, tag and search filter server-side; totals come from the summary endpoint
+  const leadParams = useCallback(() => {
+    const params: any = {}
+    if (filter !== 'ALL') params.status = filter
+    if (tagFilter) params.tag = tagFilter
+    if (search) params.search = search
+    return params
+  }, [filter, tagFilter, search])
+
+  const loadSummary = useCallback(async () => {
+    const r = await getLeadSummary()
+    if (r.data) setSummary(r.data)
+  }, [])
+
   const loadLeads = useCallback(async () => {
-    const r = await getLeads()
-    setAllLeads(r.data || [])
+    const [r] = await Promise.all([getLeads(leadParams()), loadSummary()])
+    setLeads(r.data?.results || [])
+    setNextCursor(r.data?.next_cursor || null)
     setLoading(false)
-  }, [])
+  }, [leadParams, loadSummary])
+
+  async function loadMore() {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    const r = await getLeads({ ...leadParams(), cursor: nextCursor })
+    setLeads(prev => [...prev, ...(r.data?.results || [])])
+    setNextCursor(r.data?.next_cursor || null)
+    setLoadingMore(false)
+  }
 
   useEffect(() => { loadLeads() }, [loadLeads])
   useEffect(() => { if (toast) { const t = setTimeout(() => setToast(null), 3000); return () => clearTimeout(t) } }, [toast])
@@ -48,6 +78,48 @@ export default function AdminClientsPage() {
     setSyncing(false)
   }
 
+  async function handleMergeDuplicates() {
+    setMerging(true)
+    const dup = await getLeadDuplicates()
+    const clusters = dup.data?.clusters || []
+    const extra = clusters.reduce((s, c) => s + c.leads.length - 1, 0)
+    if (!clusters.length) {
+      setToast({ msg: 'No duplicate leads found', type: 'ok' })
+    } else if (confirm(`Merge ${extra} duplicate lead(s) into ${clusters.length} contact(s)? Leads sharing an email or phone number are combined.`)) {
+      const res = await mergeLeads({ all: true })
+      if (res.data) {
+        setToast({ msg: `${res.data.merged} duplicate(s) merged${res.data.skipped ? `, ${res.data.skipped} group(s) need review` : ''}`, type: 'ok' })
+        loadLeads()
+      } else {
+        setToast({ msg: res.error || 'Merge failed', type: 'err' })
+      }
+    }
+    setMerging(false)
+  }
+
+  async function handleImport(e: React.ChangeEvent<HTMLInputElement>) {
+    const file = e.target.files?.[0]
+    e.target.value = ''
+    if (!file) return
+    setImporting(true)
+    const fd = new FormData()
+    fd.append('file', file)
+    fd.append('source', 'other')
+    const res = await importLeads(fd)
+    if (res.data) {
+      const d = res.data
+      const firstError = d.errors?.[0] ? ` (row ${d.errors[0].row}: ${d.errors[0].errors.join(', ')})` : ''
+      setToast({
+        msg: `${d.created} imported, ${d.duplicates} duplicates skipped${d.failed ? `, ${d.failed} rejected${firstError}` : ''}`,
+        type: d.failed || d.error ? 'err' : 'ok',
+      })
+      loadLeads()
+    } else {
+      setToast({ msg: res.error || 'Import failed', type: 'err' })
+    }
+    setImporting(false)
+  }
+
   function handleExportCSV() {
     const statusParam = filter !== 'ALL' ? `?status=${filter}` : ''
     const base = process.env.NEXT_PUBLIC_API_BASE || 'https://theminddepartment-api.fly.dev/api'
@@ -69,8 +141,9 @@ export default function AdminClientsPage() {
   async function handleStatusChange(id: number, newStatus: string) {
     const res = await updateLeadStatus(id, newStatus)
     if (res.data) {
-      setAllLeads(prev => prev.map(l => l.id === id ? res.data : l))
+      setLeads(prev => prev.map(l => l.id === id ? res.data : l))
       if (selected?.id === id) setSelected(res.data)
+      loadSummary()
     }
   }
 
@@ -92,8 +165,9 @@ export default function AdminClientsPage() {
       status: selected.status,
     })
     if (res.data) {
-      setAllLeads(prev => prev.map(l => l.id === selected.id ? res.data : l))
+      setLeads(prev => prev.map(l => l.id === selected.id ? res.data : l))
       setSelected(res.data)
+      loadSummary()
       setToast({ msg: 'Saved', type: 'ok' })
     } else {
       setToast({ msg: res.error || 'Save failed', type: 'err' })
@@ -117,23 +191,18 @@ export default function AdminClientsPage() {
 
   // Compute stats
   const today = new Date().toISOString().slice(0, 10)
-  const allTags = Array.from(new Set(allLeads.flatMap(l => (l.tags || '').split(',').map((t: string) => t.trim()).filter(Boolean))))
-  const overdue = allLeads.filter(l => l.follow_up_date && l.follow_up_date < today && !['CONVERTED', 'LOST'].includes(l.status))
-
-  const filtered = allLeads
-    .filter(l => filter === 'ALL' || l.status === filter)
-    .filter(l => !tagFilter || (l.tags || '').toLowerCase().includes(tagFilter.toLowerCase()))
-    .filter(l => !search || (l.name || '').toLowerCase().includes(search.toLowerCase()) || (l.email || '').toLowerCase().includes(search.toLowerCase()) || (l.phone || '').includes(search))
+  const allTags: string[] = summary?.tags || []
+  const statusCount = (key: string) => summary?.by_status?.[key]?.count || 0
 
   const stats = {
-    total: allLeads.length,
-    new: allLeads.filter(l => l.status === 'NEW').length,
-    contacted: allLeads.filter(l => l.status === 'CONTACTED').length,
-    qualified: allLeads.filter(l => l.status === 'QUALIFIED').length,
-    converted: allLeads.filter(l => l.status === 'CONVERTED').length,
-    lost: allLeads.filter(l => l.status === 'LOST').length,
-    pipeline: allLeads.filter(l => !['CONVERTED', 'LOST'].includes(l.status)).reduce((s: number, l: any) => s + (l.value_pence || 0), 0),
-    overdue: overdue.length,
+    total: summary?.total || 0,
+    new: statusCount('NEW'),
+    contacted: statusCount('CONTACTED'),
+    qualified: statusCount('QUALIFIED'),
+    converted: statusCount('CONVERTED'),
+    lost: statusCount('LOST'),
+    pipeline: summary?.pipeline_pence || 0,
+    overdue: summary?.overdue_follow_ups || 0,
   }
 
   return (
@@ -153,6 +222,9 @@ export default function AdminClientsPage() {
         </div>
         <div style={{ display: 'flex', gap: 6 }}>
           <button style={{ ...btnGhost, ...btnSm }} onClick={handleSync} disabled={syncing}>{syncing ? 'Syncing…' : 'Sync from Bookings'}</button>
+          <button style={{ ...btnGhost, ...btnSm }} onClick={handleMergeDuplicates} disabled={merging}>{merging ? 'Checking…' : 'Merge Duplicates'}</button>
+          <button style={{ ...btnGhost, ...btnSm }} onClick={() => importRef.current?.click()} disabled={importing}>{importing ? 'Importing…' : 'Import CSV/JSON'}</button>
+          <input ref={importRef} type="file" accept=".csv,.json,.jsonl,text/csv,application/json" onChange={handleImport} style={{ display: 'none' }} />
           <button style={{ ...btnGhost, ...btnSm }} onClick={handleExportCSV}>CSV Export</button>
           <button style={btnPrimary} onClick={() => setShowAdd(true)}>+ Add Lead</button>
         </div>
@@ -193,7 +265,7 @@ export default function AdminClientsPage() {
             {allTags.map(t => <option key={t} value={t} style={optStyle}>{t}</option>)}
           </select>
         )}
-        <span style={{ fontSize: '0.75rem', color: C.muted }}>{filtered.length} result{filtered.length !== 1 ? 's' : ''}</span>
+        <span style={{ fontSize: '0.75rem', color: C.muted }}>{leads.length}{nextCursor ? '+' : ''} result{leads.length !== 1 ? 's' : ''}</span>
       </div>
 
       {/* Leads Table */}
@@ -209,7 +281,7 @@ export default function AdminClientsPage() {
             <th style={thStyle}>Status</th>
           </tr></thead>
           <tbody>
-            {filtered.map(l => {
+            {leads.map(l => {
               const isOverdue = l.follow_up_date && l.follow_up_date < today && !['CONVERTED', 'LOST'].includes(l.status)
               return (
                 <tr key={l.id} style={{ cursor: 'pointer' }} onClick={() => openDetail(l)} onMouseEnter={e => (e.currentTarget.style.background = C.cardAlt)} onMouseLeave={e => (e.currentTarget.style.background = 'transparent')}>
@@ -243,10 +315,17 @@ export default function AdminClientsPage() {
                 </tr>
               )
             })}
-            {filtered.length === 0 && <tr><td colSpan={7} style={{ textAlign: 'center', padding: '2rem', color: C.muted, fontSize: '0.85rem' }}>No leads found. Click &quot;Sync from Bookings&quot; to import existing clients.</td></tr>}
+            {leads.length === 0 && <tr><td colSpan={7} style={{ textAlign: 'center', padding: '2rem', color: C.muted, fontSize: '0.85rem' }}>No leads found. Click &quot;Sync from Bookings&quot; to import existing clients.</td></tr>}
           </tbody>
         </table>
       </div>
+      {nextCursor && (
+        <div style={{ textAlign: 'center', marginBottom: '1rem' }}>
+          <button onClick={loadMore} disabled={loadingMore} style={{ padding: '0.45rem 1.2rem', borderRadius: 8, border: `1px solid ${C.border}`, background: 'transparent', color: C.muted, fontWeight: 600, cursor: 'pointer', fontSize: '0.8rem', opacity: loadingMore ? 0.5 : 1 }}>
+            {loadingMore ? 'Loading…' : 'Load more'}
+          </button>
+        </div>
+      )}
 
       {/* Add Lead Modal */}
       {showAdd && (
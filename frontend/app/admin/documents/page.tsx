@@ -38,6 +38,8 @@ const CAT_COLORS: Record<string, string> = {
 
 export default function AdminDocumentsPage() {
   const [docs, setDocs] = useState<any[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [summary, setSummary] = useState<any>(null)
   const [loading, setLoading] = useState(true)
   const [activeCategory, setActiveCategory] = useState('')
@@ -56,11 +58,24 @@ export default function AdminDocumentsPage() {
     if (activeCategory) params.category = activeCategory
     if (search) params.search = search
     const [docsRes, sumRes] = await Promise.all([getDocuments(params), getDocumentSummary()])
-    setDocs(docsRes.data || [])
+    setDocs(docsRes.data?.results || [])
+    setNextCursor(docsRes.data?.next_cursor || null)
     setSummary(sumRes.data || null)
     setLoading(false)
   }, [activeCategory, search])
 
+  async function loadMore() {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    const params: any = { cursor: nextCursor }
+    if (activeCategory) params.category = activeCategory
+    if (search) params.search = search
+    const res = await getDocuments(params)
+    setDocs(prev => [...prev, ...(res.data?.results || [])])
+    setNextCursor(res.data?.next_cursor || null)
+    setLoadingMore(false)
+  }
+
   useEffect(() => { load() }, [load])
 
   function showToast(msg: string) {
@@ -360,6 +375,14 @@ export default function AdminDocumentsPage() {
         </div>
       )}
 
+      {!loading && nextCursor && (
+        <div style={{ textAlign: 'center', marginTop: '1rem' }}>
+          <button onClick={loadMore} disabled={loadingMore} style={{ padding: '0.45rem 1.2rem', borderRadius: 8, border: `1px solid ${C.border}`, background: 'transparent', color: C.muted, fontWeight: 600, cursor: 'pointer', fontSize: '0.8rem', opacity: loadingMore ? 0.5 : 1 }}>
+            {loadingMore ? 'Loading…' : 'Load more'}
+          </button>
+        </div>
+      )}
+
       {/* Upload / Edit Modal */}
       {showUpload && (
         <div style={{ position: 'fixed', inset: 0, background: 'rgba(0,0,0,0.6)', display: 'flex', alignItems: 'center', justifyContent: 'center', zIndex: 9000, padding: '1rem' }} onClick={() => { setShowUpload(false); setEditDoc(null) }}>
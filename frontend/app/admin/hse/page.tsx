@@ -216,7 +216,9 @@ export default function AdminHSEPage() {
   const [tab, setTab] = useState<Tab>('dashboard')
   const [dash, setDash] = useState<any>(null)
   const [items, setItems] = useState<any[]>([])
+  const [itemsCursor, setItemsCursor] = useState<string | null>(null)
   const [accidents, setAccidents] = useState<any[]>([])
+  const [accidentsCursor, setAccidentsCursor] = useState<string | null>(null)
   const [calData, setCalData] = useState<any>(null)
   const [auditLog, setAuditLog] = useState<any[]>([])
   const [loading, setLoading] = useState(true)
@@ -255,23 +257,34 @@ export default function AdminHSEPage() {
     } catch {}
   }, [])
 
-  const fetchItems = useCallback(async () => {
+  // Lists are paginated: a cursor fetches the next page and appends it
+  const fetchItems = useCallback(async (cursor?: string) => {
     try {
       const qs = new URLSearchParams()
       if (statusFilter) qs.set('status', statusFilter)
       if (typeFilter) qs.set('type', typeFilter)
+      if (cursor) qs.set('cursor', cursor)
       const r = await fetch(`${API}/items/?${qs}`)
-      if (r.ok) setItems(await r.json())
+      if (r.ok) {
+        const page = await r.json()
+        setItems(prev => cursor ? [...prev, ...page.results] : page.results)
+        setItemsCursor(page.next_cursor)
+      }
     } catch {}
   }, [statusFilter, typeFilter])
 
-  const fetchAccidents = useCallback(async () => {
+  const fetchAccidents = useCallback(async (cursor?: string) => {
     try {
       const qs = new URLSearchParams()
       if (accStatusFilter) qs.set('status', accStatusFilter)
       if (accRiddorFilter) qs.set('riddor', '1')
+      if (cursor) qs.set('cursor', cursor)
       const r = await fetch(`${API}/accidents/?${qs}`)
-      if (r.ok) setAccidents(await r.json())
+      if (r.ok) {
+        const page = await r.json()
+        setAccidents(prev => cursor ? [...prev, ...page.results] : page.results)
+        setAccidentsCursor(page.next_cursor)
+      }
     } catch {}
   }, [accStatusFilter, accRiddorFilter])
 
@@ -583,6 +596,12 @@ export default function AdminHSEPage() {
               ))}
             </div>
           )}
+          {!resolveMode && itemsCursor && (
+            <button onClick={() => fetchItems(itemsCursor)} style={{
+              display: 'block', margin: '1rem auto 0', padding: '0.4rem 1rem', borderRadius: 8,
+              border: `1px solid ${C.border}`, background: 'transparent', color: C.muted, cursor: 'pointer', fontSize: '0.8rem', fontWeight: 600,
+            }}>Load more</button>
+          )}
         </div>
       )}
 
@@ -767,6 +786,12 @@ export default function AdminHSEPage() {
               })}
             </div>
           )}
+          {accidentsCursor && (
+            <button onClick={() => fetchAccidents(accidentsCursor)} style={{
+              display: 'block', margin: '1rem auto 0', padding: '0.4rem 1rem', borderRadius: 8,
+              border: `1px solid ${C.border}`, background: 'transparent', color: C.muted, cursor: 'pointer', fontSize: '0.8rem', fontWeight: 600,
+            }}>Load more</button>
+          )}
 
           <div style={{ marginTop: '1rem', fontSize: '0.75rem', color: C.muted, padding: '0.75rem', background: C.card, borderRadius: 8 }}>
             <strong>RIDDOR:</strong> Reporting of Injuries, Diseases and Dangerous Occurrences Regulations 2013.
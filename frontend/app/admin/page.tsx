@@ -1,7 +1,7 @@
 'use client'
 
 import { useEffect, useState, useCallback } from 'react'
-import { getDashboardSummary } from '@/lib/api'
+import { getDashboardSummary, getRevenueBookings } from '@/lib/api'
 
 /* ================================================================
    SMART BOOKING DASHBOARD — Visual Intelligence Interface
@@ -35,10 +35,11 @@ const HOURS = Array.from({ length: 13 }, (_, i) => i + 7) // 7am-7pm
 interface DashData {
   revenue_today: number
   revenue_next_7_days: number
-  revenue_breakdown: { total: number; secured: number; deposit: number; at_risk: number; bookings: any[] }
+  revenue_breakdown: { total: number; secured: number; deposit: number; at_risk: number; counts: Record<string, number> }
   high_risk_bookings_today: number
   reliability_distribution: { excellent: number; good: number; fair: number; poor: number }
   client_quadrant: { id: number; name: string; email: string; reliability: number; frequency: number; zone: string; total_bookings: number; no_shows: number; lifetime_value: number }[]
+  client_quadrant_meta?: { total: number; zones: Record<string, number>; sample_step: number }
   demand_calendar: { cells: { hour: number; day_of_week: number; total_bookings: number; no_shows: number; no_show_rate: number; demand_intensity: number }[]; services: any[] }
   owner_actions: { severity: string; message: string; link: string; booking_id?: number }[]
   total_upcoming_bookings: number
@@ -116,7 +117,7 @@ function LegendDot({ color, label, value, pct: p }: { color: string; label: stri
 // ════════════════════════════════════════════════════════════════
 // PHASE 2 — Reliability Quadrant
 // ════════════════════════════════════════════════════════════════
-function ReliabilityQuadrant({ clients }: { clients: DashData['client_quadrant'] }) {
+function ReliabilityQuadrant({ clients, zones }: { clients: DashData['client_quadrant']; zones?: Record<string, number> }) {
   const [selected, setSelected] = useState<typeof clients[0] | null>(null)
   const maxFreq = Math.max(5, ...clients.map(c => c.frequency))
 
@@ -164,7 +165,7 @@ function ReliabilityQuadrant({ clients }: { clients: DashData['client_quadrant']
       <div style={{ display: 'flex', gap: '1rem', marginTop: '0.75rem', flexWrap: 'wrap' }}>
         {['VIP', 'Stable', 'Watch', 'High Risk'].map(z => (
           <div key={z} style={{ display: 'flex', alignItems: 'center', gap: 4, fontSize: '0.7rem', color: C.muted }}>
-            <div style={{ width: 8, height: 8, borderRadius: '50%', background: zoneColor(z) }} />{z} ({clients.filter(c => c.zone === z).length})
+            <div style={{ width: 8, height: 8, borderRadius: '50%', background: zoneColor(z) }} />{z} ({zones ? zones[z] ?? 0 : clients.filter(c => c.zone === z).length})
           </div>
         ))}
       </div>
@@ -322,7 +323,16 @@ function RiskStack({ data }: { data: DashData['revenue_breakdown'] }) {
     { key: 'at_risk', label: 'At Risk', value: data.at_risk, color: C.atRisk },
   ]
 
-  const hoverBookings = hover ? data.bookings.filter(b => b.category === hover) : []
+  // Per-booking lists are fetched on first hover of each category
+  const [lists, setLists] = useState<Record<string, any[]>>({})
+  useEffect(() => {
+    if (!hover || lists[hover]) return
+    getRevenueBookings({ category: hover }).then(res => {
+      if (res.data) setLists(l => ({ ...l, [hover]: res.data.bookings }))
+    })
+  }, [hover, lists])
+
+  const hoverBookings = hover ? lists[hover] || [] : []
 
   return (
     <div style={{ background: C.card, borderRadius: 16, padding: '1.5rem' }}>
@@ -620,7 +630,7 @@ export default function AdminDashboard() {
           {data.leave_this_week && data.leave_this_week.length > 0 && <LeaveThisWeekCard data={data.leave_this_week} />}
 
           {/* Phase 2: Reliability Quadrant */}
-          <ReliabilityQuadrant clients={data.client_quadrant} />
+          <ReliabilityQuadrant clients={data.client_quadrant} zones={data.client_quadrant_meta?.zones} />
 
           {/* Phase 3: Demand Calendar */}
           <DemandCalendar data={data.demand_calendar} />
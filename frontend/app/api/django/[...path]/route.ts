@@ -2,6 +2,9 @@ import { NextRequest, NextResponse } from 'next/server'
 
 const API_BASE = (process.env.DJANGO_BACKEND_URL || 'http://localhost:8000').trim()
 
+// Comms long-polls hold a request open for up to ~25s
+export const maxDuration = 60
+
 async function proxyRequest(req: NextRequest) {
   const url = new URL(req.url)
   const path = url.pathname.replace(/^\/api\/django/, '')
@@ -13,10 +16,14 @@ async function proxyRequest(req: NextRequest) {
     if (contentType) headers['Content-Type'] = contentType
     const auth = req.headers.get('authorization')
     if (auth) headers['Authorization'] = auth
+    const lastEventId = req.headers.get('last-event-id')
+    if (lastEventId) headers['Last-Event-ID'] = lastEventId
 
     const init: RequestInit = {
       method: req.method,
       headers,
+      // Closing the browser request also closes the one to Django
+      signal: req.signal,
     }
 
     if (req.method !== 'GET' && req.method !== 'HEAD') {
@@ -29,6 +36,19 @@ async function proxyRequest(req: NextRequest) {
     }
 
     const res = await fetch(target, init)
+
+    // Server-Sent Events are passed through as they arrive rather than buffered
+    if (res.headers.get('content-type')?.startsWith('text/event-stream')) {
+      return new NextResponse(res.body, {
+        status: res.status,
+        headers: {
+          'Content-Type': 'text/event-stream',
+          'Cache-Control': 'no-cache',
+          'X-Accel-Buffering': 'no',
+        },
+      })
+    }
+
     const body = await res.arrayBuffer()
 
     return new NextResponse(Buffer.from(body), {
@@ -38,6 +58,7 @@ async function proxyRequest(req: NextRequest) {
       },
     })
   } catch (err: any) {
+    if (req.signal.aborted) return new NextResponse(null, { status: 499 })
     console.error('[PROXY ERROR]', target, err.message)
     return NextResponse.json(
       { error: 'Proxy error', detail: err.message, target },
@@ -1,10 +1,23 @@
 import { NextRequest, NextResponse } from 'next/server'
+import { COOKIE_NAME } from '@/lib/auth'
 
 const BACKEND_URL = (process.env.DJANGO_BACKEND_URL || 'http://localhost:8000').trim().replace(/\/$/, '')
 
+// Request headers passed through so Django can answer ranges and revalidations
+const FORWARD_REQUEST_HEADERS = ['range', 'if-range', 'if-none-match', 'if-modified-since']
+const FORWARD_RESPONSE_HEADERS = [
+  'content-type', 'content-disposition', 'content-length', 'content-range',
+  'accept-ranges', 'etag', 'last-modified', 'cache-control',
+]
+
 /**
  * Proxy media/document file requests to the Django backend.
  * Routes /api/files/media/vault/2026/02/file.pdf → DJANGO_BACKEND_URL/media/vault/2026/02/file.pdf
+ * and protected files /api/files/api/files/document/12/ → DJANGO_BACKEND_URL/api/files/document/12/
+ *
+ * Links opened in a new tab carry no Authorization header, so the session
+ * cookie's access token is used instead. The body is streamed, and 206/304
+ * responses keep their status and headers.
  */
 async function proxyMedia(req: NextRequest) {
   const url = new URL(req.url)
@@ -14,33 +27,38 @@ async function proxyMedia(req: NextRequest) {
   try {
     const headers: Record<string, string> = {}
     const auth = req.headers.get('authorization')
+    const token = req.cookies.get(COOKIE_NAME)?.value
     if (auth) headers['Authorization'] = auth
+    else if (token) headers['Authorization'] = `Bearer ${token}`
+    for (const name of FORWARD_REQUEST_HEADERS) {
+      const value = req.headers.get(name)
+      if (value) headers[name] = value
+    }
 
-    let res = await fetch(target, { method: 'GET', headers })
+    let res = await fetch(target, { method: req.method, headers })
 
     // Fallback: if path doesn't start with /media/, try with /media/ prefix
-    if (!res.ok && !path.startsWith('/media/')) {
+    if (res.status === 404 && !path.startsWith('/media/') && !path.startsWith('/api/')) {
       const fallback = `${BACKEND_URL}/media${path}${url.search}`
-      res = await fetch(fallback, { method: 'GET', headers })
+      res = await fetch(fallback, { method: req.method, headers })
     }
 
-    if (!res.ok) {
-      return new NextResponse('File not found', { status: res.status })
+    if (!res.ok && res.status !== 304) {
+      return new NextResponse(res.status === 416 ? null : 'File not found', {
+        status: res.status,
+        headers: res.status === 416 ? { 'Content-Range': res.headers.get('content-range') || '' } : {},
+      })
     }
 
-    const body = await res.arrayBuffer()
-    const contentType = res.headers.get('content-type') || 'application/octet-stream'
-    const contentDisposition = res.headers.get('content-disposition')
-
-    const responseHeaders: Record<string, string> = {
-      'Content-Type': contentType,
-    }
-    if (contentDisposition) {
-      responseHeaders['Content-Disposition'] = contentDisposition
+    const responseHeaders: Record<string, string> = {}
+    for (const name of FORWARD_RESPONSE_HEADERS) {
+      const value = res.headers.get(name)
+      if (value) responseHeaders[name] = value
     }
+    if (!responseHeaders['content-type']) responseHeaders['content-type'] = 'application/octet-stream'
 
-    return new NextResponse(Buffer.from(body), {
-      status: 200,
+    return new NextResponse(res.status === 304 ? null : res.body, {
+      status: res.status,
       headers: responseHeaders,
     })
   } catch (err: any) {
@@ -50,3 +68,4 @@ async function proxyMedia(req: NextRequest) {
 }
 
 export const GET = proxyMedia
+export const HEAD = proxyMedia
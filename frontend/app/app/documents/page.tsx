@@ -31,6 +31,8 @@ const CAT_COLORS: Record<string, string> = {
 
 export default function StaffDocumentsPage() {
   const [docs, setDocs] = useState<any[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [loading, setLoading] = useState(true)
   const [activeCategory, setActiveCategory] = useState('')
   const [search, setSearch] = useState('')
@@ -42,11 +44,25 @@ export default function StaffDocumentsPage() {
     if (search) params.search = search
     const res = await getDocuments(params)
     // Staff only sees documents with access_level 'staff'
-    const all = res.data || []
+    const all = res.data?.results || []
     setDocs(all.filter((d: any) => d.access_level === 'staff'))
+    setNextCursor(res.data?.next_cursor || null)
     setLoading(false)
   }, [activeCategory, search])
 
+  async function loadMore() {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    const params: any = { cursor: nextCursor }
+    if (activeCategory) params.category = activeCategory
+    if (search) params.search = search
+    const res = await getDocuments(params)
+    const more = (res.data?.results || []).filter((d: any) => d.access_level === 'staff')
+    setDocs(prev => [...prev, ...more])
+    setNextCursor(res.data?.next_cursor || null)
+    setLoadingMore(false)
+  }
+
   useEffect(() => { load() }, [load])
 
   function fmtDate(d: string | null) {
@@ -140,6 +156,14 @@ export default function StaffDocumentsPage() {
           })}
         </div>
       )}
+
+      {!loading && nextCursor && (
+        <div style={{ textAlign: 'center', marginTop: '1rem' }}>
+          <button onClick={loadMore} disabled={loadingMore} style={{ padding: '0.45rem 1.2rem', borderRadius: 8, border: `1px solid ${C.border}`, background: 'transparent', color: C.muted, fontWeight: 600, cursor: 'pointer', fontSize: '0.8rem', opacity: loadingMore ? 0.5 : 1 }}>
+            {loadingMore ? 'Loading…' : 'Load more'}
+          </button>
+        </div>
+      )}
     </div>
   )
 }
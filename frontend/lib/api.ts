@@ -699,6 +699,37 @@ export async function getMessages(channelId: number, limit = 50) {
   return apiFetch<any[]>(`/comms/channels/${channelId}/messages/?limit=${limit}`)
 }
 
+export async function pollMessages(channelId: number, sinceId: number, signal?: AbortSignal) {
+  return apiFetch<any[]>(`/comms/channels/${channelId}/messages/poll/?since_id=${sinceId}`, { signal })
+}
+
+// Long-polls for messages after sinceId, calling onMessages as each batch arrives; returns a stop function
+export function subscribeMessages(channelId: number, sinceId: number, onMessages: (messages: any[]) => void) {
+  const controller = new AbortController()
+  let cursor = sinceId
+  ;(async () => {
+    while (!controller.signal.aborted) {
+      const res = await pollMessages(channelId, cursor, controller.signal)
+      if (controller.signal.aborted) return
+      if (res.data) {
+        if (res.data.length > 0) {
+          cursor = res.data[res.data.length - 1].id
+          onMessages(res.data)
+        }
+      } else {
+        await new Promise(resolve => setTimeout(resolve, 3000))
+      }
+    }
+  })()
+  return () => controller.abort()
+}
+
+// Appends messages not already in the list (a sent message also arrives through the subscription)
+export function mergeMessages(existing: any[], incoming: any[]) {
+  const seen = new Set(existing.map(m => m.id))
+  return [...existing, ...incoming.filter(m => !seen.has(m.id))]
+}
+
 export async function sendMessage(channelId: number, body: string, files?: File[]) {
   if (files && files.length > 0) {
     // Use FormData for file uploads — bypass apiFetch to avoid JSON content-type
@@ -790,15 +821,17 @@ export async function getClients() {
 }
 
 // --- Documents ---
-export async function getDocuments(params?: { category?: string; search?: string; expired?: boolean; expiring?: boolean; placeholder?: boolean }) {
+export async function getDocuments(params?: { category?: string; search?: string; expired?: boolean; expiring?: boolean; placeholder?: boolean; cursor?: string; page_size?: number }) {
   const qs = new URLSearchParams()
   if (params?.category) qs.set('category', params.category)
   if (params?.search) qs.set('search', params.search)
   if (params?.expired) qs.set('expired', 'true')
   if (params?.expiring) qs.set('expiring', 'true')
   if (params?.placeholder) qs.set('placeholder', 'true')
+  if (params?.cursor) qs.set('cursor', params.cursor)
+  if (params?.page_size) qs.set('page_size', String(params.page_size))
   const q = qs.toString()
-  return apiFetch<any[]>(`/documents/${q ? '?' + q : ''}`)
+  return apiFetch<{ results: any[]; next_cursor: string | null }>(`/documents/${q ? '?' + q : ''}`)
 }
 
 export async function getDocumentSummary() {
@@ -842,11 +875,27 @@ export async function getDocumentTags() {
 }
 
 // --- CRM ---
-export async function getLeads(params?: { status?: string }) {
+export async function getLeads(params?: { status?: string; tag?: string; search?: string; cursor?: string; page_size?: number }) {
   const qs = new URLSearchParams()
   if (params?.status) qs.set('status', params.status)
+  if (params?.tag) qs.set('tag', params.tag)
+  if (params?.search) qs.set('search', params.search)
+  if (params?.cursor) qs.set('cursor', params.cursor)
+  if (params?.page_size) qs.set('page_size', String(params.page_size))
   const q = qs.toString()
-  return apiFetch<any[]>(`/crm/leads/${q ? '?' + q : ''}`)
+  return apiFetch<{ results: any[]; next_cursor: string | null }>(`/crm/leads/${q ? '?' + q : ''}`)
+}
+
+// Pipeline totals over every lead, counted server-side
+export async function getLeadSummary() {
+  return apiFetch<{
+    total: number
+    by_status: Record<string, { count: number; value_pence: number }>
+    by_source: Record<string, number>
+    pipeline_pence: number
+    overdue_follow_ups: number
+    tags: string[]
+  }>('/crm/leads/summary/')
 }
 
 export async function createLead(data: any) {
@@ -865,11 +914,40 @@ export async function syncLeadsFromBookings() {
   return apiFetch<any>('/crm/sync/', { method: 'POST' })
 }
 
+export async function importLeads(formData: FormData) {
+  const token = getAccessToken()
+  const res = await fetch(`/api/django/crm/leads/import/`, {
+    method: 'POST',
+    headers: { ...(token ? { Authorization: `Bearer ${token}` } : {}) },
+    body: formData,
+  })
+  const data = await res.json()
+  if (!res.ok) return { data: null, error: data.error || data.detail || JSON.stringify(data) }
+  return { data, error: null }
+}
+
+export async function getLeadDuplicates() {
+  return apiFetch<{ clusters: { primary_id: number; leads: any[] }[] }>('/crm/leads/duplicates/')
+}
+
+export async function mergeLeads(data: { primary_id: number; duplicate_ids: number[] } | { all: true }) {
+  return apiFetch<any>('/crm/leads/merge/', { method: 'POST', body: JSON.stringify(data) })
+}
+
 // --- Smart Dashboard ---
 export async function getDashboardSummary() {
   return apiFetch<any>('/dashboard-summary/')
 }
 
+export async function getRevenueBookings(params?: { category?: string; page?: number; page_size?: number }) {
+  const qs = new URLSearchParams()
+  if (params?.category) qs.set('category', params.category)
+  if (params?.page) qs.set('page', String(params.page))
+  if (params?.page_size) qs.set('page_size', String(params.page_size))
+  const q = qs.toString()
+  return apiFetch<any>(`/dashboard-summary/revenue-bookings/${q ? '?' + q : ''}`)
+}
+
 // --- Analytics ---
 export async function getAnalyticsDashboard() {
   return apiFetch<any>('/analytics/dashboard/')